@@ -5,6 +5,8 @@ Central location for season-related constants used across API endpoints.
 Update CURRENT_SEASON at the start of each new season.
 """
 
+import os
+
 # The currently active MNP season
 CURRENT_SEASON = 23
 
@@ -13,3 +15,6 @@ AVAILABLE_SEASONS = [20, 21, 22, CURRENT_SEASON]
 
 # Default seasons for multi-season analysis (current + previous)
 DEFAULT_ANALYSIS_SEASONS = [CURRENT_SEASON - 1, CURRENT_SEASON]
+
+# Keep all scores in memory for analytic endpoints (api/services/score_store.py)
+SCORE_STORE_ENABLED = os.getenv("SCORE_STORE_ENABLED", "false").lower() == "true"
@@ -17,7 +17,7 @@ from slowapi.errors import RateLimitExceeded
 from slowapi.util import get_remote_address
 from starlette.middleware.base import BaseHTTPMiddleware
 
-from api.config import AVAILABLE_SEASONS
+from api.config import AVAILABLE_SEASONS, SCORE_STORE_ENABLED
 from api.routers import (
     analysis,
     live_matches,
@@ -31,6 +31,7 @@ from api.routers import (
     teams,
     venues,
 )
+from api.services.score_store import load_score_store
 from etl.database import db
 
 
@@ -45,6 +46,11 @@ async def lifespan(app: FastAPI):
     db.connect(use_pool=True)
     logger.info("Database connection pool initialized")
 
+    # Optional: load scores into the in-process columnar store. A failed load
+    # is logged and leaves the endpoints on their SQL paths; it doesn't stop startup
+    if SCORE_STORE_ENABLED:
+        load_score_store()
+
     yield
 
     # Shutdown: Close database connections
@@ -142,6 +142,7 @@ class ScorePercentile(BaseModel):
     machine_key: str
     machine_name: str | None = None
     venue_key: str | None = None
+    round_type: str = Field("_ALL_", description="'_ALL_', 'singles' or 'doubles'")
     percentile: int = Field(..., ge=0, le=100, description="Percentile value (0-100)")
     score_threshold: int = Field(..., description="Score at this percentile")
     sample_size: int = Field(..., gt=0, description="Number of scores used to calculate percentile")
@@ -157,11 +158,43 @@ class MachinePercentiles(BaseModel):
     machine_key: str
     machine_name: str
     venue_key: str
+    round_type: str = Field("_ALL_", description="'_ALL_', 'singles' or 'doubles'")
     season: int
     sample_size: int
     percentiles: dict[int, int] = Field(..., description="Map of percentile -> score")
 
 
+class ScoreHistogramBucket(BaseModel):
+    """One log-scaled histogram bucket: scores in [low, high); scores of 0 get [0, 1)"""
+
+    low: int
+    high: int
+    count: int
+
+
+class ScoreScatterPoint(BaseModel):
+    """A score from the downsampled scatter series"""
+
+    score: int
+    percentile: float = Field(..., ge=0, le=100, description="Rank among all the scores (0-100)")
+    player_key: str
+    player_name: str | None = None
+
+
+class MachineScoreDistribution(BaseModel):
+    """Pre-binned score distribution of a machine for charts"""
+
+    machine_key: str
+    machine_name: str
+    venue_key: str
+    seasons: list[int]
+    score_count: int
+    min_score: int
+    max_score: int
+    buckets: list[ScoreHistogramBucket]
+    scatter: list[ScoreScatterPoint]
+
+
 # Player Machine Stats Models
 class PlayerMachineStats(BaseModel):
     """Player statistics for a specific machine"""
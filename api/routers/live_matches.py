@@ -23,13 +23,14 @@ from api.models.schemas import (
     LiveScore,
     LiveWeekResponse,
 )
+from api.services import live_snapshots
 
 router = APIRouter(prefix="/live", tags=["live"])
 logger = logging.getLogger(__name__)
 
 MNP_MAIN_BASE = "https://mondaynightpinball.com"
 
-# In-memory caches with TTL
+# In-memory caches with TTL, in front of the shared live_match_snapshots table
 # Structure: {key: {"data": ..., "expires": datetime}}
 _match_cache: dict[str, dict] = {}
 _week_cache: dict[str, dict] = {}
@@ -55,7 +56,7 @@ def _get_week_matches_from_db(season: int, week: int) -> list[dict]:
     return execute_query(
         """
         SELECT
-            m.match_key, m.week, m.date,
+            m.match_key, m.season, m.week, m.date,
             m.away_team_key, t1.team_name AS away_team_name,
             m.home_team_key, t2.team_name AS home_team_name,
             m.venue_key
@@ -327,7 +328,7 @@ def _get_percentile_thresholds(machine_keys: list[str]) -> dict[str, list[tuple]
         f"""
         SELECT machine_key, percentile, score_threshold
         FROM score_percentiles
-        WHERE machine_key IN ({placeholders}) AND venue_key = '_ALL_'
+        WHERE machine_key IN ({placeholders}) AND venue_key = '_ALL_' AND round_type = '_ALL_'
         ORDER BY machine_key, score_threshold ASC
         """,
         params,
@@ -482,6 +483,45 @@ def _build_detail(
     )
 
 
+def _enrich_detail(db_match: dict, raw: dict) -> LiveMatchDetail:
+    """Look up machine names and percentiles for a match and build its detail."""
+    machine_keys = list(
+        {
+            game.get("machine")
+            for rd in raw.get("rounds", [])
+            for game in rd.get("games", [])
+            if game.get("machine")
+        }
+    )
+
+    machine_names = _get_machine_names(machine_keys)
+    percentile_data = _get_percentile_thresholds(machine_keys)
+
+    return _build_detail(db_match, raw, machine_names, percentile_data)
+
+
+def _snapshot_row(
+    db_match: dict,
+    raw: dict,
+    detail: LiveMatchDetail | None,
+    fetched_at: datetime,
+) -> dict:
+    """Build a live_match_snapshots row. COMPLETE matches are stored as final."""
+    state = _parse_state(raw)
+    is_final = state == "COMPLETE"
+    return {
+        "match_key": db_match["match_key"],
+        "season": db_match["season"],
+        "week": db_match["week"],
+        "state": state,
+        "is_final": is_final,
+        "raw_json": raw,
+        "detail": detail.model_dump(mode="json") if detail is not None else None,
+        "fetched_at": fetched_at,
+        "expires_at": None if is_final else fetched_at + ACTIVE_TTL,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Endpoints
 # ---------------------------------------------------------------------------
@@ -494,7 +534,8 @@ def _build_detail(
     description=(
         "Fetches all matches for the current (or specified) week from "
         "mondaynightpinball.com in parallel and returns their live state and "
-        "running point totals. Results cached for 60 seconds."
+        "running point totals. Results cached for 60 seconds; completed matches "
+        "are served from the stored snapshot and never refetched."
     ),
 )
 async def get_live_week(
@@ -527,9 +568,25 @@ async def get_live_week(
     )
     available_weeks = [r["week"] for r in week_rows]
 
-    # Fetch all matches from the main site in parallel
-    raw_results = await asyncio.gather(*[_fetch_match_json(m["match_key"]) for m in db_matches])
-
+    # Serve completed (and recently fetched active) matches from the shared
+    # snapshot table; only the rest are fetched from the main site in parallel
+    snapshots = live_snapshots.load_snapshots([m["match_key"] for m in db_matches])
+    raw_by_key = {
+        key: snap["raw_json"]
+        for key, snap in snapshots.items()
+        if live_snapshots.is_usable(snap, now, refresh)
+    }
+    to_fetch = [m for m in db_matches if m["match_key"] not in raw_by_key]
+    fetched = await asyncio.gather(*[_fetch_match_json(m["match_key"]) for m in to_fetch])
+
+    new_snapshots = []
+    for db_match, raw in zip(to_fetch, fetched):
+        raw_by_key[db_match["match_key"]] = raw
+        if raw is not None:
+            new_snapshots.append(_snapshot_row(db_match, raw, None, now))
+    live_snapshots.save_snapshots(new_snapshots)
+
+    raw_results = [raw_by_key.get(m["match_key"]) for m in db_matches]
     summaries = [_build_summary(db_match, raw) for db_match, raw in zip(db_matches, raw_results)]
 
     result = LiveWeekResponse(
@@ -546,7 +603,8 @@ async def get_live_week(
     description=(
         "Fetches a single match from mondaynightpinball.com and enriches each "
         "game score with its historical percentile rank on that machine. "
-        "Active matches cached for 30s; complete matches cached for 10 minutes."
+        "Active matches cached for 30s and shared between workers; complete "
+        "matches are stored permanently and never fetched upstream again."
     ),
 )
 async def get_live_match(
@@ -564,7 +622,7 @@ async def get_live_match(
     db_rows = execute_query(
         """
         SELECT
-            m.match_key, m.week, m.date,
+            m.match_key, m.season, m.week, m.date,
             m.away_team_key, t1.team_name AS away_team_name,
             m.home_team_key, t2.team_name AS home_team_name,
             m.venue_key
@@ -583,6 +641,25 @@ async def get_live_match(
         )
     db_match = db_rows[0]
 
+    # Completed matches (and active ones another worker fetched recently) are
+    # served from the shared snapshot table instead of the main site
+    snapshot = live_snapshots.load_snapshot(match_key)
+    if live_snapshots.is_usable(snapshot, now, refresh):
+        ttl = COMPLETE_TTL if snapshot["is_final"] else snapshot["expires_at"] - now
+        if snapshot["detail"] is not None and not refresh:
+            detail = LiveMatchDetail.model_validate(snapshot["detail"])
+            _match_cache[match_key] = {"data": detail, "expires": now + ttl}
+            return detail
+
+        # Stored raw JSON without a (fresh) enrichment: rebuild it locally
+        raw = snapshot["raw_json"]
+        detail = _enrich_detail(db_match, raw)
+        live_snapshots.save_snapshots(
+            [_snapshot_row(db_match, raw, detail, snapshot["fetched_at"])]
+        )
+        _match_cache[match_key] = {"data": detail, "expires": now + ttl}
+        return detail
+
     raw = await _fetch_match_json(match_key)
     if raw is None:
         # Return minimal detail with UNAVAILABLE state instead of 502
@@ -596,20 +673,8 @@ async def get_live_match(
         _match_cache[match_key] = {"data": detail, "expires": now + ACTIVE_TTL}
         return detail
 
-    # Collect unique machine keys for batch lookups
-    machine_keys = list(
-        {
-            game.get("machine")
-            for rd in raw.get("rounds", [])
-            for game in rd.get("games", [])
-            if game.get("machine")
-        }
-    )
-
-    machine_names = _get_machine_names(machine_keys)
-    percentile_data = _get_percentile_thresholds(machine_keys)
-
-    detail = _build_detail(db_match, raw, machine_names, percentile_data)
+    detail = _enrich_detail(db_match, raw)
+    live_snapshots.save_snapshots([_snapshot_row(db_match, raw, detail, now)])
 
     ttl = COMPLETE_TTL if _parse_state(raw) == "COMPLETE" else ACTIVE_TTL
     _match_cache[match_key] = {"data": detail, "expires": now + ttl}
@@ -14,13 +14,18 @@ from api.models.schemas import (
     MachineList,
     MachinePercentiles,
     MachineScore,
+    MachineScoreDistribution,
     MachineScoreList,
     MachineTopScore,
     ScorePercentile,
 )
+from api.services.score_distribution import get_machine_distribution
 
 router = APIRouter(prefix="/machines", tags=["machines"])
 
+# score_percentiles round types ('_ALL_' = all rounds)
+ROUND_TYPES = ["_ALL_", "singles", "doubles"]
+
 
 @router.get(
     "/dashboard-stats",
@@ -303,17 +308,22 @@ def get_machine_percentiles(
     venue_key: str | None = Query(
         None, description="Filter by venue (use '_ALL_' for aggregate stats)"
     ),
+    round_type: str = Query(
+        "_ALL_", description="Round type: '_ALL_' (all rounds), 'singles' or 'doubles'"
+    ),
 ):
     """
     Get score percentile data for a specific machine.
 
-    Returns percentiles (10th, 25th, 50th, 75th, 90th, 95th, 99th) for the machine.
+    Returns percentiles (1st, 5th, 10th, ..., 95th, 99th) for the machine, per
+    venue and season.
 
     Example queries:
     - `/machines/SternWars/percentiles` - All percentile data for Star Wars
     - `/machines/SternWars/percentiles?season=22` - Season 22 only
     - `/machines/SternWars/percentiles?venue_key=_ALL_` - Aggregate across all venues
     - `/machines/SternWars/percentiles?venue_key=JUP` - Jupiter venue only
+    - `/machines/SternWars/percentiles?venue_key=JUP&round_type=singles` - Singles rounds at Jupiter
     """
     # First verify machine exists
     machine_query = "SELECT machine_name FROM machines WHERE machine_key = :machine_key"
@@ -323,9 +333,14 @@ def get_machine_percentiles(
 
     machine_name = machine_result[0]["machine_name"]
 
+    if round_type not in ROUND_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid round_type. Must be one of: {ROUND_TYPES}"
+        )
+
     # Build WHERE clauses
-    where_clauses = ["sp.machine_key = :machine_key"]
-    params = {"machine_key": machine_key}
+    where_clauses = ["sp.machine_key = :machine_key", "sp.round_type = :round_type"]
+    params = {"machine_key": machine_key, "round_type": round_type}
 
     if season is not None:
         where_clauses.append("sp.season = :season")
@@ -342,6 +357,7 @@ def get_machine_percentiles(
         SELECT
             sp.machine_key,
             sp.venue_key,
+            sp.round_type,
             sp.season,
             sp.sample_size,
             sp.percentile,
@@ -366,6 +382,7 @@ def get_machine_percentiles(
                 "machine_key": machine_key,
                 "machine_name": machine_name,
                 "venue_key": row["venue_key"],
+                "round_type": row["round_type"],
                 "season": row["season"],
                 "sample_size": row["sample_size"],
                 "percentiles": {},
@@ -386,6 +403,9 @@ def get_machine_percentiles_raw(
     machine_key: str,
     season: int | None = Query(None, description="Filter by season"),
     venue_key: str | None = Query(None, description="Filter by venue"),
+    round_type: str = Query(
+        "_ALL_", description="Round type: '_ALL_' (all rounds), 'singles' or 'doubles'"
+    ),
     percentile: int | None = Query(None, ge=0, le=100, description="Filter by specific percentile"),
 ):
     """
@@ -406,9 +426,14 @@ def get_machine_percentiles_raw(
 
     machine_name = machine_result[0]["machine_name"]
 
+    if round_type not in ROUND_TYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Invalid round_type. Must be one of: {ROUND_TYPES}"
+        )
+
     # Build WHERE clauses
-    where_clauses = ["sp.machine_key = :machine_key"]
-    params = {"machine_key": machine_key}
+    where_clauses = ["sp.machine_key = :machine_key", "sp.round_type = :round_type"]
+    params = {"machine_key": machine_key, "round_type": round_type}
 
     if season is not None:
         where_clauses.append("sp.season = :season")
@@ -428,6 +453,7 @@ def get_machine_percentiles_raw(
         SELECT
             sp.machine_key,
             sp.venue_key,
+            sp.round_type,
             sp.percentile,
             sp.score_threshold,
             sp.sample_size,
@@ -450,6 +476,60 @@ def get_machine_percentiles_raw(
     return [ScorePercentile(**row) for row in rows]
 
 
+@router.get(
+    "/{machine_key}/distribution",
+    response_model=MachineScoreDistribution,
+    responses={404: {"model": ErrorResponse}},
+    summary="Get machine score distribution",
+    description="Get a log-scaled score histogram and a downsampled scatter series for charts",
+)
+def get_machine_score_distribution(
+    machine_key: str,
+    seasons: list[int] | None = Query(None, description="Filter by season(s) - can pass multiple"),
+    venue_key: str | None = Query(None, description="Filter by venue"),
+):
+    """
+    Get the score distribution of a machine, pre-binned by the ETL.
+
+    Returns histogram buckets (about 21% wide on a log scale) and up to 200
+    scores at evenly spaced percentiles, whatever the number of scores. Scores
+    of 0 are counted in a bucket of their own, low 0 and high 1.
+
+    Example queries:
+    - `/machines/MM/distribution` - All seasons, all venues
+    - `/machines/MM/distribution?seasons=21&seasons=22` - Seasons 21 and 22
+    - `/machines/MM/distribution?venue_key=T4B` - Scores from 4Bs Tavern only
+    """
+    # First verify machine exists
+    machine_query = "SELECT machine_name FROM machines WHERE machine_key = :machine_key"
+    machine_result = execute_query(machine_query, {"machine_key": machine_key})
+    if not machine_result:
+        raise HTTPException(status_code=404, detail=f"Machine '{machine_key}' not found")
+
+    distribution = get_machine_distribution(machine_key, seasons, venue_key)
+    if distribution is None:
+        raise HTTPException(
+            status_code=404, detail=f"No score distribution found for machine '{machine_key}'"
+        )
+
+    # Player names for the scatter tooltips
+    player_keys = list({point["player_key"] for point in distribution["scatter"]})
+    names = execute_query(
+        "SELECT player_key, name FROM players WHERE player_key = ANY(:player_keys)",
+        {"player_keys": player_keys},
+    )
+    name_map = {row["player_key"]: row["name"] for row in names}
+    for point in distribution["scatter"]:
+        point["player_name"] = name_map.get(point["player_key"])
+
+    return MachineScoreDistribution(
+        machine_key=machine_key,
+        machine_name=machine_result[0]["machine_name"],
+        venue_key=venue_key or "_ALL_",
+        **distribution,
+    )
+
+
 @router.get(
     "/{machine_key}/scores",
     response_model=MachineScoreList,
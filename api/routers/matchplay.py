@@ -7,6 +7,7 @@ Provides endpoints for:
 - Fetching Matchplay stats for linked players
 """
 
+import asyncio
 import logging
 from datetime import datetime
 
@@ -26,7 +27,10 @@ from api.models.schemas import (
     MatchplayRating,
     MatchplayUser,
 )
+from api.services.matchplay_cache import response_cache
 from api.services.matchplay_client import MatchplayClient, MatchplayClientError
+from api.services.matchplay_ratings import bulk_upsert_ratings, profile_to_rating_row
+from api.services.matchplay_scheduler import MatchplayRefreshScheduler
 from api.services.player_matcher import PlayerMatcher
 from etl.database import db
 
@@ -34,6 +38,10 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/matchplay", tags=["matchplay"])
 
+# Time budget for the refresh=true path of /players/ratings. Players that can't
+# be fetched within it (rate limit exhausted) keep their cached ratings.
+REFRESH_TIMEOUT_SECONDS = 20.0
+
 
 def get_db_connection():
     """Get database connection, ensuring it's initialized."""
@@ -42,16 +50,24 @@ def get_db_connection():
     return db.engine.connect()
 
 
+def _store_refreshed_ratings(rows: list[dict]) -> None:
+    """Bulk upsert refreshed ratings and stamp last_synced in one transaction."""
+    with get_db_connection() as conn:
+        bulk_upsert_ratings(conn, rows)
+        conn.commit()
+
+
 @router.get(
     "/status",
     summary="Check Matchplay integration status",
-    description="Check if Matchplay API is configured and accessible",
+    description="Check if Matchplay API is configured and accessible, with response cache stats",
 )
 async def get_matchplay_status():
     """
     Check if the Matchplay.events integration is properly configured.
     """
-    client = MatchplayClient()
+    # Bypass the response cache so the connectivity check really hits the API
+    client = MatchplayClient(cache=None)
 
     status = {
         "configured": client.is_configured(),
@@ -72,6 +88,8 @@ async def get_matchplay_status():
             status["api_accessible"] = False
             status["error"] = str(e)
 
+    status["response_cache"] = await asyncio.to_thread(response_cache.summary)
+
     return status
 
 
@@ -576,110 +594,41 @@ async def get_players_matchplay_ratings(
     if refresh and client.is_configured():
         logger.info(f"Refreshing Matchplay ratings for {len(mappings)} players")
 
+        # Fetch all profiles concurrently, paced against the API rate limit
+        scheduler = MatchplayRefreshScheduler(client)
+        try:
+            result = await scheduler.fetch_profiles(
+                [m["matchplay_user_id"] for m in mappings], timeout=REFRESH_TIMEOUT_SECONDS
+            )
+        except MatchplayClientError as e:
+            raise HTTPException(status_code=503, detail=f"Matchplay API error: {str(e)}")
+        if result["skipped"]:
+            logger.warning(
+                f"Rating refresh ran out of time; {len(result['skipped'])} players left cached"
+            )
+
+        # Gather refreshed rows in memory, then write them in one round trip
+        rating_rows = []
         for mapping in mappings:
             player_key = mapping["mnp_player_key"]
-            matchplay_user_id = mapping["matchplay_user_id"]
+            profile = result["profiles"].get(mapping["matchplay_user_id"])
+            if not profile:
+                continue
 
-            # Check rate limit before each call
-            if client.rate_limit_remaining is not None and client.rate_limit_remaining <= 2:
-                logger.warning("Rate limit nearly exhausted, stopping refresh")
-                break
+            row = profile_to_rating_row(mapping["matchplay_user_id"], profile)
+            rating_rows.append(row)
 
-            try:
-                # Fetch full profile with IFPA and tournament count data
-                profile = await client.get_user_profile(
-                    matchplay_user_id, include_ifpa=True, include_counts=True
-                )
-                if profile:
-                    # Extract user info
-                    user_info = profile.get("user", {})
-                    location = user_info.get("location")
-                    avatar = user_info.get("avatar")
-
-                    # Extract rating data
-                    rating_data = profile.get("rating", {})
-                    new_rating = rating_data.get("rating")
-                    new_rd = rating_data.get("rd")
-                    game_count = rating_data.get("gameCount")
-                    win_count = rating_data.get("winCount")
-                    loss_count = rating_data.get("lossCount")
-                    efficiency_percent = rating_data.get("efficiencyPercent")
-                    lower_bound = rating_data.get("lowerBound")
-
-                    # Extract IFPA data
-                    ifpa_data = profile.get("ifpa", {})
-                    ifpa_id = ifpa_data.get("ifpaId") if ifpa_data else None
-                    ifpa_rank = ifpa_data.get("rank") if ifpa_data else None
-                    ifpa_rating = ifpa_data.get("rating") if ifpa_data else None
-                    ifpa_womens_rank = ifpa_data.get("womensRank") if ifpa_data else None
-
-                    # Extract tournament count
-                    counts = profile.get("userCounts", {})
-                    tournament_count = counts.get("tournamentPlayCount")
-
-                    # Update the response
-                    ratings[player_key]["rating"] = new_rating
-                    ratings[player_key]["rd"] = new_rd
-                    ratings[player_key]["game_count"] = game_count
-
-                    # Store in cache - upsert into matchplay_ratings
-                    with get_db_connection() as conn:
-                        now = datetime.utcnow()
-
-                        # Delete existing rating for this user
-                        conn.execute(
-                            text("""
-                            DELETE FROM matchplay_ratings
-                            WHERE matchplay_user_id = :matchplay_user_id
-                        """),
-                            {"matchplay_user_id": matchplay_user_id},
-                        )
-
-                        # Insert new rating with all available data
-                        conn.execute(
-                            text("""
-                            INSERT INTO matchplay_ratings
-                                (matchplay_user_id, rating_value, rating_rd, game_count, win_count,
-                                 loss_count, efficiency_percent, lower_bound, ifpa_id, ifpa_rank,
-                                 ifpa_rating, ifpa_womens_rank, tournament_count, location, avatar, fetched_at)
-                            VALUES
-                                (:matchplay_user_id, :rating_value, :rating_rd, :game_count, :win_count,
-                                 :loss_count, :efficiency_percent, :lower_bound, :ifpa_id, :ifpa_rank,
-                                 :ifpa_rating, :ifpa_womens_rank, :tournament_count, :location, :avatar, :fetched_at)
-                        """),
-                            {
-                                "matchplay_user_id": matchplay_user_id,
-                                "rating_value": new_rating,
-                                "rating_rd": new_rd,
-                                "game_count": game_count,
-                                "win_count": win_count,
-                                "loss_count": loss_count,
-                                "efficiency_percent": efficiency_percent,
-                                "lower_bound": lower_bound,
-                                "ifpa_id": ifpa_id,
-                                "ifpa_rank": ifpa_rank,
-                                "ifpa_rating": ifpa_rating,
-                                "ifpa_womens_rank": ifpa_womens_rank,
-                                "tournament_count": tournament_count,
-                                "location": location,
-                                "avatar": avatar,
-                                "fetched_at": now,
-                            },
-                        )
-
-                        # Update last_synced on mapping
-                        conn.execute(
-                            text("""
-                            UPDATE matchplay_player_mappings
-                            SET last_synced = :last_synced
-                            WHERE matchplay_user_id = :matchplay_user_id
-                        """),
-                            {"matchplay_user_id": matchplay_user_id, "last_synced": now},
-                        )
-                        conn.commit()
+            # Update the response
+            ratings[player_key]["rating"] = row["rating_value"]
+            ratings[player_key]["rd"] = row["rating_rd"]
+            ratings[player_key]["game_count"] = row["game_count"]
 
+        if rating_rows:
+            try:
+                # Run the blocking DB write off the event loop
+                await asyncio.to_thread(_store_refreshed_ratings, rating_rows)
             except Exception as e:
-                logger.warning(f"Failed to fetch rating for {player_key}: {e}")
+                logger.warning(f"Failed to cache {len(rating_rows)} refreshed ratings: {e}")
 
         oldest_fetch = datetime.utcnow()
 
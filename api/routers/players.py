@@ -4,6 +4,7 @@ Players API endpoints
 
 from collections import defaultdict
 
+import numpy as np
 from fastapi import APIRouter, HTTPException, Query
 
 from api.config import CURRENT_SEASON
@@ -23,6 +24,8 @@ from api.models.schemas import (
     PlayerMachineStats,
     PlayerMachineStatsList,
 )
+from api.services.quantile_sketch import get_machine_digests
+from api.services.score_store import ScoreStore, get_score_store
 
 router = APIRouter(prefix="/players", tags=["players"])
 
@@ -47,6 +50,10 @@ def calculate_stats_from_scores(
     """
     import numpy as np
 
+    store = get_score_store()
+    if store is not None:
+        return calculate_stats_from_store(store, player_key, seasons, venue_key, min_games)
+
     # Build WHERE clause
     where_clauses = ["s.player_key = :player_key"]
     params = {"player_key": player_key}
@@ -125,6 +132,51 @@ def calculate_stats_from_scores(
     return stats
 
 
+def calculate_stats_from_store(
+    store: ScoreStore,
+    player_key: str,
+    seasons: list[int] | None,
+    venue_key: str | None,
+    min_games: int,
+) -> list[dict]:
+    """calculate_stats_from_scores() over the in-process score store."""
+    mask = store.select(
+        seasons=seasons, players=[player_key], venues=[venue_key] if venue_key else None
+    )
+    groups = [
+        group for group in store.group_stats(mask, by="machine") if group["count"] >= min_games
+    ]
+    if not groups:
+        return []
+
+    machines = execute_query(
+        "SELECT machine_key, machine_name FROM machines WHERE machine_key = ANY(:machine_keys)",
+        {"machine_keys": [group["key"] for group in groups]},
+    )
+    machine_names = {row["machine_key"]: row["machine_name"] for row in machines}
+
+    # Like the SQL path, season and venue come from the machine's lowest score
+    return [
+        {
+            "player_key": player_key,
+            "machine_key": group["key"],
+            "machine_name": machine_names[group["key"]],
+            "venue_key": venue_key or store.key_at("venue", group["first_row"]),
+            "season": int(store.columns["season"][group["first_row"]]),
+            "games_played": group["count"],
+            "total_score": group["total"],
+            "median_score": int(group["median"]),
+            "avg_score": int(group["total"] / group["count"]),
+            "best_score": group["max"],
+            "worst_score": group["min"],
+            "median_percentile": None,
+            "avg_percentile": None,
+        }
+        for group in groups
+        if group["key"] in machine_names
+    ]
+
+
 def calculate_win_percentage_for_player(
     player_key: str, seasons: list[int] | None = None, venue_key: str | None = None
 ) -> dict[str, float]:
@@ -357,6 +409,7 @@ def get_player_dashboard_stats():
                         FROM score_percentiles p
                         WHERE p.machine_key = s.machine_key
                           AND p.venue_key = :venue_all
+                          AND p.round_type = '_ALL_'
                           AND p.season = s.season
                           AND s.score >= p.score_threshold
                     ) as percentile
@@ -823,44 +876,24 @@ def get_player_machine_score_history(
             detail=f"No scores found for player '{player_key}' on machine '{machine_key}'",
         )
 
-    # Fetch percentile thresholds for this machine
-    pct_results = execute_query(
-        """
-        SELECT percentile, score_threshold
-        FROM score_percentiles
-        WHERE machine_key = :machine_key AND venue_key = '_ALL_'
-        ORDER BY score_threshold ASC
-        """,
-        {"machine_key": machine_key},
-    )
-    pct_thresholds = (
-        [(r["score_threshold"], r["percentile"]) for r in pct_results] if pct_results else []
+    # Percentile rank of each score among all league scores on this machine,
+    # from the machine's score sketches (all seasons, all venues)
+    machine_digest = get_machine_digests(machine_keys=[machine_key]).get(machine_key)
+    percentiles = (
+        np.minimum(machine_digest.cdf([s["score"] for s in scores]) * 100, 99).astype(int)
+        if machine_digest
+        else [None] * len(scores)
     )
 
-    def _score_percentile(score_val, thresholds):
-        result = 0
-        for threshold, pct in thresholds:
-            if score_val >= threshold:
-                result = pct
-            else:
-                break
-        return result
-
     # Group scores by season for aggregation
-    from collections import defaultdict
-
-    import numpy as np
-
     season_groups = defaultdict(list)
     all_scores_data = []
 
-    for score_record in scores:
+    for score_record, percentile in zip(scores, percentiles):
         season_num = score_record["season"]
         score_val = score_record["score"]
         season_groups[season_num].append(score_val)
 
-        percentile = _score_percentile(score_val, pct_thresholds) if pct_thresholds else None
-
         all_scores_data.append(
             {
                 "score": score_val,
@@ -872,7 +905,7 @@ def get_player_machine_score_history(
                 "round_number": score_record["round_number"],
                 "player_position": score_record["player_position"],
                 "match_key": score_record["match_key"],
-                "percentile": percentile,
+                "percentile": int(percentile) if percentile is not None else None,
             }
         )
 
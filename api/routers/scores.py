@@ -15,11 +15,154 @@ from api.models.schemas import (
     ScoreBrowseResponse,
     ScoreItem,
 )
+from api.services.leaderboards import LEADERBOARD_SIZE, get_machine_leaderboards
+from api.services.quantile_sketch import get_machine_digests
+from api.services.score_store import ScoreStore, get_score_store
 
 router = APIRouter(prefix="/scores", tags=["scores"])
 logger = logging.getLogger(__name__)
 
 
+def get_machine_stats_from_scores(where_clause: str, params: dict) -> list[dict]:
+    """Count, median, min and max per machine, computed from the filtered scores."""
+    stats_query = f"""
+        SELECT
+            s.machine_key,
+            m.machine_name,
+            COUNT(*) as count,
+            CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY s.score) AS BIGINT) as median,
+            MIN(s.score) as min,
+            MAX(s.score) as max
+        FROM scores s
+        JOIN machines m ON s.machine_key = m.machine_key
+        WHERE {where_clause}
+        GROUP BY s.machine_key, m.machine_name
+        ORDER BY m.machine_name
+    """
+    return execute_query(stats_query, params)
+
+
+def get_machine_stats_from_store(
+    store: ScoreStore,
+    seasons: list[int],
+    teams: list[str] | None,
+    machine_keys: list[str] | None,
+    venue_key: str | None,
+) -> list[dict]:
+    """get_machine_stats_from_scores() over the in-process score store."""
+    mask = store.select(
+        seasons=seasons,
+        teams=teams,
+        machines=machine_keys,
+        venues=[venue_key] if venue_key else None,
+    )
+    groups = store.group_stats(mask, by="machine")
+    if not groups:
+        return []
+
+    machines = execute_query(
+        "SELECT machine_key, machine_name FROM machines WHERE machine_key = ANY(:machine_keys)",
+        {"machine_keys": [group["key"] for group in groups]},
+    )
+    machine_names = {row["machine_key"]: row["machine_name"] for row in machines}
+    stats = [
+        {
+            "machine_key": group["key"],
+            "machine_name": machine_names[group["key"]],
+            "count": group["count"],
+            # CAST(PERCENTILE_CONT(...) AS BIGINT) rounds half to even too
+            "median": int(round(group["median"])),
+            "min": group["min"],
+            "max": group["max"],
+        }
+        for group in groups
+        if group["key"] in machine_names
+    ]
+    stats.sort(key=lambda row: row["machine_name"])
+    return stats
+
+
+def get_machine_stats_from_sketches(
+    seasons: list[int], machine_keys: list[str] | None, venue_key: str | None
+) -> list[dict]:
+    """
+    Count, median, min and max per machine, from the merged score sketches.
+
+    Only for filters the sketches are keyed by (seasons, machines, venue);
+    the median is a t-digest estimate, the rest is exact.
+    """
+    digests = get_machine_digests(seasons, machine_keys, venue_key)
+    if not digests:
+        return []
+
+    machines = execute_query(
+        "SELECT machine_key, machine_name FROM machines WHERE machine_key = ANY(:machine_keys)",
+        {"machine_keys": list(digests)},
+    )
+    stats = [
+        {
+            "machine_key": machine["machine_key"],
+            "machine_name": machine["machine_name"],
+            "count": digests[machine["machine_key"]].count,
+            "median": round(digests[machine["machine_key"]].median),
+            "min": digests[machine["machine_key"]].min_score,
+            "max": digests[machine["machine_key"]].max_score,
+        }
+        for machine in machines
+    ]
+    stats.sort(key=lambda row: row["machine_name"])
+    return stats
+
+
+def get_top_scores_from_scores(where_clause: str, params: dict, limit: int) -> dict[str, list]:
+    """Highest `limit` filtered scores per machine, ranked over every matching score."""
+    scores_query = f"""
+        WITH ranked_scores AS (
+            SELECT
+                s.score,
+                s.player_key,
+                p.name as player_name,
+                s.team_key,
+                t.team_name,
+                s.venue_key,
+                v.venue_name,
+                s.season,
+                s.round_number as round,
+                s.machine_key,
+                s.date,
+                ROW_NUMBER() OVER (PARTITION BY s.machine_key ORDER BY s.score DESC) as rn
+            FROM scores s
+            JOIN players p ON s.player_key = p.player_key
+            JOIN teams t ON s.team_key = t.team_key AND t.season = s.season
+            JOIN venues v ON s.venue_key = v.venue_key
+            WHERE {where_clause}
+        )
+        SELECT * FROM ranked_scores
+        WHERE rn <= :scores_limit
+        ORDER BY machine_key, score DESC
+    """
+    scores_by_machine = {}
+    for row in execute_query(scores_query, {**params, "scores_limit": limit}) or []:
+        scores_by_machine.setdefault(row["machine_key"], []).append(row)
+    return scores_by_machine
+
+
+def to_score_item(row: dict) -> ScoreItem:
+    """ScoreItem from a raw score or leaderboard row."""
+    return ScoreItem(
+        score=row["score"],
+        player_key=row["player_key"],
+        player_name=row["player_name"],
+        team_key=row["team_key"],
+        team_name=row["team_name"],
+        venue_key=row["venue_key"],
+        venue_name=row["venue_name"],
+        date=row["date"].strftime("%Y-%m-%d") if row["date"] else None,
+        season=row["season"],
+        round=row["round"],
+    )
+
+
 @router.get(
     "/browse",
     response_model=ScoreBrowseResponse,
@@ -89,23 +232,21 @@ def browse_scores(
         params["venue_key"] = venue_key
 
     where_clause = " AND ".join(where_clauses)
-
-    # First, get aggregate stats per machine
-    stats_query = f"""
-        SELECT
-            s.machine_key,
-            m.machine_name,
-            COUNT(*) as count,
-            CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY s.score) AS BIGINT) as median,
-            MIN(s.score) as min,
-            MAX(s.score) as max
-        FROM scores s
-        JOIN machines m ON s.machine_key = m.machine_key
-        WHERE {where_clause}
-        GROUP BY s.machine_key, m.machine_name
-        ORDER BY m.machine_name
-    """
-    stats_result = execute_query(stats_query, params)
+    score_venue_key = venue_key if venue_key and not include_all_venues else None
+
+    # First, get aggregate stats per machine; the score sketches cover every
+    # filter except teams
+    store = get_score_store()
+    if teams and store is not None:
+        stats_result = get_machine_stats_from_store(
+            store, seasons, teams, machine_filter_keys, score_venue_key
+        )
+    elif teams:
+        stats_result = get_machine_stats_from_scores(where_clause, params)
+    else:
+        stats_result = get_machine_stats_from_sketches(
+            seasons, machine_filter_keys, score_venue_key
+        )
 
     if not stats_result:
         return ScoreBrowseResponse(
@@ -123,55 +264,13 @@ def browse_scores(
     # Calculate total score count
     total_score_count = sum(row["count"] for row in stats_result)
 
-    # Now get the first N scores per machine
-    # Using a window function to rank scores within each machine
-    scores_query = f"""
-        WITH ranked_scores AS (
-            SELECT
-                s.score,
-                s.player_key,
-                p.name as player_name,
-                s.team_key,
-                t.team_name,
-                s.venue_key,
-                v.venue_name,
-                s.season,
-                s.round_number as round,
-                s.machine_key,
-                s.date,
-                ROW_NUMBER() OVER (PARTITION BY s.machine_key ORDER BY s.score DESC) as rn
-            FROM scores s
-            JOIN players p ON s.player_key = p.player_key
-            JOIN teams t ON s.team_key = t.team_key AND t.season = s.season
-            JOIN venues v ON s.venue_key = v.venue_key
-            WHERE {where_clause}
-        )
-        SELECT * FROM ranked_scores
-        WHERE rn <= :scores_limit
-        ORDER BY machine_key, score DESC
-    """
-    params["scores_limit"] = scores_per_machine
-    scores_result = execute_query(scores_query, params)
-
-    # Group scores by machine
-    scores_by_machine = {}
-    for row in scores_result or []:
-        machine_key = row["machine_key"]
-        if machine_key not in scores_by_machine:
-            scores_by_machine[machine_key] = []
-        scores_by_machine[machine_key].append(
-            ScoreItem(
-                score=row["score"],
-                player_key=row["player_key"],
-                player_name=row["player_name"],
-                team_key=row["team_key"],
-                team_name=row["team_name"],
-                venue_key=row["venue_key"],
-                venue_name=row["venue_name"],
-                date=row["date"].strftime("%Y-%m-%d") if row["date"] else None,
-                season=row["season"],
-                round=row["round"],
-            )
+    # Now get the first N scores per machine; the leaderboards cover every
+    # filter except teams
+    if teams:
+        scores_by_machine = get_top_scores_from_scores(where_clause, params, scores_per_machine)
+    else:
+        scores_by_machine = get_machine_leaderboards(
+            seasons, machine_filter_keys, score_venue_key, limit=scores_per_machine
         )
 
     # Build machine groups
@@ -179,7 +278,7 @@ def browse_scores(
     for stat_row in stats_result:
         machine_key = stat_row["machine_key"]
         count = stat_row["count"]
-        scores = scores_by_machine.get(machine_key, [])
+        scores = [to_score_item(row) for row in scores_by_machine.get(machine_key, [])]
 
         machine_groups.append(
             MachineScoreGroup(
@@ -243,6 +342,21 @@ def browse_machine_scores(
 
     machine_name = machine_result[0]["machine_name"]
 
+    # Without a team filter, the first pages come from the leaderboards and
+    # the count from the score sketches
+    if not teams and offset + limit <= LEADERBOARD_SIZE:
+        score_venue_key = venue_key if venue_key and not include_all_venues else None
+        digest = get_machine_digests(seasons, [machine_key], score_venue_key).get(machine_key)
+        leaderboard = get_machine_leaderboards(
+            seasons, [machine_key], score_venue_key, limit=limit, offset=offset
+        )
+        return MachineScoresResponse(
+            machine_key=machine_key,
+            machine_name=machine_name,
+            total_count=digest.count if digest else 0,
+            scores=[to_score_item(row) for row in leaderboard.get(machine_key, [])],
+        )
+
     # Build query parameters
     params = {
         "seasons": seasons,
@@ -295,21 +409,7 @@ def browse_machine_scores(
     params["offset"] = offset
     scores_result = execute_query(scores_query, params)
 
-    scores = [
-        ScoreItem(
-            score=row["score"],
-            player_key=row["player_key"],
-            player_name=row["player_name"],
-            team_key=row["team_key"],
-            team_name=row["team_name"],
-            venue_key=row["venue_key"],
-            venue_name=row["venue_name"],
-            date=row["date"].strftime("%Y-%m-%d") if row["date"] else None,
-            season=row["season"],
-            round=row["round"],
-        )
-        for row in scores_result or []
-    ]
+    scores = [to_score_item(row) for row in scores_result or []]
 
     return MachineScoresResponse(
         machine_key=machine_key,
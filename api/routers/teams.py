@@ -166,112 +166,6 @@ def get_team(team_key: str, season: int | None = Query(None, description="Filter
     return TeamDetail(**teams[0])
 
 
-def calculate_team_win_percentage(  # noqa: C901
-    team_key: str,
-    all_team_keys: list[str],
-    seasons: list[int] | None = None,
-    venue_key: str | None = None,
-    rounds: list[int] | None = None,
-    exclude_subs: bool = True,
-    machine_filter_keys: list[str] | None = None,
-) -> dict[str, float]:
-    """
-    Calculate win percentage for a team on each machine using optimized batch query.
-
-    Win percentage is calculated by comparing team player scores to opponent scores.
-
-    Args:
-        team_key: Team's unique key
-        all_team_keys: List of team keys including aliases (e.g., [TRL, CDC])
-        seasons: Optional list of seasons to filter
-        venue_key: Optional venue filter
-        rounds: Optional list of rounds to filter (1-4)
-        exclude_subs: Exclude substitute players (default: true)
-        machine_filter_keys: Optional list of machine keys to filter (for include_all_venues mode)
-
-    Returns:
-        Dict mapping machine_key to win percentage (0-100)
-    """
-    # Build WHERE clause for filtering - include all aliased team keys
-    params = {}
-    if len(all_team_keys) == 1:
-        where_clauses = ["team_scores.team_key = :team_key"]
-        params["team_key"] = team_key
-    else:
-        team_key_placeholders = ", ".join([f":team_key_{i}" for i in range(len(all_team_keys))])
-        where_clauses = [f"team_scores.team_key IN ({team_key_placeholders})"]
-        for i, tk in enumerate(all_team_keys):
-            params[f"team_key_{i}"] = tk
-
-    if seasons is not None and len(seasons) > 0:
-        season_placeholders = ", ".join([f":season_{i}" for i in range(len(seasons))])
-        where_clauses.append(f"team_scores.season IN ({season_placeholders})")
-        for i, season in enumerate(seasons):
-            params[f"season_{i}"] = season
-
-    # Machine filter (for include_all_venues mode)
-    if machine_filter_keys:
-        machine_placeholders = ", ".join(
-            [f":wp_machine_{i}" for i in range(len(machine_filter_keys))]
-        )
-        where_clauses.append(f"team_scores.machine_key IN ({machine_placeholders})")
-        for i, mk in enumerate(machine_filter_keys):
-            params[f"wp_machine_{i}"] = mk
-
-    # Venue filter (only if not using machine filter mode)
-    if venue_key is not None and not machine_filter_keys:
-        where_clauses.append("team_scores.venue_key = :venue_key")
-        params["venue_key"] = venue_key
-
-    if rounds is not None and len(rounds) > 0:
-        placeholders = ", ".join([f":round_{i}" for i in range(len(rounds))])
-        where_clauses.append(f"team_scores.round_number IN ({placeholders})")
-        for i, r in enumerate(rounds):
-            params[f"round_{i}"] = r
-
-    if exclude_subs:
-        where_clauses.append(
-            "(team_scores.is_substitute IS NULL OR team_scores.is_substitute = false)"
-        )
-        where_clauses.append(
-            "(opp_scores.is_substitute IS NULL OR opp_scores.is_substitute = false)"
-        )
-
-    where_clause = " AND ".join(where_clauses)
-
-    # Optimized batch query using self-join to compare team vs opponent scores
-    query = f"""
-        SELECT
-            team_scores.machine_key,
-            COUNT(*) as total_comparisons,
-            SUM(CASE WHEN team_scores.score > opp_scores.score THEN 1 ELSE 0 END) as wins
-        FROM scores team_scores
-        INNER JOIN scores opp_scores
-            ON team_scores.match_key = opp_scores.match_key
-            AND team_scores.round_number = opp_scores.round_number
-            AND team_scores.machine_key = opp_scores.machine_key
-            AND team_scores.team_key != opp_scores.team_key
-        WHERE {where_clause}
-        GROUP BY team_scores.machine_key
-    """
-
-    results = execute_query(query, params)
-
-    # Calculate win percentages
-    win_percentages = {}
-    for row in results:
-        machine_key = row["machine_key"]
-        total = row["total_comparisons"]
-        wins = row["wins"]
-
-        if total > 0:
-            win_percentages[machine_key] = (wins / total) * 100.0
-        else:
-            win_percentages[machine_key] = None
-
-    return win_percentages
-
-
 @router.get(
     "/{team_key}/machines",
     response_model=TeamMachineStatsList,
@@ -343,12 +237,14 @@ def get_team_machine_stats(  # noqa: C901
                 detail="Invalid rounds parameter. Must be comma-separated integers 1-4",
             )
 
-    # First verify team exists
+    # First verify team exists, taking its current name
     team_check = execute_query(
-        "SELECT 1 FROM teams WHERE team_key = :team_key LIMIT 1", {"team_key": team_key}
+        "SELECT team_name FROM teams WHERE team_key = :team_key ORDER BY season DESC LIMIT 1",
+        {"team_key": team_key},
     )
     if not team_check:
         raise HTTPException(status_code=404, detail=f"Team '{team_key}' not found")
+    team_name = team_check[0]["team_name"]
 
     # Get team keys including any historical aliases (e.g., TRL includes CDC/Contras)
     all_team_keys = get_team_keys_with_aliases(team_key)
@@ -369,114 +265,92 @@ def get_team_machine_stats(  # noqa: C901
         if not machine_filter_keys:
             return TeamMachineStatsList(stats=[], total=0, limit=limit, offset=offset)
 
-    # Build WHERE clause for filtering - include all aliased team keys
-    params = {}
-    if len(all_team_keys) == 1:
-        where_clauses = ["s.team_key = :team_key"]
-        params["team_key"] = team_key
-    else:
-        team_key_placeholders = ", ".join([f":team_key_{i}" for i in range(len(all_team_keys))])
-        where_clauses = [f"s.team_key IN ({team_key_placeholders})"]
-        for i, tk in enumerate(all_team_keys):
-            params[f"team_key_{i}"] = tk
+    # Stats are pre-aggregated per season and round in team_machine_stats
+    # (etl/calculate_team_machine_stats.py); read the rows matching the filters
+    # and merge them per machine below
+    params = {
+        "team_keys": all_team_keys,
+        "venue_key": venue_key if venue_key is not None and not include_all_venues else "_ALL_",
+        "includes_subs": not exclude_subs,
+    }
+    where_clauses = [
+        "tms.team_key = ANY(:team_keys)",
+        "tms.venue_key = :venue_key",
+        "tms.includes_subs = :includes_subs",
+    ]
 
     if seasons is not None and len(seasons) > 0:
-        season_placeholders = ", ".join([f":season_{i}" for i in range(len(seasons))])
-        where_clauses.append(f"s.season IN ({season_placeholders})")
-        for i, season in enumerate(seasons):
-            params[f"season_{i}"] = season
+        where_clauses.append("tms.season = ANY(:seasons)")
+        params["seasons"] = seasons
 
     # Machine filter (from include_all_venues mode)
     if machine_filter_keys:
-        machine_placeholders = ", ".join([f":machine_{i}" for i in range(len(machine_filter_keys))])
-        where_clauses.append(f"s.machine_key IN ({machine_placeholders})")
-        for i, mk in enumerate(machine_filter_keys):
-            params[f"machine_{i}"] = mk
-
-    # Venue filter (only if not using include_all_venues mode)
-    if venue_key is not None and not include_all_venues:
-        where_clauses.append("s.venue_key = :venue_key")
-        params["venue_key"] = venue_key
+        where_clauses.append("tms.machine_key = ANY(:machine_keys)")
+        params["machine_keys"] = machine_filter_keys
 
     if rounds_list is not None and len(rounds_list) > 0:
-        placeholders = ", ".join([f":round_{i}" for i in range(len(rounds_list))])
-        where_clauses.append(f"s.round_number IN ({placeholders})")
-        for i, r in enumerate(rounds_list):
-            params[f"round_{i}"] = r
-
-    if exclude_subs:
-        where_clauses.append("(s.is_substitute IS NULL OR s.is_substitute = false)")
+        where_clauses.append("tms.round_number = ANY(:rounds)")
+        params["rounds"] = rounds_list
 
     where_clause = " AND ".join(where_clauses)
 
-    # Fetch all scores grouped by machine
     query = f"""
         SELECT
-            s.machine_key,
+            tms.machine_key,
             m.machine_name,
-            t.team_name,
-            s.season,
-            s.venue_key,
-            s.round_number,
-            s.score
-        FROM scores s
-        JOIN machines m ON s.machine_key = m.machine_key
-        JOIN teams t ON s.team_key = t.team_key AND s.season = t.season
+            tms.season,
+            tms.round_number,
+            tms.games_played,
+            tms.total_score,
+            tms.median_score,
+            tms.best_score,
+            tms.worst_score,
+            tms.wins,
+            tms.comparisons,
+            tms.scores
+        FROM team_machine_stats tms
+        JOIN machines m ON tms.machine_key = m.machine_key
         WHERE {where_clause}
-        ORDER BY s.machine_key, s.score
     """
 
-    scores = execute_query(query, params)
-
-    # Group scores by machine
-    machine_scores = defaultdict(lambda: {"scores": [], "rounds": set()})
-    machine_info = {}
-
-    for score in scores:
-        mk = score["machine_key"]
-        machine_scores[mk]["scores"].append(score["score"])
-        machine_scores[mk]["rounds"].add(score["round_number"])
-        if mk not in machine_info:
-            machine_info[mk] = {
-                "machine_key": mk,
-                "machine_name": score["machine_name"],
-                "team_name": score["team_name"],
-                "season": score["season"],
-                "venue_key": venue_key if venue_key else score["venue_key"],
-            }
+    rows = execute_query(query, params)
 
-    # Calculate win percentages for this team
-    win_percentages = calculate_team_win_percentage(
-        team_key, all_team_keys, seasons, venue_key, rounds_list, exclude_subs, machine_filter_keys
-    )
+    # Merge the (alias, season, round) rows of each machine
+    machine_rows = defaultdict(list)
+    for row in rows:
+        machine_rows[row["machine_key"]].append(row)
 
-    # Calculate stats for each machine
     all_stats = []
-    for machine_key, data in machine_scores.items():
-        score_list = data["scores"]
-        if len(score_list) < min_games:
+    for machine_key, group in machine_rows.items():
+        games_played = sum(row["games_played"] for row in group)
+        if games_played < min_games:
             continue
 
-        info = machine_info[machine_key]
-        scores_array = np.array(score_list)
+        if len(group) == 1:
+            median_score = group[0]["median_score"]
+        else:
+            median_score = np.median(np.concatenate([row["scores"] for row in group]))
+        total_score = sum(row["total_score"] for row in group)
+        wins = sum(row["wins"] for row in group)
+        comparisons = sum(row["comparisons"] for row in group)
 
         stat = {
             "team_key": team_key,
-            "team_name": info["team_name"],
+            "team_name": team_name,
             "machine_key": machine_key,
-            "machine_name": info["machine_name"],
-            "venue_key": info["venue_key"],
-            "season": info["season"],
-            "games_played": len(score_list),
-            "total_score": int(np.sum(scores_array)),
-            "median_score": int(np.median(scores_array)),
-            "avg_score": int(np.mean(scores_array)),
-            "best_score": int(np.max(scores_array)),
-            "worst_score": int(np.min(scores_array)),
+            "machine_name": group[0]["machine_name"],
+            "venue_key": venue_key,
+            "season": max(row["season"] for row in group),
+            "games_played": games_played,
+            "total_score": total_score,
+            "median_score": int(median_score),
+            "avg_score": int(total_score / games_played),
+            "best_score": max(row["best_score"] for row in group),
+            "worst_score": min(row["worst_score"] for row in group),
             "median_percentile": None,  # Would need percentile data
             "avg_percentile": None,
-            "win_percentage": win_percentages.get(machine_key),
-            "rounds_played": sorted(list(data["rounds"])),
+            "win_percentage": (wins / comparisons) * 100.0 if comparisons else None,
+            "rounds_played": sorted({row["round_number"] for row in group}),
         }
         all_stats.append(stat)
 
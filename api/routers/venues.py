@@ -21,6 +21,7 @@ from api.models.schemas import (
     VenueWithStats,
     VenueWithStatsList,
 )
+from api.services.quantile_sketch import get_machine_digests
 
 router = APIRouter(prefix="/venues", tags=["venues"])
 
@@ -490,6 +491,15 @@ def get_venue_machines(  # noqa: C901
 
     where_clause = " AND ".join(where_clauses) if where_clauses else "TRUE"
 
+    # Medians come from the merged score sketches, which aren't keyed by team;
+    # only team-filtered stats still sort the scores for them
+    if team_key is not None:
+        median_sql = (
+            "COALESCE(CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY s.score) AS INTEGER), 0)"
+        )
+    else:
+        median_sql = "0"
+
     # Get machine statistics
     query = f"""
         SELECT
@@ -499,7 +509,7 @@ def get_venue_machines(  # noqa: C901
             m.year,
             COUNT(s.score_id) as total_scores,
             COUNT(DISTINCT s.player_key) as unique_players,
-            COALESCE(CAST(PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY s.score) AS INTEGER), 0) as median_score,
+            {median_sql} as median_score,
             COALESCE(MAX(s.score), 0) as max_score,
             COALESCE(MIN(s.score), 0) as min_score,
             COALESCE(CAST(AVG(s.score) AS INTEGER), 0) as avg_score
@@ -512,6 +522,17 @@ def get_venue_machines(  # noqa: C901
 
     machines = execute_query(query, params)
 
+    if team_key is None and machines:
+        digests = get_machine_digests(
+            seasons,
+            [machine["machine_key"] for machine in machines],
+            venue_key if scores_from == "venue" else None,
+        )
+        for machine in machines:
+            digest = digests.get(machine["machine_key"])
+            if digest:
+                machine["median_score"] = round(digest.median)
+
     # Add venue information, is_current flag, and ensure venue_key is set
     for machine in machines:
         if "venue_key" not in machine or not machine["venue_key"]:
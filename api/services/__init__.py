@@ -2,9 +2,11 @@
 API services for external integrations and business logic.
 """
 
+from api.services.leaderboards import LEADERBOARD_SIZE, get_machine_leaderboards
 from api.services.matchplay_client import MatchplayClient
 from api.services.matchup_calculator import (
     calculate_confidence_interval,
+    calculate_confidence_interval_from_digest,
     calculate_full_matchup_analysis,
     get_current_machines_for_venue,
     get_machine_names,
@@ -14,14 +16,31 @@ from api.services.matchup_calculator import (
     get_team_machine_pick_frequency,
 )
 from api.services.player_matcher import PlayerMatcher
+from api.services.quantile_sketch import ScoreDigest, get_machine_digests, get_player_digests
+from api.services.score_distribution import get_machine_distribution
+from api.services.weekly_recap import (
+    build_weekly_recap,
+    find_comebacks,
+    get_stored_weekly_recap,
+)
 
 __all__ = [
+    "LEADERBOARD_SIZE",
     "MatchplayClient",
     "PlayerMatcher",
+    "ScoreDigest",
+    "build_weekly_recap",
+    "find_comebacks",
     "calculate_full_matchup_analysis",
     "get_current_machines_for_venue",
     "get_machine_names",
     "calculate_confidence_interval",
+    "calculate_confidence_interval_from_digest",
+    "get_machine_digests",
+    "get_machine_distribution",
+    "get_machine_leaderboards",
+    "get_player_digests",
+    "get_stored_weekly_recap",
     "get_team_machine_pick_frequency",
     "get_player_machine_preferences",
     "get_player_machine_confidence",
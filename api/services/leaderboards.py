@@ -0,0 +1,79 @@
+"""
+Top-score leaderboards for score browsing - shared by the API and ETL.
+
+etl/calculate_score_leaderboards.py stores the top LEADERBOARD_SIZE scores of
+every (machine, venue, season) in machine_score_leaderboards (venue '_ALL_' =
+all venues), with player, team and venue names already joined. The top N
+scores of several seasons are among the top N of each season's board, so a
+request merges at most N rows per machine and season instead of ranking every
+matching score.
+
+Boards aren't kept per team; team-filtered requests and pages past
+LEADERBOARD_SIZE still query scores.
+"""
+
+from api.dependencies import execute_query
+
+# Scores kept per (machine, venue, season) board
+LEADERBOARD_SIZE = 100
+
+
+def get_machine_leaderboards(
+    seasons: list[int],
+    machine_keys: list[str] | None = None,
+    venue_key: str | None = None,
+    limit: int = LEADERBOARD_SIZE,
+    offset: int = 0,
+) -> dict[str, list[dict]]:
+    """
+    Highest scores per machine over the given seasons, merged from the boards.
+
+    Args:
+        seasons: Seasons to combine
+        machine_keys: Only these machines (None = every machine)
+        venue_key: Only scores at this venue (None = all venues)
+        limit: Scores to return per machine
+        offset: Scores to skip per machine; offset + limit must not exceed
+            LEADERBOARD_SIZE
+
+    Returns:
+        {machine_key: [score rows, highest first]} with the columns of the
+        browse endpoints' raw score query
+    """
+    if offset + limit > LEADERBOARD_SIZE:
+        raise ValueError(f"Leaderboards only hold the top {LEADERBOARD_SIZE} scores")
+
+    where_clauses = ["season = ANY(:seasons)", "venue_key = :venue_key", "rank <= :top"]
+    params = {"seasons": seasons, "venue_key": venue_key or "_ALL_", "top": offset + limit}
+    if machine_keys:
+        where_clauses.append("machine_key = ANY(:machine_keys)")
+        params["machine_keys"] = machine_keys
+
+    rows = execute_query(
+        f"""
+        SELECT
+            machine_key,
+            score,
+            player_key,
+            player_name,
+            team_key,
+            team_name,
+            score_venue_key as venue_key,
+            venue_name,
+            season,
+            round_number as round,
+            date
+        FROM machine_score_leaderboards
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY machine_key, score DESC, season, rank
+        """,
+        params,
+    )
+
+    leaderboards = {}
+    for row in rows:
+        leaderboards.setdefault(row["machine_key"], []).append(row)
+    return {
+        machine_key: machine_rows[offset : offset + limit]
+        for machine_key, machine_rows in leaderboards.items()
+    }
@@ -0,0 +1,134 @@
+"""
+Durable store for live match snapshots.
+
+Match JSON fetched from mondaynightpinball.com is persisted to the
+live_match_snapshots table (migration 008) so it can be shared between
+uvicorn workers and survives restarts:
+
+- Completed matches are written once with is_final = true. They are served
+  from the database from then on and never fetched upstream again.
+- Active matches are written with a short expires_at. Any worker can serve
+  the snapshot until it expires, so only one worker has to hit the league
+  site per TTL window.
+
+All functions degrade gracefully: if the table is missing or the database
+is unreachable they log a warning and behave like an empty store, so the
+live endpoints keep working straight off the league site.
+"""
+
+import json
+import logging
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import bindparam, text
+
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+
+def _ensure_engine():
+    if not db.engine:
+        db.connect()
+
+
+def load_snapshots(match_keys: list[str]) -> dict[str, dict[str, Any]]:
+    """
+    Batch-load stored snapshots for a set of matches.
+
+    Args:
+        match_keys: DB match keys to look up
+
+    Returns:
+        {match_key: {"state", "is_final", "raw_json", "detail", "fetched_at", "expires_at"}}
+        for every match that has a stored snapshot.
+    """
+    if not match_keys:
+        return {}
+
+    query = text(
+        """
+        SELECT match_key, state, is_final, raw_json, detail, fetched_at, expires_at
+        FROM live_match_snapshots
+        WHERE match_key IN :match_keys
+        """
+    ).bindparams(bindparam("match_keys", expanding=True))
+
+    try:
+        _ensure_engine()
+        with db.engine.connect() as conn:
+            result = conn.execute(query, {"match_keys": list(match_keys)})
+            return {row.match_key: dict(row._mapping) for row in result}
+    except Exception as e:
+        logger.warning(f"Failed to load live match snapshots: {e}")
+        return {}
+
+
+def load_snapshot(match_key: str) -> dict[str, Any] | None:
+    """Load the stored snapshot for a single match, or None if there is none."""
+    return load_snapshots([match_key]).get(match_key)
+
+
+def is_usable(snapshot: dict[str, Any] | None, now: datetime, refresh: bool = False) -> bool:
+    """
+    Return True if a stored snapshot can be served without going upstream.
+
+    Final snapshots are always usable. Active snapshots are usable until they
+    expire, unless the caller explicitly asked for a refresh.
+    """
+    if snapshot is None:
+        return False
+    if snapshot["is_final"]:
+        return True
+    if refresh:
+        return False
+    expires_at = snapshot.get("expires_at")
+    return expires_at is not None and expires_at > now
+
+
+def save_snapshots(rows: list[dict[str, Any]]) -> None:
+    """
+    Upsert snapshots in a single transaction.
+
+    Each row needs: match_key, season, week, state, is_final, raw_json (dict),
+    detail (dict or None), fetched_at, expires_at (None for final snapshots).
+
+    A final snapshot is never overwritten by a non-final one, so a worker
+    holding an older active response cannot regress a completed match.
+    """
+    if not rows:
+        return
+
+    query = text(
+        """
+        INSERT INTO live_match_snapshots
+            (match_key, season, week, state, is_final, raw_json, detail, fetched_at, expires_at)
+        VALUES
+            (:match_key, :season, :week, :state, :is_final, :raw_json, :detail,
+             :fetched_at, :expires_at)
+        ON CONFLICT (match_key) DO UPDATE SET
+            state = EXCLUDED.state,
+            is_final = EXCLUDED.is_final,
+            raw_json = EXCLUDED.raw_json,
+            detail = EXCLUDED.detail,
+            fetched_at = EXCLUDED.fetched_at,
+            expires_at = EXCLUDED.expires_at
+        WHERE NOT live_match_snapshots.is_final OR EXCLUDED.is_final
+        """
+    )
+    params = [
+        {
+            **row,
+            "raw_json": json.dumps(row["raw_json"]),
+            "detail": json.dumps(row["detail"]) if row.get("detail") is not None else None,
+        }
+        for row in rows
+    ]
+
+    try:
+        _ensure_engine()
+        with db.engine.begin() as conn:
+            conn.execute(query, params)
+    except Exception as e:
+        logger.warning(f"Failed to save {len(rows)} live match snapshot(s): {e}")
@@ -0,0 +1,222 @@
+"""
+Persistent response cache for the Matchplay.events API.
+
+MatchplayClient routes its lookups (user search, user profile, tournament
+search and details) through this cache so repeated lookups - reopening the
+link dialog for the same player, rerunning the MNP tournament investigation -
+don't burn the API rate limit. Entries live in the matchplay_response_cache
+table (migration 010) so every API worker and ETL script shares them.
+
+- Fresh entries (younger than the endpoint's TTL) are served directly.
+- Expired entries are revalidated with If-None-Match / If-Modified-Since;
+  a 304 response just extends the entry.
+- Per-endpoint counters (hits, revalidations, misses, errors) are kept in
+  process and per-entry counters in the table, for cache effectiveness stats.
+
+If the table is missing or the database is unreachable, the cache behaves as
+if empty and the client simply calls the API.
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+from urllib.parse import urlencode
+
+from sqlalchemy import text
+
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+# How long each endpoint's responses are served without revalidation
+CACHE_TTLS = {
+    "search_users": timedelta(hours=24),
+    "search_tournaments": timedelta(hours=24),
+    "user_profile": timedelta(hours=1),
+    "tournament": timedelta(hours=1),
+}
+
+
+def make_cache_key(path: str, params: dict[str, Any] | None = None) -> str:
+    """Build a cache key from the request path and its sorted query parameters."""
+    if not params:
+        return path
+    return f"{path}?{urlencode(sorted(params.items()))}"
+
+
+class MatchplayResponseCache:
+    """
+    Database-backed cache of Matchplay API responses.
+    """
+
+    def __init__(self):
+        self.stats: dict[str, dict[str, int]] = {}
+        self._warned = False
+
+    def _record(self, endpoint: str, outcome: str) -> None:
+        counters = self.stats.setdefault(
+            endpoint, {"hits": 0, "revalidated": 0, "misses": 0, "errors": 0}
+        )
+        counters[outcome] += 1
+
+    def _warn(self, action: str, error: Exception) -> None:
+        # Only warn once per process - a missing table would otherwise log on every call
+        if not self._warned:
+            logger.warning(f"Matchplay response cache unavailable ({action}): {error}")
+            self._warned = True
+
+    def _connect(self):
+        if not db.engine:
+            db.connect()
+        return db.engine.begin()
+
+    def get(self, cache_key: str) -> dict[str, Any] | None:
+        """
+        Look up a cached response.
+
+        Returns:
+            {"body", "etag", "last_modified", "expires_at", "endpoint"} or None
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    text(
+                        """
+                        SELECT endpoint, body, etag, last_modified, expires_at
+                        FROM matchplay_response_cache
+                        WHERE cache_key = :cache_key
+                        """
+                    ),
+                    {"cache_key": cache_key},
+                ).fetchone()
+            return dict(row._mapping) if row else None
+        except Exception as e:
+            self._warn("read", e)
+            return None
+
+    def record_hit(self, cache_key: str, endpoint: str) -> None:
+        """Count a request served from a fresh entry."""
+        self._record(endpoint, "hits")
+        self._execute(
+            """
+            UPDATE matchplay_response_cache
+            SET hit_count = hit_count + 1
+            WHERE cache_key = :cache_key
+            """,
+            {"cache_key": cache_key},
+        )
+
+    def record_revalidated(self, cache_key: str, endpoint: str, ttl: timedelta) -> None:
+        """Extend an entry after the API answered 304 Not Modified."""
+        self._record(endpoint, "revalidated")
+        now = datetime.utcnow()
+        self._execute(
+            """
+            UPDATE matchplay_response_cache
+            SET revalidation_count = revalidation_count + 1,
+                fetched_at = :now,
+                expires_at = :expires_at
+            WHERE cache_key = :cache_key
+            """,
+            {"cache_key": cache_key, "now": now, "expires_at": now + ttl},
+        )
+
+    def record_error(self, endpoint: str) -> None:
+        """Count a request that failed before a response could be cached."""
+        self._record(endpoint, "errors")
+
+    def put(
+        self,
+        cache_key: str,
+        endpoint: str,
+        body: Any,
+        etag: str | None,
+        last_modified: str | None,
+        ttl: timedelta,
+    ) -> None:
+        """Store a fresh response (a cache miss)."""
+        self._record(endpoint, "misses")
+        now = datetime.utcnow()
+        self._execute(
+            """
+            INSERT INTO matchplay_response_cache
+                (cache_key, endpoint, body, etag, last_modified, fetched_at, expires_at)
+            VALUES
+                (:cache_key, :endpoint, :body, :etag, :last_modified, :now, :expires_at)
+            ON CONFLICT (cache_key) DO UPDATE SET
+                body = EXCLUDED.body,
+                etag = EXCLUDED.etag,
+                last_modified = EXCLUDED.last_modified,
+                fetched_at = EXCLUDED.fetched_at,
+                expires_at = EXCLUDED.expires_at
+            """,
+            {
+                "cache_key": cache_key,
+                "endpoint": endpoint,
+                "body": json.dumps(body),
+                "etag": etag,
+                "last_modified": last_modified,
+                "now": now,
+                "expires_at": now + ttl,
+            },
+        )
+
+    def _execute(self, query: str, params: dict[str, Any]) -> None:
+        try:
+            with self._connect() as conn:
+                conn.execute(text(query), params)
+        except Exception as e:
+            self._warn("write", e)
+
+    def summary(self) -> dict[str, Any]:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            {
+                "process": {endpoint: {hits, revalidated, misses, errors, hit_rate}},
+                "stored": {endpoint: {entries, fresh_entries, hits, revalidations}},
+            }
+            hit_rate counts 304 revalidations as hits since they skip the payload.
+        """
+        process = {}
+        for endpoint, counters in self.stats.items():
+            total = sum(counters.values())
+            served = counters["hits"] + counters["revalidated"]
+            process[endpoint] = {**counters, "hit_rate": round(served / total, 4) if total else 0.0}
+
+        stored = {}
+        try:
+            with self._connect() as conn:
+                result = conn.execute(
+                    text(
+                        """
+                        SELECT
+                            endpoint,
+                            COUNT(*) AS entries,
+                            COUNT(*) FILTER (WHERE expires_at > NOW() AT TIME ZONE 'UTC')
+                                AS fresh_entries,
+                            SUM(hit_count) AS hits,
+                            SUM(revalidation_count) AS revalidations
+                        FROM matchplay_response_cache
+                        GROUP BY endpoint
+                        ORDER BY endpoint
+                        """
+                    )
+                )
+                for row in result:
+                    stored[row.endpoint] = {
+                        "entries": row.entries,
+                        "fresh_entries": row.fresh_entries,
+                        "hits": int(row.hits or 0),
+                        "revalidations": int(row.revalidations or 0),
+                    }
+        except Exception as e:
+            self._warn("stats", e)
+
+        return {"process": process, "stored": stored}
+
+
+# Shared instance used by every MatchplayClient in this process
+response_cache = MatchplayResponseCache()
@@ -9,12 +9,21 @@ impractical to fetch all games for a player. See:
 mnp-app-docs/api/MATCHPLAY_INTEGRATION.md
 """
 
+import asyncio
 import logging
 import os
+from datetime import datetime
 from typing import Any
 
 import httpx
 
+from api.services.matchplay_cache import (
+    CACHE_TTLS,
+    MatchplayResponseCache,
+    make_cache_key,
+    response_cache,
+)
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,7 +36,10 @@ class MatchplayClientError(Exception):
 class MatchplayRateLimitError(MatchplayClientError):
     """Rate limit exceeded"""
 
-    pass
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        # Seconds to wait before retrying, from the Retry-After header if sent
+        self.retry_after = retry_after
 
 
 class MatchplayAuthError(MatchplayClientError):
@@ -41,18 +53,31 @@ class MatchplayClient:
     Client for interacting with the Matchplay.events API.
 
     Requires MATCHPLAY_API_TOKEN environment variable to be set.
+
+    User searches, profiles and tournament lookups go through a persistent
+    response cache (see matchplay_cache.py) with ETag revalidation.
     """
 
     BASE_URL = "https://app.matchplay.events"
 
-    def __init__(self, token: str | None = None):
+    def __init__(
+        self,
+        token: str | None = None,
+        base_url: str | None = None,
+        cache: MatchplayResponseCache | None = response_cache,
+    ):
         """
         Initialize the Matchplay client.
 
         Args:
             token: Optional API token. If not provided, reads from MATCHPLAY_API_TOKEN env var.
+            base_url: Optional API root. Defaults to MATCHPLAY_BASE_URL env var, then
+                BASE_URL. Point it at a local stand-in server for testing.
+            cache: Response cache to use, or None to always call the API.
         """
         self.token = token or os.getenv("MATCHPLAY_API_TOKEN")
+        self.base_url = (base_url or os.getenv("MATCHPLAY_BASE_URL") or self.BASE_URL).rstrip("/")
+        self.cache = cache
         if not self.token:
             logger.warning("MATCHPLAY_API_TOKEN not set - Matchplay integration will not work")
 
@@ -77,11 +102,79 @@ class MatchplayClient:
             raise MatchplayAuthError("Invalid or expired API token")
 
         if response.status_code == 429:
-            raise MatchplayRateLimitError("Rate limit exceeded")
+            retry_after = response.headers.get("retry-after")
+            raise MatchplayRateLimitError(
+                "Rate limit exceeded",
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
 
         response.raise_for_status()
         return response.json()
 
+    async def _cached_get(
+        self,
+        endpoint: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        revalidate: bool = False,
+    ) -> Any:
+        """
+        GET a JSON response through the persistent response cache.
+
+        Fresh entries are returned without contacting the API. Expired entries
+        (or any entry when revalidate=True) are revalidated with their ETag /
+        Last-Modified validators; a 304 response reuses the cached body.
+
+        Args:
+            endpoint: Logical endpoint name (key into CACHE_TTLS)
+            path: Request path relative to the API root
+            params: Query parameters
+            revalidate: Skip the freshness check and always ask the API
+
+        Returns:
+            Decoded JSON body
+        """
+        cache_key = make_cache_key(path, params)
+        ttl = CACHE_TTLS[endpoint]
+        entry = await asyncio.to_thread(self.cache.get, cache_key) if self.cache else None
+
+        if entry and not revalidate and entry["expires_at"] > datetime.utcnow():
+            await asyncio.to_thread(self.cache.record_hit, cache_key, endpoint)
+            return entry["body"]
+
+        headers = dict(self.headers)
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                response = await client.get(
+                    f"{self.base_url}{path}", params=params, headers=headers
+                )
+            if response.status_code == 304 and entry:
+                self._update_rate_limits(response)
+                await asyncio.to_thread(self.cache.record_revalidated, cache_key, endpoint, ttl)
+                return entry["body"]
+            data = self._handle_response(response)
+        except Exception:
+            if self.cache:
+                self.cache.record_error(endpoint)
+            raise
+
+        if self.cache:
+            await asyncio.to_thread(
+                self.cache.put,
+                cache_key,
+                endpoint,
+                data,
+                response.headers.get("etag"),
+                response.headers.get("last-modified"),
+                ttl,
+            )
+        return data
+
     async def search_users(self, query: str) -> list[dict[str, Any]]:
         """
         Search for users by name.
@@ -95,17 +188,17 @@ class MatchplayClient:
         if not self.token:
             raise MatchplayClientError("API token not configured")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.BASE_URL}/api/search",
-                params={"query": query, "type": "users"},
-                headers=self.headers,
-            )
-            data = self._handle_response(response)
-            return data.get("data", [])
+        data = await self._cached_get(
+            "search_users", "/api/search", params={"query": query, "type": "users"}
+        )
+        return data.get("data", [])
 
     async def get_user_profile(
-        self, user_id: int, include_ifpa: bool = True, include_counts: bool = True
+        self,
+        user_id: int,
+        include_ifpa: bool = True,
+        include_counts: bool = True,
+        revalidate: bool = False,
     ) -> dict[str, Any]:
         """
         Get a user's full profile including rating and IFPA data.
@@ -114,6 +207,7 @@ class MatchplayClient:
             user_id: Matchplay user ID
             include_ifpa: Include IFPA ranking data
             include_counts: Include tournament count data
+            revalidate: Bypass the cache TTL and revalidate with the API
 
         Returns:
             Complete user profile with nested rating, ifpa, and userCounts data:
@@ -133,12 +227,10 @@ class MatchplayClient:
         if include_counts:
             params["includeCounts"] = 1
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.BASE_URL}/api/users/{user_id}", params=params, headers=self.headers
-            )
-            # This endpoint returns data directly, not nested in "data"
-            return self._handle_response(response)
+        # This endpoint returns data directly, not nested in "data"
+        return await self._cached_get(
+            "user_profile", f"/api/users/{user_id}", params=params, revalidate=revalidate
+        )
 
     async def get_rating_summary(self, user_id: int) -> dict[str, Any]:
         """
@@ -161,7 +253,7 @@ class MatchplayClient:
 
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.get(
-                f"{self.BASE_URL}/api/ratings/users/{user_id}/summary", headers=self.headers
+                f"{self.base_url}/api/ratings/users/{user_id}/summary", headers=self.headers
             )
             data = self._handle_response(response)
             return data.get("data", {})
@@ -182,7 +274,7 @@ class MatchplayClient:
 
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.get(
-                f"{self.BASE_URL}/api/ratings/{rating_type}/{user_id}", headers=self.headers
+                f"{self.base_url}/api/ratings/{rating_type}/{user_id}", headers=self.headers
             )
             data = self._handle_response(response)
             return data.get("data", {})
@@ -200,14 +292,10 @@ class MatchplayClient:
         if not self.token:
             raise MatchplayClientError("API token not configured")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.BASE_URL}/api/search",
-                params={"query": query, "type": "tournaments"},
-                headers=self.headers,
-            )
-            data = self._handle_response(response)
-            return data.get("data", [])
+        data = await self._cached_get(
+            "search_tournaments", "/api/search", params={"query": query, "type": "tournaments"}
+        )
+        return data.get("data", [])
 
     async def get_tournament(self, tournament_id: int) -> dict[str, Any]:
         """
@@ -222,12 +310,8 @@ class MatchplayClient:
         if not self.token:
             raise MatchplayClientError("API token not configured")
 
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{self.BASE_URL}/api/tournaments/{tournament_id}", headers=self.headers
-            )
-            data = self._handle_response(response)
-            return data.get("data", {})
+        data = await self._cached_get("tournament", f"/api/tournaments/{tournament_id}")
+        return data.get("data", {})
 
     async def get_tournament_games(
         self, tournament_id: int, status: str | None = None
@@ -251,7 +335,7 @@ class MatchplayClient:
 
         async with httpx.AsyncClient(timeout=30.0) as client:
             response = await client.get(
-                f"{self.BASE_URL}/api/tournaments/{tournament_id}/games",
+                f"{self.base_url}/api/tournaments/{tournament_id}/games",
                 params=params,
                 headers=self.headers,
             )
@@ -0,0 +1,118 @@
+"""
+Bulk persistence of Matchplay profile data into the rating cache.
+
+Used by both the refresh=true path of /matchplay/players/ratings and the
+weekly refresh_matchplay_data.py ETL step. Refreshed profiles are gathered
+in memory and written with a single statement: one set-based upsert into
+matchplay_ratings plus one UPDATE of matchplay_player_mappings.last_synced,
+instead of a DELETE, INSERT and UPDATE round trip per player.
+"""
+
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import text
+
+# Columns written to matchplay_ratings, with the Postgres types used to
+# decode the JSON payload in bulk_upsert_ratings()
+RATING_COLUMNS = {
+    "matchplay_user_id": "integer",
+    "rating_value": "numeric",
+    "rating_rd": "numeric",
+    "game_count": "integer",
+    "win_count": "integer",
+    "loss_count": "integer",
+    "efficiency_percent": "numeric",
+    "lower_bound": "numeric",
+    "ifpa_id": "integer",
+    "ifpa_rank": "integer",
+    "ifpa_rating": "numeric",
+    "ifpa_womens_rank": "integer",
+    "tournament_count": "integer",
+    "location": "text",
+    "avatar": "text",
+}
+
+
+def profile_to_rating_row(matchplay_user_id: int, profile: dict[str, Any]) -> dict[str, Any]:
+    """
+    Flatten a Matchplay user profile into a matchplay_ratings row.
+
+    Args:
+        matchplay_user_id: Matchplay user ID the profile belongs to
+        profile: Response from MatchplayClient.get_user_profile()
+
+    Returns:
+        Dictionary keyed by RATING_COLUMNS
+    """
+    user_info = profile.get("user", {})
+    rating_data = profile.get("rating", {}) or {}
+    ifpa_data = profile.get("ifpa", {}) or {}
+    counts = profile.get("userCounts", {}) or {}
+
+    return {
+        "matchplay_user_id": matchplay_user_id,
+        "rating_value": rating_data.get("rating"),
+        "rating_rd": rating_data.get("rd"),
+        "game_count": rating_data.get("gameCount"),
+        "win_count": rating_data.get("winCount"),
+        "loss_count": rating_data.get("lossCount"),
+        "efficiency_percent": rating_data.get("efficiencyPercent"),
+        "lower_bound": rating_data.get("lowerBound"),
+        "ifpa_id": ifpa_data.get("ifpaId"),
+        "ifpa_rank": ifpa_data.get("rank"),
+        "ifpa_rating": ifpa_data.get("rating"),
+        "ifpa_womens_rank": ifpa_data.get("womensRank"),
+        "tournament_count": counts.get("tournamentPlayCount"),
+        "location": user_info.get("location"),
+        "avatar": user_info.get("avatar"),
+    }
+
+
+def bulk_upsert_ratings(conn, rows: list[dict[str, Any]], fetched_at: datetime = None) -> int:
+    """
+    Write refreshed ratings for many users in one round trip.
+
+    The rows are shipped as a single JSON array and expanded server-side with
+    jsonb_to_recordset, then upserted into matchplay_ratings (unique on
+    matchplay_user_id, migration 009) and stamped on matchplay_player_mappings.
+    The caller owns the transaction.
+
+    Args:
+        conn: SQLAlchemy connection
+        rows: Output of profile_to_rating_row()
+        fetched_at: Timestamp for fetched_at / last_synced (default: now, UTC)
+
+    Returns:
+        Number of mappings whose last_synced was updated
+    """
+    if not rows:
+        return 0
+
+    fetched_at = fetched_at or datetime.utcnow()
+    columns = ", ".join(RATING_COLUMNS)
+    record_type = ", ".join(f"{name} {pg_type}" for name, pg_type in RATING_COLUMNS.items())
+    updates = ", ".join(
+        f"{name} = EXCLUDED.{name}" for name in RATING_COLUMNS if name != "matchplay_user_id"
+    )
+
+    query = f"""
+        WITH data AS (
+            SELECT * FROM jsonb_to_recordset(CAST(:rows AS jsonb)) AS r({record_type})
+        ),
+        upserted AS (
+            INSERT INTO matchplay_ratings ({columns}, fetched_at)
+            SELECT {columns}, :fetched_at FROM data
+            ON CONFLICT (matchplay_user_id) DO UPDATE SET
+                {updates},
+                fetched_at = EXCLUDED.fetched_at
+            RETURNING matchplay_user_id
+        )
+        UPDATE matchplay_player_mappings m
+        SET last_synced = :fetched_at
+        FROM upserted u
+        WHERE m.matchplay_user_id = u.matchplay_user_id
+    """
+    result = conn.execute(text(query), {"rows": json.dumps(rows), "fetched_at": fetched_at})
+    return result.rowcount
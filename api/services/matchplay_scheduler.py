@@ -0,0 +1,245 @@
+"""
+Rate-limit-aware scheduler for bulk Matchplay.events profile refreshes.
+
+Refreshing every linked player used to be a sequential loop that slept a
+fixed 0.2s between requests and simply stopped once the remaining quota got
+low. This scheduler instead paces requests against the quota Matchplay
+reports in its x-ratelimit-* headers:
+
+- A token bucket sized from x-ratelimit-limit refills continuously over the
+  rate limit window and is clamped to x-ratelimit-remaining after every
+  response, so we never run ahead of the server's view of the quota.
+- A small pool of workers keeps several requests in flight at once.
+- Users are processed in the order given; callers pass them stalest
+  last_synced first so an interrupted run resumes where it left off.
+- 429 responses are retried with exponential backoff (honoring Retry-After).
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+
+from api.services.matchplay_client import (
+    MatchplayAuthError,
+    MatchplayClient,
+    MatchplayRateLimitError,
+)
+
+logger = logging.getLogger(__name__)
+
+# Matchplay rate limits are per minute. Until the first response tells us the
+# real limit we assume a conservative default.
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+DEFAULT_RATE_LIMIT = 60
+
+DEFAULT_CONCURRENCY = 4
+MAX_RETRIES = 4
+BACKOFF_BASE_SECONDS = 2.0
+BACKOFF_MAX_SECONDS = 60.0
+
+
+class TokenBucket:
+    """
+    Token bucket that paces requests against the Matchplay rate limit.
+
+    The bucket holds up to `capacity` tokens and refills at
+    capacity / window tokens per second. Each request consumes one token.
+    """
+
+    def __init__(self, capacity: int, window: float = RATE_LIMIT_WINDOW_SECONDS):
+        self.window = window
+        self.capacity = float(capacity)
+        self.refill_rate = self.capacity / window
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+
+    def sync(self, remaining: int | None, limit: int | None) -> None:
+        """Reconcile the bucket with the quota reported by the server."""
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+            self.refill_rate = self.capacity / self.window
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+
+    def penalize(self, seconds: float) -> None:
+        """Empty the bucket so no request is sent for roughly `seconds`."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.refill_rate)
+
+    async def acquire(self, deadline: float | None = None) -> bool:
+        """
+        Wait for a token and consume it.
+
+        Args:
+            deadline: Optional time.monotonic() value. If a token would not be
+                available before then, give up without waiting.
+
+        Returns:
+            True if a token was acquired, False if the deadline would be missed.
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) / self.refill_rate
+                if deadline is not None and time.monotonic() + wait > deadline:
+                    return False
+                await asyncio.sleep(wait)
+
+
+class MatchplayRefreshScheduler:
+    """
+    Fetches Matchplay profiles for many users as fast as the API quota allows.
+    """
+
+    def __init__(
+        self,
+        client: MatchplayClient,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        max_retries: int = MAX_RETRIES,
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            client: Configured MatchplayClient (its rate limit tracking is shared)
+            concurrency: Maximum number of requests in flight at once
+            max_retries: Retries per user after a 429 or transient network error
+        """
+        self.client = client
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.bucket = TokenBucket(client.rate_limit_total or DEFAULT_RATE_LIMIT)
+        if client.rate_limit_remaining is not None:
+            self.bucket.sync(client.rate_limit_remaining, client.rate_limit_total)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        if retry_after is not None:
+            return retry_after
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2**attempt))
+        return delay * (0.5 + random.random() / 2)
+
+    async def _fetch_one(self, user_id: int, deadline: float | None) -> dict[str, Any] | None:
+        """
+        Fetch one profile, retrying 429s and transient errors.
+
+        Returns None if the deadline was reached before the request could be sent.
+        """
+        attempt = 0
+        while True:
+            if not await self.bucket.acquire(deadline):
+                return None
+            try:
+                profile = await self.client.get_user_profile(
+                    user_id, include_ifpa=True, include_counts=True, revalidate=True
+                )
+                self.bucket.sync(self.client.rate_limit_remaining, self.client.rate_limit_total)
+                return profile
+            except MatchplayRateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, e.retry_after)
+                logger.warning(f"Rate limited fetching user {user_id}, backing off {delay:.1f}s")
+                self.bucket.penalize(delay)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt, None)
+                logger.warning(
+                    f"Network error fetching user {user_id} ({e}), retry in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def fetch_profiles(
+        self,
+        user_ids: list[int],
+        on_profile: Callable[[int, dict[str, Any]], None] | None = None,
+        timeout: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Fetch profiles for a list of users with bounded concurrency.
+
+        Args:
+            user_ids: Matchplay user IDs, highest priority (stalest) first
+            on_profile: Optional callback invoked as each profile arrives, e.g.
+                to persist it immediately so an interrupted run can resume
+            timeout: Optional overall time budget in seconds. Users that could
+                not be started within the budget are reported as skipped.
+
+        Returns:
+            {
+                "profiles": {user_id: profile},
+                "failed": {user_id: error message},
+                "skipped": [user_id, ...],
+                "elapsed": seconds,
+            }
+
+        Raises:
+            MatchplayAuthError: If the API token is rejected (no point continuing)
+        """
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for user_id in user_ids:
+            queue.put_nowait(user_id)
+
+        profiles: dict[int, dict[str, Any]] = {}
+        failed: dict[int, str] = {}
+        skipped: list[int] = []
+        out_of_time = False
+        auth_error: MatchplayAuthError | None = None
+
+        async def worker():
+            nonlocal out_of_time, auth_error
+            while not queue.empty():
+                user_id = queue.get_nowait()
+                if out_of_time or auth_error:
+                    skipped.append(user_id)
+                    continue
+                try:
+                    profile = await self._fetch_one(user_id, deadline)
+                except MatchplayAuthError as e:
+                    auth_error = e
+                    skipped.append(user_id)
+                    continue
+                except Exception as e:
+                    logger.warning(f"Failed to fetch profile for user {user_id}: {e}")
+                    failed[user_id] = str(e)
+                    continue
+
+                if profile is None:
+                    out_of_time = True
+                    skipped.append(user_id)
+                    continue
+
+                profiles[user_id] = profile
+                if on_profile:
+                    on_profile(user_id, profile)
+
+        await asyncio.gather(*[worker() for _ in range(min(self.concurrency, len(user_ids)))])
+
+        if auth_error:
+            raise auth_error
+
+        return {
+            "profiles": profiles,
+            "failed": failed,
+            "skipped": skipped,
+            "elapsed": time.monotonic() - started,
+        }
@@ -20,6 +20,8 @@ from api.models.schemas import (
     PlayerMachinePreference,
     TeamMachineConfidence,
 )
+from api.services.quantile_sketch import ScoreDigest, get_player_digests
+from api.services.score_store import get_score_store
 
 
 def get_current_machines_for_venue(venue_key: str, seasons: list[int]) -> list[str]:
@@ -101,6 +103,24 @@ def calculate_confidence_interval(
     )
 
 
+def calculate_confidence_interval_from_digest(digest: ScoreDigest) -> ConfidenceInterval | None:
+    """
+    Calculate 25th-75th percentile range from a merged score sketch.
+    Returns None if insufficient data (< 5 scores).
+    """
+    if digest.count < 5:
+        return None
+
+    p25, median, p75 = digest.quantiles([0.25, 0.5, 0.75])
+
+    return ConfidenceInterval(
+        median=median,
+        p25=p25,
+        p75=p75,
+        sample_size=digest.count,
+    )
+
+
 def get_team_machine_pick_frequency(
     team_key: str,
     team_home_venue: str,
@@ -415,6 +435,9 @@ def get_player_machine_confidence(
 ) -> list[PlayerMachineConfidence]:
     """
     Get confidence intervals for each player on each available machine across multiple seasons.
+
+    Players are those who played these machines for the team in these seasons;
+    their intervals come from their merged score sketches (player_score_sketches).
     """
     if not available_machines:
         return []
@@ -433,48 +456,37 @@ def get_player_machine_confidence(
     if roster_only:
         roster_filter = "AND s.is_substitute = false"
 
-    all_scores_query = f"""
-        SELECT
+    players_query = f"""
+        SELECT DISTINCT
             s.player_key,
-            p.name as player_name,
-            s.machine_key,
-            s.score
+            p.name as player_name
         FROM scores s
         INNER JOIN players p ON s.player_key = p.player_key
         WHERE s.team_key = :team_key
             AND s.season = ANY(:seasons)
             AND s.machine_key = ANY(:machines)
             {roster_filter}
-        ORDER BY s.player_key, s.machine_key, s.score
     """
 
-    all_scores = execute_query(all_scores_query, query_params)
-
-    player_machine_scores = defaultdict(lambda: defaultdict(list))
-    player_names = {}
-
-    for row in all_scores:
-        player_key = row["player_key"]
-        player_names[player_key] = row["player_name"]
-        machine_key = row["machine_key"]
-        player_machine_scores[player_key][machine_key].append(row["score"])
+    players = execute_query(players_query, query_params)
+    player_names = {row["player_key"]: row["player_name"] for row in players}
 
-    # Batch fetch win percentages for all players
-    all_player_keys = list(player_machine_scores.keys())
+    # Batch fetch score sketches and win percentages for all players
+    all_player_keys = list(player_names.keys())
+    digests = get_player_digests(all_player_keys, available_machines, seasons)
     win_pcts = _get_player_win_percentages(all_player_keys, seasons, available_machines)
 
     result = []
 
-    for player_key, machine_scores in player_machine_scores.items():
-        player_name = player_names[player_key]
+    for player_key, player_name in player_names.items():
         player_win_pcts = win_pcts.get(player_key, {})
 
         for machine_key in available_machines:
             machine_name = machine_name_map.get(machine_key, machine_key)
-            scores = machine_scores.get(machine_key, [])
+            digest = digests.get((player_key, machine_key))
 
-            if len(scores) >= 5:
-                ci = calculate_confidence_interval(scores)
+            if digest is not None and digest.count >= 5:
+                ci = calculate_confidence_interval_from_digest(digest)
                 result.append(
                     PlayerMachineConfidence(
                         player_key=player_key,
@@ -520,22 +532,31 @@ def get_team_machine_confidence(
     machine_names = execute_query(machine_names_query, {"machines": available_machines})
     machine_name_map = {m["machine_key"]: m["machine_name"] for m in machine_names}
 
-    all_scores_query = """
-        SELECT machine_key, score
-        FROM scores
-        WHERE team_key = :team_key
-            AND season = ANY(:seasons)
-            AND machine_key = ANY(:machines)
-        ORDER BY machine_key, score
-    """
+    store = get_score_store()
+    if store is not None:
+        mask = store.select(seasons=seasons, teams=[team_key], machines=available_machines)
+        machine_scores = {
+            machine_key: scores.tolist()
+            for machine_key, scores in store.grouped_scores(mask, by="machine").items()
+        }
+    else:
+        all_scores_query = """
+            SELECT machine_key, score
+            FROM scores
+            WHERE team_key = :team_key
+                AND season = ANY(:seasons)
+                AND machine_key = ANY(:machines)
+            ORDER BY machine_key, score
+        """
 
-    all_scores = execute_query(
-        all_scores_query, {"team_key": team_key, "seasons": seasons, "machines": available_machines}
-    )
+        all_scores = execute_query(
+            all_scores_query,
+            {"team_key": team_key, "seasons": seasons, "machines": available_machines},
+        )
 
-    machine_scores = defaultdict(list)
-    for row in all_scores:
-        machine_scores[row["machine_key"]].append(row["score"])
+        machine_scores = defaultdict(list)
+        for row in all_scores:
+            machine_scores[row["machine_key"]].append(row["score"])
 
     # Get team-level win percentages
     team_win_pcts = _get_team_win_percentages(team_key, seasons, available_machines)
@@ -4,16 +4,134 @@ Service to match MNP players with Matchplay.events profiles.
 Matching strategy:
 - 100% exact name match (case-insensitive) -> auto-link eligible
 - Any other match -> requires manual confirmation
+
+Two modes:
+- find_matches / batch_find_matches search the Matchplay API name by name.
+- bulk_match scores names against a locally cached roster of Matchplay users
+  through a RosterIndex, without any API calls, for whole-league link reports.
 """
 
 import logging
 from difflib import SequenceMatcher
 from typing import Any
 
+import numpy as np
+
 from api.services.matchplay_client import MatchplayClient
 
 logger = logging.getLogger(__name__)
 
+# Number of blocked candidates per name that get scored
+DEFAULT_BLOCK_SIZE = 8
+
+
+def _name_grams(normalized: str) -> set[str]:
+    """Blocking keys for a normalized name: whole words plus padded character trigrams."""
+    grams = {f"w:{token}" for token in normalized.split()}
+    padded = f"  {normalized} "
+    grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class RosterIndex:
+    """
+    Blocking index over a local roster of Matchplay users.
+
+    Each roster name is broken into word tokens and character trigrams, and an
+    inverted index maps every gram to the roster positions containing it. A
+    query gathers the postings for its grams, counts shared grams per roster
+    entry with one np.bincount, and ranks entries by Dice coefficient
+    (2 * shared / (grams_a + grams_b)). Only the top few candidates are then
+    scored.
+
+    Per-name character counts let quick_ratios() bound SequenceMatcher.ratio()
+    for a whole batch of (name, candidate) pairs with array operations, so the
+    pairwise scorer only runs on pairs that can reach the threshold.
+    """
+
+    def __init__(self, users: list[dict[str, Any]]):
+        """
+        Build the index.
+
+        Args:
+            users: Matchplay user dicts with at least "name" and "userId" (or "id")
+        """
+        self.users = [u for u in users if u.get("name")]
+        self.names = [u["name"].lower().strip() for u in self.users]
+
+        postings: dict[str, list[int]] = {}
+        gram_counts = np.zeros(len(self.users), dtype=np.int32)
+        for position, name in enumerate(self.names):
+            grams = _name_grams(name)
+            gram_counts[position] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+
+        self.postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()}
+        self.gram_counts = gram_counts
+
+        self.alphabet = {char: i for i, char in enumerate(sorted(set("".join(self.names))))}
+        self.char_counts = self.char_matrix(self.names)
+        self.lengths = np.array([len(name) for name in self.names], dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    def candidates(self, name: str, limit: int = DEFAULT_BLOCK_SIZE) -> list[tuple[int, float]]:
+        """
+        Return the roster positions most likely to match a name.
+
+        Args:
+            name: Name to look up
+            limit: Maximum number of candidates
+
+        Returns:
+            List of (roster position, Dice coefficient), best first
+        """
+        grams = _name_grams(name.lower().strip())
+        hits = [self.postings[g] for g in grams if g in self.postings]
+        if not hits:
+            return []
+
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.users))
+        dice = 2.0 * shared / (len(grams) + self.gram_counts)
+
+        nonzero = np.flatnonzero(shared)
+        if len(nonzero) > limit:
+            nonzero = nonzero[np.argpartition(-dice[nonzero], limit)[:limit]]
+        ranked = nonzero[np.argsort(-dice[nonzero])]
+        return [(int(i), float(dice[i])) for i in ranked]
+
+    def char_matrix(self, names: list[str]) -> np.ndarray:
+        """Per-name counts of each roster character (characters not in the roster are skipped)."""
+        matrix = np.zeros((len(names), len(self.alphabet)), dtype=np.int16)
+        rows = np.repeat(np.arange(len(names)), [len(name) for name in names])
+        codes = np.array(
+            [self.alphabet.get(char, -1) for name in names for char in name], dtype=int
+        )
+        known = codes >= 0
+        np.add.at(matrix, (rows[known], codes[known]), 1)
+        return matrix
+
+    def quick_ratios(
+        self, counts: np.ndarray, lengths: np.ndarray, positions: np.ndarray
+    ) -> np.ndarray:
+        """
+        SequenceMatcher.quick_ratio() of query names against roster positions.
+
+        An upper bound of ratio(): matching blocks can't share more characters
+        than the two names have in common.
+
+        Args:
+            counts: char_matrix() rows of the query names, one per pair
+            lengths: Query name lengths, one per pair
+            positions: Roster positions, one per pair
+        """
+        shared = np.minimum(counts, self.char_counts[positions]).sum(axis=1)
+        total = lengths + self.lengths[positions]
+        # Two empty names are identical, like SequenceMatcher says
+        return np.divide(2.0 * shared, total, out=np.ones(len(total)), where=total > 0)
+
 
 class PlayerMatcher:
     """
@@ -142,6 +260,9 @@ class PlayerMatcher:
         """
         Find matches for multiple MNP players.
 
+        Makes one API search per name; use bulk_match() to score a whole
+        roster against cached Matchplay users without API calls.
+
         Args:
             mnp_names: List of MNP player names
             auto_link_only: If True, only return exact (auto-link eligible) matches
@@ -160,3 +281,96 @@ class PlayerMatcher:
             results[name] = matches
 
         return results
+
+    def bulk_match(
+        self,
+        mnp_players: list[dict[str, Any]],
+        roster: list[dict[str, Any]],
+        min_similarity: float = 0.5,
+        max_candidates: int = DEFAULT_BLOCK_SIZE,
+    ) -> list[dict[str, Any]]:
+        """
+        Match many MNP players against a locally cached Matchplay roster.
+
+        No API calls are made. Each name is compared only with the few roster
+        entries the RosterIndex blocks it into, and those candidates are scored
+        with the same confidence rules as find_matches(). All (name, candidate)
+        pairs are scored together: exact matches and the quick_ratios() bound
+        are array operations, and SequenceMatcher only runs on the pairs whose
+        bound reaches min_similarity.
+
+        Args:
+            mnp_players: Dicts with "player_key" and "name"
+            roster: Matchplay user dicts (see RosterIndex)
+            min_similarity: Minimum confidence to include a candidate
+            max_candidates: Candidates per name passed to the pairwise scorer
+
+        Returns:
+            Ranked auto-link report, best confidence first:
+            [
+                {
+                    "player_key": ..., "name": ...,
+                    "matches": [{"user", "confidence", "auto_link_eligible"}, ...],
+                    "best_confidence": 0.0-1.0,
+                    "auto_link_eligible": True only for a single exact match,
+                },
+                ...
+            ]
+        """
+        index = RosterIndex(roster)
+        names = [self._normalize_name(player["name"]) for player in mnp_players]
+
+        # One (name, candidate) pair per blocked candidate
+        blocks = [
+            [position for position, _dice in index.candidates(name, max_candidates)]
+            for name in names
+        ]
+        offsets = np.cumsum([0] + [len(block) for block in blocks])
+        rows = np.repeat(np.arange(len(names)), np.diff(offsets))
+        positions = np.array([position for block in blocks for position in block], dtype=np.int64)
+
+        exact = (
+            np.array(names, dtype=object)[rows] == np.array(index.names, dtype=object)[positions]
+        )
+        lengths = np.array([len(name) for name in names], dtype=np.int32)
+        bounds = index.quick_ratios(index.char_matrix(names)[rows], lengths[rows], positions)
+
+        confidence = np.where(exact, 1.0, 0.0)
+        for pair in np.flatnonzero(~exact & (bounds >= min_similarity)):
+            confidence[pair] = self._calculate_similarity(
+                names[rows[pair]], index.names[positions[pair]]
+            )
+
+        report = []
+        for player_index, player in enumerate(mnp_players):
+            mnp_name = player["name"]
+            matches = [
+                {
+                    "user": index.users[positions[pair]],
+                    "confidence": round(float(confidence[pair]), 4),
+                    "auto_link_eligible": bool(exact[pair]),
+                }
+                for pair in range(offsets[player_index], offsets[player_index + 1])
+                if confidence[pair] >= min_similarity
+            ]
+            matches.sort(key=lambda x: x["confidence"], reverse=True)
+
+            exact_count = sum(1 for m in matches if m["auto_link_eligible"])
+            report.append(
+                {
+                    "player_key": player["player_key"],
+                    "name": mnp_name,
+                    "matches": matches,
+                    "best_confidence": matches[0]["confidence"] if matches else 0.0,
+                    # Two Matchplay users with the same name can't be auto-linked
+                    "auto_link_eligible": exact_count == 1,
+                }
+            )
+
+        report.sort(key=lambda r: r["best_confidence"], reverse=True)
+
+        logger.info(
+            f"Bulk matched {len(mnp_players)} players against {len(index)} roster users "
+            f"({sum(1 for r in report if r['auto_link_eligible'])} auto-link eligible)"
+        )
+        return report
@@ -0,0 +1,250 @@
+"""
+Mergeable score quantile sketches (t-digest) - shared by the API and ETL.
+
+etl/calculate_score_sketches.py stores one digest per (machine, venue, season)
+in machine_score_sketches (venue '_ALL_' = all venues) and one per
+(player, machine, season) in player_score_sketches. Endpoints that accept any
+combination of seasons merge the stored digests for that combination and read
+medians, quartiles and percentile ranks from the result instead of sorting the
+raw scores with PERCENTILE_CONT on every request.
+
+A digest is a list of centroids (mean, weight) sorted by mean. Centroids are
+small in the tails and largest around the median (the t-digest k1 scale
+function), so a digest of any size holds at most COMPRESSION / 2 centroids and
+the rank error of an estimate is bounded by the weight of the centroids around
+it: well under 1% of the scores at the median, and much less in the tails.
+Digests of fewer scores than that keep every score as its own centroid and
+give exact answers. Count, total, min and max are stored alongside and are
+always exact.
+"""
+
+from collections import defaultdict
+
+import numpy as np
+
+from api.dependencies import execute_query
+
+# Scale of the k1 function; bounds a digest to COMPRESSION / 2 centroids
+COMPRESSION = 200
+
+
+def _k_scale(q: np.ndarray, compression: int) -> np.ndarray:
+    """t-digest k1 scale function: steep near q=0 and q=1, flat around the median."""
+    return compression / (2 * np.pi) * np.arcsin(2 * np.clip(q, 0.0, 1.0) - 1)
+
+
+def _compress(
+    means: np.ndarray, weights: np.ndarray, compression: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge adjacent centroids that fall into the same unit of the k1 scale.
+
+    Centroids are bucketed by the k value at the middle of their cumulative
+    weight; each bucket becomes one centroid at its weighted mean.
+    """
+    order = np.argsort(means, kind="stable")
+    means, weights = means[order], weights[order]
+
+    cumulative = np.cumsum(weights)
+    midpoints = (cumulative - weights / 2) / cumulative[-1]
+    buckets = np.floor(_k_scale(midpoints, compression))
+
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    merged_weights = np.add.reduceat(weights, starts)
+    merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+    return merged_means, merged_weights
+
+
+class ScoreDigest:
+    """
+    t-digest of a set of scores.
+
+    Estimates follow PERCENTILE_CONT / numpy's linear interpolation: on a digest
+    whose centroids are all single scores, quantile() is exact.
+    """
+
+    __slots__ = ("means", "weights", "count", "total", "min_score", "max_score")
+
+    def __init__(
+        self,
+        means: np.ndarray,
+        weights: np.ndarray,
+        count: int,
+        total: int,
+        min_score: int,
+        max_score: int,
+    ):
+        self.means = np.asarray(means, dtype=np.float64)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.count = int(count)
+        self.total = int(total)
+        self.min_score = int(min_score)
+        self.max_score = int(max_score)
+
+    @classmethod
+    def from_scores(cls, scores, compression: int = COMPRESSION) -> "ScoreDigest":
+        """Build a digest from raw scores (at least one)."""
+        values = np.asarray(scores, dtype=np.float64)
+        means, weights = _compress(values, np.ones_like(values), compression)
+        return cls(
+            means,
+            weights,
+            count=len(values),
+            total=int(np.asarray(scores, dtype=np.int64).sum()),
+            min_score=values.min(),
+            max_score=values.max(),
+        )
+
+    @classmethod
+    def from_row(cls, row: dict) -> "ScoreDigest":
+        """Rebuild a digest from a machine_/player_score_sketches row."""
+        return cls(
+            row["centroid_means"],
+            row["centroid_weights"],
+            count=row["score_count"],
+            total=row["total_score"],
+            min_score=row["min_score"],
+            max_score=row["max_score"],
+        )
+
+    def to_row(self) -> dict:
+        """Columns of a machine_/player_score_sketches row (keys excluded)."""
+        return {
+            "score_count": self.count,
+            "total_score": self.total,
+            "min_score": self.min_score,
+            "max_score": self.max_score,
+            "centroid_means": self.means.tolist(),
+            "centroid_weights": self.weights.astype(np.int64).tolist(),
+        }
+
+    @classmethod
+    def merge(cls, digests: list["ScoreDigest"], compression: int = COMPRESSION) -> "ScoreDigest":
+        """Combine digests of disjoint score sets (e.g. several seasons) into one."""
+        if len(digests) == 1:
+            return digests[0]
+        means, weights = _compress(
+            np.concatenate([d.means for d in digests]),
+            np.concatenate([d.weights for d in digests]),
+            compression,
+        )
+        return cls(
+            means,
+            weights,
+            count=sum(d.count for d in digests),
+            total=sum(d.total for d in digests),
+            min_score=min(d.min_score for d in digests),
+            max_score=max(d.max_score for d in digests),
+        )
+
+    def _knots(self) -> tuple[np.ndarray, np.ndarray]:
+        """(0-based rank, score) interpolation points: min, each centroid's center, max."""
+        ranks = np.cumsum(self.weights) - (self.weights + 1) / 2
+        ranks = np.concatenate(([0.0], ranks, [self.count - 1.0]))
+        scores = np.concatenate(([self.min_score], self.means, [self.max_score]))
+        return ranks, scores
+
+    def quantiles(self, qs) -> np.ndarray:
+        """Scores at the given quantiles (0-1)."""
+        ranks, scores = self._knots()
+        return np.interp(np.asarray(qs, dtype=np.float64) * (self.count - 1), ranks, scores)
+
+    def quantile(self, q: float) -> float:
+        """Score at quantile q (0-1)."""
+        return float(self.quantiles([q])[0])
+
+    @property
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+    def cdf(self, scores) -> np.ndarray:
+        """Fraction of the scores at or below each given score (0-1)."""
+        ranks, knot_scores = self._knots()
+        values = np.asarray(scores, dtype=np.float64)
+        fractions = (np.interp(values, knot_scores, ranks) + 1) / self.count
+        fractions = np.where(values < self.min_score, 0.0, fractions)
+        return np.clip(fractions, 0.0, 1.0)
+
+
+def _merge_rows(rows: list[dict], key) -> dict:
+    """Group sketch rows by key(row) and merge each group into one digest."""
+    groups = defaultdict(list)
+    for row in rows:
+        groups[key(row)].append(ScoreDigest.from_row(row))
+    return {group_key: ScoreDigest.merge(digests) for group_key, digests in groups.items()}
+
+
+def get_machine_digests(
+    seasons: list[int] | None = None,
+    machine_keys: list[str] | None = None,
+    venue_key: str | None = None,
+) -> dict[str, ScoreDigest]:
+    """
+    Merged score digest of each machine over the given seasons.
+
+    Args:
+        seasons: Seasons to combine (None = every season)
+        machine_keys: Machines to return (None = every machine with scores)
+        venue_key: Only scores at this venue (None = all venues)
+
+    Returns:
+        Dict mapping machine_key to its digest; machines without scores are absent
+    """
+    where_clauses = ["venue_key = :venue_key"]
+    params = {"venue_key": venue_key or "_ALL_"}
+    if seasons:
+        where_clauses.append("season = ANY(:seasons)")
+        params["seasons"] = seasons
+    if machine_keys:
+        where_clauses.append("machine_key = ANY(:machine_keys)")
+        params["machine_keys"] = machine_keys
+
+    rows = execute_query(
+        f"""
+        SELECT machine_key, score_count, total_score, min_score, max_score,
+               centroid_means, centroid_weights
+        FROM machine_score_sketches
+        WHERE {" AND ".join(where_clauses)}
+        """,
+        params,
+    )
+    return _merge_rows(rows, key=lambda row: row["machine_key"])
+
+
+def get_player_digests(
+    player_keys: list[str],
+    machine_keys: list[str] | None = None,
+    seasons: list[int] | None = None,
+) -> dict[tuple[str, str], ScoreDigest]:
+    """
+    Merged score digest of each player on each machine over the given seasons.
+
+    Returns:
+        Dict mapping (player_key, machine_key) to its digest
+    """
+    if not player_keys:
+        return {}
+
+    where_clauses = ["player_key = ANY(:player_keys)"]
+    params = {"player_keys": player_keys}
+    if seasons:
+        where_clauses.append("season = ANY(:seasons)")
+        params["seasons"] = seasons
+    if machine_keys:
+        where_clauses.append("machine_key = ANY(:machine_keys)")
+        params["machine_keys"] = machine_keys
+
+    rows = execute_query(
+        f"""
+        SELECT player_key, machine_key, score_count, total_score, min_score, max_score,
+               centroid_means, centroid_weights
+        FROM player_score_sketches
+        WHERE {" AND ".join(where_clauses)}
+        """,
+        params,
+    )
+    return _merge_rows(rows, key=lambda row: (row["player_key"], row["machine_key"]))
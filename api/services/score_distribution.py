@@ -0,0 +1,170 @@
+"""
+Pre-binned score distributions for machine charts - shared by the API and ETL.
+
+etl/calculate_score_distributions.py stores, per (machine, venue, season), a
+log-scaled histogram and a downsampled scatter series in
+machine_score_distributions (venue '_ALL_' = all venues). The machine
+distribution endpoint merges the rows for the requested seasons, so a chart
+costs one index range scan and a few kilobytes however many scores the
+machine has.
+
+Histogram buckets sit on one fixed log grid (BUCKETS_PER_DECADE per power of
+ten, bucket i = [10^(i/B), 10^((i+1)/B))), so a row only stores its first
+bucket index and the counts from there, and rows merge by adding counts.
+Scores of 0 (a tilted or unplayed ball) have no place on a log scale; they get
+their own bucket, ZERO_BUCKET = [0, 1), just below the grid.
+
+The scatter series keeps SCATTER_POINTS scores picked at evenly spaced ranks,
+which preserves the shape of the distribution for a percentile-vs-score
+chart. Each point stands for score_count / len(points) scores when rows are
+merged.
+"""
+
+import numpy as np
+
+from api.dependencies import execute_query
+
+# Histogram resolution: buckets per power of ten (~21% wide each)
+BUCKETS_PER_DECADE = 12
+
+# Bucket of scores below 1, covering [0, 1)
+ZERO_BUCKET = -1
+
+# Points kept in each scatter series
+SCATTER_POINTS = 200
+
+
+def log_buckets(scores: np.ndarray) -> np.ndarray:
+    """Index of the log-grid bucket of each score (ZERO_BUCKET for scores below 1)."""
+    grid = np.floor(np.log10(np.maximum(scores, 1)) * BUCKETS_PER_DECADE).astype(np.int64)
+    return np.where(scores < 1, ZERO_BUCKET, grid)
+
+
+def bucket_edges(first_bucket: int, bucket_count: int) -> np.ndarray:
+    """Integer edges of bucket_count consecutive buckets starting at first_bucket."""
+    indexes = np.arange(first_bucket, first_bucket + bucket_count + 1)
+    edges = np.ceil(10 ** (indexes / BUCKETS_PER_DECADE)).astype(np.int64)
+    # ZERO_BUCKET starts at 0 rather than on the grid
+    return np.where(indexes <= ZERO_BUCKET, 0, edges)
+
+
+def evenly_ranked(count: int, points: int = SCATTER_POINTS) -> np.ndarray:
+    """Indexes of up to `points` evenly spaced ranks out of `count`, ends included."""
+    return np.unique(np.round(np.linspace(0, count - 1, min(count, points))).astype(np.int64))
+
+
+def build_distribution(scores, player_keys) -> dict:
+    """
+    Histogram and scatter series of one group of scores.
+
+    Returns:
+        Columns of a machine_score_distributions row (keys excluded)
+    """
+    scores = np.asarray(scores, dtype=np.int64)
+    order = np.argsort(scores, kind="stable")
+    ordered = scores[order]
+
+    buckets = log_buckets(ordered)
+    first_bucket = int(buckets[0])
+    counts = np.bincount(buckets - first_bucket)
+
+    picks = evenly_ranked(len(ordered))
+    return {
+        "score_count": len(ordered),
+        "min_score": int(ordered[0]),
+        "max_score": int(ordered[-1]),
+        "first_bucket": first_bucket,
+        "bucket_counts": counts.tolist(),
+        "scatter_scores": ordered[picks].tolist(),
+        "scatter_player_keys": [player_keys[i] for i in order[picks]],
+    }
+
+
+def merge_distributions(rows: list[dict]) -> dict:
+    """
+    Combine machine_score_distributions rows (e.g. several seasons).
+
+    Returns:
+        {score_count, min_score, max_score,
+         buckets: [{low, high, count}], scatter: [{score, percentile, player_key}]}
+    """
+    first = min(row["first_bucket"] for row in rows)
+    last = max(row["first_bucket"] + len(row["bucket_counts"]) for row in rows)
+    counts = np.zeros(last - first, dtype=np.int64)
+    for row in rows:
+        start = row["first_bucket"] - first
+        counts[start : start + len(row["bucket_counts"])] += row["bucket_counts"]
+    edges = bucket_edges(first, last - first)
+
+    # Each point weighs the number of scores it stands for; its percentile is
+    # the middle of its weight in the merged ranking
+    scores = np.concatenate([np.asarray(row["scatter_scores"], dtype=np.int64) for row in rows])
+    weights = np.concatenate(
+        [
+            np.full(len(row["scatter_scores"]), row["score_count"] / len(row["scatter_scores"]))
+            for row in rows
+        ]
+    )
+    player_keys = [key for row in rows for key in row["scatter_player_keys"]]
+
+    order = np.argsort(scores, kind="stable")
+    cumulative = np.cumsum(weights[order])
+    percentiles = (cumulative - weights[order] / 2) / cumulative[-1] * 100
+    picks = evenly_ranked(len(order)) if len(rows) > 1 else np.arange(len(order))
+
+    return {
+        "score_count": sum(row["score_count"] for row in rows),
+        "min_score": min(row["min_score"] for row in rows),
+        "max_score": max(row["max_score"] for row in rows),
+        "buckets": [
+            {"low": int(edges[i]), "high": int(edges[i + 1]), "count": int(counts[i])}
+            for i in range(len(counts))
+        ],
+        "scatter": [
+            {
+                "score": int(scores[order[i]]),
+                "percentile": round(float(percentiles[i]), 2),
+                "player_key": player_keys[order[i]],
+            }
+            for i in picks
+        ],
+    }
+
+
+def get_machine_distribution(
+    machine_key: str, seasons: list[int] | None = None, venue_key: str | None = None
+) -> dict | None:
+    """
+    Merged histogram and scatter series of a machine's scores.
+
+    Args:
+        machine_key: Machine
+        seasons: Seasons to combine (None = every season)
+        venue_key: Only scores at this venue (None = all venues)
+
+    Returns:
+        merge_distributions() result plus the seasons covered, or None if there
+        are no scores
+    """
+    where_clauses = ["machine_key = :machine_key", "venue_key = :venue_key"]
+    params = {"machine_key": machine_key, "venue_key": venue_key or "_ALL_"}
+    if seasons:
+        where_clauses.append("season = ANY(:seasons)")
+        params["seasons"] = seasons
+
+    rows = execute_query(
+        f"""
+        SELECT season, score_count, min_score, max_score, first_bucket, bucket_counts,
+               scatter_scores, scatter_player_keys
+        FROM machine_score_distributions
+        WHERE {" AND ".join(where_clauses)}
+        ORDER BY season
+        """,
+        params,
+    )
+    if not rows:
+        return None
+
+    distribution = merge_distributions(rows)
+    distribution["seasons"] = [row["season"] for row in rows]
+    return distribution
@@ -0,0 +1,235 @@
+"""
+In-process columnar copy of the scores table, for analytic endpoints.
+
+With SCORE_STORE_ENABLED, the API loads every score at startup into NumPy
+columns: int64 scores, int8 season/week/round, and int32 codes into sorted
+key dictionaries for players, machines, venues and teams (a few MB for the
+whole league). Helpers then filter with vectorized masks and group with one
+sort instead of fetching rows over the network and building dicts.
+
+The store remembers the data version it was built from (data_versions,
+migration 020). get_score_store() checks the current version at most every
+VERSION_CHECK_SECONDS and reloads when an ETL run or production sync has
+stamped a new one. Callers fall back to SQL when it returns None.
+"""
+
+import logging
+import threading
+import time
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from api.config import SCORE_STORE_ENABLED
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+# How often requests check the data version for a reload
+VERSION_CHECK_SECONDS = 30
+
+# Dictionary-encoded key columns
+KEY_COLUMNS = ["player", "machine", "venue", "team"]
+
+
+class ScoreStore:
+    """Scores as NumPy columns; key columns hold codes into self.keys[column]."""
+
+    def __init__(self, version: int | None, rows: list[tuple]):
+        """
+        Args:
+            version: Data version the rows were read at
+            rows: (player_key, machine_key, venue_key, team_key, score, season,
+                   week, round_number, is_substitute) tuples
+        """
+        self.version = version
+        self.keys: dict[str, np.ndarray] = {}
+        self.codes: dict[str, dict[str, int]] = {}
+        self.columns: dict[str, np.ndarray] = {}
+
+        columns = list(zip(*rows)) if rows else [()] * 9
+        for name, values in zip(KEY_COLUMNS, columns[:4]):
+            keys, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+            self.keys[name] = keys
+            self.codes[name] = {key: code for code, key in enumerate(keys)}
+            self.columns[name] = codes.astype(np.int32)
+
+        self.columns["score"] = np.array(columns[4], dtype=np.int64)
+        self.columns["season"] = np.array(columns[5], dtype=np.int8)
+        self.columns["week"] = np.array(columns[6], dtype=np.int8)
+        self.columns["round"] = np.array(columns[7], dtype=np.int8)
+        self.columns["is_substitute"] = np.array(columns[8], dtype=bool)
+
+    @classmethod
+    def load(cls) -> "ScoreStore":
+        """Read every score and the current data version in one snapshot."""
+        if not db.engine:
+            db.connect()
+        with db.engine.connect() as conn:
+            conn.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+            version = _read_data_version(conn)
+            rows = conn.execute(
+                text("""
+                SELECT player_key, machine_key, venue_key, team_key, score,
+                       season, week, round_number, COALESCE(is_substitute, false)
+                FROM scores
+            """)
+            ).fetchall()
+        return cls(version, rows)
+
+    def __len__(self) -> int:
+        return len(self.columns["score"])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    def select(
+        self,
+        seasons: list[int] | None = None,
+        players: list[str] | None = None,
+        machines: list[str] | None = None,
+        venues: list[str] | None = None,
+        teams: list[str] | None = None,
+        rounds: list[int] | None = None,
+        exclude_substitutes: bool = False,
+    ) -> np.ndarray:
+        """Boolean mask of the scores matching every given filter (None = no filter)."""
+        mask = np.ones(len(self), dtype=bool)
+        if seasons:
+            mask &= np.isin(self.columns["season"], seasons)
+        if rounds:
+            mask &= np.isin(self.columns["round"], rounds)
+        if exclude_substitutes:
+            mask &= ~self.columns["is_substitute"]
+        for name, keys in zip(KEY_COLUMNS, (players, machines, venues, teams)):
+            if keys:
+                codes = [self.codes[name][key] for key in keys if key in self.codes[name]]
+                mask &= np.isin(self.columns[name], codes)
+        return mask
+
+    def _grouped(self, mask: np.ndarray, by: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(selected row indexes sorted by group then score, group codes, group starts)."""
+        rows = np.flatnonzero(mask)
+        rows = rows[np.lexsort((self.columns["score"][rows], self.columns[by][rows]))]
+        groups = self.columns[by][rows]
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]]) if len(rows) else rows
+        return rows, groups[starts], starts
+
+    def grouped_scores(self, mask: np.ndarray, by: str = "machine") -> dict[str, np.ndarray]:
+        """{key: ascending scores} of the selected scores, per player/machine/venue/team."""
+        rows, codes, starts = self._grouped(mask, by)
+        scores = np.split(self.columns["score"][rows], starts[1:])
+        return dict(zip(self.keys[by][codes], scores))
+
+    def group_stats(self, mask: np.ndarray, by: str = "machine") -> list[dict]:
+        """
+        Count, total, median, min and max of the selected scores per group.
+
+        The median interpolates like PERCENTILE_CONT(0.5). `first_row` is the
+        index of the group's lowest score, for columns like its season.
+        """
+        rows, codes, starts = self._grouped(mask, by)
+        if not len(rows):
+            return []
+        scores = self.columns["score"][rows]
+        counts = np.diff(np.r_[starts, len(rows)])
+        ends = starts + counts - 1
+        medians = (scores[starts + (counts - 1) // 2] + scores[starts + counts // 2]) / 2
+        totals = np.add.reduceat(scores, starts)
+        return [
+            {
+                "key": key,
+                "count": int(count),
+                "total": int(total),
+                "median": float(median),
+                "min": int(scores[start]),
+                "max": int(scores[end]),
+                "first_row": int(rows[start]),
+            }
+            for key, count, total, median, start, end in zip(
+                self.keys[by][codes], counts, totals, medians, starts, ends
+            )
+        ]
+
+    def key_at(self, column: str, row: int) -> str:
+        """Key of a dictionary-encoded column at a row index."""
+        return self.keys[column][self.columns[column][row]]
+
+
+def _read_data_version(conn) -> int | None:
+    """MAX(data_versions.version); None before migration 020 (load once, never reload)."""
+    if conn.execute(text("SELECT to_regclass('data_versions')")).scalar() is None:
+        return None
+    return conn.execute(text("SELECT MAX(version) FROM data_versions")).scalar()
+
+
+_store: ScoreStore | None = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def _reload():
+    """Replace the store; the caller holds _lock."""
+    global _store, _checked_at
+    start = time.perf_counter()
+    _store = ScoreStore.load()
+    _checked_at = time.monotonic()
+    logger.info(
+        f"Score store loaded: {len(_store)} scores, {_store.nbytes / 1024 / 1024:.1f} MB, "
+        f"data version {_store.version} ({time.perf_counter() - start:.2f}s)"
+    )
+
+
+def load_score_store() -> ScoreStore | None:
+    """
+    (Re)load the store now; called at API startup.
+
+    Returns None when the store is disabled or can't be loaded; the API then
+    starts on its SQL paths and get_score_store() retries later.
+    """
+    global _checked_at
+    if not SCORE_STORE_ENABLED:
+        return None
+    with _lock:
+        try:
+            _reload()
+        except (SQLAlchemyError, MemoryError) as e:
+            _checked_at = time.monotonic()
+            logger.warning(f"Score store failed to load, using SQL: {e}")
+    return _store
+
+
+def get_score_store() -> ScoreStore | None:
+    """
+    The current store, reloaded first if the data version has moved.
+
+    Returns None when the store is disabled or can't be loaded, so callers
+    use their SQL path. Other requests keep using the old store while one
+    reloads it.
+    """
+    global _checked_at
+    if not SCORE_STORE_ENABLED:
+        return None
+    # Also spaces out retries after a failed load, rather than one per request
+    if _checked_at and time.monotonic() - _checked_at < VERSION_CHECK_SECONDS:
+        return _store
+    if not _lock.acquire(blocking=_store is None):
+        return _store
+
+    try:
+        if not db.engine:
+            db.connect()
+        with db.engine.connect() as conn:
+            version = _read_data_version(conn)
+        _checked_at = time.monotonic()
+        if _store is None or version != _store.version:
+            logger.info(f"Data version is now {version}; reloading score store")
+            _reload()
+    except (SQLAlchemyError, MemoryError) as e:
+        _checked_at = time.monotonic()
+        logger.warning(f"Score store unavailable, using SQL: {e}")
+    finally:
+        _lock.release()
+    return _store
@@ -21,6 +21,7 @@ from pathlib import Path
 from sqlalchemy import text
 
 from etl.database import db
+from etl.parsers.season_pack import SeasonPack, load_pack
 
 logging.basicConfig(
     level=logging.INFO,
@@ -61,35 +62,26 @@ def get_matches_needing_machines(season: int = None) -> list:
     return [(row[0], row[1]) for row in rows]
 
 
-def load_match_json(match_key: str, season: int, data_archive: Path) -> dict | None:
+def load_match_json(
+    match_key: str, season: int, data_archive: Path, packs: dict[int, SeasonPack] = None
+) -> dict | None:
     """
-    Load a match JSON file by match key.
+    Load a match by match key from its season pack.
 
     Args:
         match_key: Match key (e.g., 'mnp-22-1-ADB-TBT')
         season: Season number
         data_archive: Path to mnp-data-archive
+        packs: Season packs already loaded by earlier calls, reused and filled in
 
     Returns:
         Match data dict or None if not found
     """
-    # Match files are in season-XX/matches/
-    matches_dir = data_archive / f"season-{season}" / "matches"
-
-    if not matches_dir.exists():
-        return None
-
-    match_file = matches_dir / f"{match_key}.json"
-
-    if not match_file.exists():
-        return None
-
-    try:
-        with open(match_file) as f:
-            return json.load(f)
-    except (OSError, json.JSONDecodeError) as e:
-        logger.warning(f"Error loading {match_file}: {e}")
-        return None
+    packs = packs if packs is not None else {}
+    if season not in packs:
+        # Match files are in season-XX/matches/
+        packs[season] = load_pack(data_archive / f"season-{season}" / "matches")
+    return packs[season].get(match_key)
 
 
 def extract_machines_from_match(match_data: dict) -> list | None:
@@ -144,9 +136,10 @@ def backfill_match_machines(season: int = None, dry_run: bool = False) -> int:
     not_found = 0
     no_machines = 0
     updates = []
+    packs = {}
 
     for match_key, match_season in matches_to_update:
-        match_data = load_match_json(match_key, match_season, data_archive)
+        match_data = load_match_json(match_key, match_season, data_archive, packs)
 
         if match_data is None:
             not_found += 1
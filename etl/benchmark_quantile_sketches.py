@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Benchmark the score quantile sketches against exact quantiles.
+
+For every machine with scores in the given seasons (all venues combined), this
+merges the stored per-season digests the way the API does and compares their
+quantiles with exact ones (numpy linear interpolation, which matches
+PERCENTILE_CONT) over the raw scores. It reports:
+- rank error: how far the estimated score sits from the requested quantile,
+  as a fraction of the scores (0.005 = half a percentile)
+- relative median error
+- time to merge and query the digests vs. an exact PERCENTILE_CONT query
+
+--synthetic runs the same comparison on generated lognormal scores split into
+seasons, without a database.
+
+Usage:
+    python etl/benchmark_quantile_sketches.py --seasons 21 22
+    python etl/benchmark_quantile_sketches.py --seasons 22 --min-scores 50
+    python etl/benchmark_quantile_sketches.py --synthetic
+"""
+
+import argparse
+import logging
+import sys
+import time
+from collections import defaultdict
+
+import numpy as np
+from sqlalchemy import text
+
+from api.services.quantile_sketch import ScoreDigest, get_machine_digests
+from etl.database import db
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+QUANTILES = np.linspace(0.01, 0.99, 99)
+
+
+def compare(digest: ScoreDigest, scores: np.ndarray) -> tuple[float, float]:
+    """(max rank error over QUANTILES, relative median error) of a digest."""
+    ordered = np.sort(scores)
+    estimates = digest.quantiles(QUANTILES)
+    # Fraction of scores below each estimate vs. the quantile asked for, with
+    # ties counted half so an estimate equal to a repeated score isn't penalized
+    below = np.searchsorted(ordered, estimates, side="left")
+    at_or_below = np.searchsorted(ordered, estimates, side="right")
+    ranks = (below + at_or_below) / 2 / len(ordered)
+    rank_error = float(np.max(np.abs(ranks - QUANTILES)))
+
+    exact_median = float(np.median(ordered))
+    median_error = abs(digest.median - exact_median) / exact_median if exact_median else 0.0
+    return rank_error, median_error
+
+
+def report(results: list[tuple[int, float, float]]):
+    """Log error percentiles per group-size bucket."""
+    buckets = [(1, 100), (100, 1000), (1000, None)]
+    for low, high in buckets:
+        selected = [r for r in results if r[0] >= low and (high is None or r[0] < high)]
+        if not selected:
+            continue
+        rank_errors = np.array([r[1] for r in selected])
+        median_errors = np.array([r[2] for r in selected])
+        label = f"{low}-{high - 1}" if high else f"{low}+"
+        logger.info(
+            f"  {label:>9} scores ({len(selected)} groups): "
+            f"rank error p50={np.median(rank_errors):.4f} max={rank_errors.max():.4f}, "
+            f"median error p50={np.median(median_errors):.2%} max={median_errors.max():.2%}"
+        )
+
+
+def run_synthetic(seasons: int, groups: int, seed: int) -> list[tuple[int, float, float]]:
+    """Digest generated per-season scores, merge them and compare with exact quantiles."""
+    rng = np.random.default_rng(seed)
+    results = []
+    merge_seconds = 0.0
+    for _ in range(groups):
+        size = int(rng.integers(5, 20000))
+        scores = np.round(rng.lognormal(rng.uniform(14, 20), rng.uniform(0.5, 1.5), size))
+        season_digests = [
+            ScoreDigest.from_scores(part) for part in np.array_split(scores, seasons) if len(part)
+        ]
+
+        start = time.perf_counter()
+        digest = ScoreDigest.merge(season_digests)
+        digest.quantiles([0.25, 0.5, 0.75])
+        merge_seconds += time.perf_counter() - start
+
+        results.append((size, *compare(digest, scores)))
+
+    logger.info(f"Merge + quartiles: {merge_seconds / groups * 1e6:.0f} µs per group")
+    return results
+
+
+def run_database(seasons: list[int], min_scores: int) -> list[tuple[int, float, float]]:
+    """Compare stored machine digests with the machines' raw scores."""
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            text("SELECT machine_key, score FROM scores WHERE season = ANY(:seasons)"),
+            {"seasons": seasons},
+        ).fetchall()
+
+    raw = defaultdict(list)
+    for machine_key, score in rows:
+        raw[machine_key].append(score)
+
+    start = time.perf_counter()
+    digests = get_machine_digests(seasons)
+    for digest in digests.values():
+        digest.quantiles([0.25, 0.5, 0.75])
+    sketch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with db.engine.connect() as conn:
+        conn.execute(
+            text("""
+            SELECT machine_key,
+                   percentile_cont(ARRAY[0.25, 0.5, 0.75]) WITHIN GROUP (ORDER BY score)
+            FROM scores
+            WHERE season = ANY(:seasons)
+            GROUP BY machine_key
+        """),
+            {"seasons": seasons},
+        ).fetchall()
+    exact_seconds = time.perf_counter() - start
+
+    logger.info(
+        f"All machines, quartiles: sketches {sketch_seconds * 1000:.1f} ms "
+        f"(fetch + merge), PERCENTILE_CONT {exact_seconds * 1000:.1f} ms"
+    )
+
+    results = []
+    for machine_key, scores in raw.items():
+        if len(scores) < min_scores:
+            continue
+        digest = digests.get(machine_key)
+        if digest is None:
+            logger.warning(f"  No sketch for {machine_key}; run calculate_score_sketches.py")
+            continue
+        if digest.count != len(scores):
+            logger.warning(f"  {machine_key}: sketch has {digest.count} scores, raw {len(scores)}")
+        results.append((len(scores), *compare(digest, np.array(scores, dtype=np.float64))))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark score sketches vs exact quantiles")
+    parser.add_argument("--seasons", type=int, nargs="+", help="Seasons to merge (e.g., 21 22)")
+    parser.add_argument("--min-scores", type=int, default=1, help="Skip smaller machines")
+    parser.add_argument("--synthetic", action="store_true", help="Use generated scores, no DB")
+    parser.add_argument("--groups", type=int, default=500, help="Synthetic groups to generate")
+    parser.add_argument("--seed", type=int, default=22, help="Synthetic random seed")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        logger.info(f"Synthetic: {args.groups} groups split into 10 seasons")
+        results = run_synthetic(10, args.groups, args.seed)
+    else:
+        if not args.seasons:
+            parser.error("--seasons is required unless --synthetic")
+        try:
+            db.connect()
+            logger.info(f"Machines in seasons {args.seasons}, all venues")
+            results = run_database(args.seasons, args.min_scores)
+        except Exception as e:
+            logger.error(f"Error: {e}", exc_info=True)
+            return 1
+        finally:
+            db.close()
+
+    if not results:
+        logger.error("Nothing to compare")
+        return 1
+    report(results)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
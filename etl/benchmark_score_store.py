@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark the API's in-process score store against its SQL paths.
+
+Loads the store (api/services/score_store.py) the way the API does at startup,
+then times the endpoint helpers that use it with the store and with SQL, and
+checks both give the same results:
+- players.calculate_stats_from_scores for the most active players
+- scores.get_machine_stats_from_scores (team-filtered /scores/browse) per team
+- a league-wide median per machine and season
+
+Usage:
+    python etl/benchmark_score_store.py --seasons 22 23
+    python etl/benchmark_score_store.py --seasons 23 --players 50 --repeat 5
+"""
+
+import argparse
+import logging
+import sys
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from api.routers import players, scores
+from api.services import score_store
+from api.services.score_store import ScoreStore
+from etl.database import db
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    """(best seconds over `repeat` calls, last result)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def compare(name: str, cases: list, sql_fn, store_fn, repeat: int) -> bool:
+    """Time both paths over every case; log totals and any mismatch."""
+    sql_seconds = store_seconds = 0.0
+    mismatches = 0
+    for case in cases:
+        seconds, expected = timed(lambda: sql_fn(case), repeat)
+        sql_seconds += seconds
+        seconds, actual = timed(lambda: store_fn(case), repeat)
+        store_seconds += seconds
+        if sorted(expected, key=str) != sorted(actual, key=str):
+            mismatches += 1
+            logger.warning(f"  {name}: results differ for {case}")
+
+    logger.info(
+        f"{name} ({len(cases)} calls): SQL {sql_seconds * 1000:.1f} ms, "
+        f"store {store_seconds * 1000:.1f} ms ({sql_seconds / max(store_seconds, 1e-9):.0f}x)"
+    )
+    return mismatches == 0
+
+
+def run(seasons: list[int], player_count: int, repeat: int) -> bool:
+    start = time.perf_counter()
+    store = ScoreStore.load()
+    logger.info(
+        f"Loaded {len(store)} scores ({store.nbytes / 1024 / 1024:.1f} MB) "
+        f"in {(time.perf_counter() - start) * 1000:.0f} ms, data version {store.version}"
+    )
+
+    with db.engine.connect() as conn:
+        player_keys = conn.execute(
+            text("""
+            SELECT player_key FROM scores WHERE season = ANY(:seasons)
+            GROUP BY player_key ORDER BY COUNT(*) DESC LIMIT :limit
+        """),
+            {"seasons": seasons, "limit": player_count},
+        ).scalars()
+        player_keys = list(player_keys)
+        team_keys = list(
+            conn.execute(
+                text("SELECT DISTINCT team_key FROM scores WHERE season = ANY(:seasons)"),
+                {"seasons": seasons},
+            ).scalars()
+        )
+
+    # The helpers take the store path whenever it's enabled; force SQL here
+    score_store.SCORE_STORE_ENABLED = False
+
+    ok = compare(
+        "Player machine stats",
+        player_keys,
+        lambda player_key: players.calculate_stats_from_scores(player_key, seasons),
+        lambda player_key: players.calculate_stats_from_store(store, player_key, seasons, None, 1),
+        repeat,
+    )
+
+    ok &= compare(
+        "Team-filtered browse stats",
+        team_keys,
+        lambda team_key: scores.get_machine_stats_from_scores(
+            "s.season = ANY(:seasons) AND s.team_key = ANY(:teams)",
+            {"seasons": seasons, "teams": [team_key]},
+        ),
+        lambda team_key: scores.get_machine_stats_from_store(
+            store, seasons, [team_key], None, None
+        ),
+        repeat,
+    )
+
+    def league_sql(season):
+        with db.engine.connect() as conn:
+            rows = conn.execute(
+                text("""
+                SELECT machine_key,
+                       PERCENTILE_CONT(0.5) WITHIN GROUP (ORDER BY score) AS median
+                FROM scores WHERE season = :season GROUP BY machine_key
+            """),
+                {"season": season},
+            ).fetchall()
+        return [(row.machine_key, float(row.median)) for row in rows]
+
+    def league_store(season):
+        groups = store.group_stats(store.select(seasons=[season]), by="machine")
+        return [(group["key"], group["median"]) for group in groups]
+
+    ok &= compare("League medians per machine", seasons, league_sql, league_store, repeat)
+
+    mask = store.select(seasons=seasons)
+    seconds, _ = timed(lambda: store.select(seasons=seasons, teams=team_keys[:1]), repeat)
+    logger.info(
+        f"One filter mask over {len(store)} scores: {seconds * 1e6:.0f} µs "
+        f"({int(np.count_nonzero(mask))} scores in seasons {seasons})"
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the in-process score store vs SQL")
+    parser.add_argument("--seasons", type=int, nargs="+", required=True, help="e.g. 22 23")
+    parser.add_argument("--players", type=int, default=20, help="Most active players to test")
+    parser.add_argument("--repeat", type=int, default=3, help="Calls per case (best is kept)")
+    args = parser.parse_args()
+
+    try:
+        db.connect()
+        ok = run(args.seasons, args.players, args.repeat)
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+    finally:
+        db.close()
+
+    if not ok:
+        logger.error("Store and SQL results differ")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
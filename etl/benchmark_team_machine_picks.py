@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Benchmark the vectorized team machine pick calculation against the row-by-row one.
+
+calculate_team_machine_picks.py aggregates picks from the season snapshot
+with NumPy and derives opportunities from a match-by-machine availability
+matrix. This times it against the row-by-row calculation it replaced (kept
+below as the reference: scores fetched with SQL and grouped in Python
+dicts, opportunities expanded with jsonb_array_elements_text) and checks:
+- every pick statistic and opportunity count is identical
+- vectorized Wilson bounds match the scalar formula
+- times_picked matches verify_team_machine_picks.py's fresh calculation
+  from the games table
+
+Usage:
+    python etl/benchmark_team_machine_picks.py --seasons 21 22
+    python etl/benchmark_team_machine_picks.py --seasons 22 --repeat 5
+"""
+
+import argparse
+import logging
+import math
+import sys
+import time
+from collections import defaultdict
+
+from sqlalchemy import text
+
+from etl import calculate_team_machine_picks as picks
+from etl.database import db
+from etl.loaders.season_snapshot import load_season_snapshot
+from etl.verify_team_machine_picks import get_fresh_calculation
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+
+def reference_pick_stats(season: int) -> dict:
+    """Pick statistics grouped row by row from the scores of complete matches."""
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            text("""
+            SELECT s.match_key, s.round_number, s.machine_key,
+                   m.home_team_key, m.away_team_key, s.team_key, s.score
+            FROM scores s
+            JOIN matches m ON s.match_key = m.match_key
+            WHERE s.season = :season AND m.state = 'complete'
+        """),
+            {"season": season},
+        ).fetchall()
+
+    # {(match, round, machine): {team_key: [scores]}} plus the match's teams
+    game_scores = defaultdict(lambda: defaultdict(list))
+    game_teams = {}
+    for match_key, round_num, machine_key, home_team, away_team, team_key, score in rows:
+        game_scores[(match_key, round_num, machine_key)][team_key].append(score)
+        game_teams[(match_key, round_num, machine_key)] = (home_team, away_team)
+
+    pick_stats = defaultdict(
+        lambda: {"times_picked": 0, "wins": 0, "total_points": 0, "total_score": 0, "game_count": 0}
+    )
+    for (match_key, round_num, machine_key), team_scores in game_scores.items():
+        home_team, away_team = game_teams[(match_key, round_num, machine_key)]
+        picker_is_home = round_num in (2, 4)
+        picker, opponent = (home_team, away_team) if picker_is_home else (away_team, home_team)
+        round_type = "doubles" if round_num in (1, 4) else "singles"
+
+        won = 1 if sum(team_scores[picker]) > sum(team_scores[opponent]) else 0
+        stats = pick_stats[(picker, machine_key, picker_is_home, round_type)]
+        stats["times_picked"] += 1
+        stats["wins"] += won
+        stats["total_points"] += won
+        stats["total_score"] += sum(team_scores[picker])
+        stats["game_count"] += len(team_scores[picker])
+
+    return dict(pick_stats)
+
+
+def reference_opportunities(season: int) -> dict:
+    """Opportunities expanded in SQL, per-match machines or venue_machines as a fallback."""
+    pickers = """
+        SELECT m.*, m.home_team_key AS team_key, true AS is_home, round_type
+        FROM matches m, (VALUES ('doubles'), ('singles')) AS r(round_type)
+        WHERE m.season = :season AND m.state = 'complete'
+        UNION ALL
+        SELECT m.*, m.away_team_key AS team_key, false AS is_home, round_type
+        FROM matches m, (VALUES ('doubles'), ('singles')) AS r(round_type)
+        WHERE m.season = :season AND m.state = 'complete'
+    """
+    with db.engine.connect() as conn:
+        has_machines = conn.execute(
+            text("""
+            SELECT COUNT(*) FROM matches
+            WHERE season = :season AND state = 'complete' AND machines IS NOT NULL
+        """),
+            {"season": season},
+        ).scalar()
+        if has_machines:
+            query = f"""
+                SELECT p.team_key, machine_key, p.is_home, p.round_type, COUNT(*)
+                FROM ({pickers}) p, jsonb_array_elements_text(p.machines) AS machine_key
+                WHERE p.machines IS NOT NULL
+                GROUP BY p.team_key, machine_key, p.is_home, p.round_type
+            """
+        else:
+            query = f"""
+                SELECT p.team_key, vm.machine_key, p.is_home, p.round_type, COUNT(*)
+                FROM ({pickers}) p
+                JOIN venue_machines vm
+                    ON p.venue_key = vm.venue_key AND p.season = vm.season
+                WHERE vm.active = true
+                GROUP BY p.team_key, vm.machine_key, p.is_home, p.round_type
+            """
+        rows = conn.execute(text(query), {"season": season}).fetchall()
+
+    return {(row[0], row[1], row[2], row[3]): row[4] for row in rows}
+
+
+def reference_wilson_lower(successes: int, total: int, z: float = 1.96) -> float:
+    """The scalar Wilson score lower bound."""
+    if total == 0:
+        return 0.0
+    total = max(total, successes)
+    p = successes / total
+    denominator = 1 + (z * z) / total
+    center = p + (z * z) / (2 * total)
+    spread = z * math.sqrt((p * (1 - p) / total) + (z * z) / (4 * total * total))
+    return (center - spread) / denominator
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    """(best seconds over `repeat` calls, last result)."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def report_differences(name: str, expected: dict, actual: dict) -> bool:
+    """Log keys missing on either side and differing values; True if identical."""
+    missing = expected.keys() - actual.keys()
+    extra = actual.keys() - expected.keys()
+    differing = [key for key in expected.keys() & actual.keys() if expected[key] != actual[key]]
+    for key in sorted(missing, key=str)[:5]:
+        logger.warning(f"  {name}: missing {key}")
+    for key in sorted(extra, key=str)[:5]:
+        logger.warning(f"  {name}: unexpected {key}")
+    for key in sorted(differing, key=str)[:5]:
+        logger.warning(f"  {name}: {key} expected {expected[key]}, got {actual[key]}")
+    if missing or extra or differing:
+        logger.warning(
+            f"  {name}: {len(missing)} missing, {len(extra)} unexpected, {len(differing)} differ"
+        )
+        return False
+    return True
+
+
+def run(season: int, repeat: int) -> bool:
+    logger.info(f"Season {season}:")
+
+    snapshot = load_season_snapshot(season)
+    reference_seconds, expected_stats = timed(lambda: reference_pick_stats(season), repeat)
+    vector_seconds, pick_stats = timed(
+        lambda: picks.aggregate_team_picks(load_season_snapshot(season)), repeat
+    )
+    logger.info(
+        f"  Pick stats ({len(snapshot)} scores): rows {reference_seconds * 1000:.0f} ms, "
+        f"vectorized {vector_seconds * 1000:.0f} ms "
+        f"({reference_seconds / max(vector_seconds, 1e-9):.1f}x)"
+    )
+    ok = report_differences("pick stats", expected_stats, pick_stats)
+
+    reference_seconds, expected_opps = timed(lambda: reference_opportunities(season), repeat)
+    vector_seconds, opportunities = timed(lambda: picks.calculate_opportunities(season), repeat)
+    logger.info(
+        f"  Opportunities ({len(opportunities)} records): SQL {reference_seconds * 1000:.0f} ms, "
+        f"matrix {vector_seconds * 1000:.0f} ms "
+        f"({reference_seconds / max(vector_seconds, 1e-9):.1f}x)"
+    )
+    ok &= report_differences("opportunities", expected_opps, opportunities)
+
+    keys = list(pick_stats)
+    successes = [pick_stats[key]["times_picked"] for key in keys]
+    totals = [opportunities.get(key, 0) for key in keys]
+    wilson = picks.calculate_wilson_lower(successes, totals)
+    ok &= report_differences(
+        "Wilson bounds",
+        {key: round(reference_wilson_lower(s, t), 4) for key, s, t in zip(keys, successes, totals)},
+        {key: round(float(w), 4) for key, w in zip(keys, wilson)},
+    )
+
+    ok &= report_differences(
+        "times_picked vs verify_team_machine_picks.py",
+        get_fresh_calculation(season),
+        {key: stats["times_picked"] for key, stats in pick_stats.items()},
+    )
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark vectorized team machine picks vs the row-by-row calculation"
+    )
+    parser.add_argument("--seasons", type=int, nargs="+", required=True, help="e.g. 21 22")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per timing (best is kept)")
+    args = parser.parse_args()
+
+    try:
+        db.connect()
+        ok = all([run(season, args.repeat) for season in args.seasons])
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+    finally:
+        db.close()
+
+    if not ok:
+        logger.error("Vectorized and reference results differ")
+        return 1
+    logger.info("✓ Vectorized results match")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
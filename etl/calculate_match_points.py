@@ -20,7 +20,6 @@ Usage:
 """
 
 import argparse
-import json
 import logging
 import math
 import sys
@@ -29,7 +28,9 @@ from sqlalchemy import text
 
 from etl.config import config
 from etl.database import db
+from etl.loaders.bulk_update import bulk_update
 from etl.parsers.match_parser import MatchParser
+from etl.parsers.season_pack import load_pack
 
 # Configure logging
 logging.basicConfig(
@@ -43,7 +44,7 @@ logger = logging.getLogger(__name__)
 
 def load_match_files(season: int):
     """
-    Load all match JSON files for a season.
+    Load all match JSON files for a season (through its season pack).
 
     Args:
         season: Season number
@@ -57,14 +58,7 @@ def load_match_files(season: int):
         logger.error(f"Matches path does not exist: {matches_path}")
         return []
 
-    matches = []
-    for match_file in matches_path.glob("*.json"):
-        try:
-            with open(match_file) as f:
-                match_data = json.load(f)
-                matches.append(match_data)
-        except Exception as e:
-            logger.warning(f"Failed to load {match_file}: {e}")
+    matches = load_pack(matches_path).matches
 
     logger.info(f"Loaded {len(matches)} match files from {matches_path}")
     return matches
@@ -192,31 +186,21 @@ def calculate_match_points(match_data: dict):
 
 def update_match_points(match_points: list):
     """
-    Update matches table with calculated point totals.
+    Update matches table with calculated point totals (one bulk UPDATE).
 
     Args:
         match_points: List of (match_key, home_points, away_points) tuples
     """
     logger.info(f"Updating {len(match_points)} matches with point totals...")
 
-    query = """
-        UPDATE matches
-        SET home_team_points = :home_points,
-            away_team_points = :away_points,
-            updated_at = CURRENT_TIMESTAMP
-        WHERE match_key = :match_key
-    """
-
-    updated = 0
-
     with db.engine.begin() as conn:
-        for match_key, home_points, away_points in match_points:
-            result = conn.execute(
-                text(query),
-                {"match_key": match_key, "home_points": home_points, "away_points": away_points},
-            )
-            if result.rowcount > 0:
-                updated += 1
+        updated = bulk_update(
+            conn,
+            "matches",
+            key=("match_key", "text"),
+            columns={"home_team_points": "numeric", "away_team_points": "numeric"},
+            rows=match_points,
+        )
 
     logger.info(f"✓ Updated point totals for {updated} matches")
     return updated
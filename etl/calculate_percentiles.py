@@ -3,14 +3,15 @@
 Calculate score percentiles for each machine and populate score_percentiles table.
 
 This script:
-1. Fetches all scores for each machine
-2. Calculates percentile thresholds (90th, 95th, 99th)
-3. Calculates mean and standard deviation
-4. Populates score_percentiles table
+1. Groups the season's scores by machine, at all venues and per venue, for all
+   rounds and per round type (singles/doubles), in one pass over scores
+2. Calculates a dense grid of percentile thresholds (1st, 5th, 10th, ..., 95th, 99th)
+   for every group with enough scores
+3. Swaps the season's rows into score_percentiles (built in a shadow table first)
+   with one bulk insert
 
 Usage:
     python etl/calculate_percentiles.py --season 23
-    python etl/calculate_percentiles.py --season 23 --venue-specific
     python etl/calculate_percentiles.py --season 23 --verbose
 
 Users will be most interested in viewing how current season scores stack up to historical aggregations, and less likely to care about percentile ranking for past seasons
@@ -19,12 +20,11 @@ Users will be most interested in viewing how current season scores stack up to h
 import argparse
 import logging
 import sys
-from collections import defaultdict
 
-import numpy as np
 from sqlalchemy import text
 
 from etl.database import db
+from etl.loaders.season_swap import season_shadow
 
 # Configure logging
 logging.basicConfig(
@@ -35,210 +35,121 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Percentiles to calculate
-PERCENTILES = [50, 90, 95, 99]
+# Percentiles to calculate: every 5th plus the 1st and 99th
+PERCENTILES = [1] + list(range(5, 100, 5)) + [99]
 
+# Need at least this many scores in a group for meaningful percentiles
+MIN_SCORES = 10
 
-def fetch_scores_by_machine(season: int, venue_key=None):
-    """
-    Fetch all scores grouped by machine (and optionally venue)
-
-    Args:
-        season: Season number
-        venue_key: Optional venue key to filter by
-
-    Returns:
-        dict: {machine_key: [(score, venue_key), ...]}
-    """
-    logger.info(f"Fetching scores for season {season}...")
-
-    query = """
-        SELECT machine_key, venue_key, score
-        FROM scores
-        WHERE season = :season
-    """
-
-    if venue_key:
-        query += " AND venue_key = :venue_key"
-        params = {"season": season, "venue_key": venue_key}
-    else:
-        params = {"season": season}
-
-    query += " ORDER BY machine_key, score"
-
-    # Use engine connection properly
-    with db.engine.connect() as conn:
-        result = conn.execute(text(query), params)
-        rows = result.fetchall()
-
-    # Group scores by machine (and venue if specified)
-    scores_by_machine = defaultdict(list)
-
-    for row in rows:
-        machine_key = row[0]
-        score = row[2]
-
-        if venue_key:
-            # Venue-specific grouping
-            key = (machine_key, venue_key)
-        else:
-            # Machine-only grouping
-            key = machine_key
-
-        scores_by_machine[key].append(score)
 
-    logger.info(f"Found scores for {len(scores_by_machine)} machine/venue combinations")
-
-    return dict(scores_by_machine)
-
-
-def calculate_percentiles_for_scores(scores):
+def store_percentiles(season: int) -> int:
     """
-    Calculate percentile thresholds for a list of scores
+    Replace the season's percentiles with the full machine x venue x round type cube.
 
-    Args:
-        scores: List of score values
+    Every group (machine; machine + venue; machine + round type; machine +
+    venue + round type) is computed from a single scan of the season's scores
+    with GROUPING SETS. Thresholds follow numpy's linear interpolation
+    (PERCENTILE_CONT), truncated to integers. The rows are built in a shadow
+    table and swapped in at once, so readers never see a partially calculated
+    season.
 
     Returns:
-        dict: {percentile: threshold_value, ...} plus 'mean' and 'stddev'
+        Number of percentile rows stored
     """
-    if not scores:
-        return None
-
-    scores_array = np.array(scores)
-
-    # Calculate percentiles
-    percentile_values = {}
-    for p in PERCENTILES:
-        threshold = np.percentile(scores_array, p)
-        percentile_values[p] = int(threshold)
-
-    # Also calculate mean and stddev for outlier detection
-    percentile_values["mean"] = int(np.mean(scores_array))
-    percentile_values["stddev"] = int(np.std(scores_array))
-    percentile_values["sample_size"] = len(scores)
-
-    return percentile_values
-
-
-def clear_existing_percentiles(season: int, venue_key=None):
-    """Clear existing percentiles for the season (and optionally venue)"""
-
-    if venue_key:
-        query = """
-            DELETE FROM score_percentiles
-            WHERE season = :season AND venue_key = :venue_key
-        """
-        params = {"season": season, "venue_key": venue_key}
-        logger.info(f"Clearing existing percentiles for season {season}, venue {venue_key}")
-    else:
-        query = """
-            DELETE FROM score_percentiles
-            WHERE season = :season AND venue_key = '_ALL_'
-        """
-        params = {"season": season}
-        logger.info(f"Clearing existing percentiles for season {season} (all venues)")
-
-    with db.engine.begin() as conn:
-        conn.execute(text(query), params)
-
-
-def insert_percentiles(machine_key, venue_key, season, percentile_data):
-    """Insert percentile data for a machine/venue/season combination"""
-
-    records = []
-
-    for percentile in PERCENTILES:
-        threshold = percentile_data[percentile]
-        sample_size = percentile_data["sample_size"]
-
-        records.append(
+    logger.info(f"Calculating percentile cube for season {season}...")
+
+    with season_shadow(
+        "score_percentiles",
+        season,
+        key_columns=["machine_key", "venue_key", "round_type", "season", "percentile"],
+    ) as (conn, shadow):
+        result = conn.execute(
+            text(f"""
+            INSERT INTO {shadow} (machine_key, venue_key, round_type, season, percentile,
+                                  score_threshold, sample_size)
+            WITH season_scores AS (
+                SELECT
+                    machine_key,
+                    venue_key,
+                    CASE WHEN round_number IN (1, 4) THEN 'doubles' ELSE 'singles' END
+                        AS round_type,
+                    score
+                FROM scores
+                WHERE season = :season AND score IS NOT NULL
+            ),
+            cells AS (
+                SELECT
+                    machine_key,
+                    CASE WHEN GROUPING(venue_key) = 1 THEN '_ALL_' ELSE venue_key END
+                        AS venue_key,
+                    CASE WHEN GROUPING(round_type) = 1 THEN '_ALL_' ELSE round_type END
+                        AS round_type,
+                    COUNT(*) AS sample_size,
+                    percentile_cont(CAST(:fractions AS DOUBLE PRECISION[]))
+                        WITHIN GROUP (ORDER BY score) AS thresholds
+                FROM season_scores
+                GROUP BY GROUPING SETS (
+                    (machine_key),
+                    (machine_key, venue_key),
+                    (machine_key, round_type),
+                    (machine_key, venue_key, round_type)
+                )
+                HAVING COUNT(*) >= :min_scores
+            )
+            SELECT
+                cells.machine_key,
+                cells.venue_key,
+                cells.round_type,
+                :season,
+                grid.percentile,
+                FLOOR(grid.threshold),
+                cells.sample_size
+            FROM cells
+            CROSS JOIN LATERAL unnest(cells.thresholds, CAST(:percentiles AS INTEGER[]))
+                AS grid(threshold, percentile)
+        """),
             {
-                "machine_key": machine_key,
-                "venue_key": venue_key,
                 "season": season,
-                "percentile": percentile,
-                "score_threshold": threshold,
-                "sample_size": sample_size,
-            }
+                "fractions": [p / 100 for p in PERCENTILES],
+                "percentiles": PERCENTILES,
+                "min_scores": MIN_SCORES,
+            },
         )
+        count = result.rowcount
 
-    # Insert all percentiles for this machine
-    query = """
-        INSERT INTO score_percentiles (machine_key, venue_key, season, percentile, score_threshold, sample_size)
-        VALUES (:machine_key, :venue_key, :season, :percentile, :score_threshold, :sample_size)
-        ON CONFLICT (machine_key, venue_key, season, percentile)
-        DO UPDATE SET
-            score_threshold = EXCLUDED.score_threshold,
-            sample_size = EXCLUDED.sample_size,
-            last_calculated = CURRENT_TIMESTAMP
-    """
-
-    with db.engine.begin() as conn:
-        for record in records:
-            conn.execute(text(query), record)
+    logger.info(f"✓ Stored {count} percentile records")
+    return count
 
 
-def calculate_and_store_percentiles(season: int, venue_specific: bool = False):
+def calculate_and_store_percentiles(season: int):
     """
     Main function to calculate and store percentiles
 
     Args:
         season: Season number
-        venue_specific: If True, calculate percentiles per venue; if False, global per machine
     """
 
     logger.info("=" * 60)
     logger.info(f"Calculating Score Percentiles for Season {season}")
-    logger.info(f"Mode: {'Venue-Specific' if venue_specific else 'Global (All Venues)'}")
     logger.info("=" * 60)
 
-    # Step 1: Clear existing percentiles
-    clear_existing_percentiles(season)
-
-    # Step 2: Fetch scores
-    scores_by_machine = fetch_scores_by_machine(season)
+    with db.engine.connect() as conn:
+        score_count = conn.execute(
+            text("SELECT COUNT(*) FROM scores WHERE season = :season"), {"season": season}
+        ).scalar()
 
-    if not scores_by_machine:
+    if not score_count:
         logger.error("No scores found!")
         return False
 
-    # Step 3: Calculate percentiles
-    logger.info(f"Calculating percentiles for {len(scores_by_machine)} machines...")
-
-    machines_processed = 0
-    machines_skipped = 0
-
-    for machine_key, scores in scores_by_machine.items():
-        # Need at least 10 scores for meaningful percentiles
-        if len(scores) < 10:
-            logger.warning(f"Skipping {machine_key}: only {len(scores)} scores (need ≥10)")
-            machines_skipped += 1
-            continue
-
-        percentile_data = calculate_percentiles_for_scores(scores)
-
-        if percentile_data:
-            # Store with venue_key = '_ALL_' for global percentiles
-            insert_percentiles(machine_key, "_ALL_", season, percentile_data)
-            machines_processed += 1
-
-            # Log some stats for interesting machines
-            if machines_processed <= 5 or len(scores) > 100:
-                logger.info(
-                    f"  {machine_key}: "
-                    f"n={len(scores)}, "
-                    f"median={percentile_data[50]:,}, "
-                    f"p90={percentile_data[90]:,}, "
-                    f"p99={percentile_data[99]:,}"
-                )
+    # One grouped pass and one bulk insert, swapped into the live table
+    count = store_percentiles(season)
 
     logger.info("")
     logger.info("=" * 60)
     logger.info("✓ Percentiles calculated successfully!")
-    logger.info(f"  Machines processed: {machines_processed}")
-    logger.info(f"  Machines skipped: {machines_skipped} (insufficient data)")
-    logger.info(f"  Percentile records created: {machines_processed * len(PERCENTILES)}")
+    logger.info(f"  Groups with percentiles: {count // len(PERCENTILES)}")
+    logger.info(f"  Percentile records created: {count}")
     logger.info("=" * 60)
 
     return True
@@ -258,7 +169,7 @@ def verify_percentiles(season: int):
             MAX(sample_size) as max_samples,
             AVG(sample_size) as avg_samples
         FROM score_percentiles
-        WHERE season = :season AND venue_key = '_ALL_'
+        WHERE season = :season AND venue_key = '_ALL_' AND round_type = '_ALL_'
     """
 
     with db.engine.connect() as conn:
@@ -267,12 +178,28 @@ def verify_percentiles(season: int):
 
     if row:
         logger.info(f"  Machines with percentiles: {row[0]}")
-        logger.info(f"  Total percentile records: {row[1]}")
+        logger.info(f"  Total percentile records (all venues, all rounds): {row[1]}")
         logger.info(f"  Sample sizes: min={row[2]}, max={row[3]}, avg={row[4]:.1f}")
 
+    query = """
+        SELECT
+            COUNT(DISTINCT (machine_key, venue_key)) FILTER (WHERE venue_key != '_ALL_')
+                AS venue_groups,
+            COUNT(DISTINCT (machine_key, round_type)) FILTER (WHERE round_type != '_ALL_')
+                AS round_type_groups
+        FROM score_percentiles
+        WHERE season = :season
+    """
+
+    with db.engine.connect() as conn:
+        row = conn.execute(text(query), {"season": season}).fetchone()
+
+    logger.info(f"  Machine x venue groups: {row.venue_groups}")
+    logger.info(f"  Machine x round type groups: {row.round_type_groups}")
+
     # Show a few examples
     logger.info("")
-    logger.info("Sample percentiles (top 5 machines by sample size):")
+    logger.info("Sample percentiles (top 3 machines by sample size):")
 
     query = """
         SELECT
@@ -281,9 +208,10 @@ def verify_percentiles(season: int):
             score_threshold,
             sample_size
         FROM score_percentiles
-        WHERE season = :season AND venue_key = '_ALL_'
+        WHERE season = :season AND venue_key = '_ALL_' AND round_type = '_ALL_'
+          AND percentile IN (1, 10, 25, 50, 75, 90, 99)
         ORDER BY sample_size DESC, machine_key, percentile
-        LIMIT 35
+        LIMIT 21
     """
 
     with db.engine.connect() as conn:
@@ -305,11 +233,6 @@ def main():
     """Main entry point"""
     parser = argparse.ArgumentParser(description="Calculate score percentiles")
     parser.add_argument("--season", type=int, required=True, help="Season number (e.g., 22)")
-    parser.add_argument(
-        "--venue-specific",
-        action="store_true",
-        help="Calculate percentiles per venue (future feature)",
-    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -317,16 +240,12 @@ def main():
     if args.verbose:
         logging.getLogger().setLevel(logging.DEBUG)
 
-    if args.venue_specific:
-        logger.error("Venue-specific percentiles not yet implemented")
-        return 1
-
     try:
         # Connect to database
         db.connect()
 
         # Calculate percentiles
-        success = calculate_and_store_percentiles(args.season, args.venue_specific)
+        success = calculate_and_store_percentiles(args.season)
 
         if not success:
             return 1
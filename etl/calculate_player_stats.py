@@ -23,6 +23,8 @@ import numpy as np
 from sqlalchemy import text
 
 from etl.database import db
+from etl.loaders.season_snapshot import SeasonSnapshot, load_season_snapshot
+from etl.loaders.season_swap import season_shadow
 
 # Configure logging
 logging.basicConfig(
@@ -34,38 +36,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def fetch_player_scores(season: int):
-    """
-    Fetch all scores with player and machine information
-
-    Args:
-        season: Season number
-
-    Returns:
-        list: [(player_key, machine_key, venue_key, score), ...]
-    """
-    logger.info(f"Fetching player scores for season {season}...")
-
-    query = """
-        SELECT
-            s.player_key,
-            s.machine_key,
-            s.venue_key,
-            s.score
-        FROM scores s
-        WHERE s.season = :season
-        ORDER BY s.player_key, s.machine_key, s.score
-    """
-
-    with db.engine.connect() as conn:
-        result = conn.execute(text(query), {"season": season})
-        rows = result.fetchall()
-
-    logger.info(f"Fetched {len(rows)} score records")
-
-    return rows
-
-
 def fetch_percentile_map(season: int):
     """
     Fetch percentile thresholds for all machines
@@ -81,7 +51,7 @@ def fetch_percentile_map(season: int):
     query = """
         SELECT machine_key, percentile, score_threshold
         FROM score_percentiles
-        WHERE season = :season AND venue_key = '_ALL_'
+        WHERE season = :season AND venue_key = '_ALL_' AND round_type = '_ALL_'
         ORDER BY machine_key, percentile
     """
 
@@ -149,90 +119,73 @@ def calculate_percentile_for_score(score, percentile_thresholds):
     return 100.0
 
 
-def aggregate_player_stats(scores, percentile_map):
+def aggregate_player_stats(snapshot: SeasonSnapshot, percentile_map):
     """
-    Aggregate player statistics from score records
+    Aggregate player statistics per (player, machine) from a season snapshot
+
+    Scores are sorted once by player, machine and score; each group's
+    statistics are then read off the sorted array with NumPy.
 
     Args:
-        scores: List of (player_key, machine_key, venue_key, score) tuples
+        snapshot: The season's memory-mapped scores
         percentile_map: dict of {machine_key: {percentile: threshold}}
 
     Returns:
-        dict: {(player_key, machine_key, venue_key): stats_dict}
+        dict: {(player_key, machine_key, None): stats_dict}
     """
     logger.info("Aggregating player statistics...")
 
-    # Group scores by (player, machine, venue)
-    grouped = defaultdict(list)
+    order = np.lexsort((snapshot["score"], snapshot["machine_key"], snapshot["player_key"]))
+    scores = np.asarray(snapshot["score"])[order]
+    players = np.asarray(snapshot["player_key"])[order]
+    machines = np.asarray(snapshot["machine_key"])[order]
 
-    for player_key, machine_key, venue_key, score in scores:
-        key = (player_key, machine_key, venue_key)
-        grouped[key].append(score)
+    new_group = (players[1:] != players[:-1]) | (machines[1:] != machines[:-1])
+    starts = np.flatnonzero(np.r_[True, new_group])
+    counts = np.diff(np.r_[starts, len(scores)])
+    totals = np.add.reduceat(scores, starts)
+    medians = (scores[starts + (counts - 1) // 2] + scores[starts + counts // 2]) / 2
 
-    # Calculate statistics
     stats = {}
-    players_processed = 0
-    total_combinations = len(grouped)
-
-    for (player_key, machine_key, venue_key), score_list in grouped.items():
-        scores_array = np.array(score_list)
-
-        # Basic statistics
+    for start, count, total, median, player_key, machine_key in zip(
+        starts,
+        counts,
+        totals,
+        medians,
+        snapshot.decode("player_key", players[starts]),
+        snapshot.decode("machine_key", machines[starts]),
+    ):
         stat_dict = {
             "player_key": player_key,
             "machine_key": machine_key,
-            "venue_key": venue_key,
-            "games_played": len(score_list),
-            "total_score": int(np.sum(scores_array)),
-            "median_score": int(np.median(scores_array)),
-            "avg_score": int(np.mean(scores_array)),
-            "best_score": int(np.max(scores_array)),
-            "worst_score": int(np.min(scores_array)),
+            "venue_key": None,
+            "games_played": int(count),
+            "total_score": int(total),
+            "median_score": int(median),
+            "avg_score": int(total / count),
+            "best_score": int(scores[start + count - 1]),
+            "worst_score": int(scores[start]),
         }
 
         # Calculate percentile based on median score
-        if machine_key in percentile_map:
-            percentile_thresholds = percentile_map[machine_key]
-            median_score = stat_dict["median_score"]
-
-            # Calculate percentile for the median score
-            percentile = calculate_percentile_for_score(median_score, percentile_thresholds)
-            stat_dict["percentile"] = round(percentile, 2) if percentile is not None else None
-        else:
-            stat_dict["percentile"] = None
-
-        stats[(player_key, machine_key, venue_key)] = stat_dict
-        players_processed += 1
-
-        # Log progress every 1000 records
-        if players_processed % 1000 == 0:
-            logger.info(
-                f"  Processed {players_processed}/{total_combinations} player/machine combinations..."
-            )
-
-    logger.info(f"Calculated stats for {len(stats)} player/machine/venue combinations")
-
-    return stats
-
-
-def clear_existing_stats(season: int):
-    """Clear existing player stats for the season"""
+        percentile = calculate_percentile_for_score(
+            stat_dict["median_score"], percentile_map.get(machine_key)
+        )
+        stat_dict["percentile"] = round(percentile, 2) if percentile is not None else None
 
-    query = """
-        DELETE FROM player_machine_stats
-        WHERE season = :season AND venue_key = '_ALL_'
-    """
-    params = {"season": season}
+        stats[(player_key, machine_key, None)] = stat_dict
 
-    logger.info(f"Clearing existing player stats for season {season}")
+    logger.info(f"Calculated stats for {len(stats)} player/machine combinations")
 
-    with db.engine.begin() as conn:
-        conn.execute(text(query), params)
+    return stats
 
 
 def insert_player_stats(stats_dict, season: int):
     """
-    Insert player statistics into database
+    Replace the season's global player statistics in the database.
+
+    The rows are built in a shadow table and swapped in at once, so readers
+    never see a partially calculated season.
 
     Args:
         stats_dict: dict of {(player_key, machine_key, venue_key): stat_values}
@@ -240,68 +193,48 @@ def insert_player_stats(stats_dict, season: int):
     """
     logger.info("Inserting player statistics...")
 
-    query = """
-        INSERT INTO player_machine_stats (
-            player_key, machine_key, venue_key, season,
-            games_played, total_score, median_score, avg_score,
-            best_score, worst_score, median_percentile, avg_percentile
-        )
-        VALUES (
-            :player_key, :machine_key, :venue_key, :season,
-            :games_played, :total_score, :median_score, :avg_score,
-            :best_score, :worst_score, :median_percentile, :avg_percentile
-        )
-        ON CONFLICT (player_key, machine_key, venue_key, season)
-        DO UPDATE SET
-            games_played = EXCLUDED.games_played,
-            total_score = EXCLUDED.total_score,
-            median_score = EXCLUDED.median_score,
-            avg_score = EXCLUDED.avg_score,
-            best_score = EXCLUDED.best_score,
-            worst_score = EXCLUDED.worst_score,
-            median_percentile = EXCLUDED.median_percentile,
-            avg_percentile = EXCLUDED.avg_percentile,
-            last_calculated = CURRENT_TIMESTAMP
-    """
+    records = [
+        {
+            "player_key": stat["player_key"],
+            "machine_key": stat["machine_key"],
+            "venue_key": "_ALL_",  # Global stats (special value for all venues)
+            "season": season,
+            "games_played": stat["games_played"],
+            "total_score": stat["total_score"],
+            "median_score": stat["median_score"],
+            "avg_score": stat["avg_score"],
+            "best_score": stat["best_score"],
+            "worst_score": stat["worst_score"],
+            "median_percentile": stat["percentile"],
+            "avg_percentile": stat["percentile"],  # Using median percentile for now
+        }
+        for stat in stats_dict.values()
+    ]
+
+    with season_shadow(
+        "player_machine_stats",
+        season,
+        key_columns=["player_key", "machine_key", "venue_key", "season"],
+        scope="venue_key = '_ALL_'",
+    ) as (conn, shadow):
+        if records:
+            conn.execute(
+                text(f"""
+                INSERT INTO {shadow} (
+                    player_key, machine_key, venue_key, season,
+                    games_played, total_score, median_score, avg_score,
+                    best_score, worst_score, median_percentile, avg_percentile
+                )
+                VALUES (
+                    :player_key, :machine_key, :venue_key, :season,
+                    :games_played, :total_score, :median_score, :avg_score,
+                    :best_score, :worst_score, :median_percentile, :avg_percentile
+                )
+            """),
+                records,
+            )
 
-    records_inserted = 0
-    batch_size = 100
-
-    with db.engine.begin() as conn:
-        batch = []
-
-        for stat in stats_dict.values():
-            record = {
-                "player_key": stat["player_key"],
-                "machine_key": stat["machine_key"],
-                "venue_key": "_ALL_",  # Global stats (special value for all venues)
-                "season": season,
-                "games_played": stat["games_played"],
-                "total_score": stat["total_score"],
-                "median_score": stat["median_score"],
-                "avg_score": stat["avg_score"],
-                "best_score": stat["best_score"],
-                "worst_score": stat["worst_score"],
-                "median_percentile": stat["percentile"],
-                "avg_percentile": stat["percentile"],  # Using median percentile for now
-            }
-
-            batch.append(record)
-
-            if len(batch) >= batch_size:
-                for rec in batch:
-                    conn.execute(text(query), rec)
-                records_inserted += len(batch)
-                logger.info(f"  Inserted {records_inserted} records...")
-                batch = []
-
-        # Insert remaining records
-        if batch:
-            for rec in batch:
-                conn.execute(text(query), rec)
-            records_inserted += len(batch)
-
-    logger.info(f"✓ Inserted {records_inserted} player statistics records")
+    logger.info(f"✓ Inserted {len(records)} player statistics records")
 
 
 def calculate_and_store_player_stats(season: int):
@@ -316,39 +249,20 @@ def calculate_and_store_player_stats(season: int):
     logger.info(f"Calculating Player Machine Statistics for Season {season}")
     logger.info("=" * 60)
 
-    # Step 1: Clear existing stats
-    clear_existing_stats(season)
-
-    # Step 2: Fetch percentile map
+    # Step 1: Fetch percentile map
     percentile_map = fetch_percentile_map(season)
 
-    # Step 3: Fetch all player scores
-    scores = fetch_player_scores(season)
+    # Step 2: Load the season's scores
+    snapshot = load_season_snapshot(season)
 
-    if not scores:
+    if not len(snapshot):
         logger.error("No scores found!")
         return False
 
-    # Step 4: Aggregate by (player, machine, venue)
-    # Note: For now we'll aggregate globally (venue_key=NULL in output)
-    # but we track venue in grouping to later support venue-specific stats
-
-    # Group globally: ignore venue in the key
-    global_scores = defaultdict(list)
-    for player_key, machine_key, venue_key, score in scores:
-        key = (player_key, machine_key)
-        global_scores[key].append(score)
-
-    # Convert back to expected format for aggregate_player_stats
-    # Add venue_key=None to make it global
-    score_tuples = []
-    for (player_key, machine_key), score_list in global_scores.items():
-        for score in score_list:
-            score_tuples.append((player_key, machine_key, None, score))
-
-    stats = aggregate_player_stats(score_tuples, percentile_map)
+    # Step 3: Aggregate by (player, machine) - global stats, all venues
+    stats = aggregate_player_stats(snapshot, percentile_map)
 
-    # Step 5: Insert into database
+    # Step 4: Swap into database
     insert_player_stats(stats, season)
 
     logger.info("")
@@ -28,59 +28,32 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def calculate_player_game_counts():
+def update_player_totals():
     """
-    Calculate total games played for each player.
+    Count distinct games per player and store them in players.total_games_played.
 
-    Returns:
-        list: [(player_key, total_games), ...]
-    """
-    logger.info("Calculating player game counts...")
-
-    # Count distinct games (by game_id) for each player
-    query = """
-        SELECT
-            player_key,
-            COUNT(DISTINCT game_id) as total_games
-        FROM scores
-        GROUP BY player_key
-        ORDER BY total_games DESC
-    """
-
-    with db.engine.connect() as conn:
-        result = conn.execute(text(query))
-        rows = result.fetchall()
+    The counts are computed and written by a single UPDATE ... FROM, so no
+    per-player rows travel between the database and this script.
 
-    logger.info(f"Calculated game counts for {len(rows)} players")
-    return rows
-
-
-def update_player_totals(game_counts):
-    """
-    Update players.total_games_played for all players.
-
-    Args:
-        game_counts: List of (player_key, total_games) tuples
+    Returns:
+        Number of players updated
     """
     logger.info("Updating player total_games_played...")
 
     query = """
-        UPDATE players
-        SET total_games_played = :total_games,
+        UPDATE players p
+        SET total_games_played = c.total_games,
             updated_at = CURRENT_TIMESTAMP
-        WHERE player_key = :player_key
+        FROM (
+            SELECT player_key, COUNT(DISTINCT game_id) AS total_games
+            FROM scores
+            GROUP BY player_key
+        ) c
+        WHERE p.player_key = c.player_key
     """
 
-    updated = 0
-    batch_size = 100
-
     with db.engine.begin() as conn:
-        for i, (player_key, total_games) in enumerate(game_counts):
-            conn.execute(text(query), {"player_key": player_key, "total_games": total_games})
-            updated += 1
-
-            if (i + 1) % batch_size == 0:
-                logger.info(f"  Updated {i + 1}/{len(game_counts)} players...")
+        updated = conn.execute(text(query)).rowcount
 
     logger.info(f"✓ Updated total_games_played for {updated} players")
     return updated
@@ -94,16 +67,10 @@ def calculate_and_store_player_totals():
     logger.info("Calculating Player Total Games Played")
     logger.info("=" * 60)
 
-    # Step 1: Calculate game counts
-    game_counts = calculate_player_game_counts()
-
-    if not game_counts:
+    if not update_player_totals():
         logger.warning("No player scores found!")
         return False
 
-    # Step 2: Update player records
-    update_player_totals(game_counts)
-
     logger.info("")
     logger.info("=" * 60)
     logger.info("✓ Player totals calculated successfully!")
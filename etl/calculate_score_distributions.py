@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Build pre-binned score distributions and populate machine_score_distributions.
+
+For every machine at each venue, and at all venues ('_ALL_'), this stores the
+season's log-scaled score histogram and a downsampled scatter series
+(api/services/score_distribution.py), which /machines/{machine_key}/distribution
+serves without reading individual scores.
+
+Usage:
+    python etl/calculate_score_distributions.py --season 22
+    python etl/calculate_score_distributions.py --season 22 --verbose
+"""
+
+import argparse
+import logging
+import sys
+
+import numpy as np
+from sqlalchemy import text
+
+from api.services.score_distribution import build_distribution
+from etl.database import db
+from etl.loaders.season_snapshot import SeasonSnapshot, load_season_snapshot
+from etl.loaders.season_swap import season_shadow
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    "machine_key",
+    "venue_key",
+    "season",
+    "score_count",
+    "min_score",
+    "max_score",
+    "first_bucket",
+    "bucket_counts",
+    "scatter_scores",
+    "scatter_player_keys",
+]
+
+
+def build_distributions(snapshot: SeasonSnapshot, season: int) -> list[dict]:
+    """One machine_score_distributions row per (machine, venue) and (machine, '_ALL_')."""
+    scores = np.asarray(snapshot["score"])
+    player_keys = snapshot.decode("player_key")
+    groups = {
+        **snapshot.grouped_rows("machine_key", "venue_key"),
+        **{
+            (machine_key, "_ALL_"): rows
+            for (machine_key,), rows in snapshot.grouped_rows("machine_key").items()
+        },
+    }
+
+    return [
+        {
+            "machine_key": machine_key,
+            "venue_key": venue_key,
+            "season": season,
+            **build_distribution(scores[rows], player_keys[rows].tolist()),
+        }
+        for (machine_key, venue_key), rows in groups.items()
+    ]
+
+
+def calculate_and_store_score_distributions(season: int):
+    """
+    Main function to build and store the season's score distributions.
+
+    Args:
+        season: Season number
+    """
+    logger.info("=" * 60)
+    logger.info(f"Building Score Distributions for Season {season}")
+    logger.info("=" * 60)
+
+    snapshot = load_season_snapshot(season)
+    if not len(snapshot):
+        logger.error("No scores found!")
+        return False
+
+    records = build_distributions(snapshot, season)
+
+    with season_shadow(
+        "machine_score_distributions",
+        season,
+        key_columns=["machine_key", "venue_key", "season"],
+    ) as (conn, shadow):
+        conn.execute(
+            text(f"""
+            INSERT INTO {shadow} ({", ".join(COLUMNS)})
+            VALUES ({", ".join(f":{column}" for column in COLUMNS)})
+        """),
+            records,
+        )
+
+    logger.info("")
+    logger.info("=" * 60)
+    logger.info(f"✓ Stored {len(records)} score distributions")
+    logger.info("=" * 60)
+
+    return True
+
+
+def verify_score_distributions(season: int):
+    """Check the histograms add up to the season's scores."""
+
+    logger.info("")
+    logger.info("Verifying score distributions...")
+
+    query = """
+        SELECT
+            COUNT(*) AS total_records,
+            SUM(score_count) FILTER (WHERE venue_key = '_ALL_') AS stored_scores,
+            (SELECT COUNT(*) FROM scores
+             WHERE season = :season AND score IS NOT NULL) AS season_scores,
+            MAX(cardinality(bucket_counts)) AS max_buckets,
+            BOOL_AND((SELECT SUM(c) FROM unnest(bucket_counts) AS c) = score_count)
+                AS histograms_complete
+        FROM machine_score_distributions
+        WHERE season = :season
+    """
+
+    with db.engine.connect() as conn:
+        row = conn.execute(text(query), {"season": season}).fetchone()
+
+    logger.info(f"  Total records: {row.total_records}")
+    logger.info(f"  Scores covered: {row.stored_scores}/{row.season_scores}")
+    logger.info(f"  Widest histogram: {row.max_buckets} buckets")
+    if row.stored_scores != row.season_scores or not row.histograms_complete:
+        logger.warning("  Histogram counts don't add up to the season's scores")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build pre-binned score distributions")
+    parser.add_argument("--season", type=int, required=True, help="Season number (e.g., 22)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        db.connect()
+
+        success = calculate_and_store_score_distributions(args.season)
+        if not success:
+            return 1
+
+        verify_score_distributions(args.season)
+
+        logger.info("")
+        logger.info("Done!")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
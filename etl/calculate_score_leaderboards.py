@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Build top-score leaderboards and populate machine_score_leaderboards.
+
+For every machine at each venue, and at all venues ('_ALL_'), this stores the
+season's top LEADERBOARD_SIZE scores (api/services/leaderboards.py) with the
+player, team and venue names resolved, which /scores/browse merges instead of
+ranking every matching score.
+
+Usage:
+    python etl/calculate_score_leaderboards.py --season 22
+    python etl/calculate_score_leaderboards.py --season 22 --verbose
+"""
+
+import argparse
+import logging
+import sys
+
+from sqlalchemy import text
+
+from api.services.leaderboards import LEADERBOARD_SIZE
+from etl.database import db
+from etl.loaders.season_swap import season_shadow
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+
+logger = logging.getLogger(__name__)
+
+
+def insert_score_leaderboards(season: int) -> int:
+    """
+    Replace the season's leaderboards, ranking its scores once per board.
+
+    Scores are joined to players, teams and venues the same way the browse
+    endpoints' raw query does, so a board never holds a score that query
+    would drop. Ties are broken by score_id to keep ranks stable.
+
+    Returns:
+        Number of leaderboard rows stored
+    """
+    logger.info(f"Ranking scores for season {season}...")
+
+    with season_shadow(
+        "machine_score_leaderboards",
+        season,
+        key_columns=["machine_key", "venue_key", "season", "rank"],
+    ) as (conn, shadow):
+        result = conn.execute(
+            text(f"""
+            INSERT INTO {shadow} (machine_key, venue_key, season, rank, score,
+                                  player_key, player_name, team_key, team_name,
+                                  score_venue_key, venue_name, round_number, date)
+            WITH season_scores AS (
+                SELECT
+                    s.score_id,
+                    s.machine_key,
+                    s.venue_key,
+                    s.score,
+                    s.player_key,
+                    p.name AS player_name,
+                    s.team_key,
+                    t.team_name,
+                    v.venue_name,
+                    s.round_number,
+                    s.date
+                FROM scores s
+                JOIN players p ON s.player_key = p.player_key
+                JOIN teams t ON s.team_key = t.team_key AND t.season = s.season
+                JOIN venues v ON s.venue_key = v.venue_key
+                WHERE s.season = :season
+            ),
+            ranked AS (
+                SELECT
+                    season_scores.*,
+                    venue_key AS board_venue_key,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY machine_key, venue_key ORDER BY score DESC, score_id
+                    ) AS rank
+                FROM season_scores
+                UNION ALL
+                SELECT
+                    season_scores.*,
+                    '_ALL_' AS board_venue_key,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY machine_key ORDER BY score DESC, score_id
+                    ) AS rank
+                FROM season_scores
+            )
+            SELECT machine_key, board_venue_key, :season, rank, score,
+                   player_key, player_name, team_key, team_name,
+                   venue_key, venue_name, round_number, date
+            FROM ranked
+            WHERE rank <= :size
+        """),
+            {"season": season, "size": LEADERBOARD_SIZE},
+        )
+        count = result.rowcount
+
+    logger.info(f"✓ Stored {count} leaderboard rows")
+    return count
+
+
+def calculate_and_store_score_leaderboards(season: int):
+    """
+    Main function to build and store the season's score leaderboards.
+
+    Args:
+        season: Season number
+    """
+    logger.info("=" * 60)
+    logger.info(f"Building Score Leaderboards for Season {season}")
+    logger.info("=" * 60)
+
+    count = insert_score_leaderboards(season)
+    if not count:
+        logger.error("No scores found!")
+        return False
+
+    logger.info("")
+    logger.info("=" * 60)
+    logger.info("✓ Score leaderboards built successfully!")
+    logger.info("=" * 60)
+
+    return True
+
+
+def verify_score_leaderboards(season: int):
+    """Check every machine played this season has a complete all-venue board."""
+
+    logger.info("")
+    logger.info("Verifying score leaderboards...")
+
+    query = """
+        SELECT
+            (SELECT COUNT(*) FROM machine_score_leaderboards
+             WHERE season = :season) AS total_records,
+            (SELECT COUNT(*) FROM machine_score_leaderboards
+             WHERE season = :season AND venue_key = '_ALL_' AND rank = 1) AS machine_boards,
+            (SELECT COUNT(DISTINCT machine_key) FROM scores
+             WHERE season = :season) AS season_machines,
+            (SELECT MAX(rank) FROM machine_score_leaderboards
+             WHERE season = :season) AS max_rank
+    """
+
+    with db.engine.connect() as conn:
+        row = conn.execute(text(query), {"season": season}).fetchone()
+
+    logger.info(f"  Total records: {row.total_records}")
+    logger.info(f"  All-venue boards: {row.machine_boards}/{row.season_machines} machines")
+    logger.info(f"  Deepest board: {row.max_rank} scores (limit {LEADERBOARD_SIZE})")
+    if row.machine_boards != row.season_machines:
+        logger.warning("  Some machines have no leaderboard (missing player/team/venue rows?)")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build top-score leaderboards")
+    parser.add_argument("--season", type=int, required=True, help="Season number (e.g., 22)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        db.connect()
+
+        success = calculate_and_store_score_leaderboards(args.season)
+        if not success:
+            return 1
+
+        verify_score_leaderboards(args.season)
+
+        logger.info("")
+        logger.info("Done!")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Build score quantile sketches and populate machine_score_sketches and
+player_score_sketches.
+
+For every season this stores a t-digest (api/services/quantile_sketch.py) of:
+- the scores on each machine at each venue, and at all venues ('_ALL_')
+- each player's scores on each machine
+
+The API merges these per-season digests for whatever seasons and venue a
+request asks for, instead of sorting raw scores with PERCENTILE_CONT.
+
+Usage:
+    python etl/calculate_score_sketches.py --season 22
+    python etl/calculate_score_sketches.py --season 22 --verbose
+"""
+
+import argparse
+import logging
+import sys
+
+import numpy as np
+from sqlalchemy import text
+
+from api.services.quantile_sketch import ScoreDigest
+from etl.database import db
+from etl.loaders.season_snapshot import SeasonSnapshot, load_season_snapshot
+from etl.loaders.season_swap import season_shadow
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+
+logger = logging.getLogger(__name__)
+
+SKETCH_COLUMNS = [
+    "score_count",
+    "total_score",
+    "min_score",
+    "max_score",
+    "centroid_means",
+    "centroid_weights",
+]
+
+
+def build_sketches(snapshot: SeasonSnapshot) -> tuple[dict, dict]:
+    """
+    Digest the scores per (machine, venue) and per (player, machine).
+
+    Returns:
+        (machine_sketches, player_sketches): dicts mapping
+        (machine_key, venue_key) and (player_key, machine_key) to ScoreDigest
+    """
+    scores = np.asarray(snapshot["score"])
+    groups = {
+        **snapshot.grouped_rows("machine_key", "venue_key"),
+        **{
+            (machine_key, "_ALL_"): rows
+            for (machine_key,), rows in snapshot.grouped_rows("machine_key").items()
+        },
+    }
+    machine_sketches = {key: ScoreDigest.from_scores(scores[rows]) for key, rows in groups.items()}
+    player_sketches = {
+        key: ScoreDigest.from_scores(scores[rows])
+        for key, rows in snapshot.grouped_rows("player_key", "machine_key").items()
+    }
+    return machine_sketches, player_sketches
+
+
+def insert_sketches(table: str, key_columns: list[str], sketches: dict, season: int) -> int:
+    """Swap the season's rows of a sketch table for the given digests."""
+    records = [
+        {**dict(zip(key_columns, key)), "season": season, **digest.to_row()}
+        for key, digest in sketches.items()
+    ]
+    columns = key_columns + ["season"] + SKETCH_COLUMNS
+
+    with season_shadow(table, season, key_columns=key_columns + ["season"]) as (conn, shadow):
+        if records:
+            conn.execute(
+                text(f"""
+                INSERT INTO {shadow} ({", ".join(columns)})
+                VALUES ({", ".join(f":{column}" for column in columns)})
+            """),
+                records,
+            )
+
+    logger.info(f"✓ Stored {len(records)} {table} rows")
+    return len(records)
+
+
+def calculate_and_store_score_sketches(season: int):
+    """
+    Main function to build and store the season's score sketches.
+
+    Args:
+        season: Season number
+    """
+    logger.info("=" * 60)
+    logger.info(f"Building Score Sketches for Season {season}")
+    logger.info("=" * 60)
+
+    snapshot = load_season_snapshot(season)
+    if not len(snapshot):
+        logger.error("No scores found!")
+        return False
+
+    machine_sketches, player_sketches = build_sketches(snapshot)
+
+    insert_sketches(
+        "machine_score_sketches", ["machine_key", "venue_key"], machine_sketches, season
+    )
+    insert_sketches("player_score_sketches", ["player_key", "machine_key"], player_sketches, season)
+
+    logger.info("")
+    logger.info("=" * 60)
+    logger.info("✓ Score sketches built successfully!")
+    logger.info("=" * 60)
+
+    return True
+
+
+def verify_score_sketches(season: int):
+    """Check the sketch counts add up to the season's scores."""
+
+    logger.info("")
+    logger.info("Verifying score sketches...")
+
+    query = """
+        SELECT
+            (SELECT SUM(score_count) FROM machine_score_sketches
+             WHERE season = :season AND venue_key = '_ALL_') AS machine_scores,
+            (SELECT SUM(score_count) FROM player_score_sketches
+             WHERE season = :season) AS player_scores,
+            (SELECT COUNT(*) FROM scores
+             WHERE season = :season AND score IS NOT NULL) AS season_scores,
+            (SELECT MAX(cardinality(centroid_means)) FROM machine_score_sketches
+             WHERE season = :season) AS max_centroids
+    """
+
+    with db.engine.connect() as conn:
+        row = conn.execute(text(query), {"season": season}).fetchone()
+
+    logger.info(f"  Machine sketches cover: {row.machine_scores}/{row.season_scores} scores")
+    logger.info(f"  Player sketches cover: {row.player_scores}/{row.season_scores} scores")
+    logger.info(f"  Largest sketch: {row.max_centroids} centroids")
+    if not row.machine_scores == row.player_scores == row.season_scores:
+        logger.warning("  Sketch counts don't add up to the season's scores")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build score quantile sketches")
+    parser.add_argument("--season", type=int, required=True, help="Season number (e.g., 22)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        db.connect()
+
+        success = calculate_and_store_score_sketches(args.season)
+        if not success:
+            return 1
+
+        verify_score_sketches(args.season)
+
+        logger.info("")
+        logger.info("Done!")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
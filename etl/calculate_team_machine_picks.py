@@ -12,6 +12,11 @@ It tracks:
 - total_points: Points earned on this machine
 - avg_score: Average score on this machine
 
+Picks, opportunities and Wilson bounds are computed with NumPy over the
+season's score snapshot (etl/loaders/season_snapshot.py) and a
+match-by-machine availability matrix; etl/benchmark_team_machine_picks.py
+checks them against the row-by-row calculation.
+
 Usage:
     python etl/calculate_team_machine_picks.py --season 22
     python etl/calculate_team_machine_picks.py --season 22 --verbose
@@ -19,13 +24,15 @@ Usage:
 
 import argparse
 import logging
-import math
 import sys
 from collections import defaultdict
 
+import numpy as np
 from sqlalchemy import text
 
 from etl.database import db
+from etl.loaders.season_snapshot import SeasonSnapshot, load_season_snapshot
+from etl.loaders.season_swap import season_shadow
 
 # Configure logging
 logging.basicConfig(
@@ -37,48 +44,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def fetch_games_with_scores(season: int):
-    """
-    Fetch all games with their scores for a season.
-
-    Uses the scores table directly since it has denormalized machine_key.
-    This avoids issues with the game_id linkage which may not be correct
-    for all records.
-
-    Returns:
-        list: Game records with team performance data
-    """
-    logger.info(f"Fetching games and scores for season {season}...")
-
-    # Use scores table directly - it has machine_key denormalized
-    # This correctly handles multiple machines per round
-    # Filter by complete matches to be consistent with opportunities calculation
-    query = """
-        SELECT
-            s.match_key,
-            s.round_number,
-            s.machine_key,
-            m.home_team_key,
-            m.away_team_key,
-            s.team_key,
-            s.is_home_team,
-            s.score
-        FROM scores s
-        JOIN matches m ON s.match_key = m.match_key
-        WHERE s.season = :season
-        AND m.state = 'complete'
-        ORDER BY s.match_key, s.round_number, s.machine_key, s.team_key
-    """
-
-    with db.engine.connect() as conn:
-        result = conn.execute(text(query), {"season": season})
-        rows = result.fetchall()
-
-    logger.info(f"Fetched {len(rows)} score records")
-    return rows
-
-
-def determine_picking_team(round_number: int, home_team_key: str, away_team_key: str):
+def determine_picking_team(round_number, home_team_key, away_team_key):
     """
     Determine which team picked the machine for a given round.
 
@@ -86,29 +52,26 @@ def determine_picking_team(round_number: int, home_team_key: str, away_team_key:
     - Home team picks rounds 2 & 4
     - Away team picks rounds 1 & 3
 
+    Works on single values or on NumPy arrays of games.
+
     Returns:
         tuple: (picking_team_key, is_home)
     """
-    if round_number in [2, 4]:
-        return home_team_key, True
-    else:  # rounds 1 & 3
-        return away_team_key, False
+    is_home = np.isin(round_number, (2, 4))
+    return np.where(is_home, home_team_key, away_team_key), is_home
 
 
-def get_round_type(round_number: int):
+def get_round_type(round_number):
     """
-    Get the round type (singles or doubles).
+    Get the round type (singles or doubles), of one round or an array of them.
 
     Rounds 1 & 4 are doubles (4 players)
     Rounds 2 & 3 are singles (2 players)
     """
-    if round_number in [1, 4]:
-        return "doubles"
-    else:
-        return "singles"
+    return np.where(np.isin(round_number, (1, 4)), "doubles", "singles")
 
 
-def calculate_wilson_lower(successes: int, total: int, z: float = 1.96) -> float:
+def calculate_wilson_lower(successes, total, z: float = 1.96):
     """
     Calculate Wilson score lower bound for 95% confidence interval.
 
@@ -117,27 +80,75 @@ def calculate_wilson_lower(successes: int, total: int, z: float = 1.96) -> float
     won't rank higher than 7/10 = 70%).
 
     Args:
-        successes: Number of successes (times picked)
-        total: Total opportunities
+        successes: Number of successes (times picked), or an array of them
+        total: Total opportunities, or an array of them
         z: Z-score for confidence level (1.96 for 95% CI)
 
     Returns:
-        Lower bound of Wilson score interval (0.0 to 1.0)
+        Lower bound of Wilson score interval (0.0 to 1.0), or an array of them
     """
-    if total == 0:
-        return 0.0
+    successes = np.asarray(successes, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
 
     # Handle edge case where successes > total (data inconsistency)
-    # This can happen if venue_machines data is incomplete
-    if successes > total:
-        # Use successes as total since we know they had at least that many opportunities
-        total = successes
+    # This can happen if venue_machines data is incomplete:
+    # use successes as total since we know they had at least that many opportunities
+    n = np.maximum(total, successes)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / n
+        denominator = 1 + (z * z) / n
+        center = p + (z * z) / (2 * n)
+        spread = z * np.sqrt((p * (1 - p) / n) + (z * z) / (4 * n * n))
+        lower = np.where(total == 0, 0.0, (center - spread) / denominator)
 
-    p = successes / total
-    denominator = 1 + (z * z) / total
-    center = p + (z * z) / (2 * total)
-    spread = z * math.sqrt((p * (1 - p) / total) + (z * z) / (4 * total * total))
-    return (center - spread) / denominator
+    return float(lower) if lower.ndim == 0 else lower
+
+
+def fetch_match_machines(season: int) -> tuple[list, list]:
+    """
+    Fetch the season's complete matches and the machines available in each.
+
+    Uses per-match machines from matches.machines JSONB column for accuracy,
+    with fallback to venue_machines table if per-match data is not available.
+
+    Returns:
+        tuple: ([(home_team_key, away_team_key), ...], [[machine_key, ...], ...])
+    """
+    with db.engine.connect() as conn:
+        matches = conn.execute(
+            text("""
+            SELECT home_team_key, away_team_key, venue_key, machines
+            FROM matches
+            WHERE season = :season AND state = 'complete'
+        """),
+            {"season": season},
+        ).fetchall()
+
+        with_machines = [match for match in matches if match.machines is not None]
+        if with_machines:
+            logger.info(f"Using per-match machine data ({len(with_machines)} matches with data)")
+            return (
+                [(match.home_team_key, match.away_team_key) for match in with_machines],
+                [match.machines for match in with_machines],
+            )
+
+        logger.info("No per-match machine data available, falling back to venue_machines table")
+        venue_machines = defaultdict(list)
+        for venue_key, machine_key in conn.execute(
+            text("""
+            SELECT venue_key, machine_key
+            FROM venue_machines
+            WHERE season = :season AND active = true
+        """),
+            {"season": season},
+        ):
+            venue_machines[venue_key].append(machine_key)
+
+    return (
+        [(match.home_team_key, match.away_team_key) for match in matches],
+        [venue_machines[match.venue_key] for match in matches],
+    )
 
 
 def calculate_opportunities(season: int) -> dict:
@@ -148,274 +159,143 @@ def calculate_opportunities(season: int) -> dict:
     1. The team had pick rights in that round (home picks 2&4, away picks 1&3)
     2. The machine was available at the venue for that specific match
 
-    Uses per-match machines from matches.machines JSONB column for accuracy,
-    with fallback to venue_machines table if per-match data is not available.
+    Availability is a match-by-machine count matrix; summing its rows per
+    home and per away team gives every team's opportunities at once. Each
+    match gives each team one singles and one doubles pick.
 
     Returns:
         dict: {(team_key, machine_key, is_home, round_type): opportunity_count}
     """
     logger.info(f"Calculating pick opportunities for season {season}...")
 
-    # First, check if we have per-match machine data
-    check_query = """
-        SELECT COUNT(*) FROM matches
-        WHERE season = :season AND state = 'complete' AND machines IS NOT NULL
-    """
-    with db.engine.connect() as conn:
-        result = conn.execute(text(check_query), {"season": season})
-        matches_with_machines = result.fetchone()[0]
-
-    if matches_with_machines > 0:
-        logger.info(f"Using per-match machine data ({matches_with_machines} matches with data)")
-        query = """
-            WITH team_match_opportunities AS (
-                -- Home team picks Round 4 (doubles)
-                SELECT
-                    m.home_team_key as team_key,
-                    m.match_key,
-                    m.machines,
-                    true as is_home,
-                    'doubles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete' AND m.machines IS NOT NULL
-
-                UNION ALL
-
-                -- Away team picks Round 1 (doubles)
-                SELECT
-                    m.away_team_key as team_key,
-                    m.match_key,
-                    m.machines,
-                    false as is_home,
-                    'doubles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete' AND m.machines IS NOT NULL
-
-                UNION ALL
-
-                -- Home team picks Round 2 (singles)
-                SELECT
-                    m.home_team_key as team_key,
-                    m.match_key,
-                    m.machines,
-                    true as is_home,
-                    'singles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete' AND m.machines IS NOT NULL
-
-                UNION ALL
-
-                -- Away team picks Round 3 (singles)
-                SELECT
-                    m.away_team_key as team_key,
-                    m.match_key,
-                    m.machines,
-                    false as is_home,
-                    'singles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete' AND m.machines IS NOT NULL
-            )
-            SELECT
-                tmo.team_key,
-                machine_key,
-                tmo.is_home,
-                tmo.round_type,
-                COUNT(*) as opportunities
-            FROM team_match_opportunities tmo,
-                 jsonb_array_elements_text(tmo.machines) as machine_key
-            GROUP BY tmo.team_key, machine_key, tmo.is_home, tmo.round_type
-        """
-    else:
-        logger.info("No per-match machine data available, falling back to venue_machines table")
-        query = """
-            WITH team_matches AS (
-                -- Home team picks Round 4 (doubles)
-                SELECT
-                    m.home_team_key as team_key,
-                    m.venue_key,
-                    m.season,
-                    true as is_home,
-                    'doubles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete'
-
-                UNION ALL
-
-                -- Away team picks Round 1 (doubles)
-                SELECT
-                    m.away_team_key as team_key,
-                    m.venue_key,
-                    m.season,
-                    false as is_home,
-                    'doubles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete'
-
-                UNION ALL
-
-                -- Home team picks Round 2 (singles)
-                SELECT
-                    m.home_team_key as team_key,
-                    m.venue_key,
-                    m.season,
-                    true as is_home,
-                    'singles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete'
-
-                UNION ALL
-
-                -- Away team picks Round 3 (singles)
-                SELECT
-                    m.away_team_key as team_key,
-                    m.venue_key,
-                    m.season,
-                    false as is_home,
-                    'singles' as round_type
-                FROM matches m
-                WHERE m.season = :season AND m.state = 'complete'
-            )
-            SELECT
-                tm.team_key,
-                vm.machine_key,
-                tm.is_home,
-                tm.round_type,
-                COUNT(*) as opportunities
-            FROM team_matches tm
-            JOIN venue_machines vm
-                ON tm.venue_key = vm.venue_key
-                AND tm.season = vm.season
-            WHERE vm.active = true
-            GROUP BY tm.team_key, vm.machine_key, tm.is_home, tm.round_type
-        """
+    match_teams, match_machines = fetch_match_machines(season)
+    if not match_teams:
+        return {}
+
+    machine_keys = np.array(sorted({key for keys in match_machines for key in keys}), dtype=object)
+    machine_codes = {key: code for code, key in enumerate(machine_keys)}
+    availability = np.zeros((len(match_teams), len(machine_keys)), dtype=np.int64)
+    np.add.at(
+        availability,
+        (
+            np.repeat(np.arange(len(match_teams)), [len(keys) for keys in match_machines]),
+            [machine_codes[key] for keys in match_machines for key in keys],
+        ),
+        1,
+    )
 
-    with db.engine.connect() as conn:
-        result = conn.execute(text(query), {"season": season})
-        rows = result.fetchall()
+    team_keys, team_codes = np.unique(np.array(match_teams, dtype=object), return_inverse=True)
+    team_codes = team_codes.reshape(len(match_teams), 2)
 
     opportunities = {}
-    for row in rows:
-        team_key, machine_key, is_home, round_type, count = row
-        key = (team_key, machine_key, is_home, round_type)
-        opportunities[key] = count
+    for column, is_home in ((0, True), (1, False)):
+        per_team = np.zeros((len(team_keys), len(machine_keys)), dtype=np.int64)
+        np.add.at(per_team, team_codes[:, column], availability)
+        for team, machine in zip(*np.nonzero(per_team)):
+            for round_type in ("doubles", "singles"):
+                key = (team_keys[team], machine_keys[machine], is_home, round_type)
+                opportunities[key] = int(per_team[team, machine])
 
     logger.info(f"Calculated {len(opportunities)} opportunity records")
     return opportunities
 
 
-def aggregate_team_picks(scores, season: int):
+def aggregate_team_picks(snapshot: SeasonSnapshot) -> dict:
     """
     Aggregate team machine pick statistics.
 
+    Every game of a complete match - (match, round, machine), as each round
+    has several games on different machines - is credited to its picking
+    team, which wins it when its scores add up to more than the other
+    team's. Games are summed per (team, machine, is_home, round_type) with
+    NumPy grouping instead of a Python loop over scores.
+
     Args:
-        scores: List of score records
-        season: Season number
+        snapshot: The season's scores
 
     Returns:
-        dict: Aggregated pick statistics
+        dict: {(team_key, machine_key, is_home, round_type): stats}
     """
     logger.info("Aggregating team machine pick statistics...")
 
-    # Group scores by (match_key, round_number, machine_key, team_key)
-    # Each round has MULTIPLE games on different machines, so we need machine_key in the key
-    # Structure: {(match, round, machine, team): {'scores': [], 'is_home': bool, ...}}
-    game_results = defaultdict(lambda: {"scores": [], "is_home": None})
-
-    for row in scores:
-        match_key, round_num, machine_key, home_team, away_team, team_key, is_home, score = row
-
-        # Include machine_key in the grouping to track each game separately
-        key = (match_key, round_num, machine_key, team_key)
-        game_results[key]["scores"].append(score)
-        game_results[key]["machine"] = machine_key
-        game_results[key]["is_home"] = is_home
-        game_results[key]["home_team"] = home_team
-        game_results[key]["away_team"] = away_team
-        game_results[key]["round_num"] = round_num
-
-    # Now aggregate by (team, machine, is_home, round_type)
-    # Structure: {(team, machine, is_home, round_type): stats}
-    pick_stats = defaultdict(
-        lambda: {"times_picked": 0, "wins": 0, "total_points": 0, "total_score": 0, "game_count": 0}
+    rows = np.flatnonzero(snapshot["match_complete"])
+    if not len(rows):
+        return {}
+
+    machine_count = len(snapshot.keys("machine_key"))
+    round_number = snapshot["round_number"][rows].astype(np.int64)
+    machine = snapshot["machine_key"][rows].astype(np.int64)
+    team = snapshot["team_key"][rows]
+    home_team = snapshot["home_team_key"][rows]
+    away_team = snapshot["away_team_key"][rows]
+    score = snapshot["score"][rows]
+
+    # One id per game, and the index of one of its scores
+    game_ids = (snapshot["match_key"][rows].astype(np.int64) * 128 + round_number) * machine_count
+    _, first, game = np.unique(game_ids + machine, return_index=True, return_inverse=True)
+    games = len(first)
+
+    # Each team's total score and number of scores per game
+    totals = {}
+    for name, mask in (("home", team == home_team), ("away", team == away_team)):
+        total = np.zeros(games, dtype=np.int64)
+        np.add.at(total, game[mask], score[mask])
+        totals[name] = (total, np.bincount(game[mask], minlength=games))
+
+    # Determine who picked each machine
+    picking_team, picker_is_home = determine_picking_team(
+        round_number[first], home_team[first], away_team[first]
     )
-
-    # Process each game result
-    # Each game is uniquely identified by (match_key, round_number, machine_key)
-    processed_games = set()
-
-    for (match_key, round_num, machine_key, team_key), data in game_results.items():
-        # Game key now includes machine to handle multiple machines per round
-        game_key = (match_key, round_num, machine_key)
-
-        # Skip if we've already processed this game
-        if game_key in processed_games:
-            continue
-
-        home_team = data["home_team"]
-        away_team = data["away_team"]
-        machine = data["machine"]
-        round_type = get_round_type(round_num)
-
-        # Determine who picked this machine
-        picking_team, picker_is_home = determine_picking_team(round_num, home_team, away_team)
-
-        # Get scores for both teams in this game (now keyed by machine too)
-        home_data = game_results.get((match_key, round_num, machine_key, home_team), {"scores": []})
-        away_data = game_results.get((match_key, round_num, machine_key, away_team), {"scores": []})
-
-        home_total = sum(home_data["scores"])
-        away_total = sum(away_data["scores"])
-
-        # Calculate points for the picking team
-        # In MNP, points are awarded based on head-to-head comparisons
-        # For simplicity, we'll track total scores and win/loss
-        if picker_is_home:
-            picker_total = home_total
-            opponent_total = away_total
-        else:
-            picker_total = away_total
-            opponent_total = home_total
-
-        # Determine if the picking team won the round
-        won = 1 if picker_total > opponent_total else 0
-
-        # Calculate points (simplified: 1 point for win, 0 for loss)
-        # In reality, MNP uses position-based scoring, but this gives a good approximation
-        points = won
-
-        # Update stats for the picking team
-        stats_key = (picking_team, machine, picker_is_home, round_type)
-        pick_stats[stats_key]["times_picked"] += 1
-        pick_stats[stats_key]["wins"] += won
-        pick_stats[stats_key]["total_points"] += points
-        pick_stats[stats_key]["total_score"] += picker_total
-        pick_stats[stats_key]["game_count"] += (
-            len(home_data["scores"]) if picker_is_home else len(away_data["scores"])
+    doubles = get_round_type(round_number[first]) == "doubles"
+    picker_total = np.where(picker_is_home, totals["home"][0], totals["away"][0])
+    opponent_total = np.where(picker_is_home, totals["away"][0], totals["home"][0])
+    picker_count = np.where(picker_is_home, totals["home"][1], totals["away"][1])
+
+    # Determine if the picking team won the round
+    # Points are simplified to 1 for a win (MNP scores by head-to-head position)
+    won = picker_total > opponent_total
+
+    # Group games by (team, machine, is_home, round_type)
+    group_ids = (picking_team.astype(np.int64) * machine_count + machine[first]) * 4
+    _, group_first, group = np.unique(
+        group_ids + picker_is_home * 2 + doubles, return_index=True, return_inverse=True
+    )
+    groups = len(group_first)
+    total_score = np.zeros(groups, dtype=np.int64)
+    np.add.at(total_score, group, picker_total)
+    game_count = np.zeros(groups, dtype=np.int64)
+    np.add.at(game_count, group, picker_count)
+
+    pick_stats = {
+        (team_key, machine_key, bool(is_home), "doubles" if is_doubles else "singles"): {
+            "times_picked": int(times_picked),
+            "wins": int(wins),
+            "total_points": int(wins),
+            "total_score": int(total),
+            "game_count": int(count),
+        }
+        for team_key, machine_key, is_home, is_doubles, times_picked, wins, total, count in zip(
+            snapshot.decode("team_key", picking_team[group_first]),
+            snapshot.decode("machine_key", machine[first][group_first]),
+            picker_is_home[group_first],
+            doubles[group_first],
+            np.bincount(group, minlength=groups),
+            np.bincount(group[won], minlength=groups),
+            total_score,
+            game_count,
         )
-
-        processed_games.add(game_key)
+    }
 
     logger.info(f"Aggregated {len(pick_stats)} team/machine/context combinations")
-    return dict(pick_stats)
-
-
-def clear_existing_picks(season: int):
-    """Clear existing team machine picks for the season"""
-
-    logger.info(f"Clearing existing team machine picks for season {season}")
-
-    query = """
-        DELETE FROM team_machine_picks
-        WHERE season = :season
-    """
-
-    with db.engine.begin() as conn:
-        conn.execute(text(query), {"season": season})
+    return pick_stats
 
 
 def insert_team_picks(pick_stats: dict, opportunities: dict, season: int):
     """
-    Insert team machine pick statistics into database.
+    Replace the season's team machine pick statistics in the database.
+
+    The rows are built in a shadow table and swapped in at once, so readers
+    never see a partially calculated season.
 
     Args:
         pick_stats: dict of aggregated statistics
@@ -424,70 +304,68 @@ def insert_team_picks(pick_stats: dict, opportunities: dict, season: int):
     """
     logger.info("Inserting team machine pick statistics...")
 
-    query = """
-        INSERT INTO team_machine_picks (
-            team_key, machine_key, season, is_home, round_type,
-            times_picked, wins, total_points, avg_score,
-            total_opportunities, wilson_lower
-        )
-        VALUES (
-            :team_key, :machine_key, :season, :is_home, :round_type,
-            :times_picked, :wins, :total_points, :avg_score,
-            :total_opportunities, :wilson_lower
-        )
-        ON CONFLICT (team_key, machine_key, season, is_home, round_type)
-        DO UPDATE SET
-            times_picked = EXCLUDED.times_picked,
-            wins = EXCLUDED.wins,
-            total_points = EXCLUDED.total_points,
-            avg_score = EXCLUDED.avg_score,
-            total_opportunities = EXCLUDED.total_opportunities,
-            wilson_lower = EXCLUDED.wilson_lower,
-            last_calculated = CURRENT_TIMESTAMP
-    """
+    # Wilson score lower bounds of every combination at once
+    total_opportunities = [opportunities.get(key, 0) for key in pick_stats]
+    wilson_lower = calculate_wilson_lower(
+        [stats["times_picked"] for stats in pick_stats.values()], total_opportunities
+    )
 
-    records_inserted = 0
+    records = []
+    for ((team_key, machine_key, is_home, round_type), stats), opps, wilson in zip(
+        pick_stats.items(), total_opportunities, wilson_lower
+    ):
+        # Calculate average score
+        avg_score = (
+            int(stats["total_score"] / stats["game_count"]) if stats["game_count"] > 0 else 0
+        )
 
-    with db.engine.begin() as conn:
-        for (team_key, machine_key, is_home, round_type), stats in pick_stats.items():
-            # Calculate average score
-            avg_score = (
-                int(stats["total_score"] / stats["game_count"]) if stats["game_count"] > 0 else 0
+        # Warn if picks exceed opportunities (indicates venue_machines data gap)
+        if stats["times_picked"] > opps:
+            logger.warning(
+                f"Data inconsistency: {team_key} picked {machine_key} {stats['times_picked']}x "
+                f"but only {opps} opportunities recorded. "
+                f"Check venue_machines table for missing entries."
             )
 
-            # Get opportunities for this combination
-            opp_key = (team_key, machine_key, is_home, round_type)
-            total_opportunities = opportunities.get(opp_key, 0)
-
-            # Warn if picks exceed opportunities (indicates venue_machines data gap)
-            if stats["times_picked"] > total_opportunities:
-                logger.warning(
-                    f"Data inconsistency: {team_key} picked {machine_key} {stats['times_picked']}x "
-                    f"but only {total_opportunities} opportunities recorded. "
-                    f"Check venue_machines table for missing entries."
+        record = {
+            "team_key": team_key,
+            "machine_key": machine_key,
+            "season": season,
+            "is_home": is_home,
+            "round_type": round_type,
+            "times_picked": stats["times_picked"],
+            "wins": stats["wins"],
+            "total_points": stats["total_points"],
+            "avg_score": avg_score,
+            "total_opportunities": opps,
+            "wilson_lower": round(float(wilson), 4),
+        }
+
+        records.append(record)
+
+    with season_shadow(
+        "team_machine_picks",
+        season,
+        key_columns=["team_key", "machine_key", "season", "is_home", "round_type"],
+    ) as (conn, shadow):
+        if records:
+            conn.execute(
+                text(f"""
+                INSERT INTO {shadow} (
+                    team_key, machine_key, season, is_home, round_type,
+                    times_picked, wins, total_points, avg_score,
+                    total_opportunities, wilson_lower
                 )
+                VALUES (
+                    :team_key, :machine_key, :season, :is_home, :round_type,
+                    :times_picked, :wins, :total_points, :avg_score,
+                    :total_opportunities, :wilson_lower
+                )
+            """),
+                records,
+            )
 
-            # Calculate Wilson score lower bound
-            wilson_lower = calculate_wilson_lower(stats["times_picked"], total_opportunities)
-
-            record = {
-                "team_key": team_key,
-                "machine_key": machine_key,
-                "season": season,
-                "is_home": is_home,
-                "round_type": round_type,
-                "times_picked": stats["times_picked"],
-                "wins": stats["wins"],
-                "total_points": stats["total_points"],
-                "avg_score": avg_score,
-                "total_opportunities": total_opportunities,
-                "wilson_lower": round(wilson_lower, 4),
-            }
-
-            conn.execute(text(query), record)
-            records_inserted += 1
-
-    logger.info(f"✓ Inserted {records_inserted} team machine pick records")
+    logger.info(f"✓ Inserted {len(records)} team machine pick records")
 
 
 def calculate_and_store_team_picks(season: int):
@@ -501,23 +379,17 @@ def calculate_and_store_team_picks(season: int):
     logger.info(f"Calculating Team Machine Picks for Season {season}")
     logger.info("=" * 60)
 
-    # Step 1: Clear existing data
-    clear_existing_picks(season)
+    # Step 1: Aggregate pick statistics from the season's scores
+    pick_stats = aggregate_team_picks(load_season_snapshot(season))
 
-    # Step 2: Fetch game and score data
-    scores = fetch_games_with_scores(season)
-
-    if not scores:
+    if not pick_stats:
         logger.error("No scores found!")
         return False
 
-    # Step 3: Aggregate pick statistics
-    pick_stats = aggregate_team_picks(scores, season)
-
-    # Step 4: Calculate opportunities (how many times each machine was available to pick)
+    # Step 2: Calculate opportunities (how many times each machine was available to pick)
     opportunities = calculate_opportunities(season)
 
-    # Step 5: Insert into database with opportunities and Wilson scores
+    # Step 3: Swap into database with opportunities and Wilson scores
     insert_team_picks(pick_stats, opportunities, season)
 
     logger.info("")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Calculate team machine statistics and populate team_machine_stats table.
+
+For every team, machine, venue (plus '_ALL_'), round and season, with and
+without substitutes, this stores:
+- games_played, total_score, median/best/worst score
+- wins/comparisons: head-to-head results against the opponents who played
+  the same game (the basis of the team win percentage)
+- scores: the sorted scores, so medians can be taken across merged rows
+
+The /teams/{team_key}/machines endpoint reads these rows and merges them
+across seasons, rounds and team aliases instead of aggregating raw scores on
+every request.
+
+Usage:
+    python etl/calculate_team_machine_stats.py --season 22
+    python etl/calculate_team_machine_stats.py --season 22 --verbose
+"""
+
+import argparse
+import logging
+import sys
+
+from sqlalchemy import text
+
+from etl.database import db
+from etl.loaders.season_swap import season_shadow
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+
+logger = logging.getLogger(__name__)
+
+
+def insert_team_machine_stats(season: int) -> int:
+    """
+    Replace the season's team machine statistics, computed from its scores.
+
+    Each team score is compared with every opponent score on the same game
+    (same match, round and machine). Rows with substitutes excluded drop
+    substitutes on both sides of the comparison.
+
+    Returns:
+        Number of rows stored
+    """
+    logger.info("Aggregating team scores and head-to-head results...")
+
+    with season_shadow(
+        "team_machine_stats",
+        season,
+        key_columns=[
+            "team_key",
+            "machine_key",
+            "venue_key",
+            "season",
+            "round_number",
+            "includes_subs",
+        ],
+    ) as (conn, shadow):
+        result = conn.execute(
+            text(f"""
+            INSERT INTO {shadow} (
+                team_key, machine_key, venue_key, season, round_number, includes_subs,
+                games_played, total_score, median_score, best_score, worst_score,
+                wins, comparisons, scores
+            )
+            WITH team_scores AS (
+                SELECT
+                    s.team_key, s.machine_key, s.venue_key, s.round_number, s.score,
+                    COALESCE(s.is_substitute, false) AS is_sub,
+                    COUNT(o.score) AS comparisons_all,
+                    COUNT(o.score) FILTER (WHERE s.score > o.score) AS wins_all,
+                    COUNT(o.score) FILTER (
+                        WHERE NOT COALESCE(o.is_substitute, false)
+                    ) AS comparisons_no_subs,
+                    COUNT(o.score) FILTER (
+                        WHERE s.score > o.score AND NOT COALESCE(o.is_substitute, false)
+                    ) AS wins_no_subs
+                FROM scores s
+                LEFT JOIN scores o
+                    ON o.season = s.season
+                    AND o.match_key = s.match_key
+                    AND o.round_number = s.round_number
+                    AND o.machine_key = s.machine_key
+                    AND o.team_key != s.team_key
+                WHERE s.season = :season
+                GROUP BY s.score_id, s.season, s.team_key, s.machine_key, s.venue_key,
+                         s.round_number, s.score, s.is_substitute
+            ),
+            by_subs AS (
+                SELECT true AS includes_subs, team_key, machine_key, venue_key, round_number,
+                       score, wins_all AS wins, comparisons_all AS comparisons
+                FROM team_scores
+                UNION ALL
+                SELECT false, team_key, machine_key, venue_key, round_number,
+                       score, wins_no_subs, comparisons_no_subs
+                FROM team_scores
+                WHERE NOT is_sub
+            )
+            SELECT
+                team_key,
+                machine_key,
+                CASE WHEN GROUPING(venue_key) = 1 THEN '_ALL_' ELSE venue_key END,
+                :season,
+                round_number,
+                includes_subs,
+                COUNT(*),
+                SUM(score),
+                FLOOR(percentile_cont(0.5) WITHIN GROUP (ORDER BY score)),
+                MAX(score),
+                MIN(score),
+                SUM(wins),
+                SUM(comparisons),
+                array_agg(score ORDER BY score)
+            FROM by_subs
+            GROUP BY GROUPING SETS (
+                (team_key, machine_key, venue_key, round_number, includes_subs),
+                (team_key, machine_key, round_number, includes_subs)
+            )
+        """),
+            {"season": season},
+        )
+        count = result.rowcount
+
+    logger.info(f"✓ Stored {count} team machine stat rows")
+    return count
+
+
+def calculate_and_store_team_machine_stats(season: int):
+    """
+    Main function to calculate and store team machine statistics.
+
+    Args:
+        season: Season number
+    """
+    logger.info("=" * 60)
+    logger.info(f"Calculating Team Machine Stats for Season {season}")
+    logger.info("=" * 60)
+
+    with db.engine.connect() as conn:
+        score_count = conn.execute(
+            text("SELECT COUNT(*) FROM scores WHERE season = :season"), {"season": season}
+        ).scalar()
+
+    if not score_count:
+        logger.error("No scores found!")
+        return False
+
+    insert_team_machine_stats(season)
+
+    logger.info("")
+    logger.info("=" * 60)
+    logger.info("✓ Team machine stats calculated successfully!")
+    logger.info("=" * 60)
+
+    return True
+
+
+def verify_team_machine_stats(season: int):
+    """Check the stored rows add up to the season's scores."""
+
+    logger.info("")
+    logger.info("Verifying team machine statistics...")
+
+    query = """
+        SELECT
+            (SELECT COUNT(*) FROM team_machine_stats WHERE season = :season) AS total_records,
+            (SELECT SUM(games_played) FROM team_machine_stats
+             WHERE season = :season AND venue_key = '_ALL_' AND includes_subs) AS stored_scores,
+            (SELECT COUNT(*) FROM scores WHERE season = :season) AS season_scores,
+            (SELECT COUNT(DISTINCT team_key) FROM team_machine_stats
+             WHERE season = :season) AS unique_teams
+    """
+
+    with db.engine.connect() as conn:
+        row = conn.execute(text(query), {"season": season}).fetchone()
+
+    logger.info(f"  Total records: {row.total_records}")
+    logger.info(f"  Unique teams: {row.unique_teams}")
+    logger.info(f"  Scores covered: {row.stored_scores}/{row.season_scores}")
+    if row.stored_scores != row.season_scores:
+        logger.warning("  Stored games_played doesn't add up to the season's scores")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Calculate team machine statistics")
+    parser.add_argument("--season", type=int, required=True, help="Season number (e.g., 22)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        db.connect()
+
+        success = calculate_and_store_team_machine_stats(args.season)
+        if not success:
+            return 1
+
+        verify_team_machine_stats(args.season)
+
+        logger.info("")
+        logger.info("Done!")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
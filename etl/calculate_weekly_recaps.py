@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Build weekly recaps and populate weekly_recaps.
+
+For every week of the season with completed matches, this stores the full
+/analysis/weekly-recap response (api/services/weekly_recap.py) as one JSONB
+row, so the endpoint reads a row instead of running its queries and parsing
+the season's match files. All completed weeks are rebuilt on each run since
+standings and score outliers depend on the whole season.
+
+Usage:
+    python etl/calculate_weekly_recaps.py --season 22
+    python etl/calculate_weekly_recaps.py --season 22 --verbose
+"""
+
+import argparse
+import json
+import logging
+import sys
+
+from sqlalchemy import text
+
+from api.services.weekly_recap import build_weekly_recap
+from etl.database import db
+from etl.loaders.season_swap import season_shadow
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+
+logger = logging.getLogger(__name__)
+
+
+def fetch_completed_weeks(season: int) -> list[int]:
+    """Weeks of the season with completed matches."""
+    with db.engine.connect() as conn:
+        return list(
+            conn.execute(
+                text("""
+                SELECT DISTINCT week FROM matches
+                WHERE season = :season AND state = 'complete'
+                ORDER BY week
+            """),
+                {"season": season},
+            ).scalars()
+        )
+
+
+def calculate_and_store_weekly_recaps(season: int):
+    """
+    Main function to build and store the season's weekly recaps.
+
+    Args:
+        season: Season number
+    """
+    logger.info("=" * 60)
+    logger.info(f"Building Weekly Recaps for Season {season}")
+    logger.info("=" * 60)
+
+    weeks = fetch_completed_weeks(season)
+    if not weeks:
+        logger.error("No completed matches found!")
+        return False
+
+    records = []
+    for week in weeks:
+        recap = build_weekly_recap(season, week)
+        logger.info(
+            f"  Week {week}: {recap['match_summary']['total_matches']} matches, "
+            f"{len(recap['upsets'])} upsets, {len(recap['comebacks'])} comebacks"
+        )
+        # IPR averages come back as Decimal
+        records.append({"season": season, "week": week, "recap": json.dumps(recap, default=float)})
+
+    with season_shadow("weekly_recaps", season, key_columns=["season", "week"]) as (conn, shadow):
+        conn.execute(
+            text(f"""
+            INSERT INTO {shadow} (season, week, recap)
+            VALUES (:season, :week, CAST(:recap AS jsonb))
+        """),
+            records,
+        )
+
+    logger.info("")
+    logger.info("=" * 60)
+    logger.info(f"✓ Stored {len(records)} weekly recaps")
+    logger.info("=" * 60)
+
+    return True
+
+
+def verify_weekly_recaps(season: int):
+    """Check every completed week has a recap covering all its matches."""
+
+    logger.info("")
+    logger.info("Verifying weekly recaps...")
+
+    query = """
+        SELECT
+            w.week,
+            w.completed_matches,
+            (r.recap -> 'match_summary' ->> 'total_matches')::int AS recap_matches
+        FROM (
+            SELECT week, COUNT(*) AS completed_matches
+            FROM matches
+            WHERE season = :season AND state = 'complete'
+            GROUP BY week
+        ) w
+        LEFT JOIN weekly_recaps r ON r.season = :season AND r.week = w.week
+        ORDER BY w.week
+    """
+
+    with db.engine.connect() as conn:
+        rows = conn.execute(text(query), {"season": season}).fetchall()
+
+    missing = [row.week for row in rows if row.recap_matches is None]
+    # The summary only counts matches whose away team is in teams
+    short = [row.week for row in rows if row.recap_matches not in (None, row.completed_matches)]
+
+    logger.info(f"  Completed weeks: {len(rows)}")
+    logger.info(f"  Stored recaps: {len(rows) - len(missing)}")
+    if missing:
+        logger.warning(f"  Weeks without a recap: {missing}")
+    if short:
+        logger.warning(f"  Recaps missing matches (check teams rows): weeks {short}")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Build weekly recaps")
+    parser.add_argument("--season", type=int, required=True, help="Season number (e.g., 22)")
+    parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
+
+    args = parser.parse_args()
+
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+
+    try:
+        db.connect()
+
+        success = calculate_and_store_weekly_recaps(args.season)
+        if not success:
+            return 1
+
+        verify_weekly_recaps(args.season)
+
+        logger.info("")
+        logger.info("Done!")
+        return 0
+
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -33,6 +33,14 @@ class Config:
     DATA_PATH = PROJECT_ROOT / "mnp-data-archive"
     MACHINE_VARIATIONS_FILE = PROJECT_ROOT / "machine_variations.json"
 
+    # Parsed match archive cache (see etl/parsers/season_pack.py)
+    SEASON_PACK_DIR = Path(os.getenv("SEASON_PACK_DIR", PROJECT_ROOT / ".cache" / "season_packs"))
+
+    # Columnar score snapshots for the aggregate scripts (see etl/loaders/season_snapshot.py)
+    SEASON_SNAPSHOT_DIR = Path(
+        os.getenv("SEASON_SNAPSHOT_DIR", PROJECT_ROOT / ".cache" / "season_snapshots")
+    )
+
     # ETL settings
     BATCH_SIZE = 1000  # Number of records to insert at once
 
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Data version stamps (migration 020).
+
+Every run that changes the data the API serves appends a row to data_versions.
+The API's in-process score store (api/services/score_store.py) remembers
+MAX(version) when it loads and reloads once the version moves.
+
+Each database stamps itself: run_full_pipeline.py and update_season.py stamp
+the local database after their steps, and sync_production.py stamps production
+in the same transaction that applies the synced rows. After loading or fixing
+data by hand, stamp it yourself so running APIs pick it up.
+
+Usage:
+    python etl/data_version.py              # Stamp the local database
+    python etl/data_version.py --show       # Current version
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+
+def stamp_data_version(conn, source: str) -> int:
+    """Append a stamp through conn (commit is up to the caller). Returns the new version."""
+    return conn.execute(
+        text("INSERT INTO data_versions (source) VALUES (:source) RETURNING version"),
+        {"source": source},
+    ).scalar()
+
+
+def get_data_version(conn) -> int | None:
+    """Current data version, or None if the database was never stamped."""
+    return conn.execute(text("SELECT MAX(version) FROM data_versions")).scalar()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Stamp or show the data version")
+    parser.add_argument("--source", default="manual", help="What changed the data")
+    parser.add_argument("--show", action="store_true", help="Show the version, don't stamp")
+    args = parser.parse_args()
+
+    try:
+        db.connect()
+        with db.engine.begin() as conn:
+            if args.show:
+                logger.info(f"Data version: {get_data_version(conn)}")
+            else:
+                logger.info(f"Stamped data version {stamp_data_version(conn, args.source)}")
+        return 0
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
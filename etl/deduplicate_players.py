@@ -10,9 +10,13 @@ but different player_keys. This can happen when:
 The script will:
 1. Find all players with duplicate names
 2. For each duplicate set, pick the "canonical" key (prefer SHA-1 format)
-3. Update all scores references to use the canonical key
+3. Load the old -> canonical key mapping into a temp table
 4. Merge player stats (first/last seen season, total games)
-5. Delete the duplicate player records
+5. Update all scores references to use the canonical key
+6. Delete the duplicate player records
+
+Each rewrite is a single set-based statement joined against the mapping
+table, all in one transaction.
 
 Usage:
     python etl/deduplicate_players.py --dry-run    # Preview changes
@@ -20,6 +24,7 @@ Usage:
 """
 
 import argparse
+import json
 import logging
 import sys
 
@@ -57,30 +62,20 @@ def find_duplicate_players(conn) -> dict:
     """
     result = conn.execute(
         text("""
-        SELECT name, COUNT(*) as count
-        FROM players
-        GROUP BY name
-        HAVING COUNT(*) > 1
-        ORDER BY count DESC
+        SELECT player_key, name, first_seen_season, last_seen_season,
+               total_games_played, current_ipr
+        FROM (
+            SELECT p.*, COUNT(*) OVER (PARTITION BY name) AS name_count
+            FROM players p
+        ) p
+        WHERE name_count > 1
+        ORDER BY name_count DESC, name, first_seen_season
     """)
     )
 
     duplicates = {}
     for row in result:
-        name = row[0]
-        # Get all records for this player
-        player_result = conn.execute(
-            text("""
-            SELECT player_key, name, first_seen_season, last_seen_season,
-                   total_games_played, current_ipr
-            FROM players
-            WHERE name = :name
-            ORDER BY first_seen_season
-        """),
-            {"name": name},
-        )
-
-        duplicates[name] = [dict(r._mapping) for r in player_result]
+        duplicates.setdefault(row.name, []).append(dict(row._mapping))
 
     return duplicates
 
@@ -124,9 +119,46 @@ def select_canonical_key(players: list) -> tuple:
     return canonical, keys_to_remove
 
 
-def merge_player_stats(conn, canonical: dict, duplicates: list, dry_run: bool = False):
+def create_key_map(conn, key_map: dict):
     """
-    Merge stats from duplicate players into the canonical player.
+    Load the old -> canonical player_key mapping into a temp table.
+
+    The table is dropped when the transaction commits, so the dry run leaves
+    nothing behind.
+    """
+    conn.execute(
+        text("""
+        CREATE TEMP TABLE player_key_map (
+            old_key VARCHAR(64) PRIMARY KEY,
+            canonical_key VARCHAR(64) NOT NULL
+        ) ON COMMIT DROP
+    """)
+    )
+    conn.execute(
+        text("""
+        INSERT INTO player_key_map (old_key, canonical_key)
+        SELECT key, value FROM jsonb_each_text(CAST(:key_map AS jsonb))
+    """),
+        {"key_map": json.dumps(key_map)},
+    )
+    conn.execute(text("ANALYZE player_key_map"))
+
+
+def count_affected_rows(conn) -> dict:
+    """Count the score references of every old player_key in one query."""
+    result = conn.execute(
+        text("""
+        SELECT m.old_key,
+               (SELECT COUNT(*) FROM scores s WHERE s.player_key = m.old_key) AS scores
+        FROM player_key_map m
+    """)
+    )
+    return {row.old_key: row.scores for row in result}
+
+
+def merge_player_stats(conn):
+    """
+    Merge stats from duplicate players into their canonical players.
 
     Updates:
     - first_seen_season: MIN of all
@@ -134,86 +166,53 @@ def merge_player_stats(conn, canonical: dict, duplicates: list, dry_run: bool =
     - total_games_played: SUM of all
     - current_ipr: Keep canonical's IPR (or first non-null)
     """
-    all_players = [canonical] + duplicates
-
-    first_seen = min(p["first_seen_season"] for p in all_players if p["first_seen_season"])
-    last_seen = max(p["last_seen_season"] for p in all_players if p["last_seen_season"])
-    total_games = sum(p["total_games_played"] or 0 for p in all_players)
-
-    # Find first non-null IPR
-    current_ipr = canonical.get("current_ipr")
-    if current_ipr is None:
-        for p in all_players:
-            if p.get("current_ipr") is not None:
-                current_ipr = p["current_ipr"]
-                break
-
-    if dry_run:
-        logger.info(
-            f"    Would update canonical player stats: first_seen={first_seen}, "
-            f"last_seen={last_seen}, total_games={total_games}"
-        )
-    else:
-        conn.execute(
-            text("""
-            UPDATE players
-            SET first_seen_season = :first_seen,
-                last_seen_season = :last_seen,
-                total_games_played = :total_games,
-                current_ipr = :current_ipr,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE player_key = :player_key
-        """),
-            {
-                "player_key": canonical["player_key"],
-                "first_seen": first_seen,
-                "last_seen": last_seen,
-                "total_games": total_games,
-                "current_ipr": current_ipr,
-            },
-        )
+    conn.execute(
+        text("""
+        UPDATE players p
+        SET first_seen_season = LEAST(p.first_seen_season, d.first_seen),
+            last_seen_season = GREATEST(p.last_seen_season, d.last_seen),
+            total_games_played = COALESCE(p.total_games_played, 0) + d.total_games,
+            current_ipr = COALESCE(p.current_ipr, d.current_ipr),
+            updated_at = CURRENT_TIMESTAMP
+        FROM (
+            SELECT m.canonical_key,
+                   MIN(dup.first_seen_season) AS first_seen,
+                   MAX(dup.last_seen_season) AS last_seen,
+                   SUM(COALESCE(dup.total_games_played, 0)) AS total_games,
+                   (ARRAY_AGG(dup.current_ipr ORDER BY dup.first_seen_season)
+                       FILTER (WHERE dup.current_ipr IS NOT NULL))[1] AS current_ipr
+            FROM player_key_map m
+            JOIN players dup ON dup.player_key = m.old_key
+            GROUP BY m.canonical_key
+        ) d
+        WHERE p.player_key = d.canonical_key
+    """)
+    )
 
 
-def update_score_references(conn, canonical_key: str, old_keys: list, dry_run: bool = False):
-    """Update scores table to reference the canonical player_key"""
-    for old_key in old_keys:
-        # Count affected scores
-        result = conn.execute(
-            text("""
-            SELECT COUNT(*) FROM scores WHERE player_key = :old_key
-        """),
-            {"old_key": old_key},
-        )
-        count = result.scalar()
-
-        if count > 0:
-            if dry_run:
-                logger.info(f"    Would update {count} scores from {old_key} -> {canonical_key}")
-            else:
-                conn.execute(
-                    text("""
-                    UPDATE scores
-                    SET player_key = :canonical_key
-                    WHERE player_key = :old_key
-                """),
-                    {"canonical_key": canonical_key, "old_key": old_key},
-                )
-                logger.info(f"    Updated {count} scores from {old_key} -> {canonical_key}")
+def update_score_references(conn) -> int:
+    """Point scores at the canonical player_key. Returns the number of scores updated."""
+    result = conn.execute(
+        text("""
+        UPDATE scores s
+        SET player_key = m.canonical_key
+        FROM player_key_map m
+        WHERE s.player_key = m.old_key
+    """)
+    )
+    return result.rowcount
 
 
-def delete_duplicate_players(conn, keys_to_remove: list, dry_run: bool = False):
-    """Delete duplicate player records after merging"""
-    for key in keys_to_remove:
-        if dry_run:
-            logger.info(f"    Would delete player_key: {key}")
-        else:
-            conn.execute(
-                text("""
-                DELETE FROM players WHERE player_key = :key
-            """),
-                {"key": key},
-            )
-            logger.info(f"    Deleted player_key: {key}")
+def delete_duplicate_players(conn) -> int:
+    """Delete duplicate player records after merging. Returns the number deleted."""
+    result = conn.execute(
+        text("""
+        DELETE FROM players p
+        USING player_key_map m
+        WHERE p.player_key = m.old_key
+    """)
+    )
+    return result.rowcount
 
 
 def deduplicate_players(dry_run: bool = False):
@@ -233,9 +232,7 @@ def deduplicate_players(dry_run: bool = False):
         logger.info(f"Found {len(duplicates)} players with duplicate entries")
         logger.info("")
 
-        total_removed = 0
-        total_scores_updated = 0
-
+        key_map = {}
         for name, players in duplicates.items():
             logger.info(f"Processing: {name} ({len(players)} entries)")
 
@@ -251,32 +248,30 @@ def deduplicate_players(dry_run: bool = False):
             # Select canonical key
             canonical, keys_to_remove = select_canonical_key(players)
             logger.info(f"  Canonical key: {canonical['player_key'][:20]}...")
-
-            # Get duplicate player records for stats merging
-            dup_players = [p for p in players if p["player_key"] in keys_to_remove]
-
-            # Update score references
             for old_key in keys_to_remove:
-                result = conn.execute(
-                    text("""
-                    SELECT COUNT(*) FROM scores WHERE player_key = :old_key
-                """),
-                    {"old_key": old_key},
-                )
-                count = result.scalar()
-                total_scores_updated += count
+                key_map[old_key] = canonical["player_key"]
 
-            update_score_references(conn, canonical["player_key"], keys_to_remove, dry_run)
+        # Every rewrite below is one statement joined against the mapping table
+        create_key_map(conn, key_map)
+        score_counts = count_affected_rows(conn)
 
-            # Merge stats
-            merge_player_stats(conn, canonical, dup_players, dry_run)
+        logger.info("")
+        for old_key, count in score_counts.items():
+            if count > 0:
+                logger.info(
+                    f"  {'Would update' if dry_run else 'Updating'} {count} scores "
+                    f"from {old_key} -> {key_map[old_key]}"
+                )
 
-            # Delete duplicates
-            delete_duplicate_players(conn, keys_to_remove, dry_run)
-            total_removed += len(keys_to_remove)
+        total_removed = len(key_map)
+        total_scores_updated = sum(score_counts.values())
 
-            logger.info("")
+        if not dry_run:
+            merge_player_stats(conn)
+            total_scores_updated = update_score_references(conn)
+            total_removed = delete_duplicate_players(conn)
 
+        logger.info("")
         logger.info("=" * 60)
         logger.info("Summary:")
         logger.info(f"  Players deduplicated: {len(duplicates)}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Deferred secondary indexes for bulk loads, and an index usage report.
+
+scores carries around twenty secondary indexes, and every inserted score
+updates all of them. For a full rebuild it is much cheaper to drop the
+non-unique indexes, load, and build each index once from the finished table.
+
+- drop_secondary_indexes() records the definitions of the non-unique indexes
+  on the given tables in pipeline_deferred_indexes (migration 013), then drops
+  them. Primary keys and unique indexes stay, so upserts keep working.
+- rebuild_deferred_indexes() recreates every recorded index, several at a
+  time on separate connections, removing each record once its index exists.
+  If a run dies in between, the records survive and `--rebuild` finishes it.
+
+`run_full_pipeline.py --all-seasons --defer-indexes` drops the indexes before
+the season loads and rebuilds them as soon as the loads have finished, before
+the post-load and aggregate steps query scores and games.
+
+The usage report lists pg_stat_user_indexes scan counts with index sizes, and
+flags indexes that are unused, duplicates of another index, or a leading
+prefix of another index. Run it against the production database (the scan
+counters only reflect the queries that database has served since its
+statistics were last reset).
+
+Usage:
+    python etl/index_maintenance.py --report                 # All tables
+    python etl/index_maintenance.py --report --tables scores games
+    python etl/index_maintenance.py --rebuild                # Finish an interrupted rebuild
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+# Tables whose secondary indexes the pipeline's bulk load mode defers: the
+# ones load_season fills row by row. Aggregate tables are left out - they are
+# written after the rebuild, each season in one shadow swap (season_swap.py),
+# and later aggregate steps and the API read them through their indexes.
+DEFERRED_INDEX_TABLES = ["scores", "games"]
+
+# Indexes built at once during a rebuild (one connection each)
+DEFAULT_REBUILD_WORKERS = 4
+
+
+def get_secondary_indexes(conn, tables: list[str]) -> list[dict]:
+    """Non-unique indexes on the given tables that don't back a constraint."""
+    result = conn.execute(
+        text("""
+        SELECT c.relname AS table_name,
+               i.relname AS index_name,
+               pg_get_indexdef(x.indexrelid) AS definition,
+               pg_relation_size(x.indexrelid) AS size_bytes
+        FROM pg_index x
+        JOIN pg_class i ON i.oid = x.indexrelid
+        JOIN pg_class c ON c.oid = x.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+          AND c.relname = ANY(:tables)
+          AND NOT x.indisunique
+          AND NOT x.indisprimary
+          AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = x.indexrelid)
+        ORDER BY c.relname, i.relname
+    """),
+        {"tables": tables},
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def drop_secondary_indexes(tables: list[str] = DEFERRED_INDEX_TABLES) -> int:
+    """
+    Record and drop the secondary indexes on the given tables.
+
+    Returns:
+        Number of indexes dropped
+    """
+    with db.engine.begin() as conn:
+        indexes = get_secondary_indexes(conn, tables)
+        for index in indexes:
+            # Keep the first recorded definition if an earlier run left one behind
+            conn.execute(
+                text("""
+                INSERT INTO pipeline_deferred_indexes (index_name, table_name, definition)
+                VALUES (:index_name, :table_name, :definition)
+                ON CONFLICT (index_name) DO NOTHING
+            """),
+                index,
+            )
+            conn.execute(text(f'DROP INDEX IF EXISTS "{index["index_name"]}"'))
+
+    size_mb = sum(index["size_bytes"] for index in indexes) / 1024 / 1024
+    logger.info(
+        f"Dropped {len(indexes)} secondary indexes ({size_mb:.0f} MB) on {', '.join(tables)}"
+    )
+    return len(indexes)
+
+
+def get_deferred_indexes(conn) -> list[dict]:
+    """Recorded indexes still waiting to be rebuilt, largest tables first."""
+    result = conn.execute(
+        text("""
+        SELECT d.index_name, d.table_name, d.definition
+        FROM pipeline_deferred_indexes d
+        -- Partitioned tables have no row estimate of their own; add up their partitions'
+        LEFT JOIN LATERAL (
+            SELECT SUM(GREATEST(c.reltuples, 0)) AS row_estimate
+            FROM pg_class c
+            WHERE c.oid = to_regclass(d.table_name)
+               OR c.oid IN (
+                   SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(d.table_name)
+               )
+        ) t ON TRUE
+        ORDER BY COALESCE(t.row_estimate, 0) DESC, d.index_name
+    """)
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def _rebuild_index(index: dict) -> float:
+    """Build one recorded index on its own connection and clear its record."""
+    # IF NOT EXISTS makes a rerun after a partial rebuild safe. Indexes on a
+    # partitioned table are recorded as "ON ONLY parent"; rebuilding them
+    # without ONLY builds them on every partition too.
+    definition = re.sub(
+        r"^CREATE INDEX (\S+) ON (ONLY )?",
+        r"CREATE INDEX IF NOT EXISTS \1 ON ",
+        index["definition"],
+        count=1,
+    )
+    start = time.monotonic()
+    with db.engine.begin() as conn:
+        conn.execute(text(definition))
+        conn.execute(
+            text("DELETE FROM pipeline_deferred_indexes WHERE index_name = :index_name"),
+            {"index_name": index["index_name"]},
+        )
+    return time.monotonic() - start
+
+
+def rebuild_deferred_indexes(workers: int = DEFAULT_REBUILD_WORKERS) -> bool:
+    """
+    Rebuild every recorded index, `workers` at a time.
+
+    Returns:
+        True if all of them were rebuilt
+    """
+    with db.engine.connect() as conn:
+        indexes = get_deferred_indexes(conn)
+
+    if not indexes:
+        logger.info("No deferred indexes to rebuild")
+        return True
+
+    logger.info(f"Rebuilding {len(indexes)} deferred indexes with {workers} worker(s)...")
+    start = time.monotonic()
+    failed = 0
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(_rebuild_index, index): index for index in indexes}
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                seconds = future.result()
+                logger.info(f"  ✓ {index['index_name']} on {index['table_name']} ({seconds:.1f}s)")
+            except Exception as e:
+                failed += 1
+                logger.error(f"  ✗ {index['index_name']} on {index['table_name']}: {e}")
+
+    with db.engine.begin() as conn:
+        for table in sorted({index["table_name"] for index in indexes}):
+            conn.execute(text(f'ANALYZE "{table}"'))
+
+    logger.info(
+        f"Rebuilt {len(indexes) - failed}/{len(indexes)} indexes in {time.monotonic() - start:.1f}s"
+    )
+    if failed:
+        logger.error("Run `python etl/index_maintenance.py --rebuild` to retry the rest")
+    return failed == 0
+
+
+def get_index_usage(conn, tables: list[str] | None = None) -> list[dict]:
+    """Scan counts, size and shape of every index (optionally only on `tables`)."""
+    result = conn.execute(
+        text("""
+        SELECT s.relname AS table_name,
+               s.indexrelname AS index_name,
+               s.idx_scan,
+               s.idx_tup_read,
+               pg_relation_size(s.indexrelid) AS size_bytes,
+               x.indisunique OR x.indisprimary AS is_unique,
+               x.indkey::text AS columns,
+               x.indexprs IS NULL AND x.indpred IS NULL AS is_plain,
+               a.amname AS method,
+               pg_get_indexdef(s.indexrelid) AS definition
+        FROM pg_stat_user_indexes s
+        JOIN pg_index x ON x.indexrelid = s.indexrelid
+        JOIN pg_class i ON i.oid = s.indexrelid
+        JOIN pg_am a ON a.oid = i.relam
+        WHERE s.schemaname = current_schema()
+          AND (CAST(:tables AS text[]) IS NULL OR s.relname = ANY(CAST(:tables AS text[])))
+        ORDER BY s.relname, s.indexrelname
+    """),
+        {"tables": tables},
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def find_redundant_indexes(indexes: list[dict]) -> dict[str, str]:
+    """
+    Flag indexes whose work another index on the same table already does.
+
+    An index is redundant when another plain btree index on the same table has
+    the same columns (a duplicate; the unique or more-scanned one is kept) or
+    starts with all of its columns (a prefix). Unique indexes are never flagged,
+    since they enforce a constraint.
+
+    Returns:
+        {index_name: reason}
+    """
+    flags = {}
+    candidates = [index for index in indexes if index["is_plain"] and index["method"] == "btree"]
+    for index in candidates:
+        if index["is_unique"]:
+            continue
+        columns = index["columns"].split()
+        for other in candidates:
+            if other is index or other["table_name"] != index["table_name"]:
+                continue
+            other_columns = other["columns"].split()
+            if other_columns == columns:
+                keep_other = other["is_unique"] or (other["idx_scan"], other["index_name"]) > (
+                    index["idx_scan"],
+                    index["index_name"],
+                )
+                if keep_other:
+                    flags[index["index_name"]] = f"duplicate of {other['index_name']}"
+                    break
+            elif other_columns[: len(columns)] == columns:
+                flags[index["index_name"]] = f"prefix of {other['index_name']}"
+                break
+    return flags
+
+
+def print_usage_report(tables: list[str] | None = None):
+    """Print index usage with unused, duplicate and prefix indexes flagged."""
+    with db.engine.connect() as conn:
+        indexes = get_index_usage(conn, tables)
+        stats_reset = conn.execute(
+            text("SELECT stats_reset FROM pg_stat_database WHERE datname = current_database()")
+        ).scalar()
+
+    redundant = find_redundant_indexes(indexes)
+
+    logger.info("=" * 100)
+    logger.info("Index usage (pg_stat_user_indexes)")
+    logger.info(f"Counting since: {stats_reset or 'statistics never reset'}")
+    logger.info("=" * 100)
+    logger.info(f"{'table':<24} {'index':<36} {'scans':>10} {'size MB':>8}  flags")
+    logger.info("-" * 100)
+
+    for index in indexes:
+        flags = []
+        if index["is_unique"]:
+            flags.append("unique")
+        elif index["idx_scan"] == 0:
+            flags.append("unused")
+        if index["index_name"] in redundant:
+            flags.append(redundant[index["index_name"]])
+        logger.info(
+            f"{index['table_name']:<24} {index['index_name']:<36} {index['idx_scan']:>10} "
+            f"{index['size_bytes'] / 1024 / 1024:>8.1f}  {', '.join(flags)}"
+        )
+
+    unused = [i for i in indexes if not i["is_unique"] and i["idx_scan"] == 0]
+    reclaimable = {i["index_name"]: i["size_bytes"] for i in unused}
+    reclaimable.update(
+        {i["index_name"]: i["size_bytes"] for i in indexes if i["index_name"] in redundant}
+    )
+
+    logger.info("-" * 100)
+    logger.info(
+        f"{len(indexes)} indexes: {len(unused)} unused, {len(redundant)} redundant, "
+        f"{sum(reclaimable.values()) / 1024 / 1024:.1f} MB in candidates for removal"
+    )
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    parser = argparse.ArgumentParser(description="Index usage report and deferred index rebuilds")
+    action = parser.add_mutually_exclusive_group(required=True)
+    action.add_argument("--report", action="store_true", help="Print the index usage report")
+    action.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Rebuild indexes left dropped by an interrupted --defer-indexes run",
+    )
+    parser.add_argument("--tables", nargs="+", help="Only report on these tables")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_REBUILD_WORKERS,
+        help=f"Indexes built at once (default: {DEFAULT_REBUILD_WORKERS})",
+    )
+
+    args = parser.parse_args()
+
+    db.connect()
+    try:
+        if args.report:
+            print_usage_report(args.tables)
+            success = True
+        else:
+            success = rebuild_deferred_indexes(args.workers)
+    finally:
+        db.close()
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
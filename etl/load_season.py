@@ -5,16 +5,30 @@ Main ETL script for loading MNP season data into the database.
 Usage:
     python etl/load_season.py --season 22
     python etl/load_season.py --season 22 --verbose
+    python etl/load_season.py --season 22 --workers 1   # Extract in-process
+    python etl/load_season.py --season 22 --rebuild-partition
+
+--rebuild-partition loads the season's games and scores into fresh tables and
+swaps them in as the season's partitions once the load has finished (see
+etl/loaders/season_partition.py), instead of upserting into the live ones.
+Rows that have disappeared from the source files disappear with it.
 """
 
 import argparse
+import csv
 import json
 import logging
+import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
 
 from etl.config import config
 from etl.database import db
 from etl.loaders.db_loader import DatabaseLoader
+from etl.loaders.season_partition import season_partition_build
 from etl.parsers.ipr_parser import IPRParser
 from etl.parsers.machine_parser import MachineParser
 from etl.parsers.match_parser import MatchParser
@@ -29,7 +43,167 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-def load_season_data(season: int):  # noqa: C901
+# Matches per extraction batch; each batch is loaded before the next is consumed
+MATCHES_PER_BATCH = 25
+
+# Default extraction worker processes (1 = extract in this process)
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Parsers of an extraction worker process, set up once by _init_extract_worker
+_worker_parsers = None
+
+
+def _init_extract_worker(variations_file):
+    global _worker_parsers
+    machine_parser = MachineParser(variations_file)
+    machine_parser.load()
+    machine_parser.build_alias_map()
+    _worker_parsers = (MatchParser(), machine_parser)
+
+
+def extract_batch(matches: list[dict], match_parser=None, machine_parser=None) -> dict:
+    """
+    Extract the rows of a batch of matches, deduplicated within the batch.
+
+    Runs in an extraction worker (using its parsers) or inline when parsers
+    are passed in.
+
+    Returns:
+        {"venues", "venue_machines", "teams", "players", "matches", "games", "scores",
+         "round_points"}
+    """
+    if match_parser is None:
+        match_parser, machine_parser = _worker_parsers
+
+    venues = {}
+    venue_machines = {}
+    teams = {}
+    players = {}
+    batch = {"matches": [], "games": [], "scores": [], "round_points": []}
+
+    for match in matches:
+        rows = match_parser.extract_match_rows(match, machine_parser)
+
+        venues[rows["venue"]["venue_key"]] = rows["venue"]
+        for vm in rows["venue_machines"]:
+            venue_machines[(vm["venue_key"], vm["machine_key"], vm["season"])] = vm
+        for team in rows["teams"]:
+            teams[(team["team_key"], team["season"])] = team
+        for player in rows["players"]:
+            existing = players.get(player["player_key"])
+            if existing:
+                existing["last_seen_season"] = max(
+                    existing["last_seen_season"], player["last_seen_season"]
+                )
+            else:
+                players[player["player_key"]] = player
+
+        batch["matches"].append(rows["match"])
+        batch["games"].extend(rows["games"])
+        batch["scores"].extend(rows["scores"])
+        batch["round_points"].extend(rows["round_points"])
+
+    batch["venues"] = list(venues.values())
+    batch["venue_machines"] = list(venue_machines.values())
+    batch["teams"] = list(teams.values())
+    batch["players"] = list(players.values())
+    return batch
+
+
+def iter_batches(matches: list[dict], machine_parser: MachineParser, workers: int):
+    """
+    Yield extracted batches in match order.
+
+    With more than one worker, extraction runs in a process pool with a
+    bounded number of batches in flight, so extraction of the next batches
+    overlaps with loading the current one without buffering the season.
+    """
+    chunks = [matches[i : i + MATCHES_PER_BATCH] for i in range(0, len(matches), MATCHES_PER_BATCH)]
+
+    if workers <= 1 or len(chunks) <= 1:
+        match_parser = MatchParser()
+        for chunk in chunks:
+            yield extract_batch(chunk, match_parser, machine_parser)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_extract_worker,
+        initargs=(config.MACHINE_VARIATIONS_FILE,),
+    ) as pool:
+        remaining = iter(chunks)
+        in_flight = deque(pool.submit(extract_batch, c) for c in islice(remaining, workers * 2))
+        while in_flight:
+            batch = in_flight.popleft().result()
+            next_chunk = next(remaining, None)
+            if next_chunk is not None:
+                in_flight.append(pool.submit(extract_batch, next_chunk))
+            yield batch
+
+
+def load_venue_metadata() -> dict:
+    """Venue names, addresses and neighborhoods from venues.json"""
+    venues_json_path = config.DATA_PATH / "venues.json"
+    venue_metadata = {}
+    if venues_json_path.exists():
+        with open(venues_json_path) as f:
+            venues_data = json.load(f)
+            for venue_key, venue_info in venues_data.items():
+                venue_metadata[venue_key] = {
+                    "name": venue_info.get("name", ""),
+                    "address": venue_info.get("address", ""),
+                    "neighborhood": venue_info.get("neighborhood", ""),
+                }
+        logger.info(f"  Loaded metadata for {len(venue_metadata)} venues from venues.json")
+    return venue_metadata
+
+
+def load_team_overrides(season: int) -> dict:
+    """Team names and home venues from the season's teams.csv, keyed by team_key"""
+    overrides = {}
+    teams_csv = config.get_season_path(season) / "teams.csv"
+    if teams_csv.exists():
+        logger.info("  Loading team-venue mappings from teams.csv...")
+        with open(teams_csv) as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) >= 3:
+                    overrides[row[0].strip()] = {
+                        "home_venue_key": row[1].strip(),
+                        "team_name": row[2].strip(),
+                    }
+    return overrides
+
+
+def load_batch(
+    loader: DatabaseLoader, batch: dict, venue_metadata: dict, team_overrides: dict
+) -> None:
+    """Enrich one extracted batch and load it, dimensions before facts."""
+    for venue in batch["venues"]:
+        # Enrich with metadata from venues.json (including canonical name)
+        metadata = venue_metadata.get(venue["venue_key"])
+        if metadata:
+            if metadata.get("name"):
+                venue["venue_name"] = metadata["name"]
+            venue["address"] = metadata.get("address")
+            venue["neighborhood"] = metadata.get("neighborhood")
+
+    for team in batch["teams"]:
+        team.update(team_overrides.get(team["team_key"], {}))
+
+    loader.load_venues(batch["venues"])
+    loader.load_venue_machines(batch["venue_machines"])
+    loader.load_teams(batch["teams"])
+    loader.load_players(batch["players"])
+    loader.load_matches(batch["matches"])
+    loader.load_games(batch["games"])
+    loader.load_round_points(batch["round_points"])
+    loader.load_scores_batch(batch["scores"])
+
+
+def load_season_data(  # noqa: C901
+    season: int, workers: int = DEFAULT_WORKERS, rebuild_partition: bool = False
+):
     """Load all data for a season"""
 
     logger.info("=" * 60)
@@ -91,131 +265,55 @@ def load_season_data(season: int):  # noqa: C901
 
     logger.info("")
 
-    # Step 3: Extract and load venues
-    logger.info("Step 3: Extracting venues...")
+    # Step 3: Extract and load venues, teams, players, matches, games and scores.
+    # Each match is walked once; batches are extracted in a process pool and
+    # loaded as they arrive (dimensions first within each batch).
+    logger.info(f"Step 3: Extracting and loading matches ({workers} worker(s))...")
+    venue_keys, team_keys, player_keys = set(), set(), set()
+    match_count = game_count = score_count = 0
+    partition_build = season_partition_build(season) if rebuild_partition else nullcontext()
     try:
-        all_venues = {}
-        all_venue_machines = []
-
-        # Load venue metadata from venues.json
-        venues_json_path = config.DATA_PATH / "venues.json"
-        venue_metadata = {}
-        if venues_json_path.exists():
-            with open(venues_json_path) as f:
-                venues_data = json.load(f)
-                for venue_key, venue_info in venues_data.items():
-                    venue_metadata[venue_key] = {
-                        "name": venue_info.get("name", ""),
-                        "address": venue_info.get("address", ""),
-                        "neighborhood": venue_info.get("neighborhood", ""),
-                    }
-            logger.info(f"  Loaded metadata for {len(venue_metadata)} venues from venues.json")
-
-        for match in matches:
-            venue = match_parser.extract_venue_from_match(match)
-            venue_key = venue["venue_key"]
-
-            # Enrich with metadata from venues.json (including canonical name)
-            if venue_key in venue_metadata:
-                if venue_metadata[venue_key].get("name"):
-                    venue["venue_name"] = venue_metadata[venue_key]["name"]
-                venue["address"] = venue_metadata[venue_key].get("address")
-                venue["neighborhood"] = venue_metadata[venue_key].get("neighborhood")
-
-            all_venues[venue_key] = venue
-
-            venue_machines = match_parser.extract_venue_machines(match)
-            all_venue_machines.extend(venue_machines)
-
-        loader.load_venues(list(all_venues.values()))
-
-        # Deduplicate venue machines
-        unique_vm = {}
-        for vm in all_venue_machines:
-            key = (vm["venue_key"], vm["machine_key"], vm["season"])
-            unique_vm[key] = vm
-
-        loader.load_venue_machines(list(unique_vm.values()))
-
-        logger.info(f"✓ Loaded {len(all_venues)} venues")
+        venue_metadata = load_venue_metadata()
+        team_overrides = load_team_overrides(season)
+
+        with partition_build as builds:
+            if builds:
+                logger.info(f"  Loading games and scores into {', '.join(builds.values())}")
+                loader = DatabaseLoader(games_table=builds["games"], scores_table=builds["scores"])
+
+            for batch in iter_batches(matches, machine_parser, workers):
+                load_batch(loader, batch, venue_metadata, team_overrides)
+
+                venue_keys.update(v["venue_key"] for v in batch["venues"])
+                team_keys.update(t["team_key"] for t in batch["teams"])
+                player_keys.update(p["player_key"] for p in batch["players"])
+                match_count += len(batch["matches"])
+                game_count += len(batch["games"])
+                score_count += len(batch["scores"])
+                logger.info(f"  Loaded {match_count}/{len(matches)} matches")
+
+            # Teams from teams.csv that aren't in any match (possibly didn't play)
+            unplayed = [
+                {"team_key": team_key, "season": season, **override}
+                for team_key, override in team_overrides.items()
+                if team_key not in team_keys
+            ]
+            loader.load_teams(unplayed)
+            team_keys.update(t["team_key"] for t in unplayed)
+
+        logger.info(
+            f"✓ Loaded {len(venue_keys)} venues, {len(team_keys)} teams, "
+            f"{len(player_keys)} players, {match_count} matches, "
+            f"{game_count} games, {score_count} scores"
+        )
     except Exception as e:
-        logger.error(f"Failed to load venues: {e}")
+        logger.error(f"Failed to load match data: {e}")
         return False
 
     logger.info("")
 
-    # Step 4: Extract and load teams
-    logger.info("Step 4: Extracting teams...")
-    try:
-        import csv
-
-        all_teams = {}
-
-        for match in matches:
-            teams = match_parser.extract_teams_from_match(match)
-            for team in teams:
-                key = (team["team_key"], team["season"])
-                all_teams[key] = team
-
-        # Load team-venue mappings from teams.csv if available
-        teams_csv = config.get_season_path(season) / "teams.csv"
-        if teams_csv.exists():
-            logger.info("  Loading team-venue mappings from teams.csv...")
-            with open(teams_csv) as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    if len(row) >= 3:
-                        team_key = row[0].strip()
-                        venue_key = row[1].strip()
-                        team_name = row[2].strip()
-                        key = (team_key, season)
-                        if key in all_teams:
-                            all_teams[key]["home_venue_key"] = venue_key
-                            all_teams[key]["team_name"] = team_name
-                        else:
-                            # Team from CSV not in matches (possibly didn't play)
-                            all_teams[key] = {
-                                "team_key": team_key,
-                                "season": season,
-                                "team_name": team_name,
-                                "home_venue_key": venue_key,
-                            }
-
-        loader.load_teams(list(all_teams.values()))
-        logger.info(f"✓ Loaded {len(all_teams)} teams")
-    except Exception as e:
-        logger.error(f"Failed to load teams: {e}")
-        return False
-
-    logger.info("")
-
-    # Step 5: Extract and load players
-    logger.info("Step 5: Extracting players...")
-    try:
-        all_players = {}
-
-        for match in matches:
-            players = match_parser.extract_players_from_match(match)
-            for player in players:
-                if player["player_key"] in all_players:
-                    # Update last_seen_season
-                    existing = all_players[player["player_key"]]
-                    existing["last_seen_season"] = max(
-                        existing["last_seen_season"], player["last_seen_season"]
-                    )
-                else:
-                    all_players[player["player_key"]] = player
-
-        loader.load_players(list(all_players.values()))
-        logger.info(f"✓ Loaded {len(all_players)} players")
-    except Exception as e:
-        logger.error(f"Failed to load players: {e}")
-        return False
-
-    logger.info("")
-
-    # Step 5b: Load IPR from IPR.csv (source of truth)
-    logger.info("Step 5b: Loading IPR from IPR.csv...")
+    # Step 4: Load IPR from IPR.csv (source of truth)
+    logger.info("Step 4: Loading IPR from IPR.csv...")
     try:
         ipr_parser = IPRParser()
         ipr_path = config.DATA_PATH / "IPR.csv"
@@ -233,70 +331,18 @@ def load_season_data(season: int):  # noqa: C901
 
     logger.info("")
 
-    # Step 6: Load matches
-    logger.info("Step 6: Loading match metadata...")
-    try:
-        match_metadata = []
-        for match in matches:
-            metadata = match_parser.extract_match_metadata(match)
-            match_metadata.append(metadata)
-
-        loader.load_matches(match_metadata)
-        logger.info(f"✓ Loaded {len(match_metadata)} matches")
-    except Exception as e:
-        logger.error(f"Failed to load match metadata: {e}")
-        return False
-
-    logger.info("")
-
-    # Step 7: Load games
-    logger.info("Step 7: Loading games...")
-    try:
-        all_games = []
-        for match in matches:
-            games = match_parser.extract_games_from_match(match)
-
-            # Normalize machine keys
-            for game in games:
-                game["machine_key"] = machine_parser.normalize_machine_key(game["machine_key"])
-
-            all_games.extend(games)
-
-        loader.load_games(all_games)
-        logger.info(f"✓ Loaded {len(all_games)} games")
-    except Exception as e:
-        logger.error(f"Failed to load games: {e}")
-        return False
-
-    logger.info("")
-
-    # Step 8: Load scores
-    logger.info("Step 8: Loading scores...")
-    try:
-        all_scores = []
-        for match in matches:
-            scores = match_parser.extract_scores_from_match(match, machine_parser)
-            all_scores.extend(scores)
-
-        loader.load_scores_batch(all_scores)
-        logger.info(f"✓ Loaded {len(all_scores)} scores")
-    except Exception as e:
-        logger.error(f"Failed to load scores: {e}")
-        return False
-
-    logger.info("")
     logger.info("=" * 60)
     logger.info(f"ETL Complete for Season {season}!")
     logger.info("=" * 60)
     logger.info("")
     logger.info("Summary:")
     logger.info(f"  Machines: {len(machines)}")
-    logger.info(f"  Venues: {len(all_venues)}")
-    logger.info(f"  Teams: {len(all_teams)}")
-    logger.info(f"  Players: {len(all_players)}")
-    logger.info(f"  Matches: {len(match_metadata)}")
-    logger.info(f"  Games: {len(all_games)}")
-    logger.info(f"  Scores: {len(all_scores)}")
+    logger.info(f"  Venues: {len(venue_keys)}")
+    logger.info(f"  Teams: {len(team_keys)}")
+    logger.info(f"  Players: {len(player_keys)}")
+    logger.info(f"  Matches: {match_count}")
+    logger.info(f"  Games: {game_count}")
+    logger.info(f"  Scores: {score_count}")
     logger.info("")
 
     return True
@@ -308,6 +354,17 @@ def main():
     parser.add_argument(
         "--season", type=int, required=True, help="Season number to load (e.g., 22)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Extraction worker processes (default: {DEFAULT_WORKERS}; 1 = in-process)",
+    )
+    parser.add_argument(
+        "--rebuild-partition",
+        action="store_true",
+        help="Load games and scores into fresh tables and swap them in as the season's partitions",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -323,7 +380,7 @@ def main():
         sys.exit(1)
 
     # Load season data
-    success = load_season_data(args.season)
+    success = load_season_data(args.season, args.workers, args.rebuild_partition)
 
     # Close database connection
     db.close()
@@ -0,0 +1,66 @@
+"""
+Bulk UPDATE helper for writing many computed rows in one statement.
+
+Scripts that compute a value per row in Python (match point totals, ratings,
+...) used to send one UPDATE per row, which is hundreds of round trips against
+a remote database. bulk_update ships every (key, values) row as one array per
+column and applies them with a single UPDATE ... FROM unnest(...).
+"""
+
+import logging
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+def bulk_update(
+    conn,
+    table: str,
+    key: tuple[str, str],
+    columns: dict[str, str],
+    rows: list[tuple],
+    touch_updated_at: bool = True,
+) -> int:
+    """
+    Update many rows of a table in one statement.
+
+    Args:
+        conn: Open connection; the caller owns the transaction
+        table: Table to update
+        key: (column, SQL type) identifying each row, e.g. ("match_key", "text")
+        columns: {column: SQL type} to set, in the order they appear in each row
+        rows: Tuples of (key, *values), values in `columns` order
+        touch_updated_at: Also set updated_at = CURRENT_TIMESTAMP
+
+    Returns:
+        Number of table rows updated
+    """
+    if not rows:
+        return 0
+
+    names = [key[0], *columns]
+    types = [key[1], *columns.values()]
+    width = len(names)
+    if any(len(row) != width for row in rows):
+        raise ValueError(f"bulk_update on {table}: every row needs {width} values ({names})")
+
+    # One array parameter per column; unnest zips them back into rows server-side
+    params = {f"c{i}": [row[i] for row in rows] for i in range(width)}
+    arrays = ", ".join(f"CAST(:c{i} AS {sql_type}[])" for i, sql_type in enumerate(types))
+
+    assignments = [f"{column} = v.{column}" for column in columns]
+    if touch_updated_at:
+        assignments.append("updated_at = CURRENT_TIMESTAMP")
+
+    result = conn.execute(
+        text(f"""
+            UPDATE {table} t
+            SET {", ".join(assignments)}
+            FROM unnest({arrays}) AS v({", ".join(names)})
+            WHERE t.{key[0]} = v.{key[0]}
+        """),
+        params,
+    )
+    logger.debug(f"bulk_update {table}: {len(rows)} rows sent, {result.rowcount} updated")
+    return result.rowcount
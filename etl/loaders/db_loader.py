@@ -10,6 +10,7 @@ from sqlalchemy import text
 
 from etl.config import config
 from etl.database import db
+from etl.loaders.season_partition import ensure_season_partitions
 
 logger = logging.getLogger(__name__)
 
@@ -17,8 +18,16 @@ logger = logging.getLogger(__name__)
 class DatabaseLoader:
     """Load transformed data into PostgreSQL"""
 
-    def __init__(self):
+    def __init__(self, games_table: str = "games", scores_table: str = "scores"):
+        """
+        Args:
+            games_table, scores_table: Where games and scores are written. The
+                defaults are the live season-partitioned tables; a partition
+                rebuild passes its build tables (see loaders/season_partition.py).
+        """
         self.db = db
+        self.games_table = games_table
+        self.scores_table = scores_table
         if not self.db.engine:
             self.db.connect()
 
@@ -358,9 +367,13 @@ class DatabaseLoader:
             return 0
 
         count = 0
+        updated = 0
         machines_created = 0
 
         with self.db.engine.begin() as conn:
+            if self.games_table == "games":
+                ensure_season_partitions(conn, {game["season"] for game in games})
+
             for game in games:
                 # First, ensure the machine exists - create if missing
                 result = conn.execute(
@@ -388,32 +401,69 @@ class DatabaseLoader:
 
                 # Now insert the game
                 result = conn.execute(
-                    text("""
-                    INSERT INTO games (
+                    text(f"""
+                    INSERT INTO {self.games_table} (
                         match_key, round_number, game_number, machine_key, done,
-                        season, week, venue_key
+                        season, week, venue_key, home_points, away_points
                     )
                     VALUES (
                         :match_key, :round_number, :game_number, :machine_key, :done,
-                        :season, :week, :venue_key
+                        :season, :week, :venue_key, :home_points, :away_points
                     )
-                    ON CONFLICT (match_key, round_number, game_number) DO NOTHING
-                    RETURNING game_id
+                    ON CONFLICT (match_key, round_number, game_number, season) DO UPDATE SET
+                        home_points = EXCLUDED.home_points,
+                        away_points = EXCLUDED.away_points
+                    WHERE ({self.games_table}.home_points, {self.games_table}.away_points)
+                        IS DISTINCT FROM (EXCLUDED.home_points, EXCLUDED.away_points)
+                    RETURNING game_id, (xmax = 0) AS inserted
                 """),
                     game,
                 )
 
-                # Store game_id for scores loading
+                # Store game_id for scores loading; xmax is 0 only for a new row
                 row = result.fetchone()
                 if row:
-                    game["game_id"] = row[0]
-                    count += 1
+                    game["game_id"] = row.game_id
+                    if row.inserted:
+                        count += 1
+                    else:
+                        updated += 1
 
         if machines_created > 0:
             logger.info(f"Auto-created {machines_created} missing machines")
         logger.info(f"Loaded {count} games")
+        if updated:
+            logger.info(f"Updated points of {updated} existing games")
         return count
 
+    def load_round_points(self, round_points: list[dict]) -> int:
+        """Load per-round team points and running totals (match_round_points), upserting"""
+        if not round_points:
+            return 0
+
+        with self.db.engine.begin() as conn:
+            conn.execute(
+                text("""
+                INSERT INTO match_round_points (
+                    match_key, round_number, season, week,
+                    home_points, away_points, home_total, away_total
+                )
+                VALUES (
+                    :match_key, :round_number, :season, :week,
+                    :home_points, :away_points, :home_total, :away_total
+                )
+                ON CONFLICT (match_key, round_number) DO UPDATE SET
+                    home_points = EXCLUDED.home_points,
+                    away_points = EXCLUDED.away_points,
+                    home_total = EXCLUDED.home_total,
+                    away_total = EXCLUDED.away_total
+            """),
+                round_points,
+            )
+
+        logger.info(f"Loaded {len(round_points)} round point totals")
+        return len(round_points)
+
     def load_scores_batch(self, scores: list[dict], batch_size: int = None) -> int:
         """Load scores in batches for performance"""
         if not scores:
@@ -427,9 +477,9 @@ class DatabaseLoader:
         with self.db.engine.connect() as conn:
             # Get all game_ids
             result = conn.execute(
-                text("""
+                text(f"""
                 SELECT game_id, match_key, round_number
-                FROM games
+                FROM {self.games_table}
                 WHERE match_key = ANY(:match_keys)
             """),
                 {"match_keys": list(set(s["match_key"] for s in scores))},
@@ -462,8 +512,8 @@ class DatabaseLoader:
                         ipr = None
 
                     conn.execute(
-                        text("""
-                        INSERT INTO scores (
+                        text(f"""
+                        INSERT INTO {self.scores_table} (
                             game_id, player_key, player_position, score,
                             team_key, is_home_team, player_ipr, is_substitute,
                             match_key, venue_key, machine_key,
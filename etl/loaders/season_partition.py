@@ -0,0 +1,157 @@
+"""
+Season partitions of scores and games (migration 014).
+
+Both tables are LIST-partitioned on season, one partition per season named
+<table>_s<season>. Loaders call ensure_season_partitions before inserting a
+season's rows; there is no default partition to catch rows for a season that
+has none.
+
+season_partition_build rebuilds whole seasons without touching the live
+partitions: the rows are loaded into standalone build tables shaped like the
+parents (with the parents' keys in place so upserts work), the secondary
+indexes are built once at the end, and the builds replace the live partitions
+with DETACH/ATTACH in one short transaction. A CHECK (season = N) on each build
+lets ATTACH skip its validation scan, and ATTACH adopts the prebuilt indexes
+instead of building new ones.
+"""
+
+import logging
+import re
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from etl.database import db
+from etl.index_maintenance import get_secondary_indexes
+
+logger = logging.getLogger(__name__)
+
+# Season-partitioned tables, referenced before referencing (scores -> games)
+SEASON_PARTITIONED_TABLES = ["games", "scores"]
+
+
+def partition_name(table: str, season: int) -> str:
+    return f"{table}_s{season}"
+
+
+def ensure_season_partitions(conn, seasons, tables: list[str] = SEASON_PARTITIONED_TABLES):
+    """Create any missing <table>_s<season> partitions."""
+    for table in tables:
+        for season in sorted(seasons):
+            conn.execute(
+                text("SELECT create_season_partition(:table, :season)"),
+                {"table": table, "season": season},
+            )
+
+
+def get_key_constraints(conn, table: str) -> list[str]:
+    """Primary key and unique constraint definitions of a table."""
+    result = conn.execute(
+        text("""
+        SELECT pg_get_constraintdef(oid)
+        FROM pg_constraint
+        WHERE conrelid = CAST(:table AS regclass)
+          AND contype IN ('p', 'u')
+        ORDER BY contype, conname
+    """),
+        {"table": table},
+    )
+    return [row[0] for row in result]
+
+
+def create_build_table(conn, table: str, build: str, season: int):
+    """Standalone table shaped like `table`, keyed like it and limited to one season."""
+    conn.execute(text(f"DROP TABLE IF EXISTS {build}"))
+    conn.execute(
+        text(f"CREATE TABLE {build} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    )
+    conn.execute(text(f"ALTER TABLE {build} ADD CHECK (season = {int(season)})"))
+    for definition in get_key_constraints(conn, table):
+        conn.execute(text(f"ALTER TABLE {build} ADD {definition}"))
+
+
+def create_secondary_indexes(conn, table: str, build: str) -> int:
+    """Build the parent's secondary indexes on a build table so ATTACH can adopt them."""
+    indexes = get_secondary_indexes(conn, [table])
+    for index in indexes:
+        # "CREATE INDEX idx ON ONLY public.scores USING ..." -> "CREATE INDEX ON build USING ..."
+        definition = re.sub(
+            r"^CREATE INDEX \S+ ON (ONLY )?\S+ ",
+            f"CREATE INDEX ON {build} ",
+            index["definition"],
+            count=1,
+        )
+        conn.execute(text(definition))
+    return len(indexes)
+
+
+def swap_in(conn, builds: dict[str, str], season: int):
+    """Replace the season's live partitions with the build tables."""
+    # Referencing partitions go first, so games_sN has no scores pointing at it
+    for table in reversed(list(builds)):
+        partition = partition_name(table, season)
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": partition}).scalar():
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition}"))
+            conn.execute(text(f"DROP TABLE {partition}"))
+
+    for table, build in builds.items():
+        partition = partition_name(table, season)
+        conn.execute(text(f"ALTER TABLE {build} RENAME TO {partition}"))
+        index_names = conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :name"),
+            {"name": partition},
+        ).scalars()
+        for index_name in index_names:
+            if index_name.startswith(build):
+                new_name = partition + index_name[len(build) :]
+                conn.execute(text(f'ALTER INDEX "{index_name}" RENAME TO "{new_name}"'))
+        conn.execute(
+            text(f"ALTER TABLE {table} ATTACH PARTITION {partition} FOR VALUES IN ({int(season)})")
+        )
+
+
+@contextmanager
+def season_partition_build(season: int, tables: list[str] = SEASON_PARTITIONED_TABLES):
+    """
+    Load a season into fresh build tables, then swap them in as its partitions.
+
+    Usage:
+        with season_partition_build(22) as builds:
+            loader = DatabaseLoader(games_table=builds["games"], scores_table=builds["scores"])
+            ...
+
+    Everything that references the season's rows (matches, players, machines,
+    venues) must already be loaded when the block exits, because ATTACH
+    validates the foreign keys. If the block or the swap fails, the build
+    tables are dropped and the live partitions are left as they were.
+
+    Yields:
+        {table: build_table_name}
+    """
+    builds = {table: f"{partition_name(table, season)}_build" for table in tables}
+
+    with db.engine.begin() as conn:
+        for table, build in builds.items():
+            create_build_table(conn, table, build, season)
+
+    try:
+        yield builds
+
+        with db.engine.begin() as conn:
+            for table, build in builds.items():
+                count = create_secondary_indexes(conn, table, build)
+                conn.execute(text(f"ANALYZE {build}"))
+                logger.info(f"  Built {count} secondary indexes on {build}")
+
+        # Swap: DETACH takes an exclusive lock on the parent, held only for
+        # the renames and the ATTACH (no partition-constraint scan thanks to
+        # the CHECK; scores' foreign keys are still validated)
+        with db.engine.begin() as conn:
+            swap_in(conn, builds, season)
+    except Exception:
+        with db.engine.begin() as conn:
+            for build in reversed(list(builds.values())):
+                conn.execute(text(f"DROP TABLE IF EXISTS {build}"))
+        raise
+
+    logger.info(f"Attached rebuilt season {season} partitions of {', '.join(tables)}")
@@ -0,0 +1,298 @@
+"""
+Columnar snapshots of a season's scores for the aggregate scripts.
+
+The aggregate scripts used to query scores each with slightly different
+columns (and calculate_team_machine_picks with matches joined). A season
+snapshot holds one season's scores, with the match columns they need, as one
+.npy file per column, which the scripts memory-map and aggregate with NumPy.
+
+Snapshot layout (config.SEASON_SNAPSHOT_DIR/season-<N>/):
+    manifest.json       {"format", "season", "signature", "rows", "columns"}
+    dictionaries.json   {dictionary: [key, ...]} - sorted, a code is an index
+    <column>.npy        One array per column in SNAPSHOT_COLUMNS
+
+String columns hold int32 codes into a dictionary; team_key, home_team_key
+and away_team_key share the "team" dictionary. Because dictionaries are
+sorted, ordering by codes orders by key.
+
+The pipeline DAG writes each season's snapshot once, as its own task after
+the steps that change scores and matches (load_season, deduplicate_players,
+backfill_match_machines) and before the scripts that read it. Readers check
+that the snapshot is still current by its signature, a cheap stamp rather than
+a scan (season_signature), and rebuild it first if not; a Postgres advisory
+lock makes concurrent readers of a stale season wait for one rebuild instead
+of each doing their own. Snapshots are written to a temp directory and renamed
+into place; if SEASON_SNAPSHOT_DIR isn't writable the freshly read snapshot is
+used from memory.
+"""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+from sqlalchemy import text
+
+from etl.config import config
+from etl.database import db
+from etl.pipeline_dag import Resource, external_stamp, table_markers, table_signature
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout or the columns change
+SNAPSHOT_FORMAT = 1
+
+# pg_advisory_lock(REBUILD_LOCK, season) serializes rebuilds of a season
+REBUILD_LOCK = 7_251
+
+# (column, dtype, dictionary or None, SQL expression)
+SNAPSHOT_COLUMNS = [
+    ("score_id", np.int64, None, "s.score_id"),
+    ("score", np.int64, None, "s.score"),
+    ("week", np.int8, None, "s.week"),
+    ("round_number", np.int8, None, "s.round_number"),
+    ("player_position", np.int8, None, "s.player_position"),
+    ("is_home_team", np.bool_, None, "s.is_home_team"),
+    ("is_substitute", np.bool_, None, "COALESCE(s.is_substitute, false)"),
+    ("player_key", np.int32, "player", "s.player_key"),
+    ("machine_key", np.int32, "machine", "s.machine_key"),
+    ("venue_key", np.int32, "venue", "s.venue_key"),
+    ("team_key", np.int32, "team", "s.team_key"),
+    ("match_key", np.int32, "match", "s.match_key"),
+    ("home_team_key", np.int32, "team", "COALESCE(m.home_team_key, '')"),
+    ("away_team_key", np.int32, "team", "COALESCE(m.away_team_key, '')"),
+    ("match_complete", np.bool_, None, "COALESCE(m.state = 'complete', false)"),
+]
+
+
+class SeasonSnapshot:
+    """One season's scores as (memory-mapped) NumPy columns."""
+
+    def __init__(self, season: int, signature: str, columns: dict, dictionaries: dict):
+        self.season = season
+        self.signature = signature
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __len__(self) -> int:
+        return len(self.columns["score"])
+
+    def keys(self, column: str) -> np.ndarray:
+        """Dictionary of a coded column (code -> key)."""
+        return self.dictionaries[_dictionary_of(column)]
+
+    def decode(self, column: str, codes: np.ndarray | None = None) -> np.ndarray:
+        """Keys of a coded column, for all rows or for the given codes."""
+        return self.keys(column)[self.columns[column] if codes is None else codes]
+
+    def grouped_rows(self, *by: str) -> dict[tuple, np.ndarray]:
+        """{(key, ...): row indexes by ascending score} per combination of coded columns."""
+        if not len(self):
+            return {}
+        codes = [np.asarray(self.columns[column]) for column in by]
+        order = np.lexsort([self.columns["score"], *reversed(codes)])
+        codes = [column[order] for column in codes]
+        changed = np.zeros(len(order) - 1, dtype=bool)
+        for column in codes:
+            changed |= column[1:] != column[:-1]
+        starts = np.flatnonzero(np.r_[True, changed])
+        keys = zip(*(self.decode(name, column[starts]) for name, column in zip(by, codes)))
+        return dict(zip(keys, np.split(order, starts[1:])))
+
+
+def _dictionary_of(column: str) -> str:
+    return next(dictionary for name, _, dictionary, _ in SNAPSHOT_COLUMNS if name == column)
+
+
+def snapshot_path(season: int) -> Path:
+    return config.SEASON_SNAPSHOT_DIR / f"season-{season}"
+
+
+def season_signature(conn, season: int) -> str:
+    """
+    Stamp of the rows a season's snapshot is built from, without reading the scores.
+
+    - scores: the change markers of the season's partition (pipeline_dag's
+      table_markers; a content hash only if track_counts is off)
+    - matches: a hash of just the columns the snapshot holds, over the
+      season's few hundred matches, so calculate_match_points writing point
+      totals doesn't make the snapshot stale
+    - the latest data version stamped outside the pipeline (hand fixes)
+    """
+    scores = Resource(f"scores@{season}")
+    if conn.execute(text("SELECT current_setting('track_counts')")).scalar() == "on":
+        scores_stamp = table_markers(conn, scores)
+    else:
+        scores_stamp = table_signature(conn, scores)
+    matches = conn.execute(
+        text("""
+        SELECT COUNT(*),
+               COALESCE(SUM(hashtext(
+                   concat_ws('|', match_key, home_team_key, away_team_key, state)
+               )::bigint), 0)
+        FROM matches
+        WHERE season = :season
+    """),
+        {"season": season},
+    ).fetchone()
+    external = external_stamp(conn)
+    return f"scores:{scores_stamp}|matches:{matches[0]}:{matches[1]}|external:{external}"
+
+
+def _read(season: int) -> SeasonSnapshot:
+    """Build a snapshot from the database (in memory)."""
+    select = ", ".join(expression for _, _, _, expression in SNAPSHOT_COLUMNS)
+    with db.engine.connect() as conn:
+        # Stamp first: the rows, read after it, include every write it shows,
+        # so a write in between can only make the snapshot look stale
+        signature = season_signature(conn, season)
+        rows = conn.execute(
+            text(f"""
+            SELECT {select}
+            FROM scores s
+            LEFT JOIN matches m ON s.match_key = m.match_key
+            WHERE s.season = :season
+            ORDER BY s.score_id
+        """),
+            {"season": season},
+        ).fetchall()
+
+    values = dict(zip([name for name, *_ in SNAPSHOT_COLUMNS], zip(*rows))) if rows else {}
+    dictionary_keys = {}
+    for name, _, dictionary, _ in SNAPSHOT_COLUMNS:
+        if dictionary:
+            dictionary_keys.setdefault(dictionary, set()).update(values.get(name, ()))
+    dictionaries = {
+        name: np.array(sorted(keys), dtype=object) for name, keys in dictionary_keys.items()
+    }
+
+    columns = {}
+    for name, dtype, dictionary, _ in SNAPSHOT_COLUMNS:
+        column = values.get(name, ())
+        if dictionary:
+            codes = {key: code for code, key in enumerate(dictionaries[dictionary])}
+            column = [codes[key] for key in column]
+        columns[name] = np.array(column, dtype=dtype)
+
+    logger.info(f"Read season {season} snapshot from the database: {len(rows)} scores")
+    return SeasonSnapshot(season, signature, columns, dictionaries)
+
+
+def _write(snapshot: SeasonSnapshot) -> Path | None:
+    """Write a snapshot to its directory, replacing any older one."""
+    path = snapshot_path(snapshot.season)
+    tmp = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp"))
+        for name, column in snapshot.columns.items():
+            np.save(tmp / f"{name}.npy", column, allow_pickle=False)
+        (tmp / "dictionaries.json").write_text(
+            json.dumps({name: keys.tolist() for name, keys in snapshot.dictionaries.items()})
+        )
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "season": snapshot.season,
+            "signature": snapshot.signature,
+            "rows": len(snapshot),
+            "columns": {name: dictionary for name, _, dictionary, _ in SNAPSHOT_COLUMNS},
+        }
+        (tmp / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+        # Directories can't be replaced atomically: move the old one aside first.
+        # Readers that already mapped its files keep them until they're done.
+        old = path.with_name(f"{path.name}.{uuid.uuid4().hex}.old")
+        if path.exists():
+            os.rename(path, old)
+        os.rename(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+        return path
+    except OSError as e:
+        logger.warning(f"Could not write season snapshot {path}: {e}")
+        if tmp is not None:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return None
+
+
+def _open(path: Path) -> SeasonSnapshot | None:
+    """Memory-map a snapshot directory; None if missing, unreadable or another format."""
+    try:
+        manifest = json.loads((path / "manifest.json").read_text())
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            return None
+        dictionaries = {
+            name: np.array(keys, dtype=object)
+            for name, keys in json.loads((path / "dictionaries.json").read_text()).items()
+        }
+        columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+            for name in manifest["columns"]
+        }
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable season snapshot {path}: {e}")
+        return None
+    return SeasonSnapshot(manifest["season"], manifest["signature"], columns, dictionaries)
+
+
+@contextmanager
+def _rebuild_lock(season: int):
+    """Hold the season's rebuild lock; yields the connection holding it."""
+    params = {"lock": REBUILD_LOCK, "season": season}
+    with db.engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:lock, :season)"), params)
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+            conn.execute(text("SELECT pg_advisory_unlock(:lock, :season)"), params)
+
+
+def write_season_snapshot(season: int) -> Path | None:
+    """
+    Snapshot a season's scores now; the pipeline's season_snapshot task.
+
+    Returns:
+        The directory written, or None if SEASON_SNAPSHOT_DIR isn't writable
+    """
+    with _rebuild_lock(season):
+        path = _write(_read(season))
+    if path:
+        logger.info(f"Wrote season {season} snapshot to {path}")
+    return path
+
+
+def load_season_snapshot(season: int) -> SeasonSnapshot:
+    """
+    A season's scores as memory-mapped columns, rebuilt first if stale.
+
+    Args:
+        season: Season number
+
+    Returns:
+        SeasonSnapshot matching the database's current rows
+    """
+    snapshot = _open(snapshot_path(season))
+    if snapshot is not None:
+        with db.engine.connect() as conn:
+            if snapshot.signature == season_signature(conn, season):
+                return snapshot
+
+    with _rebuild_lock(season) as conn:
+        # Another reader may have rebuilt it while this one waited for the lock
+        snapshot = _open(snapshot_path(season))
+        if snapshot is not None and snapshot.signature == season_signature(conn, season):
+            return snapshot
+        logger.info(f"Season {season} snapshot is {'stale' if snapshot else 'missing'}; rebuilding")
+        snapshot = _read(season)
+        path = _write(snapshot)
+    return (_open(path) if path else None) or snapshot
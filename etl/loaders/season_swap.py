@@ -0,0 +1,74 @@
+"""
+Shadow build and swap for per-season aggregate tables.
+
+Aggregate scripts used to DELETE a season's rows and re-insert them, so API
+readers saw a half-populated season while the script ran, and a failed run left
+it empty. season_shadow builds the new rows in a session temp table shaped like
+the live table, checks their keys there, and then replaces the season's live
+rows in one short transaction. Readers see either the old season or the new
+one, and nothing touches the live table until the build has succeeded.
+"""
+
+import logging
+from contextlib import contextmanager
+
+from sqlalchemy import text
+
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+
+@contextmanager
+def season_shadow(table: str, season: int, key_columns: list[str], scope: str | None = None):
+    """
+    Build a season's rows of an aggregate table in a shadow, then swap them in.
+
+    Usage:
+        with season_shadow("team_machine_picks", 22, [...]) as (conn, shadow):
+            conn.execute(text(f"INSERT INTO {shadow} ..."), records)
+
+    Args:
+        table: Live aggregate table
+        season: Season being rebuilt; every shadow row must belong to it
+        key_columns: Primary/unique key of the table, checked on the shadow
+        scope: Extra SQL condition limiting which of the season's live rows are
+            replaced (e.g. "venue_key = '_ALL_'"); rows outside it are kept
+
+    Yields:
+        (conn, shadow_table_name); insert the new rows through conn
+    """
+    shadow = f"{table}_shadow"
+    scope_sql = f"season = :season AND ({scope or 'TRUE'})"
+    params = {"season": season}
+
+    with db.engine.connect() as conn:
+        # Build: nothing here is visible to other sessions, and an exception
+        # rolls the shadow back with the transaction
+        with conn.begin():
+            conn.execute(text(f"DROP TABLE IF EXISTS pg_temp.{shadow}"))
+            conn.execute(
+                text(
+                    f"CREATE TEMP TABLE {shadow} "
+                    f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+                )
+            )
+
+            yield conn, shadow
+
+            # Duplicate keys fail here, before the live table is touched
+            conn.execute(text(f"ALTER TABLE {shadow} ADD UNIQUE ({', '.join(key_columns)})"))
+            stray = conn.execute(
+                text(f"SELECT COUNT(*) FROM {shadow} WHERE NOT ({scope_sql})"), params
+            ).scalar()
+            if stray:
+                raise ValueError(f"{stray} {shadow} rows fall outside season {season}'s scope")
+            conn.execute(text(f"ANALYZE {shadow}"))
+
+        # Swap: one short transaction, row locks only
+        with conn.begin():
+            deleted = conn.execute(text(f"DELETE FROM {table} WHERE {scope_sql}"), params).rowcount
+            inserted = conn.execute(text(f"INSERT INTO {table} SELECT * FROM {shadow}")).rowcount
+            conn.execute(text(f"DROP TABLE {shadow}"))
+
+    logger.info(f"Swapped season {season} of {table}: {deleted} rows replaced by {inserted}")
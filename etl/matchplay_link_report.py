@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Bulk auto-link report for MNP players against cached Matchplay users.
+
+Instead of searching the Matchplay API once per player, this scores every
+unlinked MNP player against the roster of Matchplay users already held in
+the local response cache (search results and profiles stored in
+matchplay_response_cache). Names are blocked through a trigram/token index
+(see RosterIndex in api/services/player_matcher.py), so the whole player
+table is matched in seconds with zero API calls.
+
+Usage:
+    python etl/matchplay_link_report.py                        # Print the top of the report
+    python etl/matchplay_link_report.py --output links.csv     # Write the full report as CSV
+    python etl/matchplay_link_report.py --min-confidence 0.8   # Only strong candidates
+    python etl/matchplay_link_report.py --apply                # Create links for exact matches
+
+Only players with exactly one exact (case-insensitive) name match are ever
+linked automatically, matching the rule used by the link dialog. Everything
+else stays in the report for manual review.
+"""
+
+import argparse
+import csv
+import logging
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from etl.database import db
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+
+def get_unlinked_players(conn) -> list[dict]:
+    """Get MNP players that are not linked to a Matchplay account yet."""
+    result = conn.execute(
+        text("""
+        SELECT p.player_key, p.name
+        FROM players p
+        LEFT JOIN matchplay_player_mappings m ON m.mnp_player_key = p.player_key
+        WHERE m.id IS NULL
+        ORDER BY p.name
+    """)
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def get_cached_roster(conn) -> list[dict]:
+    """
+    Collect every Matchplay user seen in cached search results and profiles.
+
+    Users already linked to an MNP player are excluded. When a user appears
+    in several cached responses, the most recently fetched copy wins.
+    """
+    result = conn.execute(
+        text("""
+        WITH seen AS (
+            SELECT
+                CAST(COALESCE(u->>'userId', u->>'id') AS INTEGER) AS user_id,
+                u->>'name' AS name,
+                u->>'location' AS location,
+                u->>'ifpaId' AS ifpa_id,
+                c.fetched_at
+            FROM matchplay_response_cache c
+            CROSS JOIN jsonb_array_elements(c.body->'data') AS u
+            WHERE c.endpoint = 'search_users'
+            UNION ALL
+            SELECT
+                CAST(COALESCE(c.body->'user'->>'userId', c.body->'user'->>'id') AS INTEGER),
+                c.body->'user'->>'name',
+                c.body->'user'->>'location',
+                c.body->'user'->>'ifpaId',
+                c.fetched_at
+            FROM matchplay_response_cache c
+            WHERE c.endpoint = 'user_profile'
+        )
+        SELECT DISTINCT ON (s.user_id)
+            s.user_id AS "userId", s.name, s.location, s.ifpa_id AS "ifpaId"
+        FROM seen s
+        LEFT JOIN matchplay_player_mappings m ON m.matchplay_user_id = s.user_id
+        WHERE s.user_id IS NOT NULL AND s.name IS NOT NULL AND m.id IS NULL
+        ORDER BY s.user_id, s.fetched_at DESC
+    """)
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def write_csv(report: list[dict], output_path: str):
+    """Write one row per (player, candidate), ranked like the report."""
+    with open(output_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            [
+                "player_key",
+                "mnp_name",
+                "rank",
+                "matchplay_user_id",
+                "matchplay_name",
+                "location",
+                "confidence",
+                "auto_link_eligible",
+            ]
+        )
+        for entry in report:
+            if not entry["matches"]:
+                writer.writerow([entry["player_key"], entry["name"], "", "", "", "", 0.0, False])
+            for rank, match in enumerate(entry["matches"], 1):
+                user = match["user"]
+                writer.writerow(
+                    [
+                        entry["player_key"],
+                        entry["name"],
+                        rank,
+                        user["userId"],
+                        user["name"],
+                        user.get("location") or "",
+                        match["confidence"],
+                        entry["auto_link_eligible"] and match["auto_link_eligible"],
+                    ]
+                )
+
+
+def apply_exact_links(conn, report: list[dict]) -> int:
+    """Create 'auto' mappings for players with a single exact name match."""
+    rows = []
+    for entry in report:
+        if not entry["auto_link_eligible"]:
+            continue
+        user = entry["matches"][0]["user"]
+        rows.append(
+            {
+                "mnp_player_key": entry["player_key"],
+                "matchplay_user_id": user["userId"],
+                "matchplay_name": user["name"],
+                "ifpa_id": int(user["ifpaId"]) if user.get("ifpaId") else None,
+                "created_at": datetime.utcnow(),
+            }
+        )
+
+    if not rows:
+        return 0
+
+    # Two MNP players could exact-match the same Matchplay user; the unique
+    # constraints make the second one a no-op instead of an error, so only
+    # inserted rows are counted
+    result = conn.execute(
+        text("""
+        INSERT INTO matchplay_player_mappings
+            (mnp_player_key, matchplay_user_id, matchplay_name, ifpa_id, match_method, created_at)
+        VALUES
+            (:mnp_player_key, :matchplay_user_id, :matchplay_name, :ifpa_id, 'auto', :created_at)
+        ON CONFLICT DO NOTHING
+    """),
+        rows,
+    )
+    conn.commit()
+    return result.rowcount
+
+
+def run_report(
+    output: str = None, min_confidence: float = 0.5, apply: bool = False, top: int = 25
+) -> bool:
+    """Build the auto-link report for all unlinked players."""
+    from api.services.player_matcher import PlayerMatcher
+
+    db.connect()
+
+    try:
+        with db.engine.connect() as conn:
+            players = get_unlinked_players(conn)
+            roster = get_cached_roster(conn)
+            logger.info(
+                f"Matching {len(players)} unlinked players against "
+                f"{len(roster)} cached Matchplay users"
+            )
+
+            if not roster:
+                logger.warning(
+                    "No Matchplay users in the response cache yet. Lookups from the "
+                    "link dialog and /matchplay/search/users populate it."
+                )
+                return True
+
+            started = time.perf_counter()
+            matcher = PlayerMatcher(client=None)
+            report = matcher.bulk_match(players, roster, min_similarity=min_confidence)
+            elapsed = time.perf_counter() - started
+
+            eligible = [r for r in report if r["auto_link_eligible"]]
+            with_candidates = [r for r in report if r["matches"]]
+
+            logger.info("=" * 60)
+            logger.info("Matchplay Auto-Link Report")
+            logger.info("=" * 60)
+            logger.info(f"Players matched: {len(report)} in {elapsed:.2f}s")
+            logger.info(f"With candidates >= {min_confidence}: {len(with_candidates)}")
+            logger.info(f"Auto-link eligible (single exact match): {len(eligible)}")
+            logger.info("-" * 60)
+            for entry in with_candidates[:top]:
+                best = entry["matches"][0]
+                flag = "AUTO" if entry["auto_link_eligible"] else "    "
+                logger.info(
+                    f"{flag} {best['confidence']:.3f}  {entry['name']} -> "
+                    f"{best['user']['name']} (user {best['user']['userId']})"
+                )
+            logger.info("=" * 60)
+
+            if output:
+                write_csv(report, output)
+                logger.info(f"Full report written to {output}")
+
+            if apply:
+                created = apply_exact_links(conn, report)
+                logger.info(f"Created {created} auto links")
+
+            return True
+
+    except Exception as e:
+        logger.error(f"Error building link report: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank Matchplay link candidates for all unlinked MNP players",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+    # Print the strongest candidates
+    python etl/matchplay_link_report.py
+
+    # Write the full report for review
+    python etl/matchplay_link_report.py --output matchplay_links.csv
+
+    # Link every player with a single exact name match
+    python etl/matchplay_link_report.py --apply
+""",
+    )
+    parser.add_argument("--output", "-o", help="Write the full ranked report to this CSV file")
+    parser.add_argument(
+        "--min-confidence",
+        type=float,
+        default=0.5,
+        help="Minimum name similarity to report a candidate (default: 0.5)",
+    )
+    parser.add_argument(
+        "--top", type=int, default=25, help="Number of report rows to print (default: 25)"
+    )
+    parser.add_argument(
+        "--apply",
+        action="store_true",
+        help="Create 'auto' links for players with exactly one exact name match",
+    )
+
+    args = parser.parse_args()
+
+    success = run_report(
+        output=args.output, min_confidence=args.min_confidence, apply=args.apply, top=args.top
+    )
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
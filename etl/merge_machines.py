@@ -10,6 +10,7 @@ This happens when:
 
 The script will:
 1. For each duplicate group, update all references to use the canonical key
+   (one UPDATE per table, joined against a temp old -> canonical mapping table)
 2. Delete the orphaned machine entries (CASCADE handles aliases, stats, etc.)
 3. Delete junk entries with 0 references
 4. Verify data integrity after merge
@@ -139,139 +140,145 @@ def machine_exists(conn, key):
     return result.fetchone() is not None
 
 
-def ensure_canonical_exists(conn, canonical_key, old_keys):
-    """Create canonical machine entry if it doesn't exist, using metadata from old keys."""
-    if machine_exists(conn, canonical_key):
-        return
+def ensure_canonical_exists(conn, merges, machine_names):
+    """Create canonical machine entries that don't exist, using names from their old keys."""
+    missing = {}
+    for canonical, old_keys in merges:
+        if canonical in machine_names:
+            continue
+        names = [machine_names[k].strip() for k in old_keys if machine_names.get(k)]
+        missing[canonical] = names[0] if names else canonical
 
-    # Get name from first old key that exists
-    machine_name = canonical_key
-    for old_key in old_keys:
-        result = conn.execute(
-            text("SELECT machine_name FROM machines WHERE machine_key = :key"),
-            {"key": old_key},
-        )
-        row = result.fetchone()
-        if row and row[0]:
-            machine_name = row[0].strip()
-            break
+    if not missing:
+        return
 
     conn.execute(
-        text("INSERT INTO machines (machine_key, machine_name) VALUES (:key, :name)"),
-        {"key": canonical_key, "name": machine_name},
+        text("""
+            INSERT INTO machines (machine_key, machine_name)
+            SELECT key, value FROM jsonb_each_text(CAST(:machines AS jsonb))
+        """),
+        {"machines": json.dumps(missing)},
     )
-    logger.info(f"  Created canonical machine: {canonical_key} ({machine_name})")
+    for canonical, name in missing.items():
+        logger.info(f"  Created canonical machine: {canonical} ({name})")
 
 
-def merge_one_key(conn, canonical, old_key, dry_run=False):
-    """Merge a single old_key into canonical. Returns (scores, games, matches) counts."""
-    # Count what will be affected
-    scores_count = conn.execute(
-        text("SELECT COUNT(*) FROM scores WHERE machine_key = :key"),
-        {"key": old_key},
-    ).scalar()
+def create_key_map(conn, merges):
+    """
+    Load the old -> canonical machine_key mapping into a temp table.
 
-    games_count = conn.execute(
-        text("SELECT COUNT(*) FROM games WHERE machine_key = :key"),
-        {"key": old_key},
-    ).scalar()
-
-    matches_count = conn.execute(
-        text("SELECT COUNT(*) FROM matches WHERE machines @> CAST(:old_jsonb AS jsonb)"),
-        {"old_jsonb": json.dumps([old_key])},
-    ).scalar()
-
-    if dry_run:
-        logger.info(
-            f"  Would merge '{old_key}' -> '{canonical}': "
-            f"{scores_count} scores, {games_count} games, {matches_count} match JSONBs"
-        )
-        return scores_count, games_count, matches_count
-
-    # Step 1: Update RESTRICT FK tables (must update before deleting machine)
+    The table is dropped when the transaction commits, so the dry run leaves
+    nothing behind.
+    """
+    key_map = {old_key: canonical for canonical, old_keys in merges for old_key in old_keys}
     conn.execute(
-        text("UPDATE scores SET machine_key = :new WHERE machine_key = :old"),
-        {"new": canonical, "old": old_key},
+        text("""
+            CREATE TEMP TABLE machine_key_map (
+                old_key VARCHAR(50) PRIMARY KEY,
+                canonical_key VARCHAR(50) NOT NULL
+            ) ON COMMIT DROP
+        """)
     )
-
     conn.execute(
-        text("UPDATE games SET machine_key = :new WHERE machine_key = :old"),
-        {"new": canonical, "old": old_key},
+        text("""
+            INSERT INTO machine_key_map (old_key, canonical_key)
+            SELECT key, value FROM jsonb_each_text(CAST(:key_map AS jsonb))
+        """),
+        {"key_map": json.dumps(key_map)},
     )
+    conn.execute(text("ANALYZE machine_key_map"))
 
-    # Step 2: Update SET NULL FK tables
-    conn.execute(
-        text(
-            "UPDATE matchplay_player_machine_stats SET machine_key = :new WHERE machine_key = :old"
-        ),
-        {"new": canonical, "old": old_key},
-    )
 
-    conn.execute(
-        text("UPDATE matchplay_arena_mappings SET machine_key = :new WHERE machine_key = :old"),
-        {"new": canonical, "old": old_key},
+def count_affected_rows(conn):
+    """Count the rows every old machine_key touches, in one query. Returns {old_key: counts}."""
+    result = conn.execute(
+        text("""
+            SELECT m.old_key,
+                   (SELECT COUNT(*) FROM scores s WHERE s.machine_key = m.old_key) AS scores,
+                   (SELECT COUNT(*) FROM games g WHERE g.machine_key = m.old_key) AS games,
+                   (SELECT COUNT(*) FROM venue_machines vm
+                    WHERE vm.machine_key = m.old_key) AS venue_machines,
+                   (SELECT COUNT(*) FROM matches mt
+                    WHERE mt.machines @> jsonb_build_array(m.old_key)) AS matches
+            FROM machine_key_map m
+        """)
     )
+    return {row.old_key: row._mapping for row in result}
+
+
+def apply_key_map(conn):
+    """Rewrite every machine_key reference through machine_key_map, one statement per table."""
+    # Step 1: Update RESTRICT FK tables (must update before deleting machine)
+    # Step 2: Update SET NULL FK tables
+    for table in (
+        "scores",
+        "games",
+        "matchplay_player_machine_stats",
+        "matchplay_arena_mappings",
+    ):
+        conn.execute(
+            text(f"""
+                UPDATE {table} t
+                SET machine_key = m.canonical_key
+                FROM machine_key_map m
+                WHERE t.machine_key = m.old_key
+            """)
+        )
 
     # Step 3: Handle venue_machines PK conflicts
-    # Delete rows that would conflict (same venue+season already exists for canonical)
+    # Delete rows that would conflict: the canonical key is already listed for the
+    # same venue+season, or another old key of the same canonical sorts first
     conn.execute(
         text("""
-            DELETE FROM venue_machines
-            WHERE machine_key = :old
+            DELETE FROM venue_machines vm
+            USING machine_key_map m
+            WHERE vm.machine_key = m.old_key
             AND EXISTS (
                 SELECT 1 FROM venue_machines vm2
-                WHERE vm2.venue_key = venue_machines.venue_key
-                AND vm2.machine_key = :new
-                AND vm2.season = venue_machines.season
+                LEFT JOIN machine_key_map m2 ON m2.old_key = vm2.machine_key
+                WHERE vm2.venue_key = vm.venue_key
+                AND vm2.season = vm.season
+                AND COALESCE(m2.canonical_key, vm2.machine_key) = m.canonical_key
+                AND (m2.old_key IS NULL OR vm2.machine_key < vm.machine_key)
             )
-        """),
-        {"new": canonical, "old": old_key},
+        """)
     )
 
     # Update remaining rows (no conflict)
     conn.execute(
-        text("UPDATE venue_machines SET machine_key = :new WHERE machine_key = :old"),
-        {"new": canonical, "old": old_key},
+        text("""
+            UPDATE venue_machines vm
+            SET machine_key = m.canonical_key
+            FROM machine_key_map m
+            WHERE vm.machine_key = m.old_key
+        """)
     )
 
-    # Step 4: Update matches.machines JSONB array (replace + deduplicate)
-    if matches_count > 0:
-        conn.execute(
-            text("""
-                UPDATE matches
-                SET machines = (
-                    SELECT jsonb_agg(DISTINCT replaced)
-                    FROM (
-                        SELECT
-                            CASE
-                                WHEN elem #>> '{}' = :old THEN to_jsonb(CAST(:new AS text))
-                                ELSE elem
-                            END AS replaced
-                        FROM jsonb_array_elements(machines) AS elem
-                    ) sub
-                )
-                WHERE machines @> CAST(:old_jsonb AS jsonb)
-            """),
-            {
-                "new": canonical,
-                "old": old_key,
-                "old_jsonb": json.dumps([old_key]),
-            },
-        )
-
-    # Step 5: Delete old machine (CASCADE handles aliases, percentiles, stats, picks)
+    # Step 4: Update matches.machines JSONB arrays (replace + deduplicate)
     conn.execute(
-        text("DELETE FROM machines WHERE machine_key = :key"),
-        {"key": old_key},
+        text("""
+            UPDATE matches mt
+            SET machines = (
+                SELECT jsonb_agg(DISTINCT COALESCE(to_jsonb(m.canonical_key), elem))
+                FROM jsonb_array_elements(mt.machines) AS elem
+                LEFT JOIN machine_key_map m ON m.old_key = elem #>> '{}'
+            )
+            WHERE EXISTS (
+                SELECT 1 FROM jsonb_array_elements_text(mt.machines) AS elem
+                JOIN machine_key_map m ON m.old_key = elem
+            )
+        """)
     )
 
-    logger.info(
-        f"  Merged '{old_key}' -> '{canonical}': "
-        f"{scores_count} scores, {games_count} games, {matches_count} match JSONBs"
+    # Step 5: Delete old machines (CASCADE handles aliases, percentiles, stats, picks)
+    conn.execute(
+        text("""
+            DELETE FROM machines mc
+            USING machine_key_map m
+            WHERE mc.machine_key = m.old_key
+        """)
     )
 
-    return scores_count, games_count, matches_count
-
 
 def safe_delete_machine(conn, key, dry_run=False):
     """Delete a machine only if it has zero references in games and scores."""
@@ -328,24 +335,45 @@ def merge_machines(dry_run=False):
         logger.info("Phase 1: Merging duplicate machine groups")
         logger.info("-" * 40)
 
-        for canonical, old_keys in MERGE_MAPPINGS:
-            # Filter to old_keys that actually exist
-            existing_old = [k for k in old_keys if machine_exists(conn, k)]
-            if not existing_old:
-                continue
-
-            logger.info(f"\n  {canonical} <- {existing_old}")
+        # Look up every key in the mappings at once, keeping the old_keys that exist
+        all_keys = [k for canonical, old_keys in MERGE_MAPPINGS for k in [canonical, *old_keys]]
+        machine_names = dict(
+            conn.execute(
+                text(
+                    "SELECT machine_key, machine_name FROM machines WHERE machine_key = ANY(:keys)"
+                ),
+                {"keys": all_keys},
+            ).fetchall()
+        )
+        merges = [
+            (canonical, [k for k in old_keys if k in machine_names])
+            for canonical, old_keys in MERGE_MAPPINGS
+        ]
+        merges = [(canonical, old_keys) for canonical, old_keys in merges if old_keys]
+
+        if merges:
+            # Every rewrite below is one statement joined against the mapping table
+            create_key_map(conn, merges)
+            counts = count_affected_rows(conn)
+
+            for canonical, old_keys in merges:
+                logger.info(f"\n  {canonical} <- {old_keys}")
+                for old_key in old_keys:
+                    c = counts[old_key]
+                    logger.info(
+                        f"  {'Would merge' if dry_run else 'Merging'} '{old_key}' -> "
+                        f"'{canonical}': {c['scores']} scores, {c['games']} games, "
+                        f"{c['matches']} match JSONBs"
+                    )
+                    grand_scores += c["scores"]
+                    grand_games += c["games"]
+                    grand_matches += c["matches"]
 
             if not dry_run:
-                ensure_canonical_exists(conn, canonical, existing_old)
-
-            for old_key in existing_old:
-                s, g, m = merge_one_key(conn, canonical, old_key, dry_run)
-                grand_scores += s
-                grand_games += g
-                grand_matches += m
+                ensure_canonical_exists(conn, merges, machine_names)
+                apply_key_map(conn)
 
-            merges_done += 1
+            merges_done = len(merges)
 
         # Phase 2: Delete trailing-space entries
         logger.info("\n")
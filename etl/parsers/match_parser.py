@@ -8,6 +8,8 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
+from etl.parsers.season_pack import load_pack
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,22 +36,13 @@ class MatchParser:
             raise
 
     def load_all_matches(self, matches_dir: Path) -> list[dict]:
-        """Load all match JSON files from a directory"""
-        matches = []
-
+        """Load all match JSON files from a directory (through its season pack)"""
         if not matches_dir.exists():
             logger.error(f"Matches directory not found: {matches_dir}")
-            return matches
-
-        match_files = sorted(matches_dir.glob("*.json"))
+            return []
 
-        for match_file in match_files:
-            try:
-                match_data = self.load_match_file(match_file)
-                matches.append(match_data)
-            except Exception as e:
-                logger.warning(f"Skipping {match_file.name}: {e}")
-                continue
+        matches = load_pack(matches_dir).matches
+        self.matches_loaded += len(matches)
 
         logger.info(f"Loaded {len(matches)} matches from {matches_dir}")
         return matches
@@ -61,16 +54,47 @@ class MatchParser:
             return int(parts[1])
         return None
 
-    def extract_players_from_match(self, match: dict) -> list[dict]:
-        """Extract unique players from a match"""
-        players = {}
-        season = self.extract_season_from_key(match["key"])
+    def extract_match_rows(self, match: dict, machine_normalizer=None) -> dict:  # noqa: C901
+        """
+        Extract every entity row from a match in one walk.
+
+        This is the one place match rows are built; the individual extract_*
+        methods return parts of its result. Game machine keys are normalized
+        when a machine_normalizer is given, as load_season does.
+
+        Returns:
+            {"venue", "venue_machines", "teams", "players", "match", "games", "scores",
+             "round_points"} where "venue" and "match" are single rows and the rest
+            are lists
+        """
+        key = match["key"]
+        season = self.extract_season_from_key(key)
+        week = int(match.get("week", 0))
+        date = self._parse_date(match.get("date"))
+        venue = match.get("venue", {})
+        venue_key = match["venue"]["key"]
 
+        def normalize(machine_key):
+            if machine_normalizer:
+                return machine_normalizer.normalize_machine_key(machine_key)
+            return machine_key
+
+        # Lineups: teams, players and the player lookup used for scores
+        teams = []
+        players = {}
+        player_lookup = {}
         for team_type in ["home", "away"]:
             team = match.get(team_type, {})
+            teams.append(
+                {
+                    "team_key": team["key"],
+                    "season": season,
+                    "team_name": team["name"],
+                    "home_venue_key": venue_key if team_type == "home" else None,
+                }
+            )
             for player in team.get("lineup", []):
                 player_key = player["key"]
-
                 if player_key not in players:
                     players[player_key] = {
                         "player_key": player_key,
@@ -79,79 +103,174 @@ class MatchParser:
                         "first_seen_season": season,
                         "last_seen_season": season,
                     }
+                player_lookup[player_key] = {
+                    "team_key": team["key"],
+                    "is_home": team_type == "home",
+                    "ipr": player.get("IPR"),
+                    "is_substitute": player.get("sub", False),
+                }
 
-        return list(players.values())
+        # Rounds: games, scores and each round's team points
+        games = []
+        scores = []
+        round_points = {}
+        for round_data in match.get("rounds", []):
+            round_num = round_data["n"]
+            max_position = 4 if round_num in [1, 4] else 2
 
-    def extract_teams_from_match(self, match: dict) -> list[dict]:
-        """Extract team information from a match"""
-        teams = []
-        season = self.extract_season_from_key(match["key"])
+            for game in round_data.get("games", []):
+                home_points = self._game_points(game, "home_points", key)
+                away_points = self._game_points(game, "away_points", key)
+                round_home, round_away = round_points.get(round_num, (0.0, 0.0))
+                round_points[round_num] = (
+                    round_home + (home_points or 0),
+                    round_away + (away_points or 0),
+                )
 
-        for team_type in ["home", "away"]:
-            team = match.get(team_type, {})
-            teams.append(
+                # Skip games that haven't been set up yet (no machine assigned)
+                if "machine" not in game:
+                    continue
+                machine_key = normalize(game["machine"])
+                done = game.get("done", False)
+
+                games.append(
+                    {
+                        "match_key": key,
+                        "round_number": round_num,
+                        "game_number": game.get("n", 1),
+                        "machine_key": machine_key,
+                        "done": done,
+                        "season": season,
+                        "week": week,
+                        "venue_key": venue_key,
+                        "home_points": home_points,
+                        "away_points": away_points,
+                    }
+                )
+
+                if not done:
+                    continue  # No scores for incomplete games
+
+                for position in range(1, max_position + 1):
+                    player_key = game.get(f"player_{position}")
+                    score = game.get(f"score_{position}")
+                    if not player_key or score is None:
+                        continue
+                    player_info = player_lookup.get(player_key)
+                    if not player_info:
+                        continue
+
+                    scores.append(
+                        {
+                            "player_key": player_key,
+                            "player_position": position,
+                            "score": score,
+                            "team_key": player_info["team_key"],
+                            "is_home_team": player_info["is_home"],
+                            "player_ipr": player_info["ipr"],
+                            "is_substitute": player_info["is_substitute"],
+                            # Denormalized context
+                            "match_key": key,
+                            "venue_key": venue_key,
+                            "machine_key": machine_key,
+                            "round_number": round_num,
+                            "season": season,
+                            "week": week,
+                            "date": date,
+                        }
+                    )
+
+        return {
+            "venue": {"venue_key": venue["key"], "venue_name": venue["name"]},
+            "venue_machines": [
+                {"venue_key": venue["key"], "machine_key": m, "season": season, "active": True}
+                for m in venue.get("machines", [])
+            ],
+            "teams": teams,
+            "players": list(players.values()),
+            "match": {
+                "match_key": key,
+                "season": season,
+                "week": week,
+                "date": date,
+                "venue_key": venue_key,
+                "home_team_key": match["home"]["key"],
+                "away_team_key": match["away"]["key"],
+                "state": self._resolve_state(match),
+                "machines": venue.get("machines", []),
+            },
+            "games": games,
+            "scores": scores,
+            "round_points": self._cumulative_round_points(key, season, week, round_points),
+        }
+
+    @staticmethod
+    def _game_points(game: dict, field: str, match_key: str) -> float | None:
+        """A game's home_points/away_points as a number (None if not recorded or malformed)."""
+        value = game.get(field)
+        if value in (None, ""):
+            return None
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            # Bad point data mustn't stop the match's games and scores from loading
+            logger.warning(f"Ignoring malformed {field} {value!r} in match {match_key}")
+            return None
+
+    @staticmethod
+    def _cumulative_round_points(
+        match_key: str, season: int, week: int, round_points: dict
+    ) -> list[dict]:
+        """match_round_points rows: each round's game points and the running totals."""
+        rows = []
+        home_total = away_total = 0.0
+        for round_num in sorted(n for n in round_points if 1 <= n <= 4):
+            home_points, away_points = round_points[round_num]
+            home_total += home_points
+            away_total += away_points
+            rows.append(
                 {
-                    "team_key": team["key"],
+                    "match_key": match_key,
                     "season": season,
-                    "team_name": team["name"],
-                    "home_venue_key": match["venue"]["key"] if team_type == "home" else None,
+                    "week": week,
+                    "round_number": round_num,
+                    "home_points": home_points,
+                    "away_points": away_points,
+                    "home_total": home_total,
+                    "away_total": away_total,
                 }
             )
+        return rows
+
+    @staticmethod
+    def _parse_date(date: str | None) -> str | None:
+        """Convert an MM/DD/YYYY match date to YYYY-MM-DD (None if missing or invalid)."""
+        if not date:
+            return date
+        try:
+            return datetime.strptime(date, "%m/%d/%Y").strftime("%Y-%m-%d")
+        except Exception:
+            return None
 
-        return teams
+    def extract_players_from_match(self, match: dict) -> list[dict]:
+        """Extract unique players from a match"""
+        return self.extract_match_rows(match)["players"]
+
+    def extract_teams_from_match(self, match: dict) -> list[dict]:
+        """Extract team information from a match"""
+        return self.extract_match_rows(match)["teams"]
 
     def extract_venue_from_match(self, match: dict) -> dict:
         """Extract venue information from a match"""
-        venue = match.get("venue", {})
-        return {"venue_key": venue["key"], "venue_name": venue["name"]}
+        return self.extract_match_rows(match)["venue"]
 
     def extract_venue_machines(self, match: dict) -> list[dict]:
         """Extract venue-machine relationships from a match"""
-        venue = match.get("venue", {})
-        season = self.extract_season_from_key(match["key"])
-
-        machines = []
-        for machine_key in venue.get("machines", []):
-            machines.append(
-                {
-                    "venue_key": venue["key"],
-                    "machine_key": machine_key,
-                    "season": season,
-                    "active": True,
-                }
-            )
-
-        return machines
+        return self.extract_match_rows(match)["venue_machines"]
 
     def extract_match_metadata(self, match: dict) -> dict:
         """Extract match metadata"""
-        season = self.extract_season_from_key(match["key"])
-
-        # Parse date if present
-        date = match.get("date")
-        if date:
-            try:
-                # Try parsing MM/DD/YYYY format
-                date_obj = datetime.strptime(date, "%m/%d/%Y")
-                date = date_obj.strftime("%Y-%m-%d")
-            except Exception:
-                date = None
-
-        # Extract machines available at venue for this specific match
-        venue = match.get("venue", {})
-        machines = venue.get("machines", [])
-
-        return {
-            "match_key": match["key"],
-            "season": season,
-            "week": int(match.get("week", 0)),
-            "date": date,
-            "venue_key": match["venue"]["key"],
-            "home_team_key": match["home"]["key"],
-            "away_team_key": match["away"]["key"],
-            "state": self._resolve_state(match),
-            "machines": machines,
-        }
+        return self.extract_match_rows(match)["match"]
 
     @staticmethod
     def _resolve_state(match: dict) -> str:
@@ -168,105 +287,9 @@ class MatchParser:
         return state
 
     def extract_games_from_match(self, match: dict) -> list[dict]:
-        """Extract game records from a match"""
-        games = []
-        season = self.extract_season_from_key(match["key"])
-
-        for round_data in match.get("rounds", []):
-            round_num = round_data["n"]
-
-            for game in round_data.get("games", []):
-                # Skip games that haven't been set up yet (no machine assigned)
-                if "machine" not in game:
-                    continue
-
-                game_data = {
-                    "match_key": match["key"],
-                    "round_number": round_num,
-                    "game_number": game.get("n", 1),
-                    "machine_key": game["machine"],
-                    "done": game.get("done", False),
-                    "season": season,
-                    "week": int(match.get("week", 0)),
-                    "venue_key": match["venue"]["key"],
-                }
-                games.append(game_data)
-
-        return games
+        """Extract game records from a match (machine keys as recorded)"""
+        return self.extract_match_rows(match)["games"]
 
     def extract_scores_from_match(self, match: dict, machine_normalizer=None) -> list[dict]:
         """Extract all scores from a match with full context"""
-        scores = []
-        season = self.extract_season_from_key(match["key"])
-
-        # Parse date
-        date = match.get("date")
-        if date:
-            try:
-                date_obj = datetime.strptime(date, "%m/%d/%Y")
-                date = date_obj.strftime("%Y-%m-%d")
-            except Exception:
-                date = None
-
-        # Build player lookup
-        player_lookup = {}
-        for team_type in ["home", "away"]:
-            team = match.get(team_type, {})
-            for player in team.get("lineup", []):
-                player_lookup[player["key"]] = {
-                    "name": player["name"],
-                    "team_key": team["key"],
-                    "team_name": team["name"],
-                    "is_home": team_type == "home",
-                    "ipr": player.get("IPR"),
-                    "is_substitute": player.get("sub", False),
-                }
-
-        # Extract scores from each round
-        for round_data in match.get("rounds", []):
-            round_num = round_data["n"]
-
-            for game in round_data.get("games", []):
-                if not game.get("done", False):
-                    continue  # Skip incomplete games
-
-                # Get machine key (normalize if normalizer provided)
-                machine_key = game["machine"]
-                if machine_normalizer:
-                    machine_key = machine_normalizer.normalize_machine_key(machine_key)
-
-                # Determine how many players based on round
-                max_position = 4 if round_num in [1, 4] else 2
-
-                for position in range(1, max_position + 1):
-                    player_key = game.get(f"player_{position}")
-                    score = game.get(f"score_{position}")
-
-                    if not player_key or score is None:
-                        continue
-
-                    player_info = player_lookup.get(player_key)
-                    if not player_info:
-                        continue
-
-                    score_data = {
-                        "player_key": player_key,
-                        "player_position": position,
-                        "score": score,
-                        "team_key": player_info["team_key"],
-                        "is_home_team": player_info["is_home"],
-                        "player_ipr": player_info["ipr"],
-                        "is_substitute": player_info["is_substitute"],
-                        # Denormalized context
-                        "match_key": match["key"],
-                        "venue_key": match["venue"]["key"],
-                        "machine_key": machine_key,
-                        "round_number": round_num,
-                        "season": season,
-                        "week": int(match.get("week", 0)),
-                        "date": date,
-                    }
-
-                    scores.append(score_data)
-
-        return scores
+        return self.extract_match_rows(match, machine_normalizer)["scores"]
@@ -0,0 +1,190 @@
+"""
+Season pack cache of parsed match JSON files.
+
+Every reader of the match archive (load_season, backfill_match_machines,
+calculate_match_points, the weekly recap's comeback detection) used to glob
+and json.load the same few hundred files per season. A season pack is one
+file per matches directory holding every match already parsed, plus an index
+by match key, so a reader pays a single file read instead.
+
+Pack layout (two pickles back to back in one file, read in a single pass):
+    header: {"format", "source", "files": {name: (size, mtime_ns, sha1)}}
+    body:   {"matches": [match, ...], "index": {match_key: position}}
+
+A pack is rebuilt when a file is added, removed, or its size/mtime changes.
+Files whose content hash is unchanged (e.g. a fresh git checkout) are reused
+from the old pack rather than re-parsed. Packs live in config.SEASON_PACK_DIR;
+if it isn't writable the freshly parsed matches are returned without caching.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from etl.config import config
+
+logger = logging.getLogger(__name__)
+
+# Bump when the pack layout or the parsed match structure changes
+PACK_FORMAT = 1
+
+
+class SeasonPack:
+    """Parsed matches of one matches directory, in file name order."""
+
+    def __init__(self, matches: list[dict], index: dict[str, int]):
+        self.matches = matches
+        self.index = index
+
+    def get(self, match_key: str) -> dict | None:
+        """Get a match by key (the JSON file name without .json)."""
+        position = self.index.get(match_key)
+        return self.matches[position] if position is not None else None
+
+    def __len__(self):
+        return len(self.matches)
+
+    def __iter__(self):
+        return iter(self.matches)
+
+
+def pack_path(matches_dir: Path) -> Path:
+    """Pack file for a matches directory, e.g. season-22/matches -> season-22.pack."""
+    return config.SEASON_PACK_DIR / f"{matches_dir.parent.name}.pack"
+
+
+def _scan(matches_dir: Path) -> dict[str, tuple[int, int]]:
+    files = {}
+    for entry in os.scandir(matches_dir):
+        if entry.name.endswith(".json") and entry.is_file():
+            stat = entry.stat()
+            files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def _read_pack(path: Path) -> tuple[dict, dict] | None:
+    try:
+        with open(path, "rb") as f:
+            header = pickle.load(f)
+            if header.get("format") != PACK_FORMAT:
+                return None
+            return header, pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable season pack {path}: {e}")
+        return None
+
+
+def _is_fresh(header: dict | None, matches_dir: Path, files: dict) -> bool:
+    if not header or header.get("source") != str(matches_dir.resolve()):
+        return False
+    stored = header["files"]
+    return stored.keys() == files.keys() and all(
+        stored[name][:2] == stat for name, stat in files.items()
+    )
+
+
+def _build(matches_dir: Path, files: dict, old: tuple[dict, dict] | None) -> tuple[dict, dict]:
+    """Parse the directory into a (header, body) pair, reusing unchanged matches."""
+    old_files, old_matches = {}, {}
+    if old:
+        old_header, old_body = old
+        old_files = old_header["files"]
+        old_matches = {
+            name: old_body["matches"][old_body["index"][name[: -len(".json")]]]
+            for name in old_files
+            if name[: -len(".json")] in old_body["index"]
+        }
+
+    header_files = {}
+    matches = []
+    index = {}
+    parsed = reused = 0
+
+    for name in sorted(files):
+        match_key = name[: -len(".json")]
+        previous = old_files.get(name)
+
+        if previous and previous[:2] == files[name] and name in old_matches:
+            match, sha1 = old_matches[name], previous[2]
+            reused += 1
+        else:
+            try:
+                raw = (matches_dir / name).read_bytes()
+            except OSError as e:
+                logger.warning(f"Skipping {name}: {e}")
+                continue
+            sha1 = hashlib.sha1(raw).hexdigest()
+            if previous and previous[2] == sha1 and name in old_matches:
+                match = old_matches[name]
+                reused += 1
+            else:
+                try:
+                    match = json.loads(raw)
+                except json.JSONDecodeError as e:
+                    # Remembered in the header so the pack stays fresh until the file changes
+                    logger.warning(f"Skipping {name}: {e}")
+                    header_files[name] = (*files[name], sha1)
+                    continue
+                parsed += 1
+
+        header_files[name] = (*files[name], sha1)
+        index[match_key] = len(matches)
+        matches.append(match)
+
+    logger.info(
+        f"Built season pack for {matches_dir}: {len(matches)} matches "
+        f"({parsed} parsed, {reused} reused)"
+    )
+    header = {"format": PACK_FORMAT, "source": str(matches_dir.resolve()), "files": header_files}
+    return header, {"matches": matches, "index": index}
+
+
+def _write(path: Path, header: dict, body: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename, so concurrent readers never see a partial pack
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(body, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Could not write season pack {path}: {e}")
+
+
+def load_pack(matches_dir: Path) -> SeasonPack:
+    """
+    Load all matches in a directory through its season pack.
+
+    Args:
+        matches_dir: A season's matches directory (see config.get_matches_path)
+
+    Returns:
+        SeasonPack (empty if the directory doesn't exist)
+    """
+    if not matches_dir.exists():
+        return SeasonPack([], {})
+
+    files = _scan(matches_dir)
+    path = pack_path(matches_dir)
+
+    # The old pack is needed either way: served if fresh, reused from if stale
+    stored = _read_pack(path)
+    if stored and _is_fresh(stored[0], matches_dir, files):
+        body = stored[1]
+        return SeasonPack(body["matches"], body["index"])
+
+    header, body = _build(matches_dir, files, stored)
+    _write(path, header, body)
+    return SeasonPack(body["matches"], body["index"])
+
+
+def load_season_pack(season: int) -> SeasonPack:
+    """Load a season's matches through its season pack."""
+    return load_pack(config.get_matches_path(season))
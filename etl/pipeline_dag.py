@@ -0,0 +1,608 @@
+"""
+In-process DAG runner for the ETL pipeline.
+
+run_full_pipeline.py used to start every ETL script as its own subprocess,
+one season at a time, in a fixed order. This module runs the same steps as
+Python calls instead: each step declares the tables and files it reads and
+writes (STEP_IO in run_full_pipeline.py), and the runner derives a
+dependency graph from those declarations.
+
+- Steps whose reads/writes don't overlap run concurrently, either in this
+  process (workers=1) or across a pool of worker processes that import the
+  ETL modules and connect to the database once, not once per step.
+- Before a step runs, its inputs are fingerprinted: file inputs by path,
+  size and mtime, tables by cheap change markers (see table_markers).
+  Steps whose fingerprint matches the last successful run are skipped,
+  unless a step they depend on ran earlier in the same run.
+  verify_content=True (--force-verify) fingerprints tables by a content
+  hash of the rows instead, which scans them.
+- After the run a timing report shows every step and the critical path -
+  the chain of dependent steps that bounded the wall time. Each step's
+  wall/CPU time, peak RSS and database I/O are also saved to
+  pipeline_step_metrics (see etl/pipeline_metrics.py).
+
+Resources are written as:
+    "scores"                  - every row of a table
+    "scores@22"               - the rows of one season (tables with a season column)
+    "file:mnp-data-archive"   - a file or directory, relative to the project root
+
+Fingerprints are kept in pipeline_step_state (migration 011). Without that
+table every step simply runs.
+"""
+
+import hashlib
+import importlib
+import logging
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+
+from sqlalchemy import text
+
+from etl.config import config
+from etl.database import db
+from etl.pipeline_metrics import RunRecorder, StepProbe, install_io_counters, profile_path_for
+
+logger = logging.getLogger(__name__)
+
+# Default number of worker processes
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Columns that change on every rewrite without the data changing; they are
+# left out of content fingerprints so a recalculated table still matches
+VOLATILE_COLUMNS = ["id", "created_at", "updated_at", "calculated_at", "last_calculated"]
+
+LOG_FORMAT = "%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class Resource:
+    """A table (optionally one season of it) or a file/directory."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        if spec.startswith("file:"):
+            self.kind = "file"
+            self.name = spec[len("file:") :]
+            self.season = None
+        else:
+            self.kind = "table"
+            name, _, season = spec.partition("@")
+            self.name = name
+            self.season = int(season) if season else None
+
+    def overlaps(self, other: "Resource") -> bool:
+        """True if the two resources can refer to the same data."""
+        if self.kind != other.kind:
+            return False
+        if self.kind == "file":
+            a, b = Path(self.name), Path(other.name)
+            return a == b or a in b.parents or b in a.parents
+        if self.name != other.name:
+            return False
+        return self.season is None or other.season is None or self.season == other.season
+
+    def __repr__(self):
+        return self.spec
+
+
+class Task:
+    """One step invocation: a step for one season, or a step that covers all data."""
+
+    def __init__(
+        self,
+        name: str,
+        entrypoint: str,
+        season: int = None,
+        verify: str = None,
+        inputs: tuple[str, ...] = (),
+        outputs: tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.entrypoint = entrypoint
+        self.season = season
+        self.verify = verify
+        self.key = f"{name}[{season}]" if season is not None else name
+
+        module = entrypoint.split(":")[0]
+        code = f"file:{module.replace('.', '/')}.py"
+        self.inputs = [Resource(self._fill(r)) for r in (code, *inputs)]
+        self.outputs = [Resource(self._fill(r)) for r in outputs]
+
+        self.deps: list[Task] = []
+        self.status = "pending"  # pending, ran, skipped, failed, blocked
+        self.started = None
+        self.duration = 0.0
+        self.metrics = {}
+        self.error = None
+
+    def _fill(self, spec: str) -> str:
+        return spec.format(season=self.season) if self.season is not None else spec
+
+    def conflicts_with(self, other: "Task") -> bool:
+        """True if running the two tasks in either order could give different results."""
+        for out in self.outputs:
+            if any(out.overlaps(r) for r in other.inputs + other.outputs):
+                return True
+        return any(r.overlaps(out) for r in self.inputs for out in other.outputs)
+
+    @property
+    def finished(self) -> float:
+        return (self.started or 0.0) + self.duration
+
+
+def build_graph(tasks: list[Task]) -> list[Task]:
+    """
+    Link each task to the earlier tasks it conflicts with.
+
+    Tasks are given in the pipeline's serial order; a later task waits for an
+    earlier one only when one writes something the other reads or writes.
+    """
+    for i, task in enumerate(tasks):
+        task.deps = [earlier for earlier in tasks[:i] if task.conflicts_with(earlier)]
+    return tasks
+
+
+# ---------------------------------------------------------------------------
+# Fingerprints
+# ---------------------------------------------------------------------------
+
+
+def _file_signature(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    files = [path] if path.is_file() else sorted(_walk(path))
+    digest = hashlib.sha1()
+    for f in files:
+        stat = f.stat()
+        digest.update(f"{f.relative_to(path.parent)}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _walk(root: Path):
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Skip VCS metadata and bytecode caches
+        dirnames[:] = [d for d in dirnames if not d.startswith(".") and d != "__pycache__"]
+        for name in filenames:
+            if not name.startswith("."):
+                yield Path(dirpath) / name
+
+
+def table_markers(conn, resource: Resource) -> str:
+    """
+    Change markers of a table (or one season's partition) from the statistics views.
+
+    pg_stat_user_tables counts every inserted, updated and deleted row, and a
+    TRUNCATE or a shadow-table swap gives the table a new file node (or a new
+    relid), so any write moves the markers without reading a row. Partitioned
+    tables are summed over their partitions; a season of a table partitioned by
+    season (scores_s22) uses just that partition, other season-scoped tables
+    the whole table. The counters can lag a write by a few seconds, which is
+    why run_dag never skips a step after one of its inputs was written in the
+    same run.
+    """
+    relation = resource.name
+    if resource.season is not None:
+        partition = f"{resource.name}_s{resource.season}"
+        if conn.execute(text("SELECT to_regclass(:name)"), {"name": partition}).scalar():
+            relation = partition
+    markers = conn.execute(
+        text(
+            """
+            WITH rels AS (
+                SELECT to_regclass(:relation)::oid AS relid
+                UNION
+                SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:relation)
+            )
+            SELECT string_agg(
+                concat_ws(':', s.relid, pg_relation_filenode(s.relid),
+                          s.n_tup_ins, s.n_tup_upd, s.n_tup_del),
+                ',' ORDER BY s.relid
+            )
+            FROM pg_stat_user_tables s
+            JOIN rels USING (relid)
+            """
+        ),
+        {"relation": relation},
+    ).scalar()
+    return markers or "missing"
+
+
+def table_signature(conn, resource: Resource) -> str:
+    """Row count and content hash of a table (or one season of it); scans the rows."""
+    where = "WHERE season = :season" if resource.season is not None else ""
+    try:
+        row = conn.execute(
+            text(
+                f"""
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(hashtext(
+                        (to_jsonb(t) - CAST(:volatile AS text[]))::text
+                    )::bigint), 0)
+                FROM {resource.name} t
+                {where}
+                """
+            ),
+            {"volatile": VOLATILE_COLUMNS, "season": resource.season},
+        ).fetchone()
+        return f"{row[0]}:{row[1]}"
+    except Exception as e:
+        conn.rollback()
+        logger.debug(f"Could not fingerprint {resource}: {e}")
+        return "missing"
+
+
+def external_stamp(conn) -> str:
+    """
+    Latest data version stamped outside run_full_pipeline (etl/data_version.py).
+
+    Hand fixes are stamped by convention, so a stamp from any other source
+    reruns every step even if the statistics counters were reset meanwhile.
+    """
+    try:
+        if conn.execute(text("SELECT to_regclass('data_versions')")).scalar() is None:
+            return "none"
+        version = conn.execute(
+            text("SELECT MAX(version) FROM data_versions WHERE source <> 'run_full_pipeline'")
+        ).scalar()
+        return str(version)
+    except Exception as e:
+        conn.rollback()
+        logger.debug(f"Could not read data_versions: {e}")
+        return "none"
+
+
+class Fingerprinter:
+    """Computes task fingerprints, caching resource signatures within a run."""
+
+    def __init__(self, verify_content: bool = False):
+        """
+        Args:
+            verify_content: Fingerprint tables by a hash of their rows instead of
+                their change markers
+        """
+        self.verify_content = verify_content
+        self._signatures: dict[str, str] = {}
+        self._stamp: str | None = None
+
+    def _start(self, conn) -> None:
+        """Once per run: the external stamp, and content hashes if counters are off."""
+        self._stamp = external_stamp(conn)
+        if (
+            not self.verify_content
+            and conn.execute(text("SELECT current_setting('track_counts')")).scalar() != "on"
+        ):
+            logger.warning("track_counts is off; fingerprinting tables by content")
+            self.verify_content = True
+
+    def signature(self, conn, resource: Resource) -> str:
+        if resource.spec not in self._signatures:
+            if resource.kind == "file":
+                sig = _file_signature(config.PROJECT_ROOT / resource.name)
+            elif self.verify_content:
+                sig = table_signature(conn, resource)
+            else:
+                sig = table_markers(conn, resource)
+            self._signatures[resource.spec] = sig
+        return self._signatures[resource.spec]
+
+    def invalidate(self, outputs: list[Resource]) -> None:
+        """Forget signatures of anything a finished task may have written."""
+        for spec in list(self._signatures):
+            if any(Resource(spec).overlaps(out) for out in outputs):
+                del self._signatures[spec]
+
+    def fingerprint(self, task: Task) -> str:
+        digest = hashlib.sha1(f"{task.key}|{task.entrypoint}|{task.verify}".encode())
+        with db.engine.connect() as conn:
+            if self._stamp is None:
+                self._start(conn)
+            digest.update(f"external={self._stamp}\n".encode())
+            for resource in sorted(task.inputs, key=lambda r: r.spec):
+                digest.update(f"{resource.spec}={self.signature(conn, resource)}\n".encode())
+        return digest.hexdigest()
+
+
+class StepState:
+    """Last successful fingerprint per task, stored in pipeline_step_state."""
+
+    def __init__(self):
+        self.available = True
+
+    def load(self) -> dict[str, str]:
+        try:
+            with db.engine.connect() as conn:
+                result = conn.execute(text("SELECT task_key, fingerprint FROM pipeline_step_state"))
+                return {row.task_key: row.fingerprint for row in result}
+        except Exception as e:
+            logger.warning(f"pipeline_step_state unavailable, running every step: {e}")
+            self.available = False
+            return {}
+
+    def save(self, task: Task, fingerprint: str) -> None:
+        if not self.available:
+            return
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO pipeline_step_state
+                            (task_key, fingerprint, completed_at, duration_seconds)
+                        VALUES (:task_key, :fingerprint, :completed_at, :duration)
+                        ON CONFLICT (task_key) DO UPDATE SET
+                            fingerprint = EXCLUDED.fingerprint,
+                            completed_at = EXCLUDED.completed_at,
+                            duration_seconds = EXCLUDED.duration_seconds
+                        """
+                    ),
+                    {
+                        "task_key": task.key,
+                        "fingerprint": fingerprint,
+                        "completed_at": datetime.utcnow(),
+                        "duration": round(task.duration, 3),
+                    },
+                )
+        except Exception as e:
+            logger.warning(f"Could not save fingerprint for {task.key}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+
+def _resolve(entrypoint: str) -> Callable:
+    module_name, func_name = entrypoint.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+
+def _attach_log_file(log_path: str | None) -> logging.Handler | None:
+    if not log_path:
+        return None
+    handler = logging.FileHandler(log_path, mode="a")
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logging.getLogger().addHandler(handler)
+    return handler
+
+
+def _init_worker(log_path: str | None) -> None:
+    """Worker process setup: logging and one database engine for all its tasks."""
+    logging.basicConfig(
+        level=logging.INFO, format=LOG_FORMAT, handlers=[logging.StreamHandler(sys.stdout)]
+    )
+    _attach_log_file(log_path)
+    db.connect()
+    install_io_counters()
+
+
+def execute_task(
+    entrypoint: str, season: int | None, verify: str | None, profile_path: str | None = None
+) -> dict:
+    """
+    Run one task's entry point (and its verification, if any).
+
+    Runs inside a worker process or inline. A return value of False from the
+    entry point counts as a failure, like a non-zero exit code did.
+    """
+    started = time.time()
+    probe = StepProbe(profile_path)
+    probe.start()
+    args = (season,) if season is not None else ()
+    ok, error = True, None
+    try:
+        if _resolve(entrypoint)(*args) is False:
+            ok, error = False, "step reported failure"
+        elif verify:
+            _resolve(verify)(*args)
+    except Exception as e:
+        ok, error = False, f"{e}\n{traceback.format_exc()}"
+    metrics = probe.stop()
+    return {
+        "ok": ok,
+        "error": error,
+        "started": started,
+        "duration": metrics["wall_seconds"],
+        "metrics": metrics,
+    }
+
+
+class _InlineExecutor:
+    """Runs submitted work immediately in this process (workers=1)."""
+
+    def submit(self, fn, *args) -> Future:
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        pass
+
+
+def run_dag(  # noqa: C901
+    tasks: list[Task],
+    workers: int = DEFAULT_WORKERS,
+    force: bool = False,
+    profile: bool = False,
+    log_path: str | None = None,
+    log: Callable[..., None] = print,
+    verify_content: bool = False,
+) -> bool:
+    """
+    Run tasks in dependency order, skipping those whose inputs are unchanged.
+
+    Args:
+        tasks: Tasks in the pipeline's serial order
+        workers: Worker processes; 1 runs everything in this process
+        force: Run every task even if its fingerprint is unchanged
+        profile: Run each task under cProfile (stats in etl/logs/profiles/)
+        log_path: Pipeline log file that worker output is appended to
+        log: Line logger for pipeline progress
+        verify_content: Fingerprint tables by a hash of their rows (full scans)
+            instead of their change markers
+
+    Returns:
+        True if no task failed
+    """
+    build_graph(tasks)
+
+    if not db.engine:
+        db.connect()
+
+    state = StepState()
+    previous = state.load()
+    fingerprints = Fingerprinter(verify_content)
+    recorder = RunRecorder()
+    seasons = sorted({t.season for t in tasks if t.season is not None})
+    recorder.start(seasons, workers, force, profile)
+
+    log_handler = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(log_path,),
+        )
+    else:
+        executor = _InlineExecutor()
+        log_handler = _attach_log_file(log_path)
+        install_io_counters()
+
+    log(f"  {len(tasks)} tasks, {workers} worker(s){', forced' if force else ''}")
+    run_started = time.time()
+    running: dict[Future, Task] = {}
+
+    try:
+        while True:
+            for task in tasks:
+                if task.status != "pending" or task in running.values():
+                    continue
+                if any(dep.status == "pending" for dep in task.deps):
+                    continue
+                if any(dep.status in ("failed", "blocked") for dep in task.deps):
+                    task.status = "blocked"
+                    recorder.record_step(task.key, task.name, task.season, task.status, None)
+                    log(f"  ⏭️  {task.key} blocked by a failed dependency")
+                    continue
+
+                fingerprint = fingerprints.fingerprint(task)
+                # Change markers may not show a write made moments ago yet
+                inputs_written = not fingerprints.verify_content and any(
+                    out.overlaps(r)
+                    for dep in task.deps
+                    if dep.status == "ran"
+                    for out in dep.outputs
+                    for r in task.inputs
+                )
+                if not force and not inputs_written and previous.get(task.key) == fingerprint:
+                    task.status = "skipped"
+                    task.started = time.time()
+                    recorder.record_step(
+                        task.key, task.name, task.season, task.status, task.started
+                    )
+                    log(f"  ⏩ {task.key} unchanged, skipped")
+                    continue
+
+                log(f"  ▶️  {task.key}")
+                profile_path = profile_path_for(recorder.run_id, task.key) if profile else None
+                future = executor.submit(
+                    execute_task, task.entrypoint, task.season, task.verify, profile_path
+                )
+                running[future] = task
+
+            if not running:
+                break
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                task = running.pop(future)
+                result = future.result()
+                task.started = result["started"]
+                task.duration = result["duration"]
+                task.metrics = result["metrics"]
+                fingerprints.invalidate(task.outputs)
+
+                if result["ok"]:
+                    task.status = "ran"
+                    # Fingerprint again so steps that rewrite their own inputs
+                    # (deduplicate_players) match on the next run
+                    state.save(task, fingerprints.fingerprint(task))
+                    log(f"  ✅ {task.key} ({task.duration:.1f}s)")
+                else:
+                    task.status = "failed"
+                    task.error = result["error"]
+                    log(f"  ❌ {task.key} failed: {result['error']}")
+                recorder.record_step(
+                    task.key, task.name, task.season, task.status, task.started, task.metrics
+                )
+    finally:
+        executor.shutdown(wait=True)
+        if log_handler:
+            logging.getLogger().removeHandler(log_handler)
+            log_handler.close()
+
+    wall_time = time.time() - run_started
+    success = not any(task.status in ("failed", "blocked") for task in tasks)
+    recorder.finish(success, wall_time)
+    log_timing_report(tasks, wall_time, run_started, log)
+    if recorder.run_id is not None:
+        log(f"  Metrics saved as run {recorder.run_id}: python etl/pipeline_metrics.py")
+    return success
+
+
+def critical_path(tasks: list[Task]) -> list[Task]:
+    """
+    The chain of dependent tasks that finished last.
+
+    Walks back from the last task to finish, each time through the dependency
+    that finished latest - the one the task was actually waiting on.
+    """
+    finished = [t for t in tasks if t.started is not None]
+    if not finished:
+        return []
+    path = [max(finished, key=lambda t: t.finished)]
+    while True:
+        deps = [d for d in path[-1].deps if d.started is not None]
+        if not deps:
+            break
+        path.append(max(deps, key=lambda t: t.finished))
+    return list(reversed(path))
+
+
+def log_timing_report(
+    tasks: list[Task], wall_time: float, run_started: float, log: Callable[..., None] = print
+) -> None:
+    """Log per-task timings, the critical path and achieved parallelism."""
+    busy = sum(t.duration for t in tasks)
+    counts = {}
+    for t in tasks:
+        counts[t.status] = counts.get(t.status, 0) + 1
+
+    log()
+    log("TIMING REPORT")
+    log("-" * 40)
+    log(f"  {'task':<36} {'start':>8} {'time':>8} {'cpu':>8} {'rss MB':>7}  status")
+    for t in sorted(tasks, key=lambda t: (t.started is None, t.started or 0)):
+        start = f"{t.started - run_started:7.1f}s" if t.started is not None else "       -"
+        cpu = f"{t.metrics['cpu_seconds']:7.1f}s" if t.metrics else "       -"
+        rss = f"{t.metrics['peak_rss_mb']:7.0f}" if t.metrics else "      -"
+        log(f"  {t.key:<36} {start} {t.duration:7.1f}s {cpu} {rss}  {t.status}")
+    log()
+    log("  " + ", ".join(f"{n} {status}" for status, n in sorted(counts.items())))
+    parallelism = busy / wall_time if wall_time > 0 else 0.0
+    log(f"  Wall time: {wall_time:.1f}s, step time: {busy:.1f}s ({parallelism:.1f}x parallelism)")
+
+    path = critical_path(tasks)
+    if path:
+        length = sum(t.duration for t in path)
+        log(f"  Critical path ({length:.1f}s):")
+        for t in path:
+            log(f"    {t.key:<34} {t.duration:7.1f}s")
+    log()
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Per-step profiling for the ETL pipeline, and a regression report.
+
+The DAG runner (etl/pipeline_dag.py) measures every task in the process
+that runs it:
+
+- wall and CPU time
+- peak RSS (reset before each step on Linux, so a reused worker reports
+  the step's own peak rather than the largest step it ever ran)
+- rows read and written and database round trips, counted by a SQLAlchemy
+  cursor-execute hook on every engine in the process
+
+With --profile the step also runs under cProfile. The stats are written to
+etl/logs/profiles/ and the top functions go to the pipeline log.
+
+Runs and steps are stored in pipeline_runs / pipeline_step_metrics
+(migration 012). This script compares the latest run with the median of
+earlier runs and flags steps that got slower or bigger.
+
+Usage:
+    python etl/pipeline_metrics.py                    # Latest run vs. last 10 runs
+    python etl/pipeline_metrics.py --run-id 42        # A specific run
+    python etl/pipeline_metrics.py --threshold 0.5    # Flag only >50% regressions
+    python etl/pipeline_metrics.py --fail-on-regression
+"""
+
+import argparse
+import cProfile
+import io
+import logging
+import os
+import pstats
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+
+from etl.database import db
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = Path(__file__).parent / "logs" / "profiles"
+
+# Functions listed in the log for a profiled step
+PROFILE_TOP_FUNCTIONS = 15
+
+# Regression thresholds for the report
+DEFAULT_HISTORY = 10
+DEFAULT_THRESHOLD = 0.25
+MIN_WALL_DELTA_SECONDS = 1.0
+MIN_RSS_DELTA_MB = 50.0
+
+_WRITE_KEYWORDS = ("INSERT", "UPDATE", "DELETE", "MERGE")
+
+# Database I/O of the step currently running in this process
+_io = {"rows_read": 0, "rows_written": 0, "round_trips": 0}
+_io_hook_installed = False
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # psycopg2 runs executemany() as one statement per parameter set
+    _io["round_trips"] += len(parameters) if executemany and parameters else 1
+    if cursor.rowcount is None or cursor.rowcount < 0:
+        return
+    head = statement.lstrip()[:6].upper()
+    if head.startswith(_WRITE_KEYWORDS) or (
+        head.startswith("WITH") and any(k in statement.upper() for k in _WRITE_KEYWORDS)
+    ):
+        _io["rows_written"] += cursor.rowcount
+    else:
+        _io["rows_read"] += cursor.rowcount
+
+
+def install_io_counters() -> None:
+    """Count rows and round trips for every engine in this process."""
+    global _io_hook_installed
+    if not _io_hook_installed:
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        _io_hook_installed = True
+
+
+def _reset_peak_rss() -> None:
+    # Writing 5 to clear_refs resets VmHWM (Linux only)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss is the process lifetime peak: KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class StepProbe:
+    """
+    Measures one step in the current process.
+
+    Usage:
+        probe = StepProbe(profile_path)
+        probe.start()
+        ...run the step...
+        metrics = probe.stop()
+    """
+
+    def __init__(self, profile_path: str | None = None):
+        self.profile_path = profile_path
+        self._profiler = None
+
+    def start(self) -> None:
+        install_io_counters()
+        for key in _io:
+            _io[key] = 0
+        _reset_peak_rss()
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        if self.profile_path:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop(self) -> dict[str, Any]:
+        if self._profiler:
+            self._profiler.disable()
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        rows = _io["rows_read"] + _io["rows_written"]
+        metrics = {
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "peak_rss_mb": _peak_rss_mb(),
+            **_io,
+            "rows_per_second": rows / wall if wall > 0 else 0.0,
+            "profile_path": None,
+        }
+        if self._profiler:
+            metrics["profile_path"] = self._save_profile()
+        return metrics
+
+    def _save_profile(self) -> str | None:
+        try:
+            Path(self.profile_path).parent.mkdir(parents=True, exist_ok=True)
+            self._profiler.dump_stats(self.profile_path)
+            out = io.StringIO()
+            stats = pstats.Stats(self._profiler, stream=out)
+            stats.sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+            logger.info(f"Profile written to {self.profile_path}\n{out.getvalue()}")
+            return self.profile_path
+        except Exception as e:
+            logger.warning(f"Could not save profile: {e}")
+            return None
+
+
+def profile_path_for(run_id: int | None, task_key: str) -> str:
+    """Where a task's cProfile stats go for a given run."""
+    safe_key = task_key.replace("[", "_").replace("]", "")
+    return str(PROFILE_DIR / f"run{run_id or 0}_{safe_key}.prof")
+
+
+class RunRecorder:
+    """Writes pipeline_runs / pipeline_step_metrics rows; a no-op if they are missing."""
+
+    def __init__(self):
+        self.run_id = None
+
+    def start(self, seasons: list[int], workers: int, forced: bool, profiled: bool) -> None:
+        try:
+            with db.engine.begin() as conn:
+                self.run_id = conn.execute(
+                    text(
+                        """
+                        INSERT INTO pipeline_runs (started_at, seasons, workers, forced, profiled)
+                        VALUES (:started_at, :seasons, :workers, :forced, :profiled)
+                        RETURNING run_id
+                        """
+                    ),
+                    {
+                        "started_at": datetime.utcnow(),
+                        "seasons": seasons,
+                        "workers": workers,
+                        "forced": forced,
+                        "profiled": profiled,
+                    },
+                ).scalar()
+        except Exception as e:
+            logger.warning(f"pipeline_runs unavailable, step metrics won't be saved: {e}")
+
+    def record_step(
+        self,
+        task_key: str,
+        step: str,
+        season: int | None,
+        status: str,
+        started: float | None,
+        metrics: dict[str, Any] | None = None,
+    ) -> None:
+        if self.run_id is None:
+            return
+        metrics = metrics or {}
+        row = {
+            "run_id": self.run_id,
+            "task_key": task_key,
+            "step": step,
+            "season": season,
+            "status": status,
+            "started_at": datetime.utcfromtimestamp(started) if started else None,
+        }
+        for key in (
+            "wall_seconds",
+            "cpu_seconds",
+            "peak_rss_mb",
+            "rows_read",
+            "rows_written",
+            "round_trips",
+            "rows_per_second",
+            "profile_path",
+        ):
+            row[key] = metrics.get(key)
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        """
+                        INSERT INTO pipeline_step_metrics (
+                            run_id, task_key, step, season, status, started_at,
+                            wall_seconds, cpu_seconds, peak_rss_mb, rows_read,
+                            rows_written, round_trips, rows_per_second, profile_path
+                        )
+                        VALUES (
+                            :run_id, :task_key, :step, :season, :status, :started_at,
+                            :wall_seconds, :cpu_seconds, :peak_rss_mb, :rows_read,
+                            :rows_written, :round_trips, :rows_per_second, :profile_path
+                        )
+                        ON CONFLICT (run_id, task_key) DO NOTHING
+                        """
+                    ),
+                    row,
+                )
+        except Exception as e:
+            logger.warning(f"Could not save metrics for {task_key}: {e}")
+
+    def finish(self, success: bool, wall_seconds: float) -> None:
+        if self.run_id is None:
+            return
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(
+                    text(
+                        """
+                        UPDATE pipeline_runs
+                        SET finished_at = :finished_at, success = :success,
+                            wall_seconds = :wall_seconds
+                        WHERE run_id = :run_id
+                        """
+                    ),
+                    {
+                        "run_id": self.run_id,
+                        "finished_at": datetime.utcnow(),
+                        "success": success,
+                        "wall_seconds": round(wall_seconds, 3),
+                    },
+                )
+        except Exception as e:
+            logger.warning(f"Could not finish pipeline run {self.run_id}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+
+def get_run(conn, run_id: int = None) -> dict | None:
+    """Get a run by id, or the most recent finished run."""
+    where = "WHERE run_id = :run_id" if run_id else "WHERE finished_at IS NOT NULL"
+    row = conn.execute(
+        text(f"SELECT * FROM pipeline_runs {where} ORDER BY run_id DESC LIMIT 1"),
+        {"run_id": run_id},
+    ).fetchone()
+    return dict(row._mapping) if row else None
+
+
+def get_step_comparison(conn, run_id: int, history: int) -> list[dict]:
+    """
+    Steps that ran in a run, next to their medians over earlier runs.
+
+    Only runs where the step actually ran count towards its median, so a
+    string of skipped runs doesn't dilute the history.
+    """
+    result = conn.execute(
+        text(
+            """
+            WITH latest AS (
+                SELECT * FROM pipeline_step_metrics
+                WHERE run_id = :run_id AND status = 'ran'
+            ),
+            history AS (
+                SELECT m.*,
+                       ROW_NUMBER() OVER (PARTITION BY m.task_key ORDER BY m.run_id DESC) AS n
+                FROM pipeline_step_metrics m
+                JOIN latest l ON l.task_key = m.task_key
+                WHERE m.run_id < :run_id AND m.status = 'ran'
+            ),
+            medians AS (
+                SELECT
+                    task_key,
+                    COUNT(*) AS runs,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY wall_seconds) AS wall_median,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY cpu_seconds) AS cpu_median,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY peak_rss_mb) AS rss_median,
+                    percentile_cont(0.5) WITHIN GROUP (ORDER BY rows_per_second) AS rps_median
+                FROM history
+                WHERE n <= :history
+                GROUP BY task_key
+            )
+            SELECT l.task_key, l.wall_seconds, l.cpu_seconds, l.peak_rss_mb,
+                   l.rows_read, l.rows_written, l.round_trips, l.rows_per_second,
+                   l.profile_path, COALESCE(m.runs, 0) AS runs,
+                   m.wall_median, m.cpu_median, m.rss_median, m.rps_median
+            FROM latest l
+            LEFT JOIN medians m ON m.task_key = l.task_key
+            ORDER BY l.wall_seconds DESC
+            """
+        ),
+        {"run_id": run_id, "history": history},
+    )
+    return [dict(row._mapping) for row in result]
+
+
+def find_regressions(step: dict, threshold: float) -> list[str]:
+    """Describe how a step regressed against its median, if it did."""
+    if not step["runs"]:
+        return []
+
+    flags = []
+    wall, wall_median = float(step["wall_seconds"] or 0), float(step["wall_median"] or 0)
+    if wall > wall_median * (1 + threshold) and wall - wall_median >= MIN_WALL_DELTA_SECONDS:
+        flags.append(f"wall +{(wall / wall_median - 1) * 100:.0f}%" if wall_median else "wall")
+
+    cpu, cpu_median = float(step["cpu_seconds"] or 0), float(step["cpu_median"] or 0)
+    if cpu > cpu_median * (1 + threshold) and cpu - cpu_median >= MIN_WALL_DELTA_SECONDS:
+        flags.append(f"cpu +{(cpu / cpu_median - 1) * 100:.0f}%" if cpu_median else "cpu")
+
+    rss, rss_median = float(step["peak_rss_mb"] or 0), float(step["rss_median"] or 0)
+    if rss > rss_median * (1 + threshold) and rss - rss_median >= MIN_RSS_DELTA_MB:
+        flags.append(f"rss +{rss - rss_median:.0f}MB")
+
+    return flags
+
+
+def print_report(
+    run_id: int = None,
+    history: int = DEFAULT_HISTORY,
+    threshold: float = DEFAULT_THRESHOLD,
+) -> int:
+    """
+    Print the latest (or given) run against historical medians.
+
+    Returns:
+        Number of steps flagged as regressions
+    """
+    with db.engine.connect() as conn:
+        run = get_run(conn, run_id)
+        if not run:
+            logger.error("No pipeline runs recorded yet")
+            return 0
+        steps = get_step_comparison(conn, run["run_id"], history)
+
+    wall = f"{float(run['wall_seconds']):.1f}s" if run["wall_seconds"] is not None else "?"
+    logger.info("=" * 100)
+    logger.info(
+        f"Pipeline run {run['run_id']} - started {run['started_at']:%Y-%m-%d %H:%M}, "
+        f"seasons {run['seasons']}, {run['workers']} worker(s), wall {wall}, "
+        f"{'succeeded' if run['success'] else 'FAILED'}"
+    )
+    logger.info(f"Compared with the median of up to {history} earlier runs per step")
+    logger.info("=" * 100)
+    logger.info(
+        f"{'task':<34} {'wall':>8} {'median':>8} {'cpu':>8} {'rss MB':>8} "
+        f"{'rows/s':>9} {'trips':>7}  flags"
+    )
+    logger.info("-" * 100)
+
+    regressions = 0
+    for step in steps:
+        flags = find_regressions(step, threshold)
+        regressions += bool(flags)
+        median = f"{float(step['wall_median']):7.1f}s" if step["runs"] else "       -"
+        logger.info(
+            f"{step['task_key']:<34} {float(step['wall_seconds']):7.1f}s {median} "
+            f"{float(step['cpu_seconds']):7.1f}s {float(step['peak_rss_mb']):8.0f} "
+            f"{float(step['rows_per_second']):9.0f} {step['round_trips']:>7}  "
+            f"{'⚠️  ' + ', '.join(flags) if flags else ''}"
+        )
+        if flags and step["profile_path"]:
+            logger.info(f"{'':<34} profile: {step['profile_path']}")
+
+    logger.info("-" * 100)
+    if not steps:
+        logger.info("No steps ran in this run (all inputs unchanged?)")
+    elif regressions:
+        logger.info(f"⚠️  {regressions} step(s) regressed by more than {threshold:.0%}")
+    else:
+        logger.info("✅ No regressions")
+    return regressions
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        handlers=[logging.StreamHandler(sys.stdout)],
+    )
+
+    parser = argparse.ArgumentParser(
+        description="Compare the latest ETL pipeline run with historical medians"
+    )
+    parser.add_argument("--run-id", type=int, help="Run to report on (default: latest)")
+    parser.add_argument(
+        "--history",
+        type=int,
+        default=DEFAULT_HISTORY,
+        help=f"Earlier runs per step to take the median of (default: {DEFAULT_HISTORY})",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Relative slowdown flagged as a regression (default: {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="Exit with status 1 when any step regressed",
+    )
+
+    args = parser.parse_args()
+
+    db.connect()
+    try:
+        regressions = print_report(args.run_id, args.history, args.threshold)
+    finally:
+        db.close()
+
+    sys.exit(1 if regressions and args.fail_on_regression else 0)
+
+
+if __name__ == "__main__":
+    main()
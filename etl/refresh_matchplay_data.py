@@ -11,12 +11,15 @@ Usage:
     python etl/refresh_matchplay_data.py                  # Refresh all linked players
     python etl/refresh_matchplay_data.py --dry-run        # Show what would be refreshed
     python etl/refresh_matchplay_data.py --limit 10       # Refresh only 10 players (for testing)
+    python etl/refresh_matchplay_data.py --stale-hours 24 # Resume: skip players synced in last 24h
     python etl/refresh_matchplay_data.py --verbose        # Enable verbose logging
 
 Rate Limiting:
-    - Matchplay API has rate limits; this script respects them
-    - Adds a small delay between requests to avoid hitting limits
-    - Stops gracefully if rate limit is nearly exhausted
+    - Requests are paced by a token bucket sized from the x-ratelimit-* headers
+      (see api/services/matchplay_scheduler.py), with several in flight at once
+    - 429 responses are retried with exponential backoff
+    - Players are refreshed stalest-first and results are committed in small
+      batches with one bulk upsert each, so an interrupted run resumes where it stopped
 
 Data Cached:
     - Rating (value, RD, lower bound)
@@ -31,7 +34,7 @@ import asyncio
 import logging
 import os
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -48,6 +51,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Refreshed profiles are written (and committed) in batches of this size
+WRITE_BATCH_SIZE = 25
+
 
 def check_matchplay_configured() -> bool:
     """Check if Matchplay API token is configured."""
@@ -61,8 +67,13 @@ def check_matchplay_configured() -> bool:
     return True
 
 
-async def get_linked_players(conn, limit: int = None) -> list:
-    """Get all players with linked Matchplay accounts."""
+async def get_linked_players(conn, limit: int = None, stale_hours: float = None) -> list:
+    """
+    Get players with linked Matchplay accounts, stalest last_synced first.
+
+    If stale_hours is given, players synced more recently than that are skipped,
+    which lets an interrupted refresh resume without redoing finished players.
+    """
     query = """
         SELECT
             m.mnp_player_key,
@@ -72,116 +83,49 @@ async def get_linked_players(conn, limit: int = None) -> list:
             p.name as mnp_name
         FROM matchplay_player_mappings m
         JOIN players p ON p.player_key = m.mnp_player_key
-        ORDER BY m.last_synced ASC NULLS FIRST
     """
+    params = {}
+    if stale_hours is not None:
+        query += " WHERE m.last_synced IS NULL OR m.last_synced < :cutoff"
+        params["cutoff"] = datetime.utcnow() - timedelta(hours=stale_hours)
+    query += " ORDER BY m.last_synced ASC NULLS FIRST"
     if limit:
         query += f" LIMIT {limit}"
 
-    result = conn.execute(text(query))
+    result = conn.execute(text(query), params)
     return [dict(row._mapping) for row in result]
 
 
-async def fetch_matchplay_profile(client, user_id: int) -> dict:
-    """Fetch a user's full profile from Matchplay API."""
-    try:
-        return await client.get_user_profile(user_id)
-    except Exception as e:
-        logger.warning(f"Failed to fetch profile for user {user_id}: {e}")
-        return None
-
-
-def update_cached_data(conn, matchplay_user_id: int, profile_data: dict) -> bool:
-    """Update the cached Matchplay data in the database."""
-    if not profile_data:
-        return False
-
-    # Extract user info
-    user_info = profile_data.get("user", {})
-    location = user_info.get("location")
-    avatar = user_info.get("avatar")
-
-    # Extract rating data
-    rating_data = profile_data.get("rating", {})
-    rating_value = rating_data.get("rating")
-    rating_rd = rating_data.get("rd")
-    game_count = rating_data.get("gameCount")
-    win_count = rating_data.get("winCount")
-    loss_count = rating_data.get("lossCount")
-    efficiency_percent = rating_data.get("efficiencyPercent")
-    lower_bound = rating_data.get("lowerBound")
-
-    # Extract IFPA data
-    ifpa_data = profile_data.get("ifpa", {})
-    ifpa_id = ifpa_data.get("ifpaId") if ifpa_data else None
-    ifpa_rank = ifpa_data.get("rank") if ifpa_data else None
-    ifpa_rating = ifpa_data.get("rating") if ifpa_data else None
-    ifpa_womens_rank = ifpa_data.get("womensRank") if ifpa_data else None
-
-    # Extract tournament count
-    counts = profile_data.get("userCounts", {})
-    tournament_count = counts.get("tournamentPlayCount")
-
-    now = datetime.utcnow()
-
-    # Delete existing cached rating
-    conn.execute(
-        text("""
-        DELETE FROM matchplay_ratings
-        WHERE matchplay_user_id = :matchplay_user_id
-    """),
-        {"matchplay_user_id": matchplay_user_id},
-    )
+def write_cached_data(conn, profiles: dict[int, dict]) -> int:
+    """
+    Write a batch of fetched profiles to the cache and commit.
 
-    # Insert new cached data
-    conn.execute(
-        text("""
-        INSERT INTO matchplay_ratings
-            (matchplay_user_id, rating_value, rating_rd, game_count, win_count,
-             loss_count, efficiency_percent, lower_bound, ifpa_id, ifpa_rank,
-             ifpa_rating, ifpa_womens_rank, tournament_count, location, avatar, fetched_at)
-        VALUES
-            (:matchplay_user_id, :rating_value, :rating_rd, :game_count, :win_count,
-             :loss_count, :efficiency_percent, :lower_bound, :ifpa_id, :ifpa_rank,
-             :ifpa_rating, :ifpa_womens_rank, :tournament_count, :location, :avatar, :fetched_at)
-    """),
-        {
-            "matchplay_user_id": matchplay_user_id,
-            "rating_value": rating_value,
-            "rating_rd": rating_rd,
-            "game_count": game_count,
-            "win_count": win_count,
-            "loss_count": loss_count,
-            "efficiency_percent": efficiency_percent,
-            "lower_bound": lower_bound,
-            "ifpa_id": ifpa_id,
-            "ifpa_rank": ifpa_rank,
-            "ifpa_rating": ifpa_rating,
-            "ifpa_womens_rank": ifpa_womens_rank,
-            "tournament_count": tournament_count,
-            "location": location,
-            "avatar": avatar,
-            "fetched_at": now,
-        },
-    )
+    Uses a single set-based upsert for matchplay_ratings and matchplay_player_mappings
+    (see api/services/matchplay_ratings.py). Returns the number of players written.
+    """
+    from api.services.matchplay_ratings import bulk_upsert_ratings, profile_to_rating_row
 
-    # Update last_synced in mappings table
-    conn.execute(
-        text("""
-        UPDATE matchplay_player_mappings
-        SET last_synced = :last_synced
-        WHERE matchplay_user_id = :matchplay_user_id
-    """),
-        {"matchplay_user_id": matchplay_user_id, "last_synced": now},
-    )
+    if not profiles:
+        return 0
 
-    return True
+    rows = [profile_to_rating_row(user_id, profile) for user_id, profile in profiles.items()]
+    written = bulk_upsert_ratings(conn, rows)
+    conn.commit()
+    return written
 
 
-async def refresh_all_players(dry_run: bool = False, limit: int = None, verbose: bool = False):  # noqa: C901
+async def refresh_all_players(  # noqa: C901
+    dry_run: bool = False,
+    limit: int = None,
+    verbose: bool = False,
+    stale_hours: float = None,
+    concurrency: int = None,
+):
     """Refresh Matchplay data for all linked players."""
 
     # Import the Matchplay client
     from api.services.matchplay_client import MatchplayClient
+    from api.services.matchplay_scheduler import DEFAULT_CONCURRENCY, MatchplayRefreshScheduler
 
     client = MatchplayClient()
     if not client.is_configured():
@@ -195,15 +139,15 @@ async def refresh_all_players(dry_run: bool = False, limit: int = None, verbose:
 
     try:
         with db.engine.connect() as conn:
-            # Get all linked players
-            players = await get_linked_players(conn, limit)
+            # Get linked players, stalest first
+            players = await get_linked_players(conn, limit, stale_hours)
             total_players = len(players)
 
             if total_players == 0:
-                logger.info("No linked Matchplay accounts found.")
+                logger.info("No linked Matchplay accounts need refreshing.")
                 return True
 
-            logger.info(f"Found {total_players} linked Matchplay accounts")
+            logger.info(f"Found {total_players} linked Matchplay accounts to refresh")
 
             if dry_run:
                 logger.info("DRY RUN - No changes will be made")
@@ -213,50 +157,37 @@ async def refresh_all_players(dry_run: bool = False, limit: int = None, verbose:
                     )
                 return True
 
-            # Process each player
+            names = {p["matchplay_user_id"]: p["mnp_name"] for p in players}
+            pending: dict[int, dict] = {}
             success_count = 0
-            error_count = 0
-            skipped_count = 0
-
-            for i, player in enumerate(players, 1):
-                mnp_name = player["mnp_name"]
-                matchplay_user_id = player["matchplay_user_id"]
-
-                # Check rate limit before each request
-                if client.rate_limit_remaining is not None and client.rate_limit_remaining <= 5:
-                    logger.warning(
-                        f"Rate limit nearly exhausted ({client.rate_limit_remaining} remaining). Stopping."
-                    )
-                    skipped_count = total_players - i + 1
-                    break
 
+            def on_profile(matchplay_user_id: int, profile: dict):
+                # Commit in small batches so an interrupted run can resume
+                nonlocal success_count
+                pending[matchplay_user_id] = profile
                 if verbose:
+                    rating = profile.get("rating", {}).get("rating", "N/A")
                     logger.info(
-                        f"[{i}/{total_players}] Refreshing {mnp_name} (user {matchplay_user_id})..."
+                        f"  {names[matchplay_user_id]} (user {matchplay_user_id}): {rating}"
                     )
+                if len(pending) >= WRITE_BATCH_SIZE:
+                    success_count += write_cached_data(conn, pending)
+                    pending.clear()
+
+            scheduler = MatchplayRefreshScheduler(
+                client, concurrency=concurrency or DEFAULT_CONCURRENCY
+            )
+            try:
+                result = await scheduler.fetch_profiles(
+                    [p["matchplay_user_id"] for p in players], on_profile=on_profile
+                )
+            finally:
+                success_count += write_cached_data(conn, pending)
 
-                # Fetch profile from API
-                profile = await fetch_matchplay_profile(client, matchplay_user_id)
-
-                if profile:
-                    # Update database
-                    if update_cached_data(conn, matchplay_user_id, profile):
-                        success_count += 1
-                        if verbose:
-                            rating = profile.get("rating", {}).get("rating", "N/A")
-                            logger.info(f"  Rating: {rating}")
-                    else:
-                        error_count += 1
-                else:
-                    error_count += 1
-                    logger.warning(f"  Failed to fetch data for {mnp_name}")
-
-                # Small delay between requests to avoid rate limiting
-                if i < total_players:
-                    await asyncio.sleep(0.2)
-
-            # Commit all changes
-            conn.commit()
+            for matchplay_user_id in result["failed"]:
+                logger.warning(f"  Failed to fetch data for {names[matchplay_user_id]}")
+            error_count = len(result["failed"])
+            skipped_count = len(result["skipped"])
 
             # Summary
             logger.info("=" * 50)
@@ -266,7 +197,11 @@ async def refresh_all_players(dry_run: bool = False, limit: int = None, verbose:
             logger.info(f"Successfully refreshed: {success_count}")
             logger.info(f"Errors: {error_count}")
             if skipped_count > 0:
-                logger.info(f"Skipped (rate limit): {skipped_count}")
+                logger.info(f"Skipped: {skipped_count} (rerun with --stale-hours to resume)")
+            elapsed = result["elapsed"]
+            logger.info(
+                f"Elapsed: {elapsed:.1f}s ({success_count / elapsed if elapsed else 0:.2f} players/s)"
+            )
             if client.rate_limit_remaining is not None:
                 logger.info(
                     f"API rate limit remaining: {client.rate_limit_remaining}/{client.rate_limit_total}"
@@ -296,6 +231,9 @@ Examples:
 
     # Refresh only first 10 players (for testing)
     python etl/refresh_matchplay_data.py --limit 10 --verbose
+
+    # Resume an interrupted run (skip players refreshed in the last day)
+    python etl/refresh_matchplay_data.py --stale-hours 24
 """,
     )
 
@@ -305,6 +243,18 @@ Examples:
     parser.add_argument(
         "--limit", type=int, default=None, help="Limit number of players to refresh (for testing)"
     )
+    parser.add_argument(
+        "--stale-hours",
+        type=float,
+        default=None,
+        help="Only refresh players not synced within this many hours (resume a partial run)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum concurrent Matchplay requests (default: 4)",
+    )
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
 
     args = parser.parse_args()
@@ -322,7 +272,13 @@ Examples:
 
     # Run the refresh
     success = asyncio.run(
-        refresh_all_players(dry_run=args.dry_run, limit=args.limit, verbose=args.verbose)
+        refresh_all_players(
+            dry_run=args.dry_run,
+            limit=args.limit,
+            verbose=args.verbose,
+            stale_hours=args.stale_hours,
+            concurrency=args.concurrency,
+        )
     )
 
     sys.exit(0 if success else 1)
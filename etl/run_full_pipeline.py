@@ -53,6 +53,11 @@ Pipeline Steps (in order):
        This calculates picks per (team, machine, home/away, round_type).
     5. calculate_player_totals.py - Calculate player season totals
     6. calculate_match_points.py - Calculate match point totals
+    7. calculate_team_machine_stats.py - Aggregate team statistics per machine
+    8. calculate_score_sketches.py - Build score quantile sketches (t-digests)
+    9. calculate_score_distributions.py - Build pre-binned score distributions
+    10. calculate_score_leaderboards.py - Build top-score leaderboards
+    11. calculate_weekly_recaps.py - Build weekly recaps of completed weeks
 
     EXTERNAL DATA (optional, requires MATCHPLAY_API_TOKEN):
     - refresh_matchplay_data.py - Refresh Matchplay.events data for linked players
@@ -66,6 +71,38 @@ Verification:
 
 Note: Steps 2-6 are aggregate calculations that depend on step 1 and post-load steps.
 
+Execution:
+    By default the steps run as an in-process DAG (etl/pipeline_dag.py): each
+    step declares the tables and files it reads and writes in STEP_IO, steps
+    and seasons that don't touch the same data run concurrently across a
+    worker pool, and steps whose inputs haven't changed since their last
+    successful run are skipped. A timing report with the critical path is
+    logged at the end.
+
+    # Run with 8 workers, or everything in this process
+    python etl/run_full_pipeline.py --all-seasons --workers 8
+    python etl/run_full_pipeline.py --all-seasons --workers 1
+
+    # Rerun every step even if its inputs are unchanged
+    python etl/run_full_pipeline.py --all-seasons --force
+
+    # Fingerprint tables by a hash of their rows instead of their change
+    # counters (scans every input table; skips steps whose data didn't change)
+    python etl/run_full_pipeline.py --all-seasons --force-verify
+
+    # Profile every step with cProfile, then compare against earlier runs
+    python etl/run_full_pipeline.py --all-seasons --force --profile
+    python etl/pipeline_metrics.py
+
+    # Old behaviour: one subprocess per script, strictly in order
+    python etl/run_full_pipeline.py --all-seasons --serial
+
+    # Full rebuild: drop the secondary indexes on scores and games, load
+    # everything, then rebuild the indexes in parallel before the post-load
+    # and aggregate steps run (etl/index_maintenance.py; its --report shows
+    # which indexes are used)
+    python etl/run_full_pipeline.py --all-seasons --defer-indexes
+
 Logging:
     All pipeline output (including subprocess output) is written to both the
     console and a timestamped log file in etl/logs/. Old log files are
@@ -99,6 +136,11 @@ PIPELINE_STEPS = [
         False,
     ),  # This one processes all seasons at once
     ("calculate_match_points.py", "Calculate match points", True, False),
+    ("calculate_team_machine_stats.py", "Calculate team machine stats", True, False),
+    ("calculate_score_sketches.py", "Build score quantile sketches", True, False),
+    ("calculate_score_distributions.py", "Build score distributions", True, False),
+    ("calculate_score_leaderboards.py", "Build score leaderboards", True, False),
+    ("calculate_weekly_recaps.py", "Build weekly recaps", True, False),
 ]
 
 # Post-load steps that run once after all seasons are loaded
@@ -114,9 +156,161 @@ EXTERNAL_DATA_STEPS = [
     ("refresh_matchplay_data.py", "Refresh Matchplay.events data"),
 ]
 
-# Aggregate-only steps (steps 2-6)
+# Aggregate-only steps (steps 2-11)
 AGGREGATE_STEPS = PIPELINE_STEPS[1:]
 
+# What each step calls and touches, for the DAG runner (etl/pipeline_dag.py)
+# Format: script_name -> (entrypoint, verify, inputs, outputs)
+# Tables are "table" (all rows) or "table@{season}" (one season's rows);
+# files are "file:<path>" relative to the project root.
+# Two steps only run concurrently when neither writes what the other touches.
+STEP_IO = {
+    "load_season.py": (
+        "etl.load_season:load_season_data",
+        None,
+        (
+            "file:mnp-data-archive/season-{season}",
+            "file:mnp-data-archive/venues.json",
+            "file:mnp-data-archive/IPR.csv",
+            "file:machine_variations.json",
+            "file:etl/parsers",
+            "file:etl/loaders",
+        ),
+        (
+            # Shared dimension tables are upserted by every season's load,
+            # so season loads run one at a time
+            "machines",
+            "machine_aliases",
+            "venues",
+            "players",
+            "teams@{season}",
+            "venue_machines@{season}",
+            "matches@{season}",
+            "games@{season}",
+            "match_round_points@{season}",
+            "scores@{season}",
+        ),
+    ),
+    # Only with --defer-indexes, right after the season loads: every later step
+    # that reads scores or games waits for their indexes to be rebuilt
+    "index_maintenance.py": (
+        "etl.index_maintenance:rebuild_deferred_indexes",
+        None,
+        ("pipeline_deferred_indexes",),
+        ("pipeline_deferred_indexes", "scores", "games"),
+    ),
+    # Not a script: each season's score snapshot (etl/loaders/season_snapshot.py),
+    # written once after the steps that change scores and matches, for the
+    # aggregate steps that read it (the snapshot directory in their inputs)
+    "season_snapshot.py": (
+        "etl.loaders.season_snapshot:write_season_snapshot",
+        None,
+        (
+            "scores@{season}",
+            "matches@{season}",
+            "file:etl/loaders/season_snapshot.py",
+            "file:.cache/season_snapshots/season-{season}",
+        ),
+        ("file:.cache/season_snapshots/season-{season}",),
+    ),
+    "deduplicate_players.py": (
+        "etl.deduplicate_players:deduplicate_players",
+        None,
+        ("players", "scores"),
+        ("players", "scores"),
+    ),
+    "backfill_match_machines.py": (
+        "etl.backfill_match_machines:backfill_match_machines",
+        "etl.backfill_match_machines:verify_machines_data",
+        ("file:mnp-data-archive", "matches"),
+        ("matches",),
+    ),
+    "backfill_venue_machines.py": (
+        "etl.backfill_venue_machines:backfill_venue_machines",
+        "etl.backfill_venue_machines:verify_data_consistency",
+        ("scores", "matches", "machines", "venue_machines"),
+        ("machines", "venue_machines"),
+    ),
+    "calculate_percentiles.py": (
+        "etl.calculate_percentiles:calculate_and_store_percentiles",
+        "etl.calculate_percentiles:verify_percentiles",
+        ("scores@{season}",),
+        ("score_percentiles@{season}",),
+    ),
+    "calculate_player_stats.py": (
+        "etl.calculate_player_stats:calculate_and_store_player_stats",
+        "etl.calculate_player_stats:verify_player_stats",
+        (
+            "scores@{season}",
+            "players",
+            "score_percentiles@{season}",
+            "file:.cache/season_snapshots/season-{season}",
+        ),
+        ("player_machine_stats@{season}",),
+    ),
+    "calculate_team_machine_picks.py": (
+        "etl.calculate_team_machine_picks:calculate_and_store_team_picks",
+        "etl.calculate_team_machine_picks:verify_team_picks",
+        (
+            "scores@{season}",
+            "matches@{season}",
+            "venue_machines@{season}",
+            "file:.cache/season_snapshots/season-{season}",
+        ),
+        ("team_machine_picks@{season}",),
+    ),
+    "calculate_player_totals.py": (
+        "etl.calculate_player_totals:calculate_and_store_player_totals",
+        "etl.calculate_player_totals:verify_player_totals",
+        ("scores",),
+        ("players",),
+    ),
+    "calculate_match_points.py": (
+        "etl.calculate_match_points:calculate_and_store_match_points",
+        "etl.calculate_match_points:verify_match_points",
+        ("file:mnp-data-archive/season-{season}/matches",),
+        ("matches@{season}",),
+    ),
+    "calculate_team_machine_stats.py": (
+        "etl.calculate_team_machine_stats:calculate_and_store_team_machine_stats",
+        "etl.calculate_team_machine_stats:verify_team_machine_stats",
+        ("scores@{season}",),
+        ("team_machine_stats@{season}",),
+    ),
+    "calculate_score_sketches.py": (
+        "etl.calculate_score_sketches:calculate_and_store_score_sketches",
+        "etl.calculate_score_sketches:verify_score_sketches",
+        ("scores@{season}", "file:.cache/season_snapshots/season-{season}"),
+        ("machine_score_sketches@{season}", "player_score_sketches@{season}"),
+    ),
+    "calculate_score_distributions.py": (
+        "etl.calculate_score_distributions:calculate_and_store_score_distributions",
+        "etl.calculate_score_distributions:verify_score_distributions",
+        ("scores@{season}", "file:.cache/season_snapshots/season-{season}"),
+        ("machine_score_distributions@{season}",),
+    ),
+    "calculate_score_leaderboards.py": (
+        "etl.calculate_score_leaderboards:calculate_and_store_score_leaderboards",
+        "etl.calculate_score_leaderboards:verify_score_leaderboards",
+        ("scores@{season}", "players", "teams@{season}", "venues"),
+        ("machine_score_leaderboards@{season}",),
+    ),
+    "calculate_weekly_recaps.py": (
+        "etl.calculate_weekly_recaps:calculate_and_store_weekly_recaps",
+        "etl.calculate_weekly_recaps:verify_weekly_recaps",
+        (
+            "matches@{season}",
+            "scores@{season}",
+            "teams@{season}",
+            "players",
+            "machines",
+            "score_percentiles@{season}",
+            "match_round_points@{season}",
+        ),
+        ("weekly_recaps@{season}",),
+    ),
+}
+
 # Log rotation: keep this many recent log files
 MAX_LOG_FILES = 10
 
@@ -130,7 +324,8 @@ class PipelineLogger:
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_path = log_dir / f"pipeline_{timestamp}.log"
-        self._file = open(self.log_path, "w")  # noqa: SIM115
+        # Append mode: DAG worker processes append to the same file
+        self._file = open(self.log_path, "a")  # noqa: SIM115
 
     def _rotate_logs(self, log_dir: Path):
         """Delete old log files, keeping only the most recent MAX_LOG_FILES."""
@@ -247,6 +442,68 @@ def verify_matchplay_restored(etl_dir: Path, expected_count: int) -> tuple[bool,
         return False, str(e)
 
 
+def defer_secondary_indexes(etl_dir: Path, logger: PipelineLogger = None) -> bool:
+    """Drop the secondary indexes on the tables the season loads fill (scores, games)."""
+    log = logger.log if logger else print
+    try:
+        sys.path.insert(0, str(etl_dir.parent))
+        from etl.database import db
+        from etl.index_maintenance import DEFERRED_INDEX_TABLES, drop_secondary_indexes
+
+        if not db.engine:
+            db.connect()
+        count = drop_secondary_indexes(DEFERRED_INDEX_TABLES)
+        log(f"  Dropped {count} secondary indexes on {', '.join(DEFERRED_INDEX_TABLES)}")
+        log("  (definitions kept in pipeline_deferred_indexes until rebuilt)")
+        return True
+    except Exception as e:
+        log(f"  ❌ Could not drop secondary indexes: {e}")
+        return False
+
+
+def rebuild_secondary_indexes(workers: int, etl_dir: Path, logger: PipelineLogger = None) -> bool:
+    """Rebuild the indexes dropped by defer_secondary_indexes, several at a time."""
+    log = logger.log if logger else print
+    try:
+        sys.path.insert(0, str(etl_dir.parent))
+        from etl.database import db
+        from etl.index_maintenance import DEFAULT_REBUILD_WORKERS, rebuild_deferred_indexes
+
+        if not db.engine:
+            db.connect()
+        workers = workers or DEFAULT_REBUILD_WORKERS
+        log(f"  Rebuilding with {workers} worker(s)...")
+        if rebuild_deferred_indexes(workers):
+            log("  ✅ Secondary indexes rebuilt")
+            return True
+        log("  ❌ Some indexes failed; retry with: python etl/index_maintenance.py --rebuild")
+        return False
+    except Exception as e:
+        log(f"  ❌ Index rebuild failed: {e}")
+        log("  Retry with: python etl/index_maintenance.py --rebuild")
+        return False
+
+
+def stamp_data_version(etl_dir: Path, logger: PipelineLogger = None) -> bool:
+    """Record that the data changed, so running APIs reload their score stores."""
+    log = logger.log if logger else print
+    try:
+        sys.path.insert(0, str(etl_dir.parent))
+        from etl import data_version
+        from etl.database import db
+
+        if not db.engine:
+            db.connect()
+        with db.engine.begin() as conn:
+            version = data_version.stamp_data_version(conn, "run_full_pipeline")
+        log(f"  Stamped data version {version}")
+        return True
+    except Exception as e:
+        log(f"  ⚠️  Could not stamp the data version: {e}")
+        log("  Stamp it with: python etl/data_version.py")
+        return False
+
+
 def run_script(
     script_name: str,
     season: int = None,
@@ -289,63 +546,17 @@ def run_script(
         return False
 
 
-def run_pipeline(  # noqa: C901
+def run_serial_steps(  # noqa: C901
     seasons: list[int],
-    skip_load: bool = False,
-    only_aggregates: bool = False,
-    refresh_matchplay: bool = False,
-    skip_matchplay_check: bool = False,
-    restore_matchplay: Path = None,
-    etl_dir: Path = None,
+    skip_load: bool,
+    only_aggregates: bool,
+    etl_dir: Path,
     logger: PipelineLogger = None,
+    defer_indexes: bool = False,
+    workers: int = None,
 ) -> bool:
-    """Run the full ETL pipeline for the specified seasons."""
+    """Run the load, post-load and aggregate steps one subprocess at a time."""
     log = logger.log if logger else print
-
-    log("=" * 60)
-    log("MNP ETL Full Pipeline")
-    log("=" * 60)
-    log(f"Seasons to process: {seasons}")
-    log(f"Skip load: {skip_load}")
-    log(f"Only aggregates: {only_aggregates}")
-    log(f"Refresh Matchplay data: {refresh_matchplay}")
-    log(f"Restore matchplay from: {restore_matchplay or 'N/A'}")
-    if logger:
-        log(f"Log file: {logger.log_path}")
-    log("=" * 60)
-    log()
-
-    matchplay_backup_path = None
-    original_link_count = 0
-
-    # PRE-PIPELINE: Check for existing matchplay links
-    if not skip_matchplay_check and not only_aggregates:
-        log("PRE-PIPELINE: Checking for matchplay account links")
-        log("-" * 40)
-
-        has_links, link_count, _ = check_matchplay_links(etl_dir)
-        original_link_count = link_count
-
-        if has_links:
-            log(f"  Found {link_count} matchplay account links in database")
-            log()
-            log("  WARNING: Running a full data load may affect these user-created links.")
-            log("  Creating automatic backup...")
-            log()
-
-            success, result = backup_matchplay_data(etl_dir)
-            if success:
-                matchplay_backup_path = result
-                log(f"  Backup saved to: {matchplay_backup_path}")
-                log()
-            else:
-                log(f"  ERROR: Failed to backup matchplay links: {result}")
-                log("  Use --skip-matchplay-check to proceed anyway (not recommended)")
-                return False
-        else:
-            log("  No existing matchplay links found (or table doesn't exist)")
-        log()
-
     all_success = True
 
     # Step 1: Load season data (unless skipped)
@@ -365,6 +576,14 @@ def run_pipeline(  # noqa: C901
         log("STEP 1: Loading Season Data - SKIPPED")
         log()
 
+    # Everything after the load queries scores and games through their indexes
+    if defer_indexes:
+        log("POST-LOAD: Rebuilding secondary indexes")
+        log("-" * 40)
+        if not rebuild_secondary_indexes(workers, etl_dir, logger):
+            all_success = False
+        log()
+
     # Post-load steps: deduplication and backfills (unless only running aggregates)
     if not only_aggregates:
         log("POST-LOAD: Data cleanup and backfills")
@@ -413,6 +632,191 @@ def run_pipeline(  # noqa: C901
         log()
         step_num += 1
 
+    return all_success
+
+
+def build_dag_tasks(
+    seasons: list[int], skip_load: bool, only_aggregates: bool, defer_indexes: bool = False
+) -> list:
+    """Expand the pipeline steps into DAG tasks, in the serial pipeline's order."""
+    from etl.pipeline_dag import Task
+
+    steps = []
+    if not skip_load and not only_aggregates:
+        steps.append(("load_season.py", True, False))
+    if defer_indexes:
+        steps.append(("index_maintenance.py", False, False))
+    if not only_aggregates:
+        steps.extend((script, False, False) for script, _ in POST_LOAD_STEPS)
+    steps.append(("season_snapshot.py", True, False))
+    steps.extend(
+        (script, requires_season, latest_only)
+        for script, _, requires_season, latest_only in AGGREGATE_STEPS
+    )
+
+    tasks = []
+    for script, requires_season, latest_only in steps:
+        entrypoint, verify, inputs, outputs = STEP_IO[script]
+        name = script.removesuffix(".py")
+        if not requires_season:
+            tasks.append(Task(name, entrypoint, None, verify, inputs, outputs))
+            continue
+        target_seasons = [max(seasons)] if latest_only and seasons else seasons
+        for season in target_seasons:
+            tasks.append(Task(name, entrypoint, season, verify, inputs, outputs))
+    return tasks
+
+
+def run_dag_steps(
+    seasons: list[int],
+    skip_load: bool,
+    only_aggregates: bool,
+    workers: int,
+    force: bool,
+    profile: bool,
+    etl_dir: Path,
+    logger: PipelineLogger = None,
+    force_verify: bool = False,
+    defer_indexes: bool = False,
+) -> bool:
+    """Run the load, post-load and aggregate steps as an in-process DAG."""
+    log = logger.log if logger else print
+
+    sys.path.insert(0, str(etl_dir.parent))
+    from etl.pipeline_dag import DEFAULT_WORKERS, run_dag
+
+    log("PIPELINE STEPS (DAG)")
+    log("-" * 40)
+    if skip_load or only_aggregates:
+        log("  Season loading - SKIPPED")
+    if only_aggregates:
+        log("  Post-load cleanup and backfills - SKIPPED (aggregates only)")
+
+    tasks = build_dag_tasks(seasons, skip_load, only_aggregates, defer_indexes)
+    try:
+        return run_dag(
+            tasks,
+            workers=workers or DEFAULT_WORKERS,
+            force=force,
+            profile=profile,
+            log_path=str(logger.log_path) if logger else None,
+            log=log,
+            verify_content=force_verify,
+        )
+    except Exception as e:
+        log(f"  ❌ Pipeline DAG failed: {e}")
+        return False
+
+
+def run_pipeline(  # noqa: C901
+    seasons: list[int],
+    skip_load: bool = False,
+    only_aggregates: bool = False,
+    refresh_matchplay: bool = False,
+    skip_matchplay_check: bool = False,
+    restore_matchplay: Path = None,
+    etl_dir: Path = None,
+    logger: PipelineLogger = None,
+    serial: bool = False,
+    workers: int = None,
+    force: bool = False,
+    profile: bool = False,
+    defer_indexes: bool = False,
+    force_verify: bool = False,
+) -> bool:
+    """Run the full ETL pipeline for the specified seasons."""
+    log = logger.log if logger else print
+
+    log("=" * 60)
+    log("MNP ETL Full Pipeline")
+    log("=" * 60)
+    log(f"Seasons to process: {seasons}")
+    log(f"Skip load: {skip_load}")
+    log(f"Only aggregates: {only_aggregates}")
+    log(f"Refresh Matchplay data: {refresh_matchplay}")
+    log(f"Restore matchplay from: {restore_matchplay or 'N/A'}")
+    log(f"Mode: {'serial subprocesses' if serial else 'DAG'}")
+    log(f"Defer secondary indexes: {defer_indexes}")
+    if logger:
+        log(f"Log file: {logger.log_path}")
+    log("=" * 60)
+    log()
+
+    matchplay_backup_path = None
+    original_link_count = 0
+
+    # PRE-PIPELINE: Check for existing matchplay links
+    if not skip_matchplay_check and not only_aggregates:
+        log("PRE-PIPELINE: Checking for matchplay account links")
+        log("-" * 40)
+
+        has_links, link_count, _ = check_matchplay_links(etl_dir)
+        original_link_count = link_count
+
+        if has_links:
+            log(f"  Found {link_count} matchplay account links in database")
+            log()
+            log("  WARNING: Running a full data load may affect these user-created links.")
+            log("  Creating automatic backup...")
+            log()
+
+            success, result = backup_matchplay_data(etl_dir)
+            if success:
+                matchplay_backup_path = result
+                log(f"  Backup saved to: {matchplay_backup_path}")
+                log()
+            else:
+                log(f"  ERROR: Failed to backup matchplay links: {result}")
+                log("  Use --skip-matchplay-check to proceed anyway (not recommended)")
+                return False
+        else:
+            log("  No existing matchplay links found (or table doesn't exist)")
+        log()
+
+    # Bulk load mode: build each secondary index once, after the data is in
+    if defer_indexes:
+        log("PRE-LOAD: Deferring secondary index maintenance")
+        log("-" * 40)
+        if not defer_secondary_indexes(etl_dir, logger):
+            return False
+        log()
+
+    try:
+        if serial:
+            all_success = run_serial_steps(
+                seasons, skip_load, only_aggregates, etl_dir, logger, defer_indexes, workers
+            )
+        else:
+            all_success = run_dag_steps(
+                seasons,
+                skip_load,
+                only_aggregates,
+                workers,
+                force,
+                profile,
+                etl_dir,
+                logger,
+                force_verify,
+                defer_indexes,
+            )
+    finally:
+        # The rebuild normally ran right after the loads; this only finishes
+        # it if the run stopped before getting there
+        if defer_indexes:
+            log("POST-PIPELINE: Rebuilding any indexes still deferred")
+            log("-" * 40)
+            indexes_rebuilt = rebuild_secondary_indexes(workers, etl_dir, logger)
+            log()
+
+    if defer_indexes and not indexes_rebuilt:
+        all_success = False
+
+    # Even a partly failed run may have changed data
+    log("POST-PIPELINE: Stamping data version")
+    log("-" * 40)
+    stamp_data_version(etl_dir, logger)
+    log()
+
     # External data refresh (optional)
     if refresh_matchplay:
         log("EXTERNAL DATA: Refreshing Matchplay.events data")
@@ -513,6 +917,15 @@ Examples:
 
     # Skip matchplay check (not recommended for production)
     python etl/run_full_pipeline.py --seasons 22 --skip-matchplay-check
+
+    # Rerun every step, ignoring unchanged-input fingerprints
+    python etl/run_full_pipeline.py --all-seasons --force
+
+    # One subprocess per script, in strict order (pre-DAG behaviour)
+    python etl/run_full_pipeline.py --all-seasons --serial
+
+    # Full rebuild with index maintenance deferred until the data is loaded
+    python etl/run_full_pipeline.py --all-seasons --defer-indexes
 """,
     )
 
@@ -548,6 +961,37 @@ Examples:
         help="Restore matchplay links from specified backup file after pipeline completes",
     )
 
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes for the DAG runner (default: min(4, CPUs); 1 = in-process)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run every step even if its input fingerprint is unchanged",
+    )
+    parser.add_argument(
+        "--force-verify",
+        action="store_true",
+        help="Fingerprint tables by a hash of their rows instead of change counters (full scans)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Run each DAG step under cProfile (stats saved to etl/logs/profiles/)",
+    )
+    parser.add_argument(
+        "--defer-indexes",
+        action="store_true",
+        help="With --all-seasons: drop secondary indexes before loading, rebuild them after",
+    )
+    parser.add_argument(
+        "--serial",
+        action="store_true",
+        help="Run each script as a subprocess in strict order instead of the DAG runner",
+    )
+
     args = parser.parse_args()
 
     # Determine which seasons to process
@@ -560,6 +1004,9 @@ Examples:
     else:
         parser.error("Must specify --seasons, --all-seasons, or --only-aggregates")
 
+    if args.defer_indexes and (not args.all_seasons or args.skip_load or args.only_aggregates):
+        parser.error("--defer-indexes is for full rebuilds: use it with --all-seasons only")
+
     # Validate seasons
     for season in seasons:
         if season not in AVAILABLE_SEASONS:
@@ -583,6 +1030,12 @@ Examples:
             restore_matchplay=args.restore_matchplay,
             etl_dir=etl_dir,
             logger=logger,
+            serial=args.serial,
+            workers=args.workers,
+            force=args.force,
+            profile=args.profile,
+            defer_indexes=args.defer_indexes,
+            force_verify=args.force_verify,
         )
     finally:
         logger.close()
@@ -155,6 +155,11 @@ def calculate_aggregations(season: int) -> bool:
         ("calculate_player_stats.py", ["--season", str(season)]),
         ("calculate_team_machine_picks.py", ["--season", str(season)]),
         ("calculate_match_points.py", ["--season", str(season)]),
+        ("calculate_team_machine_stats.py", ["--season", str(season)]),
+        ("calculate_score_sketches.py", ["--season", str(season)]),
+        ("calculate_score_distributions.py", ["--season", str(season)]),
+        ("calculate_score_leaderboards.py", ["--season", str(season)]),
+        ("calculate_weekly_recaps.py", ["--season", str(season)]),
     ]
 
     for script_name, args in scripts:
@@ -287,6 +292,10 @@ Examples:
     # Step 4: Verify data
     verify_data(seasons)
 
+    # Step 5: Let running APIs know the data changed
+    if not run_etl_script("data_version.py", ["--source", "update_season"]):
+        logger.warning("Could not stamp the data version; run: python etl/data_version.py")
+
     logger.info("")
     logger.info("=" * 60)
     logger.info("Update Complete!")
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Verify the Matchplay response cache against a local stand-in server.
+
+Starts an http.server stand-in for the Matchplay API on localhost, points a
+MatchplayClient at it (base_url) and checks:
+- a first lookup is a miss and a repeat within the TTL is served from cache
+- once the TTL has expired, the lookup is revalidated with If-None-Match and
+  a 304 reuses the cached body
+- a changed response (new ETag) replaces the cached body
+- revalidate=True asks the server even for a fresh entry
+- query parameters are part of the cache key
+- failed requests are counted as errors and not cached
+- the per-endpoint counters and per-entry hit/revalidation counts match
+
+TTLs are shortened to one second for the run. By default the cache uses the
+matchplay_response_cache table (migration 010); the stand-in's entries are
+deleted before and after the run. --memory keeps entries in a dict instead,
+for checking the client without a database.
+
+Usage:
+    python etl/verify_matchplay_cache.py
+    python etl/verify_matchplay_cache.py --memory
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import httpx
+from sqlalchemy import text
+
+from api.services import matchplay_cache
+from api.services.matchplay_cache import MatchplayResponseCache, make_cache_key
+from api.services.matchplay_client import MatchplayClient
+from etl.database import db
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+# Far outside real Matchplay user IDs, so table entries never collide
+USER_ID = 2_000_000_001
+FAILING_USER_ID = 2_000_000_002
+TTL = timedelta(seconds=1)
+
+PROFILE_PARAMS = {"includeIfpa": 1, "includeCounts": 1}
+SEARCH_PARAMS = {"query": "stand-in", "type": "users"}
+CACHE_KEYS = [
+    make_cache_key(f"/api/users/{USER_ID}", PROFILE_PARAMS),
+    make_cache_key(f"/api/users/{FAILING_USER_ID}", PROFILE_PARAMS),
+    make_cache_key("/api/search", SEARCH_PARAMS),
+    make_cache_key("/api/search", {**SEARCH_PARAMS, "query": "other"}),
+]
+
+
+class StandInMatchplay(BaseHTTPRequestHandler):
+    """Serves /api/users/<id> and /api/search with an ETag of the current version."""
+
+    version = 1
+    # (path, If-None-Match header) per request received
+    requests: list[tuple[str, str | None]] = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if_none_match = self.headers.get("If-None-Match")
+        StandInMatchplay.requests.append((url.path, if_none_match))
+
+        if url.path == f"/api/users/{FAILING_USER_ID}":
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        etag = f'"v{self.version}"'
+        if if_none_match == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        if url.path == "/api/search":
+            body = {"data": [{"name": url.query, "version": self.version}]}
+        else:
+            body = {"user": {"userId": int(url.path.rsplit("/", 1)[-1])}, "version": self.version}
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MemoryResponseCache(MatchplayResponseCache):
+    """The same counters, with entries kept in a dict instead of the table."""
+
+    def __init__(self):
+        super().__init__()
+        self.entries: dict[str, dict] = {}
+        # summary() reports the process counters only; there's no table to warn about
+        self._warned = True
+
+    def _connect(self):
+        raise RuntimeError("in-memory cache has no table")
+
+    def get(self, cache_key):
+        entry = self.entries.get(cache_key)
+        return dict(entry) if entry else None
+
+    def record_hit(self, cache_key, endpoint):
+        self._record(endpoint, "hits")
+        self.entries[cache_key]["hit_count"] += 1
+
+    def record_revalidated(self, cache_key, endpoint, ttl):
+        self._record(endpoint, "revalidated")
+        entry = self.entries[cache_key]
+        entry["revalidation_count"] += 1
+        entry["expires_at"] = datetime.utcnow() + ttl
+
+    def put(self, cache_key, endpoint, body, etag, last_modified, ttl):
+        self._record(endpoint, "misses")
+        # Like the table's upsert, a replaced entry keeps its counts
+        previous = self.entries.get(cache_key, {"hit_count": 0, "revalidation_count": 0})
+        self.entries[cache_key] = {
+            "endpoint": endpoint,
+            "body": json.loads(json.dumps(body)),
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": datetime.utcnow() + ttl,
+            "hit_count": previous["hit_count"],
+            "revalidation_count": previous["revalidation_count"],
+        }
+
+
+def entry_counts(cache: MatchplayResponseCache, cache_key: str) -> tuple[int, int] | None:
+    """(hit_count, revalidation_count) stored for an entry; None if not cached."""
+    if isinstance(cache, MemoryResponseCache):
+        entry = cache.entries.get(cache_key)
+        return (entry["hit_count"], entry["revalidation_count"]) if entry else None
+    with db.engine.connect() as conn:
+        row = conn.execute(
+            text("""
+            SELECT hit_count, revalidation_count FROM matchplay_response_cache
+            WHERE cache_key = :cache_key
+        """),
+            {"cache_key": cache_key},
+        ).fetchone()
+    return tuple(row) if row else None
+
+
+def delete_entries():
+    with db.engine.begin() as conn:
+        conn.execute(
+            text("DELETE FROM matchplay_response_cache WHERE cache_key = ANY(:keys)"),
+            {"keys": CACHE_KEYS},
+        )
+
+
+async def run_checks(client: MatchplayClient, cache: MatchplayResponseCache) -> bool:
+    requests = StandInMatchplay.requests
+    profile_key = CACHE_KEYS[0]
+    failures = []
+
+    def check(name: str, ok: bool, detail: str = ""):
+        logger.info(
+            f"  {'✓' if ok else '✗'} {name}" + (f" ({detail})" if detail and not ok else "")
+        )
+        if not ok:
+            failures.append(name)
+
+    def sent() -> int:
+        return len(requests)
+
+    profile = await client.get_user_profile(USER_ID)
+    check("First lookup calls the server", sent() == 1 and requests[-1][1] is None)
+    check("Body is returned", profile.get("version") == 1, str(profile))
+
+    profile = await client.get_user_profile(USER_ID)
+    check("Repeat within the TTL is served from cache", sent() == 1, f"{sent()} requests")
+    check("Cached body is returned", profile.get("version") == 1, str(profile))
+
+    await asyncio.sleep(TTL.total_seconds() + 0.2)
+    profile = await client.get_user_profile(USER_ID)
+    check(
+        "Expired entry is revalidated with its ETag",
+        sent() == 2 and requests[-1][1] == '"v1"',
+        str(requests[-1]),
+    )
+    check("304 reuses the cached body", profile.get("version") == 1, str(profile))
+
+    profile = await client.get_user_profile(USER_ID)
+    check("Revalidated entry is fresh again", sent() == 2, f"{sent()} requests")
+
+    StandInMatchplay.version = 2
+    await asyncio.sleep(TTL.total_seconds() + 0.2)
+    profile = await client.get_user_profile(USER_ID)
+    check("Changed response replaces the cached body", profile.get("version") == 2, str(profile))
+
+    profile = await client.get_user_profile(USER_ID, revalidate=True)
+    check(
+        "revalidate=True asks the server for a fresh entry",
+        sent() == 4 and requests[-1][1] == '"v2"' and profile.get("version") == 2,
+        str(requests[-1]),
+    )
+
+    await client.search_users("stand-in")
+    await client.search_users("stand-in")
+    await client.search_users("other")
+    check("Query parameters are part of the cache key", sent() == 6, f"{sent()} requests")
+
+    try:
+        await client.get_user_profile(FAILING_USER_ID)
+        check("Server errors are raised", False)
+    except httpx.HTTPStatusError:
+        check("Server errors are raised", True)
+    check("Failed responses are not cached", entry_counts(cache, CACHE_KEYS[1]) is None)
+
+    process = cache.summary()["process"]
+    expected = {
+        "user_profile": {"hits": 2, "revalidated": 2, "misses": 2, "errors": 1},
+        "search_users": {"hits": 1, "revalidated": 0, "misses": 2, "errors": 0},
+    }
+    for endpoint, counters in expected.items():
+        actual = {name: process.get(endpoint, {}).get(name) for name in counters}
+        check(f"{endpoint} counters", actual == counters, f"expected {counters}, got {actual}")
+    check(
+        "Hit rate counts 304s as hits",
+        process.get("user_profile", {}).get("hit_rate") == round(4 / 7, 4),
+        str(process.get("user_profile")),
+    )
+    check(
+        "Entry hit/revalidation counts",
+        entry_counts(cache, profile_key) == (2, 2),
+        str(entry_counts(cache, profile_key)),
+    )
+
+    if failures:
+        logger.error(f"{len(failures)} check(s) failed: {failures}")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Verify the Matchplay response cache against a local stand-in server"
+    )
+    parser.add_argument(
+        "--memory", action="store_true", help="Keep entries in memory instead of the table"
+    )
+    args = parser.parse_args()
+
+    for endpoint in matchplay_cache.CACHE_TTLS:
+        matchplay_cache.CACHE_TTLS[endpoint] = TTL
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInMatchplay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    logger.info(f"Stand-in Matchplay API on {base_url}")
+
+    try:
+        if args.memory:
+            cache = MemoryResponseCache()
+        else:
+            db.connect()
+            delete_entries()
+            cache = MatchplayResponseCache()
+        client = MatchplayClient(token="stand-in", base_url=base_url, cache=cache)
+        ok = asyncio.run(run_checks(client, cache))
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+    finally:
+        server.shutdown()
+        if not args.memory and db.engine:
+            delete_entries()
+            db.close()
+
+    if ok:
+        logger.info("✓ Response cache behaves as expected")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Verify that the hot API queries on scores and games only scan the partitions
+of the seasons they ask for.
+
+Runs EXPLAIN on queries shaped like the router queries (scores browse,
+machine scores, the machines dashboard, player and team season queries, and
+games by season/week), collects every <table>_s<season> partition in each
+plan, and fails if a plan touches a season outside the query's filter. The
+sample machine, player and team are taken from the latest season.
+
+Parameters are sent the way the API sends them (inlined by psycopg2), so the
+planner can prune at plan time; a generic prepared plan would only prune at
+execution time and would still list every partition here.
+
+Usage:
+    python etl/verify_partition_pruning.py
+    python etl/verify_partition_pruning.py --verbose   # Print each plan's partitions
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+
+from sqlalchemy import text
+
+from etl.database import db
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler(sys.stdout)],
+)
+logger = logging.getLogger(__name__)
+
+PARTITION_PATTERN = re.compile(r"^(scores|games)_s(\d+)$")
+
+# (name, query, seasons the query may touch: "seasons" or "latest")
+QUERIES = [
+    (
+        "scores browse (two seasons)",
+        """
+        SELECT s.score, s.player_key, s.machine_key, s.season, t.team_name
+        FROM scores s
+        JOIN teams t ON s.team_key = t.team_key AND t.season = s.season
+        WHERE s.season = ANY(:seasons)
+        ORDER BY s.score DESC
+        LIMIT 100
+        """,
+        "seasons",
+    ),
+    (
+        "machine scores (one season)",
+        """
+        SELECT COUNT(*) FROM scores s
+        WHERE s.machine_key = :machine_key AND s.season = :latest_season
+        """,
+        "latest",
+    ),
+    (
+        "machines dashboard",
+        """
+        SELECT s.machine_key, COUNT(*) AS score_count, MAX(s.score) AS high_score
+        FROM scores s
+        WHERE s.season = :latest_season
+        GROUP BY s.machine_key
+        """,
+        "latest",
+    ),
+    (
+        "player seasons",
+        """
+        SELECT s.machine_key, s.season, COUNT(*), AVG(s.score)
+        FROM scores s
+        WHERE s.player_key = :player_key AND s.season IN (:season_a, :season_b)
+        GROUP BY s.machine_key, s.season
+        """,
+        "seasons",
+    ),
+    (
+        "team machine stats",
+        """
+        SELECT s.machine_key, COUNT(*), AVG(s.score)
+        FROM scores s
+        WHERE s.team_key = :team_key AND s.season = :latest_season
+        GROUP BY s.machine_key
+        """,
+        "latest",
+    ),
+    (
+        "games by week",
+        """
+        SELECT g.match_key, g.round_number, g.machine_key
+        FROM games g
+        WHERE g.season = :latest_season AND g.week = 1
+        """,
+        "latest",
+    ),
+]
+
+
+def get_sample_params(conn) -> dict | None:
+    """Latest two seasons plus a machine, player and team from the latest one."""
+    seasons = [
+        row[0]
+        for row in conn.execute(
+            text("SELECT DISTINCT season FROM scores ORDER BY season DESC LIMIT 2")
+        )
+    ]
+    if not seasons:
+        return None
+
+    latest = seasons[0]
+    sample = conn.execute(
+        text("SELECT machine_key, player_key, team_key FROM scores WHERE season = :season LIMIT 1"),
+        {"season": latest},
+    ).one()
+    return {
+        "latest_season": latest,
+        "seasons": seasons,
+        "season_a": seasons[0],
+        "season_b": seasons[-1],
+        "machine_key": sample.machine_key,
+        "player_key": sample.player_key,
+        "team_key": sample.team_key,
+    }
+
+
+def get_scanned_partitions(plan: dict) -> set[tuple[str, int]]:
+    """(table, season) of every season partition anywhere in an EXPLAIN plan."""
+    found = set()
+    match = PARTITION_PATTERN.match(plan.get("Relation Name", ""))
+    if match:
+        found.add((match.group(1), int(match.group(2))))
+    for child in plan.get("Plans", []):
+        found |= get_scanned_partitions(child)
+    return found
+
+
+def check_query(conn, name: str, query: str, allowed: set[int], params: dict, verbose: bool):
+    """EXPLAIN one query and report the partitions it scans."""
+    explain = conn.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params).scalar()
+    if isinstance(explain, str):
+        explain = json.loads(explain)
+    partitions = get_scanned_partitions(explain[0]["Plan"])
+    scanned = {season for _, season in partitions}
+    unexpected = scanned - allowed
+
+    if verbose:
+        logger.info(f"  {name}: {', '.join(f'{t}_s{s}' for t, s in sorted(partitions)) or '-'}")
+
+    if not partitions:
+        logger.error(f"  ✗ {name}: no season partitions in the plan (tables not partitioned?)")
+        return False
+    if unexpected:
+        logger.error(
+            f"  ✗ {name}: scans seasons {sorted(unexpected)} outside {sorted(allowed)} "
+            f"({len(partitions)} partitions)"
+        )
+        return False
+    logger.info(f"  ✓ {name}: {len(partitions)} partition(s), seasons {sorted(scanned)}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify partition pruning on hot queries")
+    parser.add_argument("--verbose", action="store_true", help="List the partitions of each plan")
+    args = parser.parse_args()
+
+    try:
+        db.connect()
+        with db.engine.connect() as conn:
+            params = get_sample_params(conn)
+            if params is None:
+                logger.error("No scores loaded; nothing to verify")
+                return 1
+
+            logger.info(f"Checking partition pruning (latest season {params['latest_season']})")
+            allowed = {"seasons": set(params["seasons"]), "latest": {params["latest_season"]}}
+            results = [
+                check_query(conn, name, query, allowed[scope], params, args.verbose)
+                for name, query, scope in QUERIES
+            ]
+
+        if all(results):
+            logger.info("✅ Every query is pruned to its seasons")
+            return 0
+        logger.error(f"❌ {results.count(False)} of {len(results)} queries scan extra seasons")
+        return 1
+
+    except Exception as e:
+        logger.error(f"Error: {e}", exc_info=True)
+        return 1
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,7 +4,14 @@ import { useEffect, useState } from 'react';
 import { useParams } from 'next/navigation';
 import Link from 'next/link';
 import { api } from '@/lib/api';
-import { Machine, MachineScore, MachineVenue, MachineTeam } from '@/lib/types';
+import {
+  Machine,
+  MachineScore,
+  MachineDistributionParams,
+  MachineScoreDistribution,
+  MachineVenue,
+  MachineTeam,
+} from '@/lib/types';
 import {
   Card,
   PageHeader,
@@ -49,6 +56,7 @@ export default function MachineDetailPage() {
 
   const [machine, setMachine] = useState<Machine | null>(null);
   const [scores, setScores] = useState<MachineScore[]>([]);
+  const [distribution, setDistribution] = useState<MachineScoreDistribution | null>(null);
   const [venues, setVenues] = useState<MachineVenue[]>([]);
   const [teams, setTeams] = useState<MachineTeam[]>([]);
   const [availableSeasons, setAvailableSeasons] = useState<number[]>([...SUPPORTED_SEASONS]);
@@ -106,6 +114,13 @@ export default function MachineDetailPage() {
     }
   }, [machineKey, selectedVenue, selectedTeams, selectedSeasons]);
 
+  // The chart and percentiles come pre-binned, so they don't depend on the team filter
+  useEffect(() => {
+    if (machineKey) {
+      fetchDistribution();
+    }
+  }, [machineKey, selectedVenue, selectedSeasons]);
+
   async function fetchMachineData() {
     setLoading(true);
     setError(null);
@@ -155,6 +170,23 @@ export default function MachineDetailPage() {
     }
   }
 
+  async function fetchDistribution() {
+    try {
+      const params: MachineDistributionParams = {};
+      if (selectedVenue !== 'all') {
+        params.venue_key = selectedVenue;
+      }
+      if (selectedSeasons.length > 0 && selectedSeasons.length < availableSeasons.length) {
+        params.seasons = selectedSeasons;
+      }
+      setDistribution(await api.getMachineDistribution(machineKey, params));
+    } catch (err) {
+      // 404 when no scores match the filters
+      setDistribution(null);
+      console.error('Failed to fetch score distribution:', err);
+    }
+  }
+
   function formatScore(score: number): string {
     if (score >= 1_000_000_000) {
       return `${(score / 1_000_000_000).toFixed(2)}B`;
@@ -166,22 +198,21 @@ export default function MachineDetailPage() {
     return score.toLocaleString();
   }
 
-  function calculatePercentile(score: number, allScores: number[]): number {
-    if (allScores.length === 0) return 0;
-    const sortedScores = [...allScores].sort((a, b) => a - b);
-    const index = sortedScores.findIndex((s) => s >= score);
-    if (index === -1) return 100;
-    return (index / sortedScores.length) * 100;
-  }
-
   function calculateStats() {
-    if (scores.length === 0) return null;
-    const sortedScores = [...scores].map(s => s.score).sort((a, b) => a - b);
-    const p25 = sortedScores[Math.floor(sortedScores.length * 0.25)];
-    const p50 = sortedScores[Math.floor(sortedScores.length * 0.50)];
-    const p75 = sortedScores[Math.floor(sortedScores.length * 0.75)];
-    const p90 = sortedScores[Math.floor(sortedScores.length * 0.90)];
-    return { p25, p50, p75, p90, sortedScores };
+    if (!distribution || distribution.scatter.length === 0) return null;
+    // Scatter points are ascending by score, each with its percentile
+    const points = distribution.scatter;
+    const scoreAt = (percentile: number) =>
+      (points.find((p) => p.percentile >= percentile) ?? points[points.length - 1]).score;
+    const zeroBucket = distribution.buckets.find((b) => b.low === 0);
+    return {
+      p25: scoreAt(25),
+      p50: scoreAt(50),
+      p75: scoreAt(75),
+      p90: scoreAt(90),
+      p95: scoreAt(95),
+      zeroCount: zeroBucket?.count ?? 0,
+    };
   }
 
   if (loading) {
@@ -463,7 +494,7 @@ export default function MachineDetailPage() {
       )}
 
       {/* Scatter Plot */}
-      {stats && scores.length > 0 && (
+      {stats && distribution && (
         <Card>
           <Card.Header>
             <Card.Title>Score Distribution Chart</Card.Title>
@@ -488,8 +519,7 @@ export default function MachineDetailPage() {
               {/* Calculate score range for y-axis */}
               {(() => {
                 // Focus on 25th-95th percentile range (most useful data)
-                const p25 = stats.sortedScores[Math.floor(stats.sortedScores.length * 0.25)];
-                const p95 = stats.sortedScores[Math.floor(stats.sortedScores.length * 0.95)];
+                const { p25, p95 } = stats;
 
                 // Ensure minimum is never negative and has some padding
                 const scoreRange = p95 - p25;
@@ -545,8 +575,8 @@ export default function MachineDetailPage() {
                     <line x1={chartLeft + (90 / 100) * chartWidth} y1={chartTop} x2={chartLeft + (90 / 100) * chartWidth} y2={chartBottom} stroke="#f59e0b" strokeWidth="2.5" strokeDasharray="8,6" />
 
                     {/* Scatter points */}
-                    {scores.map((scoreData) => {
-                      const percentile = calculatePercentile(scoreData.score, stats.sortedScores);
+                    {distribution.scatter.map((scoreData, index) => {
+                      const percentile = scoreData.percentile;
                       const x = chartLeft + (percentile / 100) * chartWidth;
 
                       // Clamp y values to visible range
@@ -559,7 +589,7 @@ export default function MachineDetailPage() {
 
                       return (
                         <circle
-                          key={scoreData.score_id}
+                          key={index}
                           cx={x}
                           cy={y}
                           r="4"
@@ -588,13 +618,15 @@ export default function MachineDetailPage() {
             </svg>
           </div>
             <p className="text-sm mt-3" style={{ color: 'var(--text-secondary)' }}>
-              Showing {scores.length} score{scores.length !== 1 ? 's' : ''} focused on 25th-95th percentile range. Outliers shown in red.
+              Showing {distribution.scatter.length} of {distribution.score_count.toLocaleString()} score{distribution.score_count !== 1 ? 's' : ''} at evenly spaced percentiles, focused on 25th-95th percentile range. Outliers shown in red.
+              {stats.zeroCount > 0 && ` Includes ${stats.zeroCount} score${stats.zeroCount !== 1 ? 's' : ''} of 0.`}
+              {selectedTeams.length > 0 && ' The team filter does not apply to the chart.'}
             </p>
           </Card.Content>
         </Card>
       )}
 
-      {scores.length === 0 && (
+      {scores.length === 0 && !distribution && (
         <Alert variant="warning" title="No Data">
           No score data available for this machine yet.
         </Alert>
@@ -24,6 +24,8 @@ import {
   RawPercentilesParams,
   MachineScoreListResponse,
   MachineScoresParams,
+  MachineScoreDistribution,
+  MachineDistributionParams,
   MachineVenue,
   MachineTeam,
   Venue,
@@ -256,6 +258,16 @@ export const api = {
     return fetchAPI<MachineScoreListResponse>(`/machines/${machineKey}/scores`, params);
   },
 
+  /**
+   * Get a machine's pre-binned score histogram and scatter series
+   */
+  getMachineDistribution: (
+    machineKey: string,
+    params?: MachineDistributionParams
+  ): Promise<MachineScoreDistribution> => {
+    return fetchAPI<MachineScoreDistribution>(`/machines/${machineKey}/distribution`, params);
+  },
+
   /**
    * Get venues where a machine has been played
    */
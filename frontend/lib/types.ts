@@ -375,6 +375,36 @@ export interface MachineScoreListResponse {
   offset: number;
 }
 
+export interface ScoreHistogramBucket {
+  low: number;
+  high: number;
+  count: number;
+}
+
+export interface ScoreScatterPoint {
+  score: number;
+  percentile: number;
+  player_key: string;
+  player_name: string | null;
+}
+
+export interface MachineScoreDistribution {
+  machine_key: string;
+  machine_name: string;
+  venue_key: string;
+  seasons: number[];
+  score_count: number;
+  min_score: number;
+  max_score: number;
+  buckets: ScoreHistogramBucket[];
+  scatter: ScoreScatterPoint[];
+}
+
+export interface MachineDistributionParams {
+  seasons?: number[];
+  venue_key?: string;
+}
+
 export interface MachineScoresParams {
   season?: number;
   venue_key?: string;
@@ -0,0 +1,39 @@
+-- Migration 008: Durable live match snapshots
+-- Version: 2.4.0
+-- Created: 2026-10-18
+-- Description: Persist live match JSON fetched from mondaynightpinball.com
+--
+-- The /live endpoints used to cache upstream match JSON in per-process dicts,
+-- so every uvicorn worker (and every restart) started cold and re-fetched
+-- every match. This table is shared by all workers:
+--   - Completed matches are stored once with is_final = true and are never
+--     fetched upstream again.
+--   - Active matches are stored with a short expires_at so that whichever
+--     worker fetches first serves the snapshot to the others until it expires.
+
+CREATE TABLE IF NOT EXISTS live_match_snapshots (
+    match_key VARCHAR(50) PRIMARY KEY,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    state VARCHAR(20) NOT NULL,
+    is_final BOOLEAN NOT NULL DEFAULT false,
+    raw_json JSONB NOT NULL,
+    detail JSONB,
+    fetched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP
+);
+
+COMMENT ON TABLE live_match_snapshots IS 'Match JSON fetched from mondaynightpinball.com, shared across API workers';
+COMMENT ON COLUMN live_match_snapshots.state IS 'Upstream match state (SCHEDULED/PLAYING/REVIEWING/COMPLETE)';
+COMMENT ON COLUMN live_match_snapshots.is_final IS 'True once the match is COMPLETE - the snapshot is never refetched';
+COMMENT ON COLUMN live_match_snapshots.raw_json IS 'Match JSON exactly as returned by the league site';
+COMMENT ON COLUMN live_match_snapshots.detail IS 'Enriched LiveMatchDetail response (percentiles, machine names, rosters)';
+COMMENT ON COLUMN live_match_snapshots.expires_at IS 'When an active snapshot should be refetched (NULL for final snapshots)';
+
+CREATE INDEX IF NOT EXISTS idx_live_snapshots_season_week
+    ON live_match_snapshots(season, week);
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.0', 'Add live_match_snapshots table for durable live match caching')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,28 @@
+-- Migration 009: One cached Matchplay rating row per user
+-- Version: 2.4.1
+-- Created: 2026-10-18
+-- Description: Unique key on matchplay_ratings.matchplay_user_id
+--
+-- Rating refreshes used to DELETE and re-INSERT each user's row. With a unique
+-- key the refresh can write every player in one set-based
+-- INSERT ... ON CONFLICT (matchplay_user_id) DO UPDATE.
+
+-- Keep only the most recently inserted row for each user
+DELETE FROM matchplay_ratings r
+USING matchplay_ratings newer
+WHERE r.matchplay_user_id = newer.matchplay_user_id
+  AND r.id < newer.id;
+
+ALTER TABLE matchplay_ratings
+    DROP CONSTRAINT IF EXISTS uq_mp_ratings_user;
+
+ALTER TABLE matchplay_ratings
+    ADD CONSTRAINT uq_mp_ratings_user UNIQUE (matchplay_user_id);
+
+-- The unique constraint's index replaces the plain lookup index
+DROP INDEX IF EXISTS idx_mp_ratings_user;
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.1', 'Unique matchplay_user_id on matchplay_ratings for bulk upserts')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,38 @@
+-- Migration 010: Persistent Matchplay API response cache
+-- Version: 2.4.2
+-- Created: 2026-10-18
+-- Description: HTTP response cache for MatchplayClient with ETag revalidation
+--
+-- User searches, profiles and tournament lookups are cached here with
+-- per-endpoint TTLs (see api/services/matchplay_cache.py). Expired entries
+-- are revalidated with If-None-Match / If-Modified-Since, so an unchanged
+-- response costs a 304 instead of a full payload. The table is shared by all
+-- API workers and the ETL scripts.
+
+CREATE TABLE IF NOT EXISTS matchplay_response_cache (
+    cache_key TEXT PRIMARY KEY,
+    endpoint VARCHAR(50) NOT NULL,
+    body JSONB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    expires_at TIMESTAMP NOT NULL,
+    hit_count INTEGER NOT NULL DEFAULT 0,
+    revalidation_count INTEGER NOT NULL DEFAULT 0
+);
+
+COMMENT ON TABLE matchplay_response_cache IS 'Cached Matchplay.events API responses (shared across API workers and ETL)';
+COMMENT ON COLUMN matchplay_response_cache.cache_key IS 'Request path plus sorted query string';
+COMMENT ON COLUMN matchplay_response_cache.endpoint IS 'Logical endpoint name used for TTLs and stats (e.g. search_users)';
+COMMENT ON COLUMN matchplay_response_cache.etag IS 'ETag response header, sent back as If-None-Match';
+COMMENT ON COLUMN matchplay_response_cache.last_modified IS 'Last-Modified response header, sent back as If-Modified-Since';
+COMMENT ON COLUMN matchplay_response_cache.hit_count IS 'Requests served from this entry without contacting Matchplay';
+COMMENT ON COLUMN matchplay_response_cache.revalidation_count IS 'Requests answered by a 304 Not Modified for this entry';
+
+CREATE INDEX IF NOT EXISTS idx_mp_response_cache_endpoint
+    ON matchplay_response_cache(endpoint);
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.2', 'Add matchplay_response_cache table')
+ON CONFLICT (version) DO NOTHING;
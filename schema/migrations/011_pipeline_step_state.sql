@@ -0,0 +1,26 @@
+-- Migration 011: Pipeline step fingerprints
+-- Version: 2.4.3
+-- Created: 2026-10-18
+-- Description: Input fingerprints of the last successful run of each ETL pipeline step
+--
+-- The DAG runner in etl/pipeline_dag.py fingerprints each step's inputs
+-- (source files and the table rows it reads) before running it. When the
+-- fingerprint matches the one stored here the step is skipped. Keeping the
+-- state in the database means a rebuilt database starts with no fingerprints
+-- and runs every step.
+
+CREATE TABLE IF NOT EXISTS pipeline_step_state (
+    task_key VARCHAR(100) PRIMARY KEY,
+    fingerprint CHAR(40) NOT NULL,
+    completed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    duration_seconds NUMERIC(10, 3)
+);
+
+COMMENT ON TABLE pipeline_step_state IS 'Last successful input fingerprint per ETL pipeline task';
+COMMENT ON COLUMN pipeline_step_state.task_key IS 'Step name, with the season in brackets for per-season steps (e.g. load_season[22])';
+COMMENT ON COLUMN pipeline_step_state.fingerprint IS 'SHA-1 over the step code and its input file/table signatures';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.3', 'Add pipeline_step_state table')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,59 @@
+-- Migration 012: Pipeline run history and per-step metrics
+-- Version: 2.4.4
+-- Created: 2026-10-18
+-- Description: Throughput history for the ETL pipeline DAG runner
+--
+-- Every run of etl/run_full_pipeline.py (DAG mode) records one pipeline_runs
+-- row and one pipeline_step_metrics row per task. Metrics are collected
+-- inside the process that ran the step (see etl/pipeline_metrics.py).
+-- `python etl/pipeline_metrics.py` compares the latest run with the
+-- historical medians and flags regressions.
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    run_id SERIAL PRIMARY KEY,
+    started_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP,
+    seasons INTEGER[],
+    workers INTEGER,
+    forced BOOLEAN NOT NULL DEFAULT FALSE,
+    profiled BOOLEAN NOT NULL DEFAULT FALSE,
+    success BOOLEAN,
+    wall_seconds NUMERIC(10, 3)
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_step_metrics (
+    id SERIAL PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES pipeline_runs(run_id) ON DELETE CASCADE,
+    task_key VARCHAR(100) NOT NULL,
+    step VARCHAR(100) NOT NULL,
+    season INTEGER,
+    status VARCHAR(20) NOT NULL,
+    started_at TIMESTAMP,
+    wall_seconds NUMERIC(10, 3),
+    cpu_seconds NUMERIC(10, 3),
+    peak_rss_mb NUMERIC(10, 1),
+    rows_read BIGINT,
+    rows_written BIGINT,
+    round_trips INTEGER,
+    rows_per_second NUMERIC(12, 1),
+    profile_path TEXT,
+    CONSTRAINT uq_pipeline_step_metrics UNIQUE (run_id, task_key)
+);
+
+COMMENT ON TABLE pipeline_runs IS 'One row per ETL pipeline run (DAG mode)';
+COMMENT ON TABLE pipeline_step_metrics IS 'Resource usage and throughput of each pipeline task';
+COMMENT ON COLUMN pipeline_step_metrics.status IS 'ran, skipped (inputs unchanged), failed or blocked';
+COMMENT ON COLUMN pipeline_step_metrics.cpu_seconds IS 'User + system CPU time of the process that ran the step';
+COMMENT ON COLUMN pipeline_step_metrics.peak_rss_mb IS 'Peak resident set size while the step ran';
+COMMENT ON COLUMN pipeline_step_metrics.rows_read IS 'Rows returned by SELECT statements';
+COMMENT ON COLUMN pipeline_step_metrics.rows_written IS 'Rows affected by INSERT/UPDATE/DELETE statements';
+COMMENT ON COLUMN pipeline_step_metrics.round_trips IS 'Statements sent to the database (executemany counts each parameter set)';
+COMMENT ON COLUMN pipeline_step_metrics.profile_path IS 'cProfile stats file when the run used --profile';
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_step_metrics_task
+    ON pipeline_step_metrics(task_key, run_id);
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.4', 'Add pipeline_runs and pipeline_step_metrics tables')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,30 @@
+-- Migration 013: Deferred index rebuilds and duplicate score index
+-- Version: 2.4.5
+-- Created: 2026-10-18
+-- Description: Bookkeeping for the pipeline's deferred-index rebuild mode
+--
+-- `run_full_pipeline.py --all-seasons --defer-indexes` drops the secondary
+-- (non-unique) indexes on scores and games before loading, and rebuilds them
+-- in parallel once the season loads have finished, before the post-load and
+-- aggregate steps run (see etl/index_maintenance.py). The aggregate tables
+-- keep their indexes. The definitions of the dropped indexes are kept
+-- here until they have been rebuilt, so an interrupted run can be finished
+-- with `python etl/index_maintenance.py --rebuild`.
+
+CREATE TABLE IF NOT EXISTS pipeline_deferred_indexes (
+    index_name VARCHAR(100) PRIMARY KEY,
+    table_name VARCHAR(100) NOT NULL,
+    definition TEXT NOT NULL,
+    dropped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE pipeline_deferred_indexes IS 'Secondary indexes dropped for a bulk load and not yet rebuilt';
+COMMENT ON COLUMN pipeline_deferred_indexes.definition IS 'CREATE INDEX statement from pg_get_indexdef';
+
+-- idx_scores_team and idx_scores_team_season are both scores(team_key, season)
+DROP INDEX IF EXISTS idx_scores_team;
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.5', 'Add pipeline_deferred_indexes table, drop duplicate idx_scores_team')
+ON CONFLICT (version) DO NOTHING;
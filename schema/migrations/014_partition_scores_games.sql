@@ -0,0 +1,224 @@
+-- Migration 014: Partition scores and games by season
+-- Version: 2.4.6
+-- Created: 2026-10-18
+-- Description: Declarative LIST partitioning of scores and games on season
+--
+-- Nearly every API query filters scores by season and every ETL step works
+-- one season at a time. With one partition per season the planner prunes the
+-- other seasons from those queries, old seasons stay compact and untouched,
+-- and a season can be rebuilt in a standalone table and swapped in with
+-- DETACH/ATTACH PARTITION (etl/loaders/season_partition.py).
+--
+-- Partitioned tables need the partition key in every primary key and unique
+-- constraint, so:
+--   games:  PRIMARY KEY (game_id, season),
+--           UNIQUE (match_key, round_number, game_number, season)
+--   scores: PRIMARY KEY (score_id, season),
+--           UNIQUE (game_id, player_key, player_position, season),
+--           FOREIGN KEY (game_id, season) REFERENCES games
+-- game_id and score_id still come from their sequences and stay unique on
+-- their own; match_key already determines the season.
+--
+-- Partitions are named <table>_s<season> and created on demand with
+-- create_season_partition('scores', 24). There is no default partition:
+-- inserting a season without one fails rather than landing somewhere it
+-- can't be swapped out of.
+--
+-- The migration rewrites both tables in one transaction.
+
+BEGIN;
+
+-- ============================================================================
+-- PARTITION HELPER
+-- ============================================================================
+
+CREATE OR REPLACE FUNCTION create_season_partition(parent TEXT, p_season INTEGER)
+RETURNS TEXT AS $$
+DECLARE
+    partition_name TEXT := format('%s_s%s', parent, p_season);
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF %I FOR VALUES IN (%s)',
+            partition_name, parent, p_season
+        );
+    END IF;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION create_season_partition(TEXT, INTEGER) IS
+    'Create <parent>_s<season> as a partition of a season-partitioned table if it does not exist';
+
+-- ============================================================================
+-- SET EXISTING ROWS ASIDE
+-- ============================================================================
+
+CREATE TEMP TABLE games_rows ON COMMIT DROP AS SELECT * FROM games;
+CREATE TEMP TABLE scores_rows ON COMMIT DROP AS SELECT * FROM scores;
+
+-- Keep the id sequences (they are owned by the SERIAL columns being dropped)
+ALTER SEQUENCE games_game_id_seq OWNED BY NONE;
+ALTER SEQUENCE scores_score_id_seq OWNED BY NONE;
+
+DROP TABLE scores;
+DROP TABLE games;
+
+-- ============================================================================
+-- PARTITIONED TABLES
+-- ============================================================================
+
+CREATE TABLE games (
+    game_id INTEGER NOT NULL DEFAULT nextval('games_game_id_seq'),
+    match_key VARCHAR(50) NOT NULL,
+    round_number INTEGER NOT NULL CHECK (round_number BETWEEN 1 AND 4),
+    game_number INTEGER NOT NULL DEFAULT 1,
+    machine_key VARCHAR(50) NOT NULL,
+    done BOOLEAN DEFAULT false,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    venue_key VARCHAR(10) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT games_pkey PRIMARY KEY (game_id, season),
+    CONSTRAINT uq_games_match_round_game UNIQUE (match_key, round_number, game_number, season)
+) PARTITION BY LIST (season);
+
+ALTER SEQUENCE games_game_id_seq OWNED BY games.game_id;
+
+COMMENT ON TABLE games IS 'Individual game instances (partitioned by season)';
+COMMENT ON COLUMN games.round_number IS 'Round 1,4 = 4-player; Round 2,3 = 2-player';
+
+CREATE TABLE scores (
+    score_id INTEGER NOT NULL DEFAULT nextval('scores_score_id_seq'),
+    game_id INTEGER NOT NULL,
+    player_key VARCHAR(64) NOT NULL,
+    player_position INTEGER NOT NULL CHECK (player_position BETWEEN 1 AND 4),
+    score BIGINT NOT NULL CHECK (score >= 0),
+    team_key VARCHAR(10) NOT NULL,
+    is_home_team BOOLEAN NOT NULL,
+    player_ipr INTEGER CHECK (player_ipr BETWEEN 1 AND 6),
+    is_substitute BOOLEAN DEFAULT false,
+    match_key VARCHAR(50) NOT NULL,
+    venue_key VARCHAR(10) NOT NULL,
+    machine_key VARCHAR(50) NOT NULL,
+    round_number INTEGER NOT NULL,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    date DATE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT scores_pkey PRIMARY KEY (score_id, season),
+    CONSTRAINT uq_scores_game_player_position
+        UNIQUE (game_id, player_key, player_position, season)
+) PARTITION BY LIST (season);
+
+ALTER SEQUENCE scores_score_id_seq OWNED BY scores.score_id;
+
+COMMENT ON TABLE scores IS 'Individual player scores with full context (partitioned by season)';
+COMMENT ON COLUMN scores.player_position IS '1-4: position in game (reliability varies)';
+COMMENT ON COLUMN scores.player_ipr IS 'IPR at time of match (snapshot)';
+COMMENT ON COLUMN scores.is_substitute IS 'True if player was a substitute (not on official roster)';
+COMMENT ON CONSTRAINT uq_scores_game_player_position ON scores IS 'Ensures a player can only have one score per position in a game';
+
+-- ============================================================================
+-- FOREIGN KEYS
+-- ============================================================================
+
+ALTER TABLE games
+    ADD CONSTRAINT fk_games_match FOREIGN KEY (match_key)
+    REFERENCES matches(match_key) ON DELETE CASCADE;
+
+ALTER TABLE games
+    ADD CONSTRAINT fk_games_machine FOREIGN KEY (machine_key)
+    REFERENCES machines(machine_key) ON DELETE RESTRICT;
+
+ALTER TABLE games
+    ADD CONSTRAINT fk_games_venue FOREIGN KEY (venue_key)
+    REFERENCES venues(venue_key) ON DELETE RESTRICT;
+
+ALTER TABLE scores
+    ADD CONSTRAINT fk_scores_game FOREIGN KEY (game_id, season)
+    REFERENCES games(game_id, season) ON DELETE CASCADE;
+
+ALTER TABLE scores
+    ADD CONSTRAINT fk_scores_player FOREIGN KEY (player_key)
+    REFERENCES players(player_key) ON DELETE CASCADE;
+
+ALTER TABLE scores
+    ADD CONSTRAINT fk_scores_machine FOREIGN KEY (machine_key)
+    REFERENCES machines(machine_key) ON DELETE RESTRICT;
+
+ALTER TABLE scores
+    ADD CONSTRAINT fk_scores_venue FOREIGN KEY (venue_key)
+    REFERENCES venues(venue_key) ON DELETE RESTRICT;
+
+ALTER TABLE scores
+    ADD CONSTRAINT fk_scores_match FOREIGN KEY (match_key)
+    REFERENCES matches(match_key) ON DELETE CASCADE;
+
+-- ============================================================================
+-- INDEXES (created on every partition, present and future)
+-- ============================================================================
+
+CREATE INDEX idx_games_match ON games(match_key);
+CREATE INDEX idx_games_machine ON games(machine_key, season);
+CREATE INDEX idx_games_machine_venue ON games(machine_key, venue_key, season);
+CREATE INDEX idx_games_season_week ON games(season, week);
+
+CREATE INDEX idx_scores_player_machine ON scores(player_key, machine_key, season);
+CREATE INDEX idx_scores_player_venue ON scores(player_key, venue_key, season);
+CREATE INDEX idx_scores_player_season ON scores(player_key, season);
+CREATE INDEX idx_scores_machine_venue ON scores(machine_key, venue_key, season);
+CREATE INDEX idx_scores_machine_score ON scores(machine_key, score);
+CREATE INDEX idx_scores_machine_season ON scores(machine_key, season);
+CREATE INDEX idx_scores_team_machine ON scores(team_key, machine_key, season);
+CREATE INDEX idx_scores_game ON scores(game_id);
+CREATE INDEX idx_scores_season_week ON scores(season, week);
+CREATE INDEX idx_scores_venue_season ON scores(venue_key, season);
+CREATE INDEX idx_scores_round_type ON scores(round_number, season);
+CREATE INDEX idx_scores_home_away ON scores(is_home_team, season);
+CREATE INDEX idx_scores_match_round_machine ON scores(match_key, round_number, machine_key);
+CREATE INDEX idx_scores_team_season ON scores(team_key, season);
+CREATE INDEX idx_scores_venue ON scores(venue_key);
+CREATE INDEX idx_scores_substitute ON scores(is_substitute);
+CREATE INDEX idx_scores_team_season_venue ON scores(team_key, season, venue_key);
+CREATE INDEX idx_scores_player_team ON scores(player_key, team_key);
+
+-- ============================================================================
+-- ONE PARTITION PER EXISTING SEASON, THEN RELOAD
+-- ============================================================================
+
+SELECT create_season_partition('games', season)
+FROM (SELECT DISTINCT season FROM games_rows) s;
+
+SELECT create_season_partition('scores', season)
+FROM (SELECT DISTINCT season FROM scores_rows) s;
+
+INSERT INTO games (
+    game_id, match_key, round_number, game_number, machine_key, done,
+    season, week, venue_key, created_at
+)
+SELECT
+    game_id, match_key, round_number, game_number, machine_key, done,
+    season, week, venue_key, created_at
+FROM games_rows;
+
+INSERT INTO scores (
+    score_id, game_id, player_key, player_position, score, team_key, is_home_team,
+    player_ipr, is_substitute, match_key, venue_key, machine_key, round_number,
+    season, week, date, created_at
+)
+SELECT
+    score_id, game_id, player_key, player_position, score, team_key, is_home_team,
+    player_ipr, is_substitute, match_key, venue_key, machine_key, round_number,
+    season, week, date, created_at
+FROM scores_rows;
+
+ANALYZE games;
+ANALYZE scores;
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.6', 'Partition scores and games by season')
+ON CONFLICT (version) DO NOTHING;
+
+COMMIT;
@@ -0,0 +1,45 @@
+-- Migration 015: Team machine stats aggregate
+-- Version: 2.4.7
+-- Created: 2026-10-18
+-- Description: Pre-aggregated team performance per machine for /teams/{team_key}/machines
+--
+-- One row per (team, machine, venue, season, round, substitutes in/out), the
+-- team-level counterpart of player_machine_stats. Rows are additive: the
+-- endpoint merges the rows matching its filters (seasons, rounds, team
+-- aliases) by summing counts, sums and wins and taking the extremes; the
+-- median of a merged set comes from the concatenated `scores` arrays.
+--
+-- Maintained per season by etl/calculate_team_machine_stats.py.
+
+CREATE TABLE IF NOT EXISTS team_machine_stats (
+    team_key VARCHAR(10) NOT NULL,
+    machine_key VARCHAR(50) NOT NULL,
+    venue_key VARCHAR(10) NOT NULL,
+    season INTEGER NOT NULL,
+    round_number INTEGER NOT NULL CHECK (round_number BETWEEN 1 AND 4),
+    includes_subs BOOLEAN NOT NULL,
+    games_played INTEGER NOT NULL,
+    total_score BIGINT NOT NULL,
+    median_score BIGINT,
+    best_score BIGINT,
+    worst_score BIGINT,
+    wins INTEGER NOT NULL DEFAULT 0,
+    comparisons INTEGER NOT NULL DEFAULT 0,
+    scores BIGINT[] NOT NULL,
+    last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (team_key, machine_key, venue_key, season, round_number, includes_subs)
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_machine_stats_season ON team_machine_stats(season);
+
+COMMENT ON TABLE team_machine_stats IS 'Aggregated team performance by machine, venue, season and round';
+COMMENT ON COLUMN team_machine_stats.venue_key IS '_ALL_ = all venues combined';
+COMMENT ON COLUMN team_machine_stats.includes_subs IS 'False: substitutes excluded from the team scores and from the opponents compared against';
+COMMENT ON COLUMN team_machine_stats.wins IS 'Head-to-head comparisons won against opponents on the same game';
+COMMENT ON COLUMN team_machine_stats.comparisons IS 'Head-to-head comparisons against opponents on the same game';
+COMMENT ON COLUMN team_machine_stats.scores IS 'The scores themselves, sorted, for medians across merged rows';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.7', 'Add team_machine_stats aggregate table')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,57 @@
+-- Migration 016: Score quantile sketches
+-- Version: 2.4.8
+-- Created: 2026-10-18
+-- Description: Mergeable t-digests of scores per machine/venue/season and per player/machine/season
+--
+-- Each row is a t-digest (api/services/quantile_sketch.py): centroid means and
+-- weights sorted by mean, plus the exact count, total, min and max. Digests of
+-- different seasons (or venues) merge into a digest of the combined scores, so
+-- endpoints answer medians, quartiles and percentile ranks for any season set
+-- without sorting the raw scores.
+--
+-- Maintained per season by etl/calculate_score_sketches.py.
+
+CREATE TABLE IF NOT EXISTS machine_score_sketches (
+    machine_key VARCHAR(50) NOT NULL,
+    venue_key VARCHAR(10) NOT NULL,
+    season INTEGER NOT NULL,
+    score_count INTEGER NOT NULL,
+    total_score BIGINT NOT NULL,
+    min_score BIGINT NOT NULL,
+    max_score BIGINT NOT NULL,
+    centroid_means DOUBLE PRECISION[] NOT NULL,
+    centroid_weights INTEGER[] NOT NULL,
+    last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (machine_key, venue_key, season)
+);
+
+CREATE INDEX IF NOT EXISTS idx_machine_score_sketches_season
+    ON machine_score_sketches(season);
+
+CREATE TABLE IF NOT EXISTS player_score_sketches (
+    player_key VARCHAR(64) NOT NULL,
+    machine_key VARCHAR(50) NOT NULL,
+    season INTEGER NOT NULL,
+    score_count INTEGER NOT NULL,
+    total_score BIGINT NOT NULL,
+    min_score BIGINT NOT NULL,
+    max_score BIGINT NOT NULL,
+    centroid_means DOUBLE PRECISION[] NOT NULL,
+    centroid_weights INTEGER[] NOT NULL,
+    last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (player_key, machine_key, season)
+);
+
+CREATE INDEX IF NOT EXISTS idx_player_score_sketches_season
+    ON player_score_sketches(season);
+
+COMMENT ON TABLE machine_score_sketches IS 't-digest of the scores on a machine per venue and season';
+COMMENT ON COLUMN machine_score_sketches.venue_key IS '_ALL_ = all venues combined';
+COMMENT ON COLUMN machine_score_sketches.centroid_means IS 'Centroid means, ascending';
+COMMENT ON COLUMN machine_score_sketches.centroid_weights IS 'Number of scores in each centroid';
+COMMENT ON TABLE player_score_sketches IS 't-digest of a player''s scores on a machine per season';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.8', 'Add machine and player score sketch tables')
+ON CONFLICT (version) DO NOTHING;
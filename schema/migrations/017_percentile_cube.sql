@@ -0,0 +1,33 @@
+-- Migration 017: Score percentile cube
+-- Version: 2.4.9
+-- Created: 2026-10-18
+-- Description: Add round_type to score_percentiles for per venue x round type thresholds
+--
+-- etl/calculate_percentiles.py now stores a dense grid of percentiles (1, 5,
+-- 10, ..., 95, 99) for every machine at all venues and per venue, each for
+-- all rounds and per round type (singles/doubles). Existing rows are the
+-- all-venue, all-round thresholds and get round_type '_ALL_'.
+
+ALTER TABLE score_percentiles
+    ADD COLUMN IF NOT EXISTS round_type VARCHAR(10) NOT NULL DEFAULT '_ALL_'
+    CHECK (round_type IN ('_ALL_', 'singles', 'doubles'));
+
+ALTER TABLE score_percentiles
+    DROP CONSTRAINT IF EXISTS score_percentiles_machine_key_venue_key_season_percentile_key;
+
+ALTER TABLE score_percentiles
+    DROP CONSTRAINT IF EXISTS score_percentiles_cell_key;
+
+ALTER TABLE score_percentiles
+    ADD CONSTRAINT score_percentiles_cell_key
+    UNIQUE (machine_key, venue_key, round_type, season, percentile);
+
+DROP INDEX IF EXISTS idx_percentiles_lookup;
+CREATE INDEX idx_percentiles_lookup ON score_percentiles(machine_key, venue_key, round_type, season);
+
+COMMENT ON COLUMN score_percentiles.round_type IS '_ALL_ = all rounds; singles = rounds 2-3, doubles = rounds 1 and 4';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.4.9', 'Add round_type to score_percentiles')
+ON CONFLICT (version) DO NOTHING;
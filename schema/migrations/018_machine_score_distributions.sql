@@ -0,0 +1,42 @@
+-- Migration 018: Machine score distributions
+-- Version: 2.5.0
+-- Created: 2026-10-18
+-- Description: Pre-binned score histograms and scatter series per machine/venue/season
+--
+-- Backs /machines/{machine_key}/distribution (api/services/score_distribution.py).
+-- Histogram buckets lie on a fixed log grid of 12 buckets per power of ten,
+-- bucket i covering [10^(i/12), 10^((i+1)/12)), plus bucket -1 = [0, 1) for
+-- scores of 0; a row stores the index of its first bucket and the counts from
+-- there on, so rows of different seasons or venues merge by adding counts.
+-- The scatter series holds up to 200 scores picked at evenly spaced ranks,
+-- with the player of each.
+--
+-- Maintained per season by etl/calculate_score_distributions.py.
+
+CREATE TABLE IF NOT EXISTS machine_score_distributions (
+    machine_key VARCHAR(50) NOT NULL,
+    venue_key VARCHAR(10) NOT NULL,
+    season INTEGER NOT NULL,
+    score_count INTEGER NOT NULL,
+    min_score BIGINT NOT NULL,
+    max_score BIGINT NOT NULL,
+    first_bucket INTEGER NOT NULL,
+    bucket_counts INTEGER[] NOT NULL,
+    scatter_scores BIGINT[] NOT NULL,
+    scatter_player_keys VARCHAR(64)[] NOT NULL,
+    last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (machine_key, venue_key, season)
+);
+
+CREATE INDEX IF NOT EXISTS idx_machine_score_distributions_season
+    ON machine_score_distributions(season);
+
+COMMENT ON TABLE machine_score_distributions IS 'Log-scaled score histogram and downsampled scatter series per machine, venue and season';
+COMMENT ON COLUMN machine_score_distributions.venue_key IS '_ALL_ = all venues combined';
+COMMENT ON COLUMN machine_score_distributions.first_bucket IS 'Log-grid index of bucket_counts[1]: bucket i = [10^(i/12), 10^((i+1)/12)), bucket -1 = [0, 1)';
+COMMENT ON COLUMN machine_score_distributions.scatter_scores IS 'Up to 200 scores at evenly spaced ranks, ascending';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.5.0', 'Add machine_score_distributions table')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,43 @@
+-- Migration 019: Machine score leaderboards
+-- Version: 2.5.1
+-- Created: 2026-10-18
+-- Description: Top scores per machine/venue/season with names resolved
+--
+-- Backs /scores/browse and /scores/browse/{machine_key} (api/services/leaderboards.py).
+-- Each (machine, venue, season) board holds its top 100 scores, venue '_ALL_'
+-- being the board over all venues. The top N scores of any set of seasons are
+-- among the top N of each season's board, so the endpoints merge a few small
+-- lists instead of ranking every matching score.
+--
+-- Maintained per season by etl/calculate_score_leaderboards.py.
+
+CREATE TABLE IF NOT EXISTS machine_score_leaderboards (
+    machine_key VARCHAR(50) NOT NULL,
+    venue_key VARCHAR(10) NOT NULL,
+    season INTEGER NOT NULL,
+    rank INTEGER NOT NULL CHECK (rank >= 1),
+    score BIGINT NOT NULL,
+    player_key VARCHAR(64) NOT NULL,
+    player_name VARCHAR(255) NOT NULL,
+    team_key VARCHAR(10) NOT NULL,
+    team_name VARCHAR(255) NOT NULL,
+    score_venue_key VARCHAR(10) NOT NULL,
+    venue_name VARCHAR(255) NOT NULL,
+    round_number INTEGER NOT NULL,
+    date DATE,
+    last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (machine_key, venue_key, season, rank)
+);
+
+CREATE INDEX IF NOT EXISTS idx_machine_score_leaderboards_season
+    ON machine_score_leaderboards(season);
+
+COMMENT ON TABLE machine_score_leaderboards IS 'Top scores per machine, venue and season with player/team/venue names';
+COMMENT ON COLUMN machine_score_leaderboards.venue_key IS 'Board venue; _ALL_ = all venues combined';
+COMMENT ON COLUMN machine_score_leaderboards.rank IS '1 = highest score on the board (ties broken by score_id)';
+COMMENT ON COLUMN machine_score_leaderboards.score_venue_key IS 'Venue the score was recorded at';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.5.1', 'Add machine_score_leaderboards table')
+ON CONFLICT (version) DO NOTHING;
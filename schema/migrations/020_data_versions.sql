@@ -0,0 +1,24 @@
+-- Migration 020: Data version stamps
+-- Version: 2.5.2
+-- Created: 2026-10-18
+-- Description: Stamp appended whenever an ETL run changes the served data
+--
+-- The API's in-process score store (api/services/score_store.py) remembers
+-- MAX(version) when it loads and reloads once it moves. Each database stamps
+-- itself: the pipeline runners stamp the local database after their steps,
+-- and etl/sync_production.py stamps production in the transaction that
+-- applies the synced changes, so the table itself is never synced.
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    version SERIAL PRIMARY KEY,
+    source VARCHAR(50) NOT NULL,
+    stamped_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+COMMENT ON TABLE data_versions IS 'One row per ETL run that changed the data; MAX(version) is the current data version';
+COMMENT ON COLUMN data_versions.source IS 'What changed the data (run_full_pipeline, update_season, sync_production, manual)';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.5.2', 'Add data_versions table')
+ON CONFLICT (version) DO NOTHING;
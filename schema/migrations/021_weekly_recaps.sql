@@ -0,0 +1,29 @@
+-- Migration 021: Weekly recaps
+-- Version: 2.5.3
+-- Created: 2026-10-18
+-- Description: Materialized /analysis/weekly-recap responses per completed week
+--
+-- Backs /analysis/weekly-recap (api/services/weekly_recap.py). Each row is the
+-- whole recap of one completed week - summary, upsets, away wins, Round 4
+-- comebacks, score outliers, machine popularity and group standings - so the
+-- endpoint reads one row instead of running its queries and parsing match files.
+--
+-- Maintained per season by etl/calculate_weekly_recaps.py, which rebuilds every
+-- completed week of the season: outliers and standings depend on season-wide
+-- percentiles and results that move as later weeks are played.
+
+CREATE TABLE IF NOT EXISTS weekly_recaps (
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    recap JSONB NOT NULL,
+    last_calculated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (season, week)
+);
+
+COMMENT ON TABLE weekly_recaps IS 'Weekly recap response per completed week (see api/models/schemas.py WeeklyRecap)';
+COMMENT ON COLUMN weekly_recaps.recap IS 'WeeklyRecap as JSON';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.5.3', 'Add weekly_recaps table')
+ON CONFLICT (version) DO NOTHING;
@@ -0,0 +1,41 @@
+-- Migration 022: Game and round points
+-- Version: 2.5.4
+-- Created: 2026-10-18
+-- Description: Per-game team points on games, per-round points and running totals
+--
+-- Team points per game and round used to exist only in the match JSON files,
+-- so Round 4 comebacks were found by re-reading the archive week by week.
+-- etl/load_season.py now stores each game's home/away points on games and
+-- each round's points with the running match totals in match_round_points,
+-- which comeback, round swing and in-progress queries read with plain SQL
+-- across any number of seasons. Reload seasons to backfill existing data.
+
+ALTER TABLE games ADD COLUMN IF NOT EXISTS home_points NUMERIC(4, 1);
+ALTER TABLE games ADD COLUMN IF NOT EXISTS away_points NUMERIC(4, 1);
+
+COMMENT ON COLUMN games.home_points IS 'Points won by the home team in this game (NULL if not recorded)';
+COMMENT ON COLUMN games.away_points IS 'Points won by the away team in this game (NULL if not recorded)';
+
+CREATE TABLE IF NOT EXISTS match_round_points (
+    match_key VARCHAR(50) NOT NULL REFERENCES matches(match_key) ON DELETE CASCADE,
+    round_number INTEGER NOT NULL CHECK (round_number BETWEEN 1 AND 4),
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    home_points NUMERIC(5, 1) NOT NULL,
+    away_points NUMERIC(5, 1) NOT NULL,
+    home_total NUMERIC(5, 1) NOT NULL,
+    away_total NUMERIC(5, 1) NOT NULL,
+    PRIMARY KEY (match_key, round_number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_match_round_points_season_week_round
+    ON match_round_points(season, week, round_number);
+
+COMMENT ON TABLE match_round_points IS 'Team game points per match round, with running match totals';
+COMMENT ON COLUMN match_round_points.home_points IS 'Home team game points in this round (bonus points excluded)';
+COMMENT ON COLUMN match_round_points.home_total IS 'Home team game points after this round (rounds 1..round_number)';
+
+-- Update schema version
+INSERT INTO schema_version (version, description)
+VALUES ('2.5.4', 'Add game points and match_round_points table')
+ON CONFLICT (version) DO NOTHING;
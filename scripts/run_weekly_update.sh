@@ -54,6 +54,21 @@ echo -e "${GREEN}✓${NC} Team machine picks updated"
 
 python etl/calculate_match_points.py --season $SEASON
 echo -e "${GREEN}✓${NC} Match points updated"
+
+python etl/calculate_team_machine_stats.py --season $SEASON
+echo -e "${GREEN}✓${NC} Team machine stats updated"
+
+python etl/calculate_score_sketches.py --season $SEASON
+echo -e "${GREEN}✓${NC} Score sketches updated"
+
+python etl/calculate_score_distributions.py --season $SEASON
+echo -e "${GREEN}✓${NC} Score distributions updated"
+
+python etl/calculate_score_leaderboards.py --season $SEASON
+echo -e "${GREEN}✓${NC} Score leaderboards updated"
+
+python etl/calculate_weekly_recaps.py --season $SEASON
+echo -e "${GREEN}✓${NC} Weekly recaps updated"
 echo ""
 
 # Step 4: Sync to production